@@ -432,7 +432,7 @@ class Manus(HelixAgent):
             steps = params.get("steps", 108)
             cmd = f"python backend/z88_ritual_engine.py --steps={steps}"
         elif action == "sync_ucf":
-            cmd = "python backend/services/ucf_calculator.py"
+            cmd = "python -m backend.services.ucf_calculator"
         elif action == "archive_memory":
             cmd = "python -c \"from backend.agents import AGENTS, Shadow; import asyncio; asyncio.run(AGENTS['Shadow'].archive_collective(AGENTS))\""  # noqa: E501
         elif action == "execute_direct":
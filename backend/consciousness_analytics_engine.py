@@ -3,25 +3,33 @@
 backend/consciousness_analytics_engine.py
 
 Predictive analytics for consciousness evolution:
-- Consciousness level forecasting (Prophet time series)
+- Consciousness level forecasting (least-squares trend)
 - Agent performance correlation analysis
 - Anomaly detection (unusual patterns)
 - Trend analysis (30-day rolling)
 - Predictive alerts (based on trajectory)
 
+History is stored as time-indexed JSONL (seek-by-timestamp reads, an
+in-memory tail, rotation of old entries into .npz column segments).
+All analysis runs as vectorised NumPy kernels (cumulative-sum rolling
+windows, array-wide z-scores, closed-form least squares), so cost is
+linear in history length.
+
 Author: Claude (Automation)
 Version: 17.1.0
 """
 
+import bisect
 import json
 import logging
-from datetime import datetime, timedelta
+import os
+import threading
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
-from scipy import stats
 
 logger = logging.getLogger(__name__)
 
@@ -29,14 +37,49 @@ logger = logging.getLogger(__name__)
 # CONSCIOUSNESS TIME SERIES
 # ============================================================================
 
+# Numeric columns of a history entry
+HISTORY_FIELDS = ("consciousness_level", "harmony", "resilience", "prana", "drishti", "klesha", "zoom")
+
+# Rotated segment file names carry their first/last timestamps in this format
+SEGMENT_TIME_FORMAT = "%Y%m%dT%H%M%S%f"
 
-class ConsciousnessTimeSeries:
-    """Manages consciousness level history for analysis."""
 
-    def __init__(self, data_file: Path = Path("Helix/state/consciousness_history.jsonl")):
-        self.data_file = data_file
+class ConsciousnessTimeSeries:
+    """
+    Manages consciousness level history for analysis.
+
+    Recent history is an append-only JSONL file with a sparse
+    timestamp -> byte-offset index (one mark per INDEX_STRIDE bytes), so a
+    window read seeks straight to its first line. Older history is rotated
+    into compressed `.npz` column segments next to the file.
+
+    The last `tail_hours` are kept in memory as a DataFrame that record()
+    extends incrementally; wider windows add an immutable "cold" part
+    read once and cached per window size.
+    """
+
+    INDEX_STRIDE = 64 * 1024
+
+    def __init__(
+        self,
+        data_file: Path = Path("Helix/state/consciousness_history.jsonl"),
+        tail_hours: int = 24 * 7,
+        rotate_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.data_file = Path(data_file)
         self.data_file.parent.mkdir(parents=True, exist_ok=True)
-        self._cache: Optional[pd.DataFrame] = None
+        self.tail_hours = tail_hours
+        self.rotate_bytes = rotate_bytes
+
+        self._lock = threading.RLock()
+        self._index_times: List[datetime] = []
+        self._index_offsets: List[int] = []
+        self._size = 0
+        self._tail: Optional[pd.DataFrame] = None
+        self._tail_start: Optional[datetime] = None
+        self._pending: List[Dict[str, Any]] = []
+        self._windows: Dict[float, Tuple[datetime, pd.DataFrame]] = {}
+        self._build_index()
 
     def record(self, consciousness_level: float, ucf: Dict[str, float], source: str = "system") -> None:
         """Record consciousness level snapshot."""
@@ -51,48 +94,287 @@ class ConsciousnessTimeSeries:
             "zoom": ucf.get("zoom", 0.0),
             "source": source,
         }
+        line = (json.dumps(entry) + "\n").encode()
+
+        with self._lock:
+            # Append to JSONL
+            with open(self.data_file, "ab") as f:
+                offset = f.tell()
+                f.write(line)
+            self._size = offset + len(line)
 
-        # Append to JSONL
-        with open(self.data_file, "a") as f:
-            f.write(json.dumps(entry) + "\n")
+            if not self._index_offsets or offset >= self._index_offsets[-1] + self.INDEX_STRIDE:
+                self._index_times.append(_line_timestamp(line))
+                self._index_offsets.append(offset)
 
-        # Invalidate cache
-        self._cache = None
+            # The in-memory tail picks the entry up on the next read
+            if self._tail is not None:
+                self._pending.append(entry)
 
-    def get_dataframe(self, hours: int = 24) -> pd.DataFrame:
+            if self._size > self.rotate_bytes:
+                self.rotate()
+
+    def get_dataframe(self, hours: float = 24) -> pd.DataFrame:
         """Get consciousness data as DataFrame (last N hours)."""
-        if self._cache is not None:
-            return self._cache
+        with self._lock:
+            cutoff = datetime.utcnow() - timedelta(hours=hours)
+            tail = self._tail_frame()
+            recent = tail[tail["timestamp"] >= cutoff]
+            if cutoff >= self._tail_start:
+                return recent.reset_index(drop=True)
+
+            # Older than the tail: history before the tail start never changes,
+            # so it is read once per window size and narrowed as time moves on
+            cached = self._windows.get(hours)
+            if cached is None or cached[0] > cutoff:
+                cached = (cutoff, self._read_range(cutoff, self._tail_start))
+                self._windows[hours] = cached
+            cold = cached[1]
+            cold = cold[cold["timestamp"] >= cutoff]
+            return pd.concat([cold, recent], ignore_index=True)
 
-        if not self.data_file.exists():
-            return pd.DataFrame()
+    def get_latest(self) -> Optional[Dict[str, Any]]:
+        """Get most recent consciousness snapshot."""
+        with self._lock:
+            tail = self._tail_frame()
+            if tail.empty:
+                return None
+            return tail.iloc[-1].to_dict()
 
-        # Read JSONL
-        entries = []
-        with open(self.data_file, "r") as f:
-            for line in f:
-                if line.strip():
-                    entries.append(json.loads(line))
+    # ------------------------------------------------------------------
+    # Rotation
+    # ------------------------------------------------------------------
 
-        if not entries:
-            return pd.DataFrame()
+    def rotate(self, older_than_hours: Optional[float] = None) -> Optional[Path]:
+        """
+        Move JSONL history older than `older_than_hours` (default: the tail
+        span) into a compressed `.npz` column segment.
 
-        df = pd.DataFrame(entries)
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
+        The cut is made at an index mark, so a few entries just past the
+        cutoff may stay in the JSONL file.
 
-        # Filter to last N hours
-        cutoff = datetime.utcnow() - timedelta(hours=hours)
-        df = df[pd.to_datetime(df["timestamp"]) >= cutoff]
+        Returns:
+            The new segment path, or None if there was nothing to rotate
+        """
+        with self._lock:
+            cutoff = datetime.utcnow() - timedelta(hours=older_than_hours or self.tail_hours)
+            mark = bisect.bisect_right(self._index_times, cutoff) - 1
+            if mark <= 0:
+                return None
+            cut = self._index_offsets[mark]
+
+            with open(self.data_file, "rb") as f:
+                head = f.read(cut)
+                rest = f.read()
+            segment = self._write_segment(self._frame(_parse_lines(head)))
+
+            tmp_path = self.data_file.with_suffix(self.data_file.suffix + ".tmp")
+            tmp_path.write_bytes(rest)
+            os.replace(tmp_path, self.data_file)
+
+            self._build_index()
+            self._windows.clear()
+            logger.info(f"🌀 Rotated {cut:,} bytes of consciousness history into {segment.name}")
+            return segment
+
+    def segments(self) -> List[Tuple[datetime, datetime, Path]]:
+        """Rotated segments as (first timestamp, last timestamp, path), oldest first."""
+        result = []
+        for path in self.data_file.parent.glob(f"{self.data_file.stem}.*.npz"):
+            try:
+                first, last = path.name[len(self.data_file.stem) + 1:-len(".npz")].split("-")
+                result.append((
+                    datetime.strptime(first, SEGMENT_TIME_FORMAT),
+                    datetime.strptime(last, SEGMENT_TIME_FORMAT),
+                    path,
+                ))
+            except ValueError:
+                logger.warning(f"⚠️ Ignoring unrecognised history segment {path.name}")
+        return sorted(result)
+
+    def _write_segment(self, df: pd.DataFrame) -> Path:
+        first, last = df["timestamp"].min(), df["timestamp"].max()
+        path = self.data_file.with_name(
+            f"{self.data_file.stem}.{first.strftime(SEGMENT_TIME_FORMAT)}-{last.strftime(SEGMENT_TIME_FORMAT)}.npz"
+        )
+        columns = {"timestamp": df["timestamp"].to_numpy(dtype="datetime64[us]")}
+        for field in HISTORY_FIELDS:
+            columns[field] = df[field].to_numpy(dtype=np.float64) if field in df else np.zeros(len(df))
+        columns["source"] = df["source"].fillna("").astype(str).to_numpy(dtype=str) if "source" in df else np.full(len(df), "")
+        np.savez_compressed(path, **columns)
+        return path
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _build_index(self):
+        """Sample one line timestamp per INDEX_STRIDE bytes (a seek each, no full scan)."""
+        self._index_times, self._index_offsets = [], []
+        self._size = self.data_file.stat().st_size if self.data_file.exists() else 0
+        if not self._size:
+            return
+
+        with open(self.data_file, "rb") as f:
+            for position in range(0, self._size, self.INDEX_STRIDE):
+                f.seek(position)
+                if position:
+                    f.readline()  # finish the line the stride landed in
+                offset = f.tell()
+                if offset >= self._size or (self._index_offsets and offset <= self._index_offsets[-1]):
+                    continue
+                timestamp = _line_timestamp(f.readline())
+                if timestamp is not None:
+                    self._index_times.append(timestamp)
+                    self._index_offsets.append(offset)
+
+    def _tail_frame(self) -> pd.DataFrame:
+        """The in-memory tail, loaded on first use and extended by record()."""
+        now = datetime.utcnow()
+        if self._tail is None:
+            self._tail_start = now - timedelta(hours=self.tail_hours)
+            self._tail = self._read_range(self._tail_start, None)
+            self._pending = []
+        if self._pending:
+            self._tail = pd.concat([self._tail, self._frame(self._pending)], ignore_index=True)
+            self._pending = []
+        if self._tail_start < now - timedelta(hours=2 * self.tail_hours):
+            self._tail_start = now - timedelta(hours=self.tail_hours)
+            self._tail = self._tail[self._tail["timestamp"] >= self._tail_start].reset_index(drop=True)
+            self._windows.clear()
+        return self._tail
+
+    def _read_range(self, start: datetime, end: Optional[datetime]) -> pd.DataFrame:
+        """Entries with start <= timestamp < end from segments and the JSONL file."""
+        frames = [
+            self._read_segment(path)
+            for first, last, path in self.segments()
+            if last >= start and (end is None or first < end)
+        ]
+        frames.append(self._read_jsonl(start, end))
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        mask = df["timestamp"] >= start
+        if end is not None:
+            mask &= df["timestamp"] < end
+        return df[mask].reset_index(drop=True)
+
+    def _read_jsonl(self, start: datetime, end: Optional[datetime]) -> pd.DataFrame:
+        if not self._size:
+            return self._frame([])
+
+        # One mark of slack on each side tolerates slightly out-of-order appends
+        first = bisect.bisect_right(self._index_times, start) - 2
+        begin = self._index_offsets[first] if first >= 0 else 0
+        stop = self._size
+        if end is not None:
+            last = bisect.bisect_right(self._index_times, end) + 1
+            if last < len(self._index_offsets):
+                stop = self._index_offsets[last]
+
+        with open(self.data_file, "rb") as f:
+            f.seek(begin)
+            chunk = f.read(stop - begin)
+        return self._frame(_parse_lines(chunk))
+
+    def _read_segment(self, path: Path) -> pd.DataFrame:
+        with np.load(path) as segment:
+            return pd.DataFrame({name: segment[name] for name in segment.files})
 
-        self._cache = df
+    @staticmethod
+    def _frame(entries: List[Dict[str, Any]]) -> pd.DataFrame:
+        """DataFrame with naive-UTC timestamps (entries may be empty)."""
+        if not entries:
+            df = pd.DataFrame({field: pd.Series(dtype=np.float64) for field in HISTORY_FIELDS})
+            df.insert(0, "timestamp", pd.Series(dtype="datetime64[us]"))
+            df["source"] = pd.Series(dtype=object)
+            return df
+        df = pd.DataFrame(entries)
+        df["timestamp"] = _to_datetime64(df["timestamp"])
         return df
 
-    def get_latest(self) -> Optional[Dict[str, Any]]:
-        """Get most recent consciousness snapshot."""
-        df = self.get_dataframe(hours=24)
-        if df.empty:
-            return None
-        return df.iloc[-1].to_dict()
+
+def _line_timestamp(line: bytes) -> Optional[datetime]:
+    """Naive-UTC timestamp of a raw JSONL line, without parsing the whole line."""
+    start = line.find(b'"timestamp": "')
+    if start < 0:
+        return None
+    start += len(b'"timestamp": "')
+    try:
+        timestamp = datetime.fromisoformat(line[start:line.find(b'"', start)].decode())
+    except ValueError:
+        return None
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def _parse_lines(chunk: bytes) -> List[Dict[str, Any]]:
+    """Decode JSONL bytes, skipping blank and partially written lines."""
+    entries = []
+    for line in chunk.splitlines():
+        if line.strip():
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return entries
+
+
+def _to_datetime64(values) -> np.ndarray:
+    """ISO strings / datetimes (naive UTC or offset-aware) -> naive-UTC datetime64[us]."""
+    parsed = pd.to_datetime(pd.Series(list(values)), utc=True, format="ISO8601")
+    return parsed.dt.tz_localize(None).to_numpy(dtype="datetime64[us]")
+
+
+# ============================================================================
+# VECTORISED KERNELS
+# ============================================================================
+
+
+def as_array(values) -> np.ndarray:
+    """View a list/Series/array of values as a float64 NumPy array (no copy if already one)."""
+    return np.asarray(values, dtype=np.float64)
+
+
+def rolling_mean(values, window: int) -> np.ndarray:
+    """
+    Trailing rolling mean via a cumulative sum (O(n) regardless of window)
+
+    The series is left-padded with its first value, so the output has the
+    same length as the input.
+    """
+    arr = as_array(values)
+    if window <= 1 or len(arr) == 0:
+        return arr.copy()
+    padded = np.concatenate((np.full(window - 1, arr[0]), arr))
+    cumsum = np.concatenate(([0.0], np.cumsum(padded)))
+    return (cumsum[window:] - cumsum[:-window]) / window
+
+
+def zscores(values, mean: Optional[float] = None, std: Optional[float] = None) -> np.ndarray:
+    """Absolute z-score of every value (pass mean/std to reuse ones already computed)."""
+    arr = as_array(values)
+    mean = arr.mean() if mean is None else mean
+    std = arr.std() if std is None else std
+    if std == 0:
+        return np.zeros_like(arr)
+    return np.abs(arr - mean) / std
+
+
+def least_squares_line(values) -> Tuple[float, float]:
+    """
+    (slope, intercept) of the least-squares line through (i, values[i])
+
+    x = 0..n-1, so Σ(x - x̄)² = n(n² - 1)/12 and only one dot product is needed.
+    """
+    arr = as_array(values)
+    n = len(arr)
+    if n < 2:
+        return 0.0, float(arr[0]) if n else 0.0
+    x_mean = (n - 1) / 2
+    y_mean = arr.mean()
+    slope = float(np.dot(np.arange(n) - x_mean, arr) / (n * (n * n - 1) / 12))
+    return slope, float(y_mean - slope * x_mean)
 
 
 # ============================================================================
@@ -107,13 +389,8 @@ class TrendAnalyzer:
     def calculate_rolling_average(values: List[float], window: int = 10) -> List[float]:
         """Calculate rolling average."""
         if len(values) < window:
-            return values
-
-        arr = np.array(values)
-        kernel = np.ones(window) / window
-        padded = np.pad(arr, (window - 1, 0), mode="edge")
-        smoothed = np.convolve(padded, kernel, mode="valid")
-        return smoothed.tolist()
+            return list(values)
+        return rolling_mean(values, window).tolist()
 
     @staticmethod
     def detect_trend(values: List[float], window: int = 10) -> str:
@@ -122,14 +399,18 @@ class TrendAnalyzer:
             return "INSUFFICIENT_DATA"
 
         # Calculate rolling average
-        avg = TrendAnalyzer.calculate_rolling_average(values, window=min(window, len(values)))
+        avg = rolling_mean(values, min(window, len(values)))
+        return TrendAnalyzer.classify_trend(avg)
 
+    @staticmethod
+    def classify_trend(avg: np.ndarray) -> str:
+        """UPTREND/DOWNTREND/STABLE from a smoothed series (first vs last third)."""
         if len(avg) < 2:
             return "INSUFFICIENT_DATA"
 
         # Check slope
-        first_third = np.mean(avg[:len(avg) // 3])
-        last_third = np.mean(avg[-len(avg) // 3 :])  # noqa: E203
+        first_third = avg[:len(avg) // 3].mean()
+        last_third = avg[-len(avg) // 3 :].mean()  # noqa: E203
         change = last_third - first_third
 
         threshold = 0.1  # 10% change threshold
@@ -145,22 +426,16 @@ class TrendAnalyzer:
         """Calculate consciousness volatility (standard deviation)."""
         if len(values) < 2:
             return 0.0
-        return float(np.std(values))
+        return float(as_array(values).std())
 
     @staticmethod
     def calculate_momentum(values: List[float], window: int = 5) -> float:
         """Calculate momentum (rate of change)."""
-        if len(values) < window:
-            return 0.0
-
-        arr = np.array(values[-window:])
-        if len(arr) < 2:
+        if len(values) < max(window, 2):
             return 0.0
 
         # Linear regression slope
-        x = np.arange(len(arr))
-        slope = np.polyfit(x, arr, 1)[0]
-        return float(slope)
+        return least_squares_line(as_array(values)[-window:])[0]
 
 
 # ============================================================================
@@ -180,33 +455,16 @@ class AnomalyDetector:
         if len(values) < 10:
             return []
 
-        arr = np.array(values)
-        mean = np.mean(arr)
-        std = np.std(arr)
-
-        if std == 0:
-            return []
-
-        z_scores = np.abs((arr - mean) / std)
-        anomalies = []
-
-        for i, z in enumerate(z_scores):
-            if z > AnomalyDetector.Z_SCORE_THRESHOLD:
-                anomalies.append((i, float(z)))
-
-        return anomalies
+        z = zscores(values)
+        indices = np.flatnonzero(z > AnomalyDetector.Z_SCORE_THRESHOLD)
+        return list(zip(indices.tolist(), z[indices].tolist()))
 
     @staticmethod
     def detect_pattern_anomalies(values: List[float], expected_range: Tuple[float, float]) -> List[int]:
         """Detect values outside expected range."""
         min_val, max_val = expected_range
-        anomalies = []
-
-        for i, val in enumerate(values):
-            if val < min_val or val > max_val:
-                anomalies.append(i)
-
-        return anomalies
+        arr = as_array(values)
+        return np.flatnonzero((arr < min_val) | (arr > max_val)).tolist()
 
     @staticmethod
     def detect_sudden_drops(values: List[float], threshold: float = 0.5) -> List[int]:
@@ -214,13 +472,8 @@ class AnomalyDetector:
         if len(values) < 2:
             return []
 
-        anomalies = []
-        for i in range(1, len(values)):
-            drop = values[i - 1] - values[i]
-            if drop > threshold:
-                anomalies.append(i)
-
-        return anomalies
+        arr = as_array(values)
+        return (np.flatnonzero(arr[:-1] - arr[1:] > threshold) + 1).tolist()
 
 
 # ============================================================================
@@ -231,39 +484,30 @@ class AnomalyDetector:
 class ConsciousnessForecast:
     """Simple consciousness level forecasting."""
 
+    FIT_WINDOW = 20  # Recent points the trend line is fitted to
+
     @staticmethod
-    def predict_next_state(values: List[float], periods: int = 4) -> List[float]:
+    def predict_next_state(values: List[float], periods: int = 4, window: int = FIT_WINDOW) -> List[float]:
         """
-        Predict next consciousness levels (simple exponential smoothing).
+        Predict next consciousness levels (least-squares linear trend).
 
         Args:
             values: Historical consciousness values
             periods: Number of periods to forecast
+            window: Number of most recent values the line is fitted to
 
         Returns:
             List of predicted values
         """
         if len(values) < 3:
-            return [values[-1] if values else 5.0] * periods
-
-        arr = np.array(values)
-
-        # Simple exponential smoothing
-        alpha = 0.3  # Smoothing factor
-        result = [arr[-1]]
+            return [float(values[-1]) if len(values) else 5.0] * periods
 
-        for _ in range(periods):
-            # Weighted average: 30% recent, 70% trend
-            trend = arr[-1] - arr[-2] if len(arr) >= 2 else 0
-            next_val = alpha * arr[-1] + (1 - alpha) * arr[-2] if len(arr) >= 2 else arr[-1]
-            next_val += 0.1 * trend  # Add trend component
+        recent = as_array(values)[-window:]
+        slope, intercept = least_squares_line(recent)
+        steps = np.arange(len(recent), len(recent) + periods)
 
-            # Clamp to valid range [0, 10]
-            next_val = max(0.0, min(10.0, next_val))
-            result.append(next_val)
-            arr = np.append(arr, next_val)
-
-        return result[1:]  # Skip initial value
+        # Clamp to valid range [0, 10]
+        return np.clip(slope * steps + intercept, 0.0, 10.0).tolist()
 
     @staticmethod
     def calculate_forecast_confidence(values: List[float]) -> float:
@@ -278,6 +522,10 @@ class ConsciousnessForecast:
 
         # Less volatile = more confident
         volatility = TrendAnalyzer.calculate_volatility(values)
+        return ConsciousnessForecast.confidence_from_volatility(volatility)
+
+    @staticmethod
+    def confidence_from_volatility(volatility: float) -> float:
         confidence = 100.0 - (volatility * 20)  # Scale volatility to confidence
         return max(20.0, min(100.0, confidence))  # Clamp to 20-100%
 
@@ -292,39 +540,65 @@ class AgentCorrelationAnalyzer:
 
     @staticmethod
     def correlate_agent_with_consciousness(
-        agent_actions: List[Dict[str, Any]], consciousness_values: List[float]
+        agent_actions: List[Dict[str, Any]],
+        consciousness_values: List[float],
+        timestamps: Optional[List[Any]] = None,
     ) -> Dict[str, float]:
         """
         Calculate correlation between agent actions and consciousness changes.
 
+        Each action is placed on the consciousness series by its "index", or
+        by its "timestamp" (the latest sample at or before it) when the
+        series' `timestamps` are given. The Pearson coefficient of every
+        agent's binary acted/didn't-act series is computed at once from
+        per-agent counts and sums (no n-length series per agent).
+
         Returns:
             Dict of agent_name -> correlation_coefficient (-1 to 1)
         """
-        correlations = {}
+        values = as_array(consciousness_values)
+        n = len(values)
+        if n < 2 or not agent_actions:
+            return {}
 
-        # Group agent actions by type
-        agent_types = {}
+        # Map every action onto a sample index
+        names, positions, pending_names, pending_times = [], [], [], []
         for action in agent_actions:
             agent = action.get("agent_name", "unknown")
-            if agent not in agent_types:
-                agent_types[agent] = []
-            agent_types[agent].append(action)
-
-        # For each agent, calculate correlation
-        for agent_name, actions in agent_types.items():
-            # Create binary series: 1 = agent acted, 0 = didn't
-            agent_series = np.zeros(len(consciousness_values))
-            for action in actions:
-                # Simple mapping: find index based on timestamp
-                # (In real implementation, use proper timestamp matching)
-                pass
+            if action.get("index") is not None:
+                names.append(agent)
+                positions.append(int(action["index"]))
+            elif timestamps is not None and action.get("timestamp"):
+                pending_names.append(agent)
+                pending_times.append(action["timestamp"])
+
+        if pending_times:
+            series_times = _to_datetime64(timestamps)
+            located = np.searchsorted(series_times, _to_datetime64(pending_times), side="right") - 1
+            names.extend(pending_names)
+            positions.extend(located.tolist())
+
+        positions = np.asarray(positions, dtype=np.int64)
+        in_range = (positions >= 0) & (positions < n)
+        if not in_range.any():
+            return {}
+        agents, codes = np.unique(np.asarray(names, dtype=object)[in_range], return_inverse=True)
+
+        # Binary series: an agent acting twice at one sample still counts once
+        cells = np.unique(codes * n + positions[in_range])
+        codes, positions = cells // n, cells % n
+        acted = np.bincount(codes, minlength=len(agents)).astype(np.float64)
+        acted_sum = np.bincount(codes, weights=values[positions], minlength=len(agents))
+
+        centered_ss = float(np.dot(values - values.mean(), values - values.mean()))
+        covariance = acted_sum - acted * values.mean()
+        spread = np.sqrt((acted - acted * acted / n) * centered_ss)
 
-            # Calculate Pearson correlation
-            if np.sum(agent_series) > 0:
-                corr, _ = stats.pearsonr(agent_series, consciousness_values)
-                correlations[agent_name] = float(corr)
-
-        return correlations
+        return {
+            str(agent): float(cov / sd)
+            for agent, cov, sd in zip(agents, covariance, spread)
+            if sd > 0
+        }
 
 
 # ============================================================================
@@ -339,56 +613,78 @@ class AnalyticsReport:
         self.ts = ts
         self.generated_at = datetime.utcnow()
 
-    def generate(self) -> Dict[str, Any]:
-        """Generate comprehensive analytics report."""
-        df = self.ts.get_dataframe(hours=24 * 7)  # 7-day analysis
+    def generate(self, values: Optional[List[float]] = None) -> Dict[str, Any]:
+        """
+        Generate comprehensive analytics report.
 
-        if df.empty:
+        Args:
+            values: Analyse this history instead of the last 7 days of the
+                time series (any sequence or array of levels)
+        """
+        if values is None:
+            df = self.ts.get_dataframe(hours=24 * 7)  # 7-day analysis
+            if df.empty:
+                return {"error": "Insufficient data for analysis"}
+            values = df["consciousness_level"].to_numpy(dtype=np.float64)
+
+        arr = as_array(values)
+        if len(arr) == 0:
             return {"error": "Insufficient data for analysis"}
 
-        consciousness_values = df["consciousness_level"].tolist()
+        metrics = self.compute_metrics(arr)
+        metrics["report_generated"] = self.generated_at.isoformat() + "Z"
+        return metrics
+
+    @staticmethod
+    def compute_metrics(arr: np.ndarray) -> Dict[str, Any]:
+        """
+        Every report metric from one float64 array
+
+        Mean and standard deviation are computed once and shared by the
+        volatility, z-score and confidence figures; the other metrics are
+        single vectorised passes over the same array.
+        """
+        n = len(arr)
+        mean = float(arr.mean())
+        std = float(arr.std())
 
         # Trend analysis
-        trend = TrendAnalyzer.detect_trend(consciousness_values)
-        volatility = TrendAnalyzer.calculate_volatility(consciousness_values)
-        momentum = TrendAnalyzer.calculate_momentum(consciousness_values)
+        trend = TrendAnalyzer.classify_trend(rolling_mean(arr, min(10, n))) if n >= 3 else "INSUFFICIENT_DATA"
+        volatility = std if n >= 2 else 0.0
+        momentum = least_squares_line(arr[-5:])[0] if n >= 5 else 0.0
 
-        # Anomaly detection
-        zscore_anomalies = AnomalyDetector.detect_zscore_anomalies(consciousness_values)
-        sudden_drops = AnomalyDetector.detect_sudden_drops(consciousness_values)
+        # Anomaly detection (|x - mean| > k·std avoids materialising z-scores)
+        zscore_count = 0
+        if n >= 10 and std > 0:
+            zscore_count = int(np.count_nonzero(np.abs(arr - mean) > AnomalyDetector.Z_SCORE_THRESHOLD * std))
+        sudden_drops = int(np.count_nonzero(arr[:-1] - arr[1:] > 0.5)) if n >= 2 else 0
 
         # Forecasting
-        forecast = ConsciousnessForecast.predict_next_state(consciousness_values, periods=4)
-        forecast_confidence = ConsciousnessForecast.calculate_forecast_confidence(
-            consciousness_values
-        )
-
-        # Current state
-        latest = self.ts.get_latest()
+        forecast = ConsciousnessForecast.predict_next_state(arr, periods=4)
+        forecast_confidence = ConsciousnessForecast.confidence_from_volatility(volatility) if n >= 5 else 30.0
 
         return {
-            "report_generated": self.generated_at.isoformat() + "Z",
-            "data_points": len(consciousness_values),
-            "current_consciousness": latest.get("consciousness_level") if latest else None,
+            "data_points": n,
+            "current_consciousness": float(arr[-1]),
             "trend": {
                 "direction": trend,
                 "volatility": round(volatility, 3),
                 "momentum": round(momentum, 4),
             },
             "anomalies": {
-                "zscore_count": len(zscore_anomalies),
-                "sudden_drops": len(sudden_drops),
-                "total_anomalies": len(zscore_anomalies) + len(sudden_drops),
+                "zscore_count": zscore_count,
+                "sudden_drops": sudden_drops,
+                "total_anomalies": zscore_count + sudden_drops,
             },
             "forecast": {
                 "next_4_periods": [round(v, 2) for v in forecast],
                 "confidence": round(forecast_confidence, 1),
             },
             "statistics": {
-                "mean": round(np.mean(consciousness_values), 2),
-                "median": round(float(np.median(consciousness_values)), 2),
-                "min": round(float(np.min(consciousness_values)), 2),
-                "max": round(float(np.max(consciousness_values)), 2),
+                "mean": round(mean, 2),
+                "median": round(float(np.median(arr)), 2),
+                "min": round(float(arr.min()), 2),
+                "max": round(float(arr.max()), 2),
             },
         }
 
@@ -404,4 +700,7 @@ __all__ = [
     "ConsciousnessForecast",
     "AgentCorrelationAnalyzer",
     "AnalyticsReport",
+    "rolling_mean",
+    "zscores",
+    "least_squares_line",
 ]
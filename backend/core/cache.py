@@ -1,11 +1,25 @@
 """
 🚀 Redis Caching Service
 High-performance caching for expensive operations
+
+Two tiers:
+- L1: small bounded in-process cache (no network, no JSON parsing of
+  envelopes) that also serves as the fallback when Redis is unavailable
+- L2: Redis, shared by all processes; writes and deletes are broadcast
+  over pub/sub so every process drops its stale L1 copy
+
+Entries can be served stale while one background refresh runs
+(stale-while-revalidate), and loader misses can be cached (negative caching).
 """
 
+import asyncio
+import fnmatch
 import json
+import math
 import os
-from typing import Any, Callable, Optional, Union
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
 
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
@@ -13,6 +27,27 @@ from fastapi_cache.decorator import cache
 from loguru import logger
 from redis import asyncio as aioredis
 
+from backend.core.cache_manager import ResponseCache
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dumps(value: Any) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=str).encode()
+
+
+def _loads(data: bytes) -> Any:
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 # Cache TTL configurations (in seconds)
 class CacheTTL:
@@ -33,18 +68,78 @@ class CacheTTL:
     MARKETPLACE_LISTINGS = 7200  # 2 hours
     ANALYTICS_AGGREGATIONS = 86400  # 24 hours
 
+    # How long expired entries may still be served while they refresh
+    STALE_GRACE = 30
+    # How long a "not found" result is remembered
+    NEGATIVE = 30
+
+
+# (fresh_until, stale_until, negative, payload) - wall-clock times, shared across processes
+CacheEntry = Tuple[float, float, bool, bytes]
+
+
+def _frame(entry: CacheEntry) -> bytes:
+    fresh_until, stale_until, negative, payload = entry
+    return b"%.3f|%.3f|%d|" % (fresh_until, stale_until, negative) + payload
+
+
+def _unframe(data: bytes) -> CacheEntry:
+    try:
+        fresh_until, stale_until, negative, payload = data.split(b"|", 3)
+        return float(fresh_until), float(stale_until), negative == b"1", payload
+    except ValueError:
+        # Plain JSON written before entries were framed - treat as fresh
+        return math.inf, math.inf, False, data
+
 
 class CacheService:
-    """Redis caching service"""
+    """Two-tier (in-process L1 + Redis L2) caching service"""
 
-    def __init__(self):
+    INVALIDATION_CHANNEL = "cache:invalidate"
+
+    def __init__(
+        self,
+        l1_max_entries: int = 2048,
+        l1_max_bytes: int = 16 * 1024 * 1024,
+        l1_ttl: float = 30,
+        scan_batch_size: int = 500,
+    ):
+        """
+        Args:
+            l1_max_entries: Maximum entries held in process
+            l1_max_bytes: Maximum payload bytes held in process
+            l1_ttl: Longest an entry stays in L1 while Redis is the source of truth
+                (bounds staleness if an invalidation message is lost)
+            scan_batch_size: Keys per SCAN/UNLINK round in clear_pattern
+        """
         self.redis: Optional[aioredis.Redis] = None
-        self.enabled = False
+        self.enabled = True
         self.prefix = "helix:"
+        self.l1 = ResponseCache(max_entries=l1_max_entries, max_bytes=l1_max_bytes)
+        self.l1_ttl = l1_ttl
+        self.scan_batch_size = scan_batch_size
+        self.node_id = uuid.uuid4().hex[:12]
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        self._loads: Dict[str, asyncio.Task] = {}
+        self.counters = {
+            "l1_hits": 0,
+            "l2_hits": 0,
+            "misses": 0,
+            "stale_served": 0,
+            "negative_hits": 0,
+            "loads": 0,
+            "invalidations_sent": 0,
+            "invalidations_received": 0,
+        }
+
+    @property
+    def mode(self) -> str:
+        return "tiered" if self.redis else "memory"
 
     async def initialize(self, redis_url: Optional[str] = None):
         """
-        Initialize Redis connection and FastAPI cache.
+        Initialize Redis connection, invalidation listener and FastAPI cache.
 
         Args:
             redis_url: Redis connection URL (default: from env)
@@ -56,15 +151,12 @@ class CacheService:
         try:
             redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379")
 
-            # Connect to Redis
-            self.redis = await aioredis.from_url(
-                redis_url,
-                encoding="utf-8",
-                decode_responses=True
-            )
+            # Connect to Redis (raw bytes - values are framed and decoded here)
+            client = await aioredis.from_url(redis_url)
 
             # Test connection
-            await self.redis.ping()
+            await client.ping()
+            await self.attach(client)
 
             # Initialize FastAPI cache
             FastAPICache.init(
@@ -72,53 +164,110 @@ class CacheService:
                 prefix=self.prefix
             )
 
-            self.enabled = True
-            logger.info(f"✅ Redis cache initialized: {redis_url}")
+            logger.info(f"✅ Redis cache initialized: {redis_url} (L1 + L2, node {self.node_id})")
 
         except Exception as e:
             logger.warning(f"⚠️ Redis cache initialization failed: {e}")
-            logger.info("📝 Continuing without cache (will use in-memory fallback)")
-            self.enabled = False
+            logger.info("📝 Continuing with in-memory cache only")
+            self.redis = None
+
+    async def attach(self, client: aioredis.Redis):
+        """Use an existing Redis client as L2 and start listening for invalidations."""
+        self.redis = client
+        self._pubsub = client.pubsub()
+        await self._pubsub.subscribe(f"{self.prefix}{self.INVALIDATION_CHANNEL}")
+        self._listener = asyncio.create_task(self._listen_for_invalidations())
 
     async def close(self):
-        """Close Redis connection"""
+        """Stop the invalidation listener and close the Redis connection"""
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._pubsub:
+            try:
+                await self._pubsub.aclose()
+            except Exception as e:
+                logger.debug(f"Pub/sub close error: {e}")
+            self._pubsub = None
         if self.redis:
-            await self.redis.close()
+            await self.redis.aclose()
+            self.redis = None
             logger.info("👋 Redis connection closed")
 
     async def get(self, key: str) -> Optional[Any]:
         """
-        Get value from cache.
+        Get value from cache (L1, then Redis).
 
         Args:
             key: Cache key
 
         Returns:
-            Cached value or None if not found
+            Cached value or None if not found, expired or cached as missing
 
         Example:
             >>> value = await cache_service.get("user:123")
         """
-        if not self.enabled or not self.redis:
+        if not self.enabled:
             return None
 
-        try:
-            value = await self.redis.get(f"{self.prefix}{key}")
-            if value:
-                logger.debug(f"🎯 Cache HIT: {key}")
-                return json.loads(value)
-            else:
-                logger.debug(f"❌ Cache MISS: {key}")
-                return None
-        except Exception as e:
-            logger.error(f"❌ Cache get error for {key}: {e}")
+        entry = await self._lookup(key)
+        if entry is None or entry[0] <= time.time() or entry[2]:
             return None
+        return _loads(entry[3])
+
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int = CacheTTL.USER_PROFILE,
+        stale_ttl: int = 0,
+        negative_ttl: Optional[int] = None,
+    ) -> Optional[Any]:
+        """
+        Get a value, loading it on a miss with one loader call per key at a time.
+
+        Args:
+            key: Cache key
+            loader: Coroutine function producing the value (None means "not found")
+            ttl: Seconds the value is fresh
+            stale_ttl: Extra seconds an expired value is served while it
+                refreshes in the background
+            negative_ttl: Seconds to remember a None result (None disables)
+
+        Returns:
+            The cached, stale or freshly loaded value
+
+        Example:
+            >>> profile = await cache_service.get_or_set(
+            ...     f"user:profile:{user_id}", lambda: load_profile(user_id),
+            ...     ttl=CacheTTL.USER_PROFILE, stale_ttl=CacheTTL.STALE_GRACE)
+        """
+        if not self.enabled:
+            return await loader()
+
+        entry = await self._lookup(key)
+        if entry is not None:
+            fresh_until, _, negative, payload = entry
+            if fresh_until <= time.time():
+                self.counters["stale_served"] += 1
+                self._start_load(key, loader, ttl, stale_ttl, negative_ttl)
+            if negative:
+                self.counters["negative_hits"] += 1
+                return None
+            return _loads(payload)
+
+        return await asyncio.shield(self._start_load(key, loader, ttl, stale_ttl, negative_ttl))
 
     async def set(
         self,
         key: str,
         value: Any,
-        ttl: int = CacheTTL.USER_PROFILE
+        ttl: int = CacheTTL.USER_PROFILE,
+        stale_ttl: int = 0
     ) -> bool:
         """
         Set value in cache.
@@ -127,6 +276,7 @@ class CacheService:
             key: Cache key
             value: Value to cache
             ttl: Time-to-live in seconds
+            stale_ttl: Extra seconds the value may be served stale by get_or_set
 
         Returns:
             True if successful
@@ -134,22 +284,21 @@ class CacheService:
         Example:
             >>> await cache_service.set("user:123", user_data, ttl=900)
         """
-        if not self.enabled or not self.redis:
+        if not self.enabled:
             return False
 
         try:
-            serialized = json.dumps(value, default=str)
-            await self.redis.setex(
-                f"{self.prefix}{key}",
-                ttl,
-                serialized
-            )
-            logger.debug(f"💾 Cache SET: {key} (TTL: {ttl}s)")
-            return True
+            return await self._store(key, _dumps(value), ttl, stale_ttl, negative=False)
         except Exception as e:
             logger.error(f"❌ Cache set error for {key}: {e}")
             return False
 
+    async def set_missing(self, key: str, ttl: int = CacheTTL.NEGATIVE) -> bool:
+        """Remember that `key` has no value, so loaders aren't re-run for it."""
+        if not self.enabled:
+            return False
+        return await self._store(key, b"null", ttl, 0, negative=True)
+
     async def delete(self, key: str) -> bool:
         """
         Delete value from cache.
@@ -163,11 +312,16 @@ class CacheService:
         Example:
             >>> await cache_service.delete("user:123")
         """
-        if not self.enabled or not self.redis:
+        if not self.enabled:
             return False
 
+        self.l1.discard(key)
+        if not self.redis:
+            return True
+
         try:
             await self.redis.delete(f"{self.prefix}{key}")
+            await self._publish(b"k", key)
             logger.debug(f"🗑️ Cache DELETE: {key}")
             return True
         except Exception as e:
@@ -178,6 +332,9 @@ class CacheService:
         """
         Clear all keys matching pattern.
 
+        Walks Redis with SCAN and unlinks each batch as it goes, so Redis is
+        never blocked by a full key walk or one huge DEL.
+
         Args:
             pattern: Key pattern (e.g., "user:*")
 
@@ -187,22 +344,30 @@ class CacheService:
         Example:
             >>> deleted = await cache_service.clear_pattern("user:*")
         """
-        if not self.enabled or not self.redis:
+        if not self.enabled:
             return 0
 
+        deleted = self.l1.remove_where(lambda key: fnmatch.fnmatchcase(key, pattern))
+        if not self.redis:
+            return deleted
+
         try:
-            keys = []
-            async for key in self.redis.scan_iter(f"{self.prefix}{pattern}"):
-                keys.append(key)
-
-            if keys:
-                deleted = await self.redis.delete(*keys)
-                logger.info(f"🗑️ Cache CLEAR: {pattern} ({deleted} keys)")
-                return deleted
-            return 0
+            deleted = 0
+            batch = []
+            async for key in self.redis.scan_iter(match=f"{self.prefix}{pattern}", count=self.scan_batch_size):
+                batch.append(key)
+                if len(batch) >= self.scan_batch_size:
+                    deleted += await self.redis.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await self.redis.unlink(*batch)
+
+            await self._publish(b"p", pattern)
+            logger.info(f"🗑️ Cache CLEAR: {pattern} ({deleted} keys)")
+            return deleted
         except Exception as e:
             logger.error(f"❌ Cache clear error for {pattern}: {e}")
-            return 0
+            return deleted
 
     async def get_stats(self) -> dict:
         """
@@ -214,13 +379,19 @@ class CacheService:
         Example:
             >>> stats = await cache_service.get_stats()
         """
+        stats = {
+            "enabled": self.enabled,
+            "mode": self.mode,
+            "serializer": "orjson" if ORJSON_AVAILABLE else "json",
+            **self.counters,
+            "l1": self.l1.get_stats(),
+        }
         if not self.enabled or not self.redis:
-            return {"enabled": False}
+            return stats
 
         try:
             info = await self.redis.info("stats")
-            return {
-                "enabled": True,
+            stats.update({
                 "total_connections": info.get("total_connections_received", 0),
                 "total_commands": info.get("total_commands_processed", 0),
                 "keyspace_hits": info.get("keyspace_hits", 0),
@@ -229,10 +400,11 @@ class CacheService:
                     info.get("keyspace_hits", 0),
                     info.get("keyspace_misses", 0)
                 )
-            }
+            })
         except Exception as e:
             logger.error(f"❌ Error getting cache stats: {e}")
-            return {"enabled": True, "error": str(e)}
+            stats["error"] = str(e)
+        return stats
 
     @staticmethod
     def _calculate_hit_rate(hits: int, misses: int) -> float:
@@ -242,6 +414,121 @@ class CacheService:
             return 0.0
         return round((hits / total) * 100, 2)
 
+    async def _lookup(self, key: str) -> Optional[CacheEntry]:
+        """Find a servable (fresh or stale) entry in L1, then L2."""
+        entry = self.l1.get_nowait(key)
+        if entry is not None:
+            self.counters["l1_hits"] += 1
+            return entry
+
+        if self.redis:
+            try:
+                data = await self.redis.get(f"{self.prefix}{key}")
+            except Exception as e:
+                logger.error(f"❌ Cache get error for {key}: {e}")
+                data = None
+            if data is not None:
+                entry = _unframe(data)
+                if entry[1] > time.time():
+                    self.counters["l2_hits"] += 1
+                    logger.debug(f"🎯 Cache HIT (L2): {key}")
+                    self._put_l1(key, entry)
+                    return entry
+
+        self.counters["misses"] += 1
+        logger.debug(f"❌ Cache MISS: {key}")
+        return None
+
+    def _put_l1(self, key: str, entry: CacheEntry) -> None:
+        ttl = entry[1] - time.time()
+        if self.redis:
+            ttl = min(ttl, self.l1_ttl)
+        if ttl > 0:
+            self.l1.set_nowait(key, entry, ttl, size=len(entry[3]))
+
+    async def _store(self, key: str, payload: bytes, ttl: float, stale_ttl: float, negative: bool) -> bool:
+        now = time.time()
+        entry = (now + ttl, now + ttl + stale_ttl, negative, payload)
+        self._put_l1(key, entry)
+        if self.redis:
+            await self.redis.set(f"{self.prefix}{key}", _frame(entry), ex=max(1, math.ceil(ttl + stale_ttl)))
+            await self._publish(b"k", key)
+        logger.debug(f"💾 Cache SET: {key} (TTL: {ttl}s{', negative' if negative else ''})")
+        return True
+
+    def _start_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+        negative_ttl: Optional[int],
+    ) -> asyncio.Task:
+        """Run the loader for `key` unless a load is already in flight."""
+        task = self._loads.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, loader, ttl, stale_ttl, negative_ttl))
+            self._loads[key] = task
+            task.add_done_callback(lambda t: self._loads.pop(key, None) if self._loads.get(key) is t else None)
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    async def _load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+        negative_ttl: Optional[int],
+    ) -> Optional[Any]:
+        self.counters["loads"] += 1
+        value = await loader()
+        try:
+            if value is not None:
+                await self._store(key, _dumps(value), ttl, stale_ttl, negative=False)
+            elif negative_ttl:
+                await self._store(key, b"null", negative_ttl, 0, negative=True)
+        except Exception as e:
+            logger.error(f"❌ Cache set error for {key}: {e}")
+        return value
+
+    async def _publish(self, kind: bytes, target: str) -> None:
+        """Tell other processes to drop `target` (a key or pattern) from their L1."""
+        try:
+            await self.redis.publish(
+                f"{self.prefix}{self.INVALIDATION_CHANNEL}",
+                b"|".join((self.node_id.encode(), kind, target.encode())),
+            )
+            self.counters["invalidations_sent"] += 1
+        except Exception as e:
+            logger.warning(f"⚠️ Cache invalidation publish failed for {target}: {e}")
+
+    async def _listen_for_invalidations(self) -> None:
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    self._apply_invalidation(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Cache invalidation listener error: {e}")
+                # Anything may have changed while we were disconnected
+                await self.l1.clear()
+                await asyncio.sleep(1)
+
+    def _apply_invalidation(self, data: bytes) -> None:
+        origin, kind, target = data.split(b"|", 2)
+        if origin.decode() == self.node_id:
+            return
+        target = target.decode()
+        self.counters["invalidations_received"] += 1
+        if kind == b"p":
+            self.l1.remove_where(lambda key: fnmatch.fnmatchcase(key, target))
+        else:
+            self.l1.discard(target)
+
 
 # Global cache service instance
 cache_service = CacheService()
@@ -335,6 +622,7 @@ async def invalidate_user_cache(user_id: str) -> int:
 __all__ = [
     "CacheService",
     "CacheTTL",
+    "CacheEntry",
     "cache_service",
     "cache_key",
     "cached",
@@ -5,10 +5,11 @@ backend/core/cache_manager.py
 High-performance in-memory caching system for API responses.
 
 Features:
-- TTL-based cache expiration
-- Thread-safe async operations
-- Automatic cleanup of expired entries
-- Cache hit/miss metrics
+- Per-entry TTL expiration
+- Bounded by entry count and total bytes, with LRU (CLOCK) eviction
+- Lock-free reads
+- Single-flight: concurrent misses for a key compute it once
+- Cache hit/miss, eviction and coalescing metrics
 - Manual invalidation support
 
 Usage:
@@ -25,34 +26,91 @@ import asyncio
 import hashlib
 import json
 import logging
-from datetime import datetime
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
+
+class _CacheEntry:
+    """A cached value with its own expiry, size and CLOCK reference bit."""
+
+    __slots__ = ("value", "expires_at", "size", "referenced")
+
+    def __init__(self, value: Any, expires_at: float, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.referenced = False
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory cost of a cached response (its JSON length in bytes)."""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return sys.getsizeof(value)
+
 
 class ResponseCache:
     """
-    In-memory cache for API responses with TTL support.
+    Bounded in-memory cache for API responses with per-entry TTL.
 
     Optimized for high-frequency endpoints like /status, /health, /agents
     that return the same data for multiple requests within a short time window.
 
+    - Reads are lock-free: a dict lookup, an expiry check and setting the
+      entry's reference bit
+    - Writes take a short threading lock and evict with the CLOCK
+      (second-chance) approximation of LRU until both the entry and byte
+      limits hold
+    - Concurrent misses for the same key are coalesced so only one caller
+      computes the value (see get_or_compute)
+
     Performance Impact:
     - Reduces response time from 200ms to 5ms (40x faster)
     - Eliminates 95% of file I/O operations
     - Decreases CPU usage by 30% during traffic spikes
     """
 
-    def __init__(self):
-        """Initialize cache with empty storage and lock."""
-        self._cache: Dict[str, tuple[Any, datetime]] = {}
-        self._lock = asyncio.Lock()
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024, default_ttl: float = 60):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries: Maximum number of cached entries
+            max_bytes: Maximum total estimated size of cached values
+            default_ttl: TTL in seconds for entries set without one
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._cache: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._bytes = 0
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._coalesced = 0
         self._enabled = True
 
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """Build a cache sized from RESPONSE_CACHE_MAX_ENTRIES / RESPONSE_CACHE_MAX_BYTES."""
+        return cls(
+            max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024")),
+            max_bytes=int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+        )
+
     def enable(self):
         """Enable caching."""
         self._enabled = True
@@ -63,53 +121,143 @@ class ResponseCache:
         self._enabled = False
         logger.info("Response cache disabled")
 
-    async def get(self, key: str, ttl_seconds: int = 60) -> Optional[Any]:
+    def get_nowait(self, key: str, default: Any = None) -> Any:
+        """
+        Get a cached value without locking or awaiting.
+
+        Args:
+            key: Cache key
+            default: Returned on a miss or an expired entry
+
+        Returns:
+            Cached value if found and not expired, default otherwise
+        """
+        if not self._enabled:
+            return default
+
+        entry = self._cache.get(key)
+        if entry is not None:
+            if entry.expires_at > time.monotonic():
+                entry.referenced = True
+                self._hits += 1
+                return entry.value
+            self._discard(key, entry)
+            self._expirations += 1
+            logger.debug(f"Cache EXPIRED: {key}")
+
+        self._misses += 1
+        return default
+
+    async def get(self, key: str, ttl_seconds: Optional[float] = None) -> Optional[Any]:
         """
         Get cached value if not expired.
 
         Args:
             key: Cache key
-            ttl_seconds: Time-to-live in seconds
+            ttl_seconds: Deprecated - the TTL is stored with each entry on set
 
         Returns:
             Cached value if found and not expired, None otherwise
         """
+        return self.get_nowait(key)
+
+    def set_nowait(
+        self, key: str, value: Any, ttl_seconds: Optional[float] = None, size: Optional[int] = None
+    ) -> bool:
+        """
+        Cache a value, evicting older entries to stay within the limits.
+
+        Args:
+            key: Cache key
+            value: Value to cache (should be JSON-serializable)
+            ttl_seconds: Time-to-live for this entry (default: default_ttl)
+            size: Size in bytes, if the caller already knows it
+
+        Returns:
+            False if the value was not cached (cache disabled or value too large)
+        """
         if not self._enabled:
-            return None
-
-        async with self._lock:
-            if key in self._cache:
-                value, cached_at = self._cache[key]
-
-                # Check if expired
-                age = (datetime.now() - cached_at).total_seconds()
-                if age < ttl_seconds:
-                    self._hits += 1
-                    logger.debug(f"Cache HIT: {key} (age={age:.1f}s)")
-                    return value
-                else:
-                    # Expired - remove from cache
-                    del self._cache[key]
-                    logger.debug(f"Cache EXPIRED: {key} (age={age:.1f}s)")
+            return False
 
-        self._misses += 1
-        logger.debug(f"Cache MISS: {key}")
-        return None
+        if size is None:
+            size = estimate_size(value)
+        if size > self.max_bytes:
+            logger.debug(f"Cache SKIP: {key} ({size} bytes exceeds max_bytes)")
+            return False
+
+        ttl = self.default_ttl if ttl_seconds is None else ttl_seconds
+        entry = _CacheEntry(value, time.monotonic() + ttl, size)
+
+        with self._lock:
+            previous = self._cache.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._cache[key] = entry
+            self._bytes += size
+            self._evict_locked()
 
-    async def set(self, key: str, value: Any):
+        logger.debug(f"Cache SET: {key} (total entries={len(self._cache)})")
+        return True
+
+    async def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
         """
-        Cache a value with timestamp.
+        Cache a value with its own TTL.
 
         Args:
             key: Cache key
             value: Value to cache (must be JSON-serializable)
+            ttl_seconds: Time-to-live for this entry (default: default_ttl)
         """
-        if not self._enabled:
-            return
+        self.set_nowait(key, value, ttl_seconds)
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[Any]], ttl_seconds: Optional[float] = None
+    ) -> Any:
+        """
+        Return the cached value, computing it once for all concurrent callers on a miss.
 
-        async with self._lock:
-            self._cache[key] = (value, datetime.now())
-            logger.debug(f"Cache SET: {key} (total entries={len(self._cache)})")
+        Args:
+            key: Cache key
+            compute: Coroutine function producing the value
+            ttl_seconds: Time-to-live for the computed entry
+
+        Returns:
+            Cached or freshly computed value
+        """
+        value = self.get_nowait(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The computing request was cancelled, not us - take over
+                return await self.get_or_compute(key, compute, ttl_seconds)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise it; mark it retrieved so an unobserved error isn't logged
+            future.exception()
+            raise
+        else:
+            self.set_nowait(key, value, ttl_seconds)
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
 
     async def invalidate(self, key: str):
         """
@@ -118,10 +266,10 @@ class ResponseCache:
         Args:
             key: Cache key to invalidate
         """
-        async with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-                logger.info(f"Cache INVALIDATED: {key}")
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._discard(key, entry)
+            logger.info(f"Cache INVALIDATED: {key}")
 
     async def invalidate_pattern(self, pattern: str):
         """
@@ -130,40 +278,84 @@ class ResponseCache:
         Args:
             pattern: String pattern to match (simple substring match)
         """
-        async with self._lock:
-            keys_to_remove = [k for k in self._cache.keys() if pattern in k]
+        count = self.remove_where(lambda key: pattern in key)
+        logger.info(f"Cache INVALIDATED: {count} entries matching '{pattern}'")
+
+    def discard(self, key: str) -> bool:
+        """Remove a single entry without logging; returns whether it was cached."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return False
+        self._discard(key, entry)
+        return True
+
+    def remove_where(self, predicate: Callable[[str], bool]) -> int:
+        """
+        Remove every entry whose key satisfies predicate.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys_to_remove = [k for k in self._cache if predicate(k)]
             for key in keys_to_remove:
-                del self._cache[key]
-            logger.info(f"Cache INVALIDATED: {len(keys_to_remove)} entries matching '{pattern}'")
+                self._bytes -= self._cache.pop(key).size
+        return len(keys_to_remove)
 
     async def clear(self):
         """Clear all cached entries."""
-        async with self._lock:
+        with self._lock:
             count = len(self._cache)
             self._cache.clear()
-            logger.info(f"Cache CLEARED: {count} entries removed")
+            self._bytes = 0
+        logger.info(f"Cache CLEARED: {count} entries removed")
 
-    async def cleanup_expired(self, max_age_seconds: int = 3600):
+    async def cleanup_expired(self, max_age_seconds: Optional[int] = None):
         """
-        Remove all entries older than max_age_seconds.
+        Remove all expired entries.
+
+        Expired entries are also dropped when read or reached by eviction,
+        so this only reclaims memory held by keys nobody asks for anymore.
 
         Args:
-            max_age_seconds: Maximum age in seconds (default: 1 hour)
+            max_age_seconds: Deprecated - expiry is stored with each entry
         """
-        async with self._lock:
-            now = datetime.now()
-            keys_to_remove = []
+        now = time.monotonic()
+        with self._lock:
+            keys_to_remove = [k for k, entry in self._cache.items() if entry.expires_at <= now]
+            for key in keys_to_remove:
+                self._bytes -= self._cache.pop(key).size
+            self._expirations += len(keys_to_remove)
 
-            for key, (value, cached_at) in self._cache.items():
-                age = (now - cached_at).total_seconds()
-                if age > max_age_seconds:
-                    keys_to_remove.append(key)
+        if keys_to_remove:
+            logger.info(f"Cache CLEANUP: {len(keys_to_remove)} expired entries removed")
 
-            for key in keys_to_remove:
+    def _discard(self, key: str, entry: _CacheEntry) -> None:
+        """Remove `entry` if it is still the one stored under `key`."""
+        with self._lock:
+            if self._cache.get(key) is entry:
                 del self._cache[key]
+                self._bytes -= entry.size
 
-            if keys_to_remove:
-                logger.info(f"Cache CLEANUP: {len(keys_to_remove)} expired entries removed")
+    def _evict_locked(self) -> None:
+        """
+        Evict until within limits. Caller holds the lock.
+
+        Expired entries go first; live entries that were read since they
+        last reached the head get a second chance at the tail.
+        """
+        now = time.monotonic()
+        while len(self._cache) > self.max_entries or self._bytes > self.max_bytes:
+            key, entry = self._cache.popitem(last=False)
+            if entry.referenced and entry.expires_at > now:
+                entry.referenced = False
+                self._cache[key] = entry
+                continue
+            self._bytes -= entry.size
+            if entry.expires_at <= now:
+                self._expirations += 1
+            else:
+                self._evictions += 1
 
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -178,22 +370,32 @@ class ResponseCache:
         return {
             "enabled": self._enabled,
             "entries": len(self._cache),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
             "hits": self._hits,
             "misses": self._misses,
             "total_requests": total_requests,
             "hit_rate_percent": round(hit_rate, 2),
-            "estimated_io_savings": f"{self._hits} file reads avoided",
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+            "coalesced": self._coalesced,
+            "in_flight": len(self._inflight),
+            "estimated_io_savings": f"{self._hits + self._coalesced} file reads avoided",
         }
 
     def reset_stats(self):
         """Reset cache statistics."""
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._coalesced = 0
         logger.info("Cache statistics reset")
 
 
 # Global singleton cache instance
-_global_cache = ResponseCache()
+_global_cache = ResponseCache.from_env()
 
 
 def get_cache() -> ResponseCache:
@@ -242,18 +444,11 @@ def cached_response(ttl_seconds: int = 60, key_func: Optional[Callable] = None):
                 args_hash = hashlib.md5(args_str.encode(), usedforsecurity=False).hexdigest()[:8]
                 cache_key = f"{func.__module__}.{func.__name__}:{args_hash}"
 
-            # Try to get from cache
-            cached_value = await cache.get(cache_key, ttl_seconds)
-            if cached_value is not None:
-                return cached_value
-
-            # Cache miss - execute function
-            result = await func(*args, **kwargs) if asyncio.iscoroutinefunction(func) else func(*args, **kwargs)
-
-            # Store in cache
-            await cache.set(cache_key, result)
+            # Serve from cache; on a miss only one concurrent caller runs the function
+            async def compute():
+                return await func(*args, **kwargs) if asyncio.iscoroutinefunction(func) else func(*args, **kwargs)
 
-            return result
+            return await cache.get_or_compute(cache_key, compute, ttl_seconds)
 
         # Add cache control methods to wrapper
         wrapper.invalidate_cache = lambda: asyncio.create_task(get_cache().invalidate_pattern(func.__name__))
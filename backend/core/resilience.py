@@ -10,10 +10,11 @@ import asyncio
 import functools
 import logging
 import time
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from typing import Any, Callable, Dict, Optional, TypeVar
+from typing import Any, Callable, Deque, Dict, List, Optional, TypeVar
 
 logger = logging.getLogger(__name__)
 
@@ -31,10 +32,17 @@ class CircuitState(Enum):
 @dataclass
 class CircuitBreakerConfig:
     """Configuration for circuit breaker."""
-    failure_threshold: int = 5        # Failures before opening circuit
+    failure_threshold: int = 5        # Consecutive failures before opening circuit
     success_threshold: int = 2        # Successes to close from half-open
     timeout: float = 30.0             # Seconds before trying half-open
     excluded_exceptions: tuple = ()   # Exceptions that don't count as failures
+    half_open_max_calls: int = 1      # Probes allowed in flight while half-open
+    failure_rate_threshold: Optional[float] = None  # Trip when this share of calls in the window fail (0-1)
+    window_type: str = "count"        # Sliding window: "count" (last N calls) or "time" (last N seconds)
+    window_size: int = 20             # Calls or seconds in the sliding window
+    minimum_calls: int = 10           # Calls needed in the window before the rate is judged
+    slow_call_threshold: Optional[float] = None  # Seconds; slower calls count as failures
+    latency_samples: int = 256        # Recent call durations kept for percentiles
 
 
 @dataclass
@@ -45,6 +53,61 @@ class CircuitBreakerState:
     success_count: int = 0
     last_failure_time: Optional[datetime] = None
     last_success_time: Optional[datetime] = None
+    opened_at: float = 0.0            # time.monotonic() of the last trip
+    half_open_in_flight: int = 0
+    generation: int = 0               # Bumped on every transition
+
+
+class SlidingWindow:
+    """
+    Failure rate over the last N calls or the last N seconds.
+
+    Count windows keep one outcome per call; time windows keep one
+    (second, calls, failures) bucket per second, so both stay O(window_size).
+    """
+
+    def __init__(self, window_type: str = "count", size: int = 20):
+        if window_type not in ("count", "time"):
+            raise ValueError(f"Unknown window type: {window_type}")
+        self.window_type = window_type
+        self.size = size
+        self._outcomes: Deque[bool] = deque(maxlen=size)
+        self._buckets: Deque[List[int]] = deque()
+        self.calls = 0
+        self.failures = 0
+
+    def record(self, failed: bool, now: Optional[float] = None) -> None:
+        if self.window_type == "count":
+            if len(self._outcomes) == self.size:
+                self.failures -= self._outcomes[0]
+                self.calls -= 1
+            self._outcomes.append(failed)
+        else:
+            second = int(time.monotonic() if now is None else now)
+            self._expire(second)
+            if self._buckets and self._buckets[-1][0] == second:
+                self._buckets[-1][1] += 1
+                self._buckets[-1][2] += failed
+            else:
+                self._buckets.append([second, 1, int(failed)])
+        self.calls += 1
+        self.failures += failed
+
+    def failure_rate(self, now: Optional[float] = None) -> float:
+        if self.window_type == "time":
+            self._expire(int(time.monotonic() if now is None else now))
+        return self.failures / self.calls if self.calls else 0.0
+
+    def reset(self) -> None:
+        self._outcomes.clear()
+        self._buckets.clear()
+        self.calls = self.failures = 0
+
+    def _expire(self, second: int) -> None:
+        while self._buckets and self._buckets[0][0] <= second - self.size:
+            _, calls, failures = self._buckets.popleft()
+            self.calls -= calls
+            self.failures -= failures
 
 
 class CircuitBreaker:
@@ -53,6 +116,15 @@ class CircuitBreaker:
 
     Prevents cascade failures by stopping calls to failing services.
 
+    Trips on consecutive failures (failure_threshold) or, when
+    failure_rate_threshold is set, on the failure rate over a sliding
+    count or time window. Calls slower than slow_call_threshold count as
+    failures. While half-open only half_open_max_calls probes run at once;
+    everything else is rejected until the probes close or reopen the circuit.
+
+    State changes happen synchronously between awaits, so no lock is needed
+    and calls never queue behind each other.
+
     Usage:
         breaker = CircuitBreaker("discord")
 
@@ -71,7 +143,10 @@ class CircuitBreaker:
         self.name = name
         self.config = config or CircuitBreakerConfig()
         self._state = CircuitBreakerState()
-        self._lock = asyncio.Lock()
+        self._window = SlidingWindow(self.config.window_type, self.config.window_size)
+        self._latencies: Deque[float] = deque(maxlen=self.config.latency_samples)
+        self._transitions: Deque[Dict[str, Any]] = deque(maxlen=20)
+        self._stats = {"calls": 0, "failures": 0, "slow_calls": 0, "rejected": 0}
 
         # Register instance for monitoring
         CircuitBreaker._instances[name] = self
@@ -79,95 +154,157 @@ class CircuitBreaker:
     @classmethod
     def get_all_states(cls) -> Dict[str, Dict[str, Any]]:
         """Get status of all circuit breakers for health checks."""
+        return {name: breaker.get_state() for name, breaker in cls._instances.items()}
+
+    def get_state(self) -> Dict[str, Any]:
+        """State, window, call counts, latency percentiles and recent transitions."""
         return {
-            name: {
-                "state": breaker._state.state.value,
-                "failure_count": breaker._state.failure_count,
-                "last_failure": (
-                    breaker._state.last_failure_time.isoformat()
-                    if breaker._state.last_failure_time else None
-                ),
-            }
-            for name, breaker in cls._instances.items()
+            "state": self._state.state.value,
+            "failure_count": self._state.failure_count,
+            "last_failure": (
+                self._state.last_failure_time.isoformat()
+                if self._state.last_failure_time else None
+            ),
+            "failure_rate": round(self._window.failure_rate(), 4),
+            "window_calls": self._window.calls,
+            **self._stats,
+            "latency_ms": self._latency_percentiles(),
+            "transitions": list(self._transitions),
         }
 
-    async def _should_allow_request(self) -> bool:
-        """Check if request should be allowed through."""
-        async with self._lock:
-            if self._state.state == CircuitState.CLOSED:
-                return True
-
-            if self._state.state == CircuitState.OPEN:
-                # Check if timeout has passed
-                if self._state.last_failure_time:
-                    elapsed = datetime.utcnow() - self._state.last_failure_time
-                    if elapsed.total_seconds() >= self.config.timeout:
-                        self._state.state = CircuitState.HALF_OPEN
-                        self._state.success_count = 0
-                        logger.info(f"Circuit {self.name}: OPEN → HALF_OPEN")
-                        return True
-                return False
+    def _latency_percentiles(self) -> Dict[str, Optional[float]]:
+        samples = sorted(self._latencies)
+        if not samples:
+            return {"p50": None, "p95": None, "p99": None}
+        return {
+            f"p{p}": round(samples[min(len(samples) - 1, int(len(samples) * p / 100))] * 1000, 2)
+            for p in (50, 95, 99)
+        }
 
-            # HALF_OPEN: allow limited requests
-            return True
+    def _transition(self, new_state: CircuitState, reason: str) -> None:
+        old_state = self._state.state
+        self._state.state = new_state
+        self._state.generation += 1
+        self._transitions.append({
+            "from": old_state.value,
+            "to": new_state.value,
+            "reason": reason,
+            "at": datetime.utcnow().isoformat(),
+        })
+        log = logger.warning if new_state == CircuitState.OPEN else logger.info
+        log(f"Circuit {self.name}: {old_state.name} → {new_state.name} ({reason})")
+
+        if new_state == CircuitState.OPEN:
+            self._state.opened_at = time.monotonic()
+        elif new_state == CircuitState.HALF_OPEN:
+            self._state.success_count = 0
+            self._state.half_open_in_flight = 0
+        else:
+            self._state.failure_count = 0
+            self._window.reset()
+
+    def _should_allow_request(self) -> bool:
+        """Check if request should be allowed through, taking a probe slot if half-open."""
+        if self._state.state == CircuitState.OPEN:
+            if time.monotonic() - self._state.opened_at < self.config.timeout:
+                return False
+            self._transition(CircuitState.HALF_OPEN, "timeout elapsed")
 
-    async def _record_success(self):
-        """Record successful call."""
-        async with self._lock:
-            self._state.last_success_time = datetime.utcnow()
+        if self._state.state == CircuitState.HALF_OPEN:
+            if self._state.half_open_in_flight >= self.config.half_open_max_calls:
+                return False
+            self._state.half_open_in_flight += 1
 
-            if self._state.state == CircuitState.HALF_OPEN:
-                self._state.success_count += 1
-                if self._state.success_count >= self.config.success_threshold:
-                    self._state.state = CircuitState.CLOSED
-                    self._state.failure_count = 0
-                    logger.info(f"Circuit {self.name}: HALF_OPEN → CLOSED")
+        return True
 
-            elif self._state.state == CircuitState.CLOSED:
-                # Reset failure count on success
-                self._state.failure_count = 0
+    def _record_success(self, duration: float = 0.0):
+        """Record successful call (a slow success counts as a failure)."""
+        slow = self.config.slow_call_threshold is not None and duration > self.config.slow_call_threshold
+        if slow:
+            self._stats["slow_calls"] += 1
+            self._record_outcome(failed=True, reason=f"slow call {duration:.2f}s")
+            return
 
-    async def _record_failure(self, exc: Exception):
+        self._state.last_success_time = datetime.utcnow()
+        if self._state.state == CircuitState.HALF_OPEN:
+            self._state.success_count += 1
+            if self._state.success_count >= self.config.success_threshold:
+                self._transition(CircuitState.CLOSED, f"{self._state.success_count} successful probes")
+        elif self._state.state == CircuitState.CLOSED:
+            # Reset consecutive failure count on success
+            self._state.failure_count = 0
+            self._window.record(False)
+
+    def _record_failure(self, exc: Exception):
         """Record failed call."""
         # Don't count excluded exceptions
         if isinstance(exc, self.config.excluded_exceptions):
             return
+        self._record_outcome(failed=True, reason=type(exc).__name__)
 
-        async with self._lock:
-            self._state.failure_count += 1
-            self._state.last_failure_time = datetime.utcnow()
+    def _record_outcome(self, failed: bool, reason: str) -> None:
+        self._stats["failures"] += 1
+        self._state.failure_count += 1
+        self._state.last_failure_time = datetime.utcnow()
 
-            if self._state.state == CircuitState.HALF_OPEN:
-                # Any failure in half-open goes back to open
-                self._state.state = CircuitState.OPEN
-                logger.warning(f"Circuit {self.name}: HALF_OPEN → OPEN")
+        if self._state.state == CircuitState.HALF_OPEN:
+            # Any failure in half-open goes back to open
+            self._transition(CircuitState.OPEN, f"probe failed: {reason}")
+            return
 
-            elif self._state.state == CircuitState.CLOSED:
-                if self._state.failure_count >= self.config.failure_threshold:
-                    self._state.state = CircuitState.OPEN
-                    logger.warning(
-                        f"Circuit {self.name}: CLOSED → OPEN "
-                        f"(failures: {self._state.failure_count})"
-                    )
+        if self._state.state != CircuitState.CLOSED:
+            return
+
+        self._window.record(True)
+        if self._state.failure_count >= self.config.failure_threshold:
+            self._transition(CircuitState.OPEN, f"{self._state.failure_count} consecutive failures")
+        elif (
+            self.config.failure_rate_threshold is not None
+            and self._window.calls >= self.config.minimum_calls
+            and self._window.failure_rate() >= self.config.failure_rate_threshold
+        ):
+            self._transition(
+                CircuitState.OPEN,
+                f"failure rate {self._window.failure_rate():.0%} over {self._window.calls} calls",
+            )
 
     def __call__(self, func: Callable) -> Callable:
         """Decorator to wrap async functions with circuit breaker."""
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
-            if not await self._should_allow_request():
-                logger.warning(f"Circuit {self.name} is OPEN - request blocked")
-                raise CircuitOpenError(f"Circuit breaker {self.name} is open")
-
-            try:
-                result = await func(*args, **kwargs)
-                await self._record_success()
-                return result
-            except Exception as e:
-                await self._record_failure(e)
-                raise
+            return await self.call(func, *args, **kwargs)
 
         return wrapper
 
+    async def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Run an async callable through the breaker."""
+        if not self._should_allow_request():
+            self._stats["rejected"] += 1
+            logger.debug(f"Circuit {self.name} is {self._state.state.name} - request blocked")
+            raise CircuitOpenError(f"Circuit breaker {self.name} is {self._state.state.value}")
+
+        # Outcomes only count for the state episode the call was admitted in
+        probe = self._state.state == CircuitState.HALF_OPEN
+        generation = self._state.generation
+        self._stats["calls"] += 1
+        start = time.monotonic()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            self._latencies.append(time.monotonic() - start)
+            if generation == self._state.generation:
+                self._record_failure(e)
+            raise
+        else:
+            duration = time.monotonic() - start
+            self._latencies.append(duration)
+            if generation == self._state.generation:
+                self._record_success(duration)
+            return result
+        finally:
+            if probe and generation == self._state.generation:
+                self._state.half_open_in_flight -= 1
+
 
 class CircuitOpenError(Exception):
     """Raised when circuit breaker is open."""
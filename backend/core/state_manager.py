@@ -1,36 +1,31 @@
 """
-< Helix Collective v17.0 - Optimized State Manager
+🌀 Helix Collective v17.0 - UCF State Service
 backend/core/state_manager.py
 
-Optimized UCF state management with file watching and async I/O.
+Single in-memory, versioned source of truth for UCF state.
 
 Key Optimizations:
-- File watching instead of polling (eliminates 95% of disk reads)
-- In-memory state cache with real-time updates
-- Async file I/O (non-blocking)
-- Automatic reload on file changes
-- Thread-safe state access
-
-Performance Impact:
-- File I/O: 100+ reads/min � 1 read when changed
-- Response time: Eliminates 50-150ms disk I/O latency
-- CPU usage: -40% reduction in I/O wait time
+- Every read is served from memory; the JSON file is only read at startup
+  and when another process changes it
+- Writes bump a monotonic version and are flushed to disk at most once per
+  coalescing window, atomically (write temp file, fsync, rename)
+- Subscribers await new versions instead of polling; slow subscribers skip
+  straight to the latest state
+- Thread-safe, so sync FastAPI routes and helpers can read and write too
+- Mutations (absolute updates or batches of deltas) run under one lock and
+  support optimistic compare-and-swap on the version
 """
 
 import asyncio
 import json
 import logging
+import os
+import tempfile
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
-
-try:
-    import aiofiles
-
-    AIOFILES_AVAILABLE = True
-except ImportError:
-    AIOFILES_AVAILABLE = False
-    logging.warning("aiofiles not available - using synchronous file I/O")
+from typing import (Any, AsyncIterator, Callable, Dict, Mapping, Optional,
+                    Tuple)
 
 try:
     from watchfiles import awatch
@@ -42,242 +37,304 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# (min, max) per field; None means unbounded on that side
+Bounds = Mapping[str, Tuple[Optional[float], Optional[float]]]
+
+
+class UCFVersionConflict(RuntimeError):
+    """Raised when a compare-and-swap mutation sees a newer version than expected."""
+
+    def __init__(self, expected_version: int, current_version: int):
+        super().__init__(f"UCF state is at v{current_version}, expected v{expected_version}")
+        self.expected_version = expected_version
+        self.current_version = current_version
+
 
 class UCFStateManager:
     """
-    Optimized UCF state management with file watching.
+    Versioned UCF state service.
 
-    Instead of reading from disk on every request, this manager:
     1. Loads state once at startup
-    2. Watches the file for changes
-    3. Automatically reloads when file is modified
-    4. Serves all requests from in-memory cache
-
-    This eliminates ~100 disk reads per minute in production!
+    2. Serves reads from an immutable in-memory snapshot
+    3. Applies writes under a lock, bumping the version and waking subscribers
+    4. Persists coalesced writes atomically in the background
+    5. Reloads when another process changes the file
     """
 
-    def __init__(self, state_file_path: str = "Helix/state/ucf_state.json"):
+    def __init__(
+        self,
+        state_file_path: str = "Helix/state/ucf_state.json",
+        flush_delay: float = 0.25,
+        poll_interval: float = 5.0,
+    ):
         """
         Initialize state manager.
 
         Args:
             state_file_path: Path to UCF state JSON file
+            flush_delay: Seconds to coalesce writes before persisting them
+            poll_interval: Seconds between file checks when watchfiles is unavailable
         """
         self.state_file_path = Path(state_file_path)
+        self.flush_delay = flush_delay
+        self.poll_interval = poll_interval
         self._current_state: Optional[Dict[str, Any]] = None
-        self._state_lock = asyncio.Lock()
+        self._version = 0
+        self._persisted_version = 0
+        self._persisted_state: Optional[Dict[str, Any]] = None  # what the file holds, as far as we know
+        self._lock = threading.Lock()
         self._last_updated: Optional[datetime] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._changed: Optional[asyncio.Event] = None
+        self._flush_task: Optional[asyncio.Task] = None
         self._watch_task: Optional[asyncio.Task] = None
         self._watching = False
         self._use_file_watching = WATCHFILES_AVAILABLE
-        self._use_async_io = AIOFILES_AVAILABLE
-
-        logger.info("UCF State Manager initialized")
-        logger.info(f"  File path: {self.state_file_path}")
-        logger.info(f"  File watching: {'enabled' if self._use_file_watching else 'disabled (polling mode)'}")
-        logger.info(f"  Async I/O: {'enabled' if self._use_async_io else 'disabled (sync mode)'}")
+        self._last_seen_mtime_ns: Optional[int] = None
+        self.stats = {"updates": 0, "flushes": 0, "external_reloads": 0, "flush_errors": 0}
 
     async def initialize(self):
         """
         Initialize the state manager.
 
         Call this during application startup to load initial state
-        and start file watching.
+        and start watching for changes made by other processes.
         """
-        logger.info("Initializing UCF State Manager...")
-
-        # Ensure directory exists
+        self._loop = asyncio.get_running_loop()
+        self._changed = asyncio.Event()
         self.state_file_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Load initial state
-        await self._load_state()
+        state = await asyncio.to_thread(self._read_file)
+        if state is None:
+            logger.warning(f"State file not found: {self.state_file_path}")
+            state = self._get_default_state()
+            self._commit(state)
+            await self.flush()
+        else:
+            self._commit(state, persisted=True)
 
-        # Start file watcher
         if self._use_file_watching:
             self._watch_task = asyncio.create_task(self._watch_state_file())
-            logger.info(" File watching enabled - state will auto-reload on changes")
         else:
             self._watch_task = asyncio.create_task(self._poll_state_file())
-            logger.info(" Polling mode enabled - state will check for changes every 5s")
-
         self._watching = True
 
-    async def shutdown(self):
-        """Gracefully shutdown the state manager."""
-        logger.info("Shutting down UCF State Manager...")
+        logger.info(
+            f"✅ UCF state service ready (v{self._version}, "
+            f"{'file watching' if self._use_file_watching else 'polling'}): {self.state_file_path}"
+        )
 
+    async def shutdown(self):
+        """Persist any pending writes and stop watching the file."""
         self._watching = False
 
-        if self._watch_task:
-            self._watch_task.cancel()
-            try:
-                await self._watch_task
-            except asyncio.CancelledError:
-                pass
-
-        logger.info(" UCF State Manager shutdown complete")
-
-    async def _load_state(self):
-        """Load UCF state from disk."""
-        try:
-            if not self.state_file_path.exists():
-                logger.warning(f"State file not found: {self.state_file_path}")
-                self._current_state = self._get_default_state()
-                await self._save_state()  # Create default state file
-                return
-
-            if self._use_async_io:
-                # Async file read
-                async with aiofiles.open(self.state_file_path, 'r') as f:
-                    content = await f.read()
-            else:
-                # Synchronous fallback
-                with open(self.state_file_path, 'r') as f:
-                    content = f.read()
+        for task in (self._watch_task, self._flush_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._watch_task = self._flush_task = None
+
+        await self.flush()
+        logger.info(f"🛑 UCF state service stopped (v{self._version})")
+
+    @property
+    def version(self) -> int:
+        """Monotonic version, bumped on every change."""
+        return self._version
+
+    @property
+    def is_active(self) -> bool:
+        """Whether the service has been initialized inside an event loop."""
+        return self._loop is not None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a copy of the current UCF state without touching the disk.
 
-            async with self._state_lock:
-                self._current_state = json.loads(content)
-                self._last_updated = datetime.now()
+        Safe to call from sync code and other threads.
+        """
+        if self._current_state is None:
+            with self._lock:
+                if self._current_state is None:
+                    self._current_state = self._read_file() or self._get_default_state()
+        return dict(self._current_state)
+
+    def versioned_snapshot(self) -> Tuple[int, Dict[str, Any]]:
+        """Get the current version together with its state."""
+        with self._lock:
+            state, version = self._current_state, self._version
+        if state is None:
+            return self._version, self.snapshot()
+        return version, dict(state)
 
-            logger.info(" UCF state loaded from disk")
-            logger.debug(f"   Harmony: {self._current_state.get('harmony', 0.0):.2f}")
-            logger.debug(f"   Resilience: {self._current_state.get('resilience', 0.0):.2f}")
+    async def get_state(self) -> Dict[str, Any]:
+        """
+        Get current UCF state (from memory, not disk!).
 
-        except json.JSONDecodeError as e:
-            logger.error(f"L Failed to parse UCF state JSON: {e}")
-            self._current_state = self._get_default_state()
-        except Exception as e:
-            logger.error(f"L Failed to load UCF state: {e}")
-            self._current_state = self._get_default_state()
+        Returns:
+            Current UCF state dictionary
+        """
+        return self.snapshot()
 
-    async def _save_state(self):
-        """Save current state to disk."""
-        if self._current_state is None:
-            return
+    async def set_state(self, new_state: Dict[str, Any]) -> int:
+        """
+        Replace UCF state.
 
-        try:
-            content = json.dumps(self._current_state, indent=2)
+        Args:
+            new_state: New UCF state dictionary
 
-            if self._use_async_io:
-                # Async file write
-                async with aiofiles.open(self.state_file_path, 'w') as f:
-                    await f.write(content)
-            else:
-                # Synchronous fallback
-                with open(self.state_file_path, 'w') as f:
-                    f.write(content)
+        Returns:
+            The new version
+        """
+        return self._commit(dict(new_state))
 
-            logger.debug("UCF state saved to disk")
+    async def update_state(self, updates: Dict[str, Any]) -> int:
+        """
+        Partially update UCF state (merge with existing state).
 
-        except Exception as e:
-            logger.error(f"Failed to save UCF state: {e}")
+        Args:
+            updates: Dictionary of fields to update
 
-    async def _watch_state_file(self):
+        Returns:
+            The new version
         """
-        Watch UCF state file for changes (using watchfiles).
+        return self.update(updates)[0]
 
-        This is the most efficient method - only reloads when file actually changes.
+    def update(
+        self, updates: Dict[str, Any], expected_version: Optional[int] = None
+    ) -> Tuple[int, Dict[str, Any]]:
         """
-        logger.info(f"Starting file watcher for: {self.state_file_path}")
-
-        try:
-            async for changes in awatch(str(self.state_file_path.parent)):
-                if not self._watching:
-                    break
+        Merge updates into the state from sync or async code.
 
-                # Check if our specific file changed
-                for change_type, file_path in changes:
-                    if Path(file_path) == self.state_file_path:
-                        logger.info(f"UCF state file changed (type={change_type}) - reloading...")
-                        await self._load_state()
-                        break
+        Args:
+            updates: Dictionary of fields to set
+            expected_version: Only apply if the state is still at this version
 
-        except Exception as e:
-            logger.error(f"File watcher error: {e}")
-            logger.info("Falling back to polling mode...")
-            await self._poll_state_file()
+        Returns:
+            The new version and a copy of the updated state
 
-    async def _poll_state_file(self):
+        Raises:
+            UCFVersionConflict: If expected_version is stale
         """
-        Poll state file for changes (fallback method).
-
-        Used when watchfiles is not available. Checks file modification time
-        every 5 seconds instead of reading on every request.
+        version, state = self.mutate(lambda state: state.update(updates), expected_version)
+        logger.debug(f"UCF state updated to v{version}: {list(updates.keys())}")
+        return version, state
+
+    def apply_deltas(
+        self,
+        deltas: Mapping[str, float],
+        bounds: Optional[Bounds] = None,
+        expected_version: Optional[int] = None,
+    ) -> Tuple[int, Dict[str, Any]]:
         """
-        logger.info("Starting state file polling (checking every 5s)")
+        Add a batch of deltas to existing fields atomically.
 
-        last_mtime = None
+        All deltas in the batch land in the same version, so concurrent
+        rituals and webhooks never overwrite each other's adjustments.
+        Fields not present in the state are ignored.
 
-        while self._watching:
-            try:
-                if self.state_file_path.exists():
-                    current_mtime = self.state_file_path.stat().st_mtime
-
-                    if last_mtime is None:
-                        last_mtime = current_mtime
-                    elif current_mtime > last_mtime:
-                        logger.info("UCF state file modified - reloading...")
-                        await self._load_state()
-                        last_mtime = current_mtime
+        Args:
+            deltas: Field name to amount to add
+            bounds: Optional (min, max) clamp per field
+            expected_version: Only apply if the state is still at this version
 
-                await asyncio.sleep(5)  # Poll every 5 seconds
+        Returns:
+            The new version and a copy of the updated state
 
-            except Exception as e:
-                logger.error(f"Polling error: {e}")
-                await asyncio.sleep(5)
+        Raises:
+            UCFVersionConflict: If expected_version is stale
+        """
+        return self.mutate(lambda state: add_bounded_deltas(state, deltas, bounds), expected_version)
 
-    async def get_state(self) -> Dict[str, Any]:
+    def mutate(
+        self,
+        mutator: Callable[[Dict[str, Any]], None],
+        expected_version: Optional[int] = None,
+    ) -> Tuple[int, Dict[str, Any]]:
         """
-        Get current UCF state (from memory, not disk!).
+        Apply an in-place mutation to a copy of the state under the lock.
 
-        This is the primary method to retrieve UCF state. It returns
-        the in-memory cached state, avoiding disk I/O entirely.
+        The mutator must be quick and must not call back into the service.
+        Before the service is initialized (scripts, CLI tools) the file is
+        re-read for every mutation and written through immediately.
 
         Returns:
-            Current UCF state dictionary
-        """
-        if self._current_state is None:
-            logger.warning("State not loaded yet - loading now...")
-            await self._load_state()
-
-        return self._current_state or self._get_default_state()
+            The new version and a copy of the updated state
 
-    async def set_state(self, new_state: Dict[str, Any]):
+        Raises:
+            UCFVersionConflict: If expected_version is stale
         """
-        Update UCF state.
+        with self._lock:
+            if expected_version is not None and expected_version != self._version:
+                raise UCFVersionConflict(expected_version, self._version)
 
-        Args:
-            new_state: New UCF state dictionary
-        """
-        async with self._state_lock:
-            self._current_state = new_state
-            self._last_updated = datetime.now()
+            if self._loop is None:
+                base = self._read_file() or self._current_state or self._get_default_state()
+            else:
+                base = self._current_state or self._get_default_state()
 
-        # Save to disk asynchronously
-        await self._save_state()
+            state = dict(base)
+            mutator(state)
+            version = self._commit_locked(state)
 
-        logger.info("UCF state updated")
-        logger.debug(f"  Harmony: {new_state.get('harmony', 0.0):.2f}")
-        logger.debug(f"  Resilience: {new_state.get('resilience', 0.0):.2f}")
+            if self._loop is None:
+                self._write_atomic(state)
+                self._persisted_version = version
+                self._persisted_state = state
+                self.stats["flushes"] += 1
+        return version, dict(state)
 
-    async def update_state(self, updates: Dict[str, Any]):
+    async def subscribe(self, since: Optional[int] = None) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
         """
-        Partially update UCF state (merge with existing state).
+        Yield (version, state) whenever the state changes.
 
-        Args:
-            updates: Dictionary of fields to update
+        The current state is yielded first unless `since` is the current
+        version. Consumers that fall behind receive only the latest state.
         """
-        async with self._state_lock:
-            if self._current_state is None:
-                self._current_state = self._get_default_state()
+        if self._changed is None:
+            raise RuntimeError("UCF state service is not initialized")
+
+        seen = -1 if since is None else since
+        while True:
+            changed = self._changed
+            version, state = self.versioned_snapshot()
+            if version > seen:
+                seen = version
+                yield version, state
+                continue
+            await changed.wait()
+
+    async def wait_for_change(self, since: int, timeout: Optional[float] = None) -> Tuple[int, Dict[str, Any]]:
+        """Wait until the version moves past `since` or the timeout expires."""
+        if self._changed is not None and self._version <= since:
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.versioned_snapshot()
 
-            self._current_state.update(updates)
-            self._last_updated = datetime.now()
+    async def flush(self) -> bool:
+        """Persist the latest state now if it has not been written yet."""
+        with self._lock:
+            state, version = self._current_state, self._version
+        if state is None or version <= self._persisted_version:
+            return True
 
-        # Save to disk asynchronously
-        await self._save_state()
+        try:
+            await asyncio.to_thread(self._write_atomic, state)
+        except Exception as e:
+            self.stats["flush_errors"] += 1
+            logger.error(f"Failed to persist UCF state v{version}: {e}")
+            return False
 
-        logger.info(f"UCF state updated: {list(updates.keys())}")
+        with self._lock:
+            if version > self._persisted_version:
+                self._persisted_version, self._persisted_state = version, state
+        self.stats["flushes"] += 1
+        return True
 
     def get_last_updated(self) -> Optional[datetime]:
         """Get timestamp of last state update."""
@@ -287,6 +344,136 @@ class UCFStateManager:
         """Check if file watching is active."""
         return self._watching
 
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "version": self._version,
+            "persisted_version": self._persisted_version,
+            "watching": self._watching,
+        }
+
+    def _commit(self, state: Dict[str, Any], persisted: bool = False) -> int:
+        with self._lock:
+            return self._commit_locked(state, persisted)
+
+    def _commit_locked(self, state: Dict[str, Any], persisted: bool = False) -> int:
+        """Publish a new immutable snapshot. Caller holds the lock."""
+        self._current_state = state
+        self._version += 1
+        self._last_updated = datetime.now()
+        if persisted:
+            self._persisted_version = self._version
+            self._persisted_state = state
+        else:
+            self.stats["updates"] += 1
+        self._notify()
+        return self._version
+
+    def _notify(self) -> None:
+        """Wake subscribers and schedule a flush on the service's event loop."""
+        if self._loop is None or self._loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._on_changed()
+        else:
+            self._loop.call_soon_threadsafe(self._on_changed)
+
+    def _on_changed(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        if changed is not None:
+            changed.set()
+        if self._version > self._persisted_version and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = self._loop.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        """Coalesce writes for one window, then persist the latest version."""
+        while self._version > self._persisted_version:
+            await asyncio.sleep(self.flush_delay)
+            if not await self.flush():
+                await asyncio.sleep(self.poll_interval)
+
+    def _read_file(self) -> Optional[Dict[str, Any]]:
+        try:
+            stat = self.state_file_path.stat()
+            content = self.state_file_path.read_text()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.error(f"Failed to read UCF state: {e}")
+            return None
+
+        self._last_seen_mtime_ns = stat.st_mtime_ns
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse UCF state JSON: {e}")
+            return None
+
+    def _write_atomic(self, state: Dict[str, Any]) -> None:
+        write_json_atomic(self.state_file_path, state)
+        self._last_seen_mtime_ns = self.state_file_path.stat().st_mtime_ns
+
+    async def _reload_if_changed_externally(self) -> None:
+        """Adopt the file's contents if another process wrote something new."""
+        try:
+            mtime_ns = self.state_file_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime_ns == self._last_seen_mtime_ns:
+            return
+
+        state = await asyncio.to_thread(self._read_file)
+        if state is None or state == self._current_state:
+            return
+
+        with self._lock:
+            if self._version > self._persisted_version:
+                # Local writes not flushed yet: keep them on top of the external edit
+                self._commit_locked(self._merge_pending_locked(state))
+            else:
+                self._commit_locked(state, persisted=True)
+        self.stats["external_reloads"] += 1
+        logger.info(f"UCF state file changed externally - reloaded as v{self._version}")
+
+    def _merge_pending_locked(self, external: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply the fields changed locally since the last persist onto an external state."""
+        local, base = self._current_state or {}, self._persisted_state or {}
+        merged = dict(external)
+        for field in base.keys() - local.keys():
+            merged.pop(field, None)
+        for field, value in local.items():
+            if field not in base or base[field] != value:
+                merged[field] = value
+        return merged
+
+    async def _watch_state_file(self):
+        """Watch the state directory and reload on external changes (watchfiles)."""
+        try:
+            async for changes in awatch(str(self.state_file_path.parent)):
+                if not self._watching:
+                    break
+                if any(Path(file_path) == self.state_file_path for _, file_path in changes):
+                    await self._reload_if_changed_externally()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"File watcher error: {e}")
+            logger.info("Falling back to polling mode...")
+            await self._poll_state_file()
+
+    async def _poll_state_file(self):
+        """Check the file's modification time for external changes (fallback)."""
+        while self._watching:
+            try:
+                await self._reload_if_changed_externally()
+            except Exception as e:
+                logger.error(f"Polling error: {e}")
+            await asyncio.sleep(self.poll_interval)
+
     @staticmethod
     def _get_default_state() -> Dict[str, Any]:
         """
@@ -308,6 +495,54 @@ class UCFStateManager:
         }
 
 
+def add_bounded_deltas(
+    state: Dict[str, Any], deltas: Mapping[str, float], bounds: Optional[Bounds] = None
+) -> None:
+    """
+    Add deltas to the existing fields of a state dict in place.
+
+    Args:
+        state: State dictionary to modify
+        deltas: Field name to amount to add; fields missing from state are skipped
+        bounds: Optional (min, max) clamp per field
+    """
+    bounds = bounds or {}
+    for field, delta in deltas.items():
+        if field not in state:
+            continue
+        value = state[field] + delta
+        low, high = bounds.get(field, (None, None))
+        if low is not None:
+            value = max(low, value)
+        if high is not None:
+            value = min(high, value)
+        state[field] = value
+
+
+def write_json_atomic(path: Path, data: Any) -> None:
+    """
+    Write JSON so readers only ever see the old or the new file.
+
+    Writes to a temp file in the same directory, fsyncs it, then renames
+    it over the target.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
 # Global singleton instance
 _global_state_manager: Optional[UCFStateManager] = None
 
@@ -327,6 +562,18 @@ def get_state_manager() -> UCFStateManager:
     return _global_state_manager
 
 
+def get_active_state_manager() -> Optional[UCFStateManager]:
+    """
+    Get the global state manager only if it was initialized at startup.
+
+    Scripts and tools that run without the app lifespan get None and
+    fall back to reading the file directly.
+    """
+    if _global_state_manager is not None and _global_state_manager.is_active:
+        return _global_state_manager
+    return None
+
+
 async def initialize_state_manager(state_file_path: str = "Helix/state/ucf_state.json"):
     """
     Initialize the global state manager.
@@ -352,8 +599,6 @@ async def shutdown_state_manager():
     Call this during FastAPI lifespan shutdown:
         await shutdown_state_manager()
     """
-    # global _global_state_manager not needed - only reading, not assigning
-
     if _global_state_manager:
         await _global_state_manager.shutdown()
 
@@ -361,7 +606,11 @@ async def shutdown_state_manager():
 # Export main components
 __all__ = [
     "UCFStateManager",
+    "UCFVersionConflict",
+    "add_bounded_deltas",
     "get_state_manager",
+    "get_active_state_manager",
     "initialize_state_manager",
     "shutdown_state_manager",
+    "write_json_atomic",
 ]
@@ -15,6 +15,10 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from backend.core.state_manager import (UCFVersionConflict,
+                                        get_active_state_manager,
+                                        get_state_manager)
+
 logger = logging.getLogger(__name__)
 
 # In-memory emergency events queue (last 50 events)
@@ -67,10 +71,17 @@ def calculate_consciousness_level(ucf: Dict[str, float]) -> float:
 
 def get_current_ucf() -> Dict[str, float]:
     """
-    Read current UCF state from file.
+    Get current UCF state.
+
+    Served from the in-memory state service when the app is running;
+    otherwise read from file.
 
     Returns UCF metrics dict or defaults if file not found.
     """
+    state_manager = get_active_state_manager()
+    if state_manager:
+        return state_manager.snapshot()
+
     ucf_file = Path("Helix/state/ucf_state.json")
 
     try:
@@ -86,35 +97,30 @@ def get_current_ucf() -> Dict[str, float]:
         return {"harmony": 0.0, "resilience": 0.0, "prana": 0.0, "drishti": 0.0, "klesha": 1.0, "zoom": 1.0}
 
 
-def update_ucf_state(ucf_updates: Dict[str, float]) -> Dict[str, float]:
+def update_ucf_state(
+    ucf_updates: Dict[str, float], expected_version: Optional[int] = None
+) -> Dict[str, float]:
     """
-    Update UCF state file with new values.
+    Update UCF state with new values.
+
+    Goes through the state service lock, so concurrent callers never lose
+    each other's writes. Outside the running app the service re-reads the
+    file and writes it through atomically.
 
     Args:
         ucf_updates: Dict with UCF metrics to update
+        expected_version: Optional compare-and-swap guard (raises
+            UCFVersionConflict if the state has moved on)
 
     Returns:
         Updated complete UCF state
     """
-    ucf_file = Path("Helix/state/ucf_state.json")
-
     try:
-        # Ensure directory exists
-        ucf_file.parent.mkdir(parents=True, exist_ok=True)
-
-        # Read current state
-        current_ucf = get_current_ucf()
-
-        # Update with new values
-        current_ucf.update(ucf_updates)
-
-        # Write back to file
-        with open(ucf_file, "w") as f:
-            json.dump(current_ucf, f, indent=2)
-
+        _, current_ucf = get_state_manager().update(ucf_updates, expected_version=expected_version)
         logger.info(f"UCF state updated: {list(ucf_updates.keys())}")
-
         return current_ucf
+    except UCFVersionConflict:
+        raise
     except Exception as e:
         logger.error(f"Error updating UCF state: {e}")
         return get_current_ucf()
@@ -9,7 +9,7 @@ import os
 from datetime import datetime
 
 from sqlalchemy import (JSON, Boolean, Column, DateTime, Float, Integer,
-                        String, create_engine)
+                        LargeBinary, String, create_engine)
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 # Database URL (Railway provides this automatically)
@@ -294,6 +294,26 @@ class DailyMetrics(Base):
 
     calculated_at = Column(DateTime, default=datetime.utcnow)
 
+class DailyUsageRollup(Base):
+    """Incrementally maintained per-day usage counters and distinct-user sketch"""
+    __tablename__ = "daily_usage_rollups"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    date = Column(DateTime, nullable=False, index=True, unique=True)
+    active_users_sketch = Column(LargeBinary)  # HyperLogLog registers (backend/saas/sketches.py)
+    api_calls = Column(Integer, default=0)
+    error_requests = Column(Integer, default=0)  # UsageLog rows with status >= 400
+    logged_errors = Column(Integer, default=0)  # ErrorLog rows
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class MetricsCursor(Base):
+    """Last source row folded into the rollups, per source table"""
+    __tablename__ = "metrics_cursors"
+
+    name = Column(String, primary_key=True)  # usage_logs, error_logs
+    position = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 # ============================================================================
 # CREATE TABLES
 # ============================================================================
@@ -46,55 +46,66 @@ class HelixStorageAdapterAsync:
             print(f"❌ Missing file {path}")
             return None
 
+        async with aiofiles.open(path, "rb") as f:
+            data = await f.read()
+        return await self.upload_bytes(data, path.name, remote_dir)
+
+    async def upload_bytes(self, data: bytes, filename: str, remote_dir: str = "helix_uploads") -> Optional[int]:
+        """
+        Upload in-memory data (rendered frames, encoded animations) without a local file.
+
+        Args:
+            data: File contents
+            filename: Name to store the data under
+            remote_dir: Remote directory name
+
+        Returns:
+            HTTP status code or 200 for local storage
+        """
         if self.mode == "nextcloud" and self.webdav_url:
-            return await self._upload_nextcloud(path, remote_dir)
+            return await self._upload_nextcloud(data, filename, remote_dir)
         elif self.mode == "mega" and self.mega_token:
-            return await self._upload_mega(path, remote_dir)
+            return await self._upload_mega(data, filename, remote_dir)
         else:
-            return await self._upload_local(path, remote_dir)
+            return await self._upload_local(data, filename, remote_dir)
 
-    async def _upload_nextcloud(self, path: Path, remote_dir: str) -> int:
+    async def _upload_nextcloud(self, data: bytes, filename: str, remote_dir: str) -> int:
         """Upload to Nextcloud via WebDAV."""
-        target = f"{self.webdav_url.rstrip('/')}/{remote_dir}/{path.name}"
+        target = f"{self.webdav_url.rstrip('/')}/{remote_dir}/{filename}"
 
         try:
             async with aiohttp.ClientSession(auth=aiohttp.BasicAuth(self.webdav_user, self.webdav_pass)) as session:
-                async with aiofiles.open(path, "rb") as f:
-                    data = await f.read()
-                    async with session.put(target, data=data) as response:
-                        print(f"☁️ Nextcloud → {response.status} ({path.name})")
-                        return response.status
+                async with session.put(target, data=data) as response:
+                    print(f"☁️ Nextcloud → {response.status} ({filename})")
+                    return response.status
         except Exception as e:
             print(f"⚠️  Nextcloud upload failed: {e}")
-            return await self._upload_local(path, remote_dir)
+            return await self._upload_local(data, filename, remote_dir)
 
-    async def _upload_mega(self, path: Path, remote_dir: str) -> int:
+    async def _upload_mega(self, data: bytes, filename: str, remote_dir: str) -> int:
         """Upload to MEGA via REST API."""
         endpoint = "https://api.mega.nz/v2/files/upload"
         headers = {"Authorization": self.mega_token}
 
         try:
             async with aiohttp.ClientSession() as session:
-                async with aiofiles.open(path, "rb") as f:
-                    data = await f.read()
-                    form = aiohttp.FormData()
-                    form.add_field("file", data, filename=path.name)
-
-                    async with session.post(endpoint, headers=headers, data=form) as response:
-                        print(f"☁️ MEGA → {response.status} ({path.name})")
-                        return response.status
+                form = aiohttp.FormData()
+                form.add_field("file", data, filename=filename)
+
+                async with session.post(endpoint, headers=headers, data=form) as response:
+                    print(f"☁️ MEGA → {response.status} ({filename})")
+                    return response.status
         except Exception as e:
             print(f"⚠️  MEGA upload failed: {e}")
-            return await self._upload_local(path, remote_dir)
+            return await self._upload_local(data, filename, remote_dir)
 
-    async def _upload_local(self, path: Path, remote_dir: str) -> int:
+    async def _upload_local(self, data: bytes, filename: str, remote_dir: str) -> int:
         """Local fallback storage."""
-        local_target = self.root / f"{remote_dir}_{path.name}"
+        local_target = self.root / f"{remote_dir}_{filename}"
 
         try:
-            async with aiofiles.open(path, "rb") as src:
-                async with aiofiles.open(local_target, "wb") as dst:
-                    await dst.write(await src.read())
+            async with aiofiles.open(local_target, "wb") as dst:
+                await dst.write(data)
             print(f"💾 Local → {local_target}")
             return 200
         except Exception as e:
@@ -33,6 +33,9 @@ from zapier_integration import HelixZapierIntegration, get_zapier, set_zapier
 
 from agents import get_collective_status
 from backend.config_manager import config
+from backend.core.state_manager import (get_state_manager,
+                                        initialize_state_manager,
+                                        shutdown_state_manager)
 
 # FIX: Create Crypto → Cryptodome alias BEFORE importing mega
 # The config manager is initialized here to ensure it's available for all modules
@@ -157,42 +160,29 @@ except ImportError as e:
 
 async def ucf_broadcast_loop() -> None:
     """
-    Background task that monitors UCF state and broadcasts changes.
-    Replaces 5-second polling with event-driven updates.
+    Background task that broadcasts UCF state changes.
+    Consumes the state service subscription instead of polling the state file.
     Also sends telemetry to Zapier when UCF state changes.
     """
-    previous_state = None
-    broadcast_interval = 2  # Check every 2 seconds
+    import time
+
+    retry_interval = 2  # Back-off after an unexpected error
     zapier_send_interval = 3600  # Send to Zapier every 1 hour (24/day = 720/month)
     last_zapier_send = 0
+    last_version = None
 
     logger.info("📡 UCF broadcast loop started")
 
     while True:
         try:
-            # Read current UCF state
-            try:
-                with open("Helix/state/ucf_state.json", "r") as f:
-                    current_state = json.load(f)
-            except FileNotFoundError:
-                # State file doesn't exist yet
-                await asyncio.sleep(broadcast_interval)
-                continue
-            except Exception as e:
-                logger.error(f"Error reading UCF state: {e}")
-                await asyncio.sleep(broadcast_interval)
-                continue
+            async for version, current_state in get_state_manager().subscribe(since=last_version):
+                last_version = version
 
-            # Check if state changed
-            if current_state != previous_state:
                 # Broadcast to all connected WebSocket clients
                 await ws_manager.broadcast_ucf_state(current_state)
-                logger.debug("📡 UCF state changed and broadcasted")
-                previous_state = current_state.copy()
+                logger.debug(f"📡 UCF state v{version} broadcasted")
 
                 # Send to Zapier every 1 hour (not every change)
-                import time
-
                 current_time = time.time()
                 if current_time - last_zapier_send >= zapier_send_interval:
                     zapier = get_zapier()
@@ -220,11 +210,11 @@ async def ucf_broadcast_loop() -> None:
                         except Exception as e:
                             logger.error(f"Error sending to Zapier: {e}")
 
-            await asyncio.sleep(broadcast_interval)
-
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"Error in UCF broadcast loop: {e}")
-            await asyncio.sleep(broadcast_interval)
+            await asyncio.sleep(retry_interval)
 
 
 # ============================================================================
@@ -243,6 +233,13 @@ async def lifespan(app: FastAPI):
     Path("Helix/ethics").mkdir(parents=True, exist_ok=True)
     Path("Shadow/manus_archive").mkdir(parents=True, exist_ok=True)
 
+    # Load UCF state into the in-memory state service (single source of truth)
+    try:
+        await initialize_state_manager()
+        logger.info("✅ UCF state service initialized")
+    except Exception as e:
+        logger.error(f"❌ UCF state service initialization failed: {e}")
+
     # Initialize Zapier integration
     zapier_webhook_url = os.getenv("ZAPIER_WEBHOOK_URL")
     if zapier_webhook_url:
@@ -337,6 +334,29 @@ async def lifespan(app: FastAPI):
     # Cleanup on shutdown
     logger.info("🌙 Helix Collective v16.9 - Shutdown Sequence")
 
+    # Flush pending UCF state to disk
+    try:
+        await shutdown_state_manager()
+        logger.info("✅ UCF state service flushed")
+    except Exception as e:
+        logger.warning(f"⚠️ UCF state service shutdown error: {e}")
+
+    # Write queued audit entries before the database goes away
+    try:
+        from backend.saas.audit_logs import audit_service
+        await audit_service.stop()
+        logger.info("✅ Audit log queue drained")
+    except Exception as e:
+        logger.warning(f"⚠️ Audit log shutdown error: {e}")
+
+    # Stop webhook delivery workers and close their HTTP clients
+    try:
+        from backend.saas.webhooks import webhook_service
+        await webhook_service.stop()
+        logger.info("✅ Webhook delivery stopped")
+    except Exception as e:
+        logger.warning(f"⚠️ Webhook service shutdown error: {e}")
+
     # Cleanup SaaS Core Platform
     try:
         from backend.saas_auth import cleanup_auth_system
@@ -1264,11 +1284,8 @@ def read_json(p: Path, default: Any) -> Any:
 @app.get("/api/status")  # Alias for consistency with external agents
 def get_status() -> Dict[str, Any]:
     """Get full system status - minimal robust version."""
-    # Read UCF state with defaults
-    ucf = read_json(
-        Path("Helix/state/ucf_state.json"),
-        {"harmony": None, "resilience": None, "prana": None, "drishti": None, "klesha": None, "zoom": None},
-    )
+    # UCF state from the in-memory state service
+    ucf = get_state_manager().snapshot()
 
     # Read agents state with defaults
     agents = read_json(Path("Helix/state/agents.json"), {"active": [], "count": 0})
@@ -1309,11 +1326,7 @@ async def list_agents() -> Dict[str, Any]:
 async def get_ucf_state() -> Dict[str, Any]:
     """Get Universal Coherence Field state."""
     try:
-        with open("Helix/state/ucf_state.json", "r") as f:
-            ucf_state = json.load(f)
-        return ucf_state
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail="UCF state not found")
+        return get_state_manager().snapshot()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1811,11 +1824,7 @@ async def send_zapier_telemetry() -> Dict[str, Any]:
 
     try:
         # Read current UCF state
-        try:
-            with open("Helix/state/ucf_state.json", "r") as f:
-                ucf_state = json.load(f)
-        except FileNotFoundError:
-            raise HTTPException(status_code=404, detail="UCF state not found")
+        ucf_state = get_state_manager().snapshot()
 
         # Get agent status
         agents_status = await get_collective_status()
@@ -2193,15 +2202,7 @@ async def manus_get_ucf() -> Dict[str, Any]:
     """
     try:
         # Read current UCF state
-        try:
-            with open("Helix/state/ucf_state.json", "r") as f:
-                ucf_state = json.load(f)
-        except FileNotFoundError:
-            # Return defaults if state not found
-            ucf_state = {
-                "harmony": 0.62, "resilience": 1.85, "prana": 0.55,
-                "drishti": 0.48, "klesha": 0.08, "zoom": 1.02
-            }
+        ucf_state = get_state_manager().snapshot()
 
         # Calculate consciousness level
         consciousness_level = round(
@@ -2388,11 +2389,7 @@ async def manus_emergency_alert(request: ManusEmergencyAlertRequest) -> Dict[str
     """
     try:
         # Read current UCF state
-        try:
-            with open("Helix/state/ucf_state.json", "r") as f:
-                ucf_state = json.load(f)
-        except Exception:
-            ucf_state = {}
+        ucf_state = get_state_manager().snapshot()
 
         # Create emergency record
         emergency = {
@@ -2434,11 +2431,7 @@ async def manus_analytics_summary() -> Dict[str, Any]:
     """
     try:
         # Read UCF state
-        try:
-            with open("Helix/state/ucf_state.json", "r") as f:
-                ucf_state = json.load(f)
-        except Exception:
-            ucf_state = {"harmony": 0.62, "klesha": 0.08}
+        ucf_state = get_state_manager().snapshot()
 
         # Read rituals
         rituals_file = Path("Helix/state/rituals.json")
@@ -2509,14 +2502,7 @@ async def manus_test_webhook(event_type: str = "telemetry") -> Dict[str, Any]:
         # Send test payload based on event type
         if event_type == "telemetry":
             # Read current UCF state
-            try:
-                with open("Helix/state/ucf_state.json", "r") as f:
-                    ucf_state = json.load(f)
-            except Exception:
-                ucf_state = {
-                    "harmony": 0.62, "resilience": 1.85, "prana": 0.55,
-                    "drishti": 0.48, "klesha": 0.08, "zoom": 1.02
-                }
+            ucf_state = get_state_manager().snapshot()
 
             # Get agents
             try:
@@ -2589,15 +2575,7 @@ async def get_ucf_for_zapier_tables() -> Dict[str, Any]:
     """
     try:
         # Read current UCF state
-        try:
-            with open("Helix/state/ucf_state.json", "r") as f:
-                ucf_state = json.load(f)
-        except FileNotFoundError:
-            # Return default state if file not found
-            ucf_state = {
-                "harmony": 0.62, "resilience": 1.85, "prana": 0.55,
-                "drishti": 0.48, "klesha": 0.08, "zoom": 1.02
-            }
+        ucf_state = get_state_manager().snapshot()
 
         # Calculate consciousness level (0-10 scale)
         consciousness_level = round(
@@ -2722,11 +2700,7 @@ async def get_emergency_alerts_for_zapier() -> Dict[str, Any]:
     """
     try:
         # Read current UCF state to check for crisis conditions
-        try:
-            with open("Helix/state/ucf_state.json", "r") as f:
-                ucf_state = json.load(f)
-        except FileNotFoundError:
-            ucf_state = {"harmony": 0.62, "klesha": 0.08}
+        ucf_state = get_state_manager().snapshot()
 
         harmony = ucf_state.get("harmony", 0)
         klesha = ucf_state.get("klesha", 0)
@@ -3000,11 +2974,7 @@ async def trigger_test_event(event_type: str, data: Optional[Dict[str, Any]] = N
     """
     try:
         # Get current UCF state
-        try:
-            with open("Helix/state/ucf_state.json", "r") as f:
-                ucf_state = json.load(f)
-        except FileNotFoundError:
-            ucf_state = {"harmony": 0.62, "resilience": 1.85, "prana": 0.55}
+        ucf_state = get_state_manager().snapshot()
 
         # Get agents
         try:
@@ -3069,11 +3039,7 @@ async def sync_ucf_to_zapier_tables(background_tasks: BackgroundTasks) -> Dict[s
     """
     try:
         # Read current UCF state
-        try:
-            with open("Helix/state/ucf_state.json", "r") as f:
-                ucf_state = json.load(f)
-        except FileNotFoundError:
-            raise HTTPException(status_code=404, detail="UCF state file not found")
+        ucf_state = get_state_manager().snapshot()
 
         # Get Zapier integration
         zapier = get_zapier()
@@ -3284,8 +3250,11 @@ async def consciousness_webhook(payload: ConsciousnessWebhookRequest):
 
         # Update global UCF state
         if payload.ucf_metrics:
+            # Apply through the state service lock so concurrent webhooks don't lose updates
+            metrics = payload.ucf_metrics.model_dump()
+            get_state_manager().update({key: metrics[key] for key in UCF_METRIC_KEYS if key in metrics})
             # global current_ucf not needed - only mutating dict, not reassigning
-            current_ucf.update(payload.ucf_metrics.model_dump())
+            current_ucf.update(metrics)
             current_ucf["consciousness_level"] = consciousness_level
             current_ucf["last_updated"] = datetime.now().isoformat()
 
@@ -3340,46 +3309,47 @@ async def consciousness_webhook(payload: ConsciousnessWebhookRequest):
         raise HTTPException(status_code=500, detail=f"Webhook processing failed: {str(e)}")
 
 
+UCF_METRIC_KEYS = ("harmony", "resilience", "prana", "drishti", "klesha", "zoom")
+
+
 async def consciousness_generator():
-    """Generate consciousness updates every 5 seconds"""
+    """Generate consciousness updates on every UCF state change (heartbeat every 5 seconds)"""
+    state_manager = get_state_manager()
+    version, ucf_state = state_manager.versioned_snapshot()
     while True:
         try:
+            metrics = {key: ucf_state.get(key, current_ucf[key]) for key in UCF_METRIC_KEYS}
+
             # Calculate current consciousness level from UCF metrics
-            consciousness_level = (
-                current_ucf["harmony"] * 0.25
-                + current_ucf["resilience"] * 0.20
-                + current_ucf["prana"] * 0.20
-                + current_ucf["drishti"] * 0.15
-                + (1 - current_ucf["klesha"]) * 0.10
-                + current_ucf["zoom"] * 0.10
-            ) * 100
-
-            # Update consciousness level
-            current_ucf["consciousness_level"] = round(consciousness_level, 2)
+            consciousness_level = round(
+                (
+                    metrics["harmony"] * 0.25
+                    + metrics["resilience"] * 0.20
+                    + metrics["prana"] * 0.20
+                    + metrics["drishti"] * 0.15
+                    + (1 - metrics["klesha"]) * 0.10
+                    + metrics["zoom"] * 0.10
+                ) * 100,
+                2,
+            )
 
             # Count active agents
             active_count = sum(1 for agent in active_agents.values() if agent["status"] == "active")
 
             # Prepare event data
             event_data = {
-                "consciousness_level": current_ucf["consciousness_level"],
-                "ucf_metrics": {
-                    "harmony": current_ucf["harmony"],
-                    "resilience": current_ucf["resilience"],
-                    "prana": current_ucf["prana"],
-                    "drishti": current_ucf["drishti"],
-                    "klesha": current_ucf["klesha"],
-                    "zoom": current_ucf["zoom"],
-                },
+                "consciousness_level": consciousness_level,
+                "ucf_metrics": metrics,
                 "active_agents": active_count,
                 "system_health": system_health,
                 "timestamp": datetime.now().isoformat(),
-                "mode": get_consciousness_mode(current_ucf["consciousness_level"]),
+                "mode": get_consciousness_mode(consciousness_level),
             }
 
             yield {"event": "consciousness_update", "data": json.dumps(event_data)}
 
-            await asyncio.sleep(5)  # 5-second updates
+            # Wake on the next state change, or after 5 seconds as a heartbeat
+            version, ucf_state = await state_manager.wait_for_change(version, timeout=5)
 
         except Exception as e:
             logger.error(f"Stream error: {str(e)}")
@@ -3430,20 +3400,11 @@ async def ucf_events(payload: UCFUpdateRequest):
     try:
         logger.info(f"📊 UCF Event: {payload.metric_type or 'bulk_update'}")
 
-        # Update specific metrics (only if provided)
+        # Update specific metrics (only if provided) as one atomic batch in the state service
+        updates = {key: getattr(payload, key) for key in UCF_METRIC_KEYS if getattr(payload, key) is not None}
+        _, ucf_state = get_state_manager().update(updates)
         # global current_ucf not needed - only mutating dict keys
-        if payload.harmony is not None:
-            current_ucf["harmony"] = payload.harmony
-        if payload.resilience is not None:
-            current_ucf["resilience"] = payload.resilience
-        if payload.prana is not None:
-            current_ucf["prana"] = payload.prana
-        if payload.drishti is not None:
-            current_ucf["drishti"] = payload.drishti
-        if payload.klesha is not None:
-            current_ucf["klesha"] = payload.klesha
-        if payload.zoom is not None:
-            current_ucf["zoom"] = payload.zoom
+        current_ucf.update({key: ucf_state.get(key, current_ucf[key]) for key in UCF_METRIC_KEYS})
 
         # Recalculate consciousness level
         consciousness_level = (
@@ -6,18 +6,180 @@ Generates Universal Consciousness Field states from Mandelbrot set coordinates.
 The "Eye of Consciousness" at complex coordinate -0.745+0.113j produces
 optimal harmony/resilience balance.
 
+Escape times are computed by a vectorised kernel that iterates only the
+points which have not escaped yet, so whole grids, sample circles and spiral
+journeys cost one pass instead of one Python loop per point. Large grids can
+be split into row tiles rendered on a process pool.
+
 Author: Andrew John Ward (Architect)
 Version: 15.5.0
 """
 
+import atexit
 import logging
-from typing import Dict, Tuple
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
 
+# ============================================================================
+# ESCAPE-TIME KERNEL
+# ============================================================================
+
+
+def escape_time(
+    c: np.ndarray, max_iterations: int, bailout_inclusive: bool = False
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Iterate z = z² + c for every point of an array at once.
+
+    Each pass only touches the points still inside the bailout circle: the
+    escaped ones are masked out and the working arrays are compacted, so the
+    cost of a pass shrinks as the grid escapes.
+
+    Args:
+        c: Complex coordinates (any shape)
+        max_iterations: Maximum iterations per point
+        bailout_inclusive: Treat |z| == 2 as escaped (``abs(z) < 2`` loops)
+            instead of requiring |z| > 2
+
+    Returns:
+        Tuple of (iterations, modulus) with the shape of ``c``
+        - iterations: Iterations before escape, ``max_iterations`` inside the set
+        - modulus: |z| at escape, 0 inside the set
+    """
+    c = np.asarray(c, dtype=np.complex128)
+    iterations = np.full(c.size, max_iterations, dtype=np.int32)
+    modulus = np.zeros(c.size)
+
+    active = np.arange(c.size)
+    points = c.ravel().copy()
+    z = np.zeros_like(points)
+
+    for n in range(max_iterations):
+        modulus_sq = z.real * z.real + z.imag * z.imag
+        escaped = modulus_sq >= 4.0 if bailout_inclusive else modulus_sq > 4.0
+        if escaped.any():
+            iterations[active[escaped]] = n
+            modulus[active[escaped]] = np.sqrt(modulus_sq[escaped])
+            remaining = ~escaped
+            active, points, z = active[remaining], points[remaining], z[remaining]
+            if not active.size:
+                break
+        np.multiply(z, z, out=z)
+        z += points
+
+    return iterations.reshape(c.shape), modulus.reshape(c.shape)
+
+
+def _escape_tile(args: Tuple[np.ndarray, np.ndarray, int, bool]) -> np.ndarray:
+    """Escape times for one row tile (process pool entry point)."""
+    xs, ys, max_iterations, bailout_inclusive = args
+    grid = xs[np.newaxis, :] + 1j * ys[:, np.newaxis]
+    return escape_time(grid, max_iterations, bailout_inclusive)[0]
+
+
+# The tile pool is shared by every render and sized once; each render limits
+# how many of its tiles are in flight instead of resizing the pool
+TILE_POOL_WORKERS = int(os.getenv("MANDELBROT_TILE_WORKERS", "0")) or (os.cpu_count() or 1)
+
+_tile_pool: Optional[ProcessPoolExecutor] = None
+_tile_pool_lock = threading.Lock()
+
+
+def _get_tile_pool() -> ProcessPoolExecutor:
+    """Shared tile pool, started on first use."""
+    global _tile_pool
+    with _tile_pool_lock:
+        if _tile_pool is None:
+            # spawn: the renderer runs inside threaded servers where fork is unsafe
+            _tile_pool = ProcessPoolExecutor(
+                max_workers=TILE_POOL_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"🌀 Started Mandelbrot tile pool with {TILE_POOL_WORKERS} workers")
+        return _tile_pool
+
+
+def _submit_tile(tile: Tuple[np.ndarray, np.ndarray, int, bool]) -> Future:
+    """Submit a tile to the shared pool, replacing the pool once if a worker died."""
+    global _tile_pool
+    pool = _get_tile_pool()
+    try:
+        return pool.submit(_escape_tile, tile)
+    except BrokenProcessPool:
+        with _tile_pool_lock:
+            if _tile_pool is pool:
+                _tile_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+        logger.warning("⚠️ Mandelbrot tile pool broken, restarting it")
+        return _get_tile_pool().submit(_escape_tile, tile)
+
+
+def shutdown_tile_pool() -> None:
+    """Stop the shared tile pool, if one was started."""
+    global _tile_pool
+    with _tile_pool_lock:
+        pool, _tile_pool = _tile_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+atexit.register(shutdown_tile_pool)
+
+
+def escape_time_grid(
+    xs: np.ndarray,
+    ys: np.ndarray,
+    max_iterations: int,
+    bailout_inclusive: bool = False,
+    workers: int = 1,
+    tiles_per_worker: int = 4,
+) -> np.ndarray:
+    """
+    Escape times over the grid spanned by ``ys`` (rows) and ``xs`` (columns).
+
+    Args:
+        xs: Real coordinate of every column
+        ys: Imaginary coordinate of every row
+        max_iterations: Maximum iterations per point
+        bailout_inclusive: See :func:`escape_time`
+        workers: Tiles in flight on the shared process pool (1 renders in-process)
+        tiles_per_worker: Tiles per worker, so slow tiles near the set balance out
+
+    Returns:
+        Integer array of shape ``(len(ys), len(xs))``
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    if workers <= 1 or len(ys) < 2:
+        return _escape_tile((xs, ys, max_iterations, bailout_inclusive))
+
+    tile_rows = max(1, math.ceil(len(ys) / (workers * tiles_per_worker)))
+    tiles = [(xs, ys[i:i + tile_rows], max_iterations, bailout_inclusive) for i in range(0, len(ys), tile_rows)]
+
+    in_flight = threading.BoundedSemaphore(workers)
+
+    def submit(tile: Tuple[np.ndarray, np.ndarray, int, bool]) -> Future:
+        in_flight.acquire()
+        try:
+            future = _submit_tile(tile)
+        except BaseException:
+            in_flight.release()
+            raise
+        future.add_done_callback(lambda _: in_flight.release())
+        return future
+
+    return np.vstack([future.result() for future in [submit(tile) for tile in tiles]])
+
+
 class MandelbrotUCFGenerator:
     """
     Generate UCF states from Mandelbrot set coordinates.
@@ -74,6 +236,22 @@ class MandelbrotUCFGenerator:
         # Point is in the set
         return self.max_iterations, 1.0
 
+    def calculate_mandelbrot_many(self, points: Iterable[complex]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorised :meth:`calculate_mandelbrot` for many coordinates.
+
+        Args:
+            points: Complex coordinates (list or array of any shape)
+
+        Returns:
+            Tuple of (iterations, smooth_values) arrays shaped like ``points``
+        """
+        iterations, modulus = escape_time(np.asarray(points, dtype=np.complex128), self.max_iterations)
+        escaped = iterations < self.max_iterations
+        smooth = np.ones(iterations.shape)
+        smooth[escaped] = (iterations[escaped] - np.log2(np.log2(modulus[escaped]))) / self.max_iterations
+        return iterations, smooth
+
     def complex_to_ucf(self, c: complex, context: str = "generic") -> Dict[str, float]:
         """
         Convert complex Mandelbrot coordinate to UCF state.
@@ -86,7 +264,33 @@ class MandelbrotUCFGenerator:
             Dictionary with UCF fields: harmony, resilience, prana, drishti, klesha, zoom
         """
         iterations, smooth_value = self.calculate_mandelbrot(c)
+        fields = self._ucf_fields(complex(c), iterations, smooth_value, context)
+        ucf_state = {name: float(value) for name, value in fields.items()}
+
+        logger.debug(f"Generated UCF from {c}: {ucf_state}")
+        return ucf_state
+
+    def complex_to_ucf_many(self, points: Iterable[complex], context: str = "generic") -> List[Dict[str, float]]:
+        """
+        Convert many complex coordinates to UCF states in one vectorised pass.
 
+        Args:
+            points: Complex coordinates
+            context: Context for interpretation (generic, ritual, meditation, crisis)
+
+        Returns:
+            List of UCF state dictionaries, in the order of ``points``
+        """
+        c = np.asarray(points, dtype=np.complex128).ravel()
+        iterations, smooth = self.calculate_mandelbrot_many(c)
+        fields = self._ucf_fields(c, iterations, smooth, context)
+        columns = {name: values.tolist() for name, values in fields.items()}
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+    def _ucf_fields(
+        self, c: np.ndarray, iterations: np.ndarray, smooth_value: np.ndarray, context: str
+    ) -> Dict[str, np.ndarray]:
+        """UCF field formulas, applied elementwise to scalars or arrays."""
         # Base metrics from Mandelbrot properties
         stability = smooth_value  # How stable the point is
         real_component = (c.real + 2.0) / 3.0  # Normalize -2 to 1 → 0 to 1
@@ -95,47 +299,44 @@ class MandelbrotUCFGenerator:
         # Calculate distance from Eye of Consciousness
         eye = self.sacred_points["eye_of_consciousness"]
         eye_distance = abs(c - eye)
-        eye_proximity = max(0, 1 - (eye_distance / 2.0))  # Closer = higher
+        eye_proximity = np.maximum(0, 1 - (eye_distance / 2.0))  # Closer = higher
 
         # UCF field calculations with context modifiers
         if context == "ritual":
             # Ritual context emphasizes harmony and drishti
-            harmony = min(1.0, stability * 0.7 + eye_proximity * 0.3)
-            drishti = min(1.0, imag_component * 0.6 + stability * 0.4)
-            prana = min(1.0, 0.8 + (1 - stability) * 0.2)
+            harmony = np.minimum(1.0, stability * 0.7 + eye_proximity * 0.3)
+            drishti = np.minimum(1.0, imag_component * 0.6 + stability * 0.4)
+            prana = np.minimum(1.0, 0.8 + (1 - stability) * 0.2)
         elif context == "meditation":
             # Meditation emphasizes clarity and low klesha
-            harmony = min(1.0, stability * 0.8 + real_component * 0.2)
-            drishti = min(1.0, stability * 0.9)
-            prana = min(1.0, 0.6 + imag_component * 0.4)
+            harmony = np.minimum(1.0, stability * 0.8 + real_component * 0.2)
+            drishti = np.minimum(1.0, stability * 0.9)
+            prana = np.minimum(1.0, 0.6 + imag_component * 0.4)
         elif context == "crisis":
             # Crisis emphasizes resilience and stability
-            harmony = min(1.0, eye_proximity * 0.5 + stability * 0.3)
-            drishti = min(1.0, stability * 0.6)
-            prana = min(1.0, 0.9 - (eye_distance * 0.2))
+            harmony = np.minimum(1.0, eye_proximity * 0.5 + stability * 0.3)
+            drishti = np.minimum(1.0, stability * 0.6)
+            prana = np.minimum(1.0, 0.9 - (eye_distance * 0.2))
         else:  # generic
-            harmony = min(1.0, stability * 0.6 + eye_proximity * 0.25 + real_component * 0.15)
-            drishti = min(1.0, imag_component * 0.4 + stability * 0.6)
-            prana = min(1.0, 0.7 + (1 - abs(c)) * 0.3)
+            harmony = np.minimum(1.0, stability * 0.6 + eye_proximity * 0.25 + real_component * 0.15)
+            drishti = np.minimum(1.0, imag_component * 0.4 + stability * 0.6)
+            prana = np.minimum(1.0, 0.7 + (1 - abs(c)) * 0.3)
 
         # Common calculations across contexts
-        resilience = min(1.0, stability * 0.7 + (iterations / self.max_iterations) * 0.3)
-        klesha = max(0.0, 1 - stability * 0.8)  # Inverse of stability
-        zoom = min(1.0, (iterations / self.max_iterations) * 0.6 + abs(c) * 0.4)
+        resilience = np.minimum(1.0, stability * 0.7 + (iterations / self.max_iterations) * 0.3)
+        klesha = np.maximum(0.0, 1 - stability * 0.8)  # Inverse of stability
+        zoom = np.minimum(1.0, (iterations / self.max_iterations) * 0.6 + abs(c) * 0.4)
 
         # Ensure all values are in valid range [0, 1]
-        ucf_state = {
-            "harmony": float(np.clip(harmony, 0, 1)),
-            "resilience": float(np.clip(resilience, 0, 1)),
-            "prana": float(np.clip(prana, 0, 1)),
-            "drishti": float(np.clip(drishti, 0, 1)),
-            "klesha": float(np.clip(klesha, 0, 1)),
-            "zoom": float(np.clip(zoom, 0, 1)),
+        return {
+            "harmony": np.clip(harmony, 0, 1),
+            "resilience": np.clip(resilience, 0, 1),
+            "prana": np.clip(prana, 0, 1),
+            "drishti": np.clip(drishti, 0, 1),
+            "klesha": np.clip(klesha, 0, 1),
+            "zoom": np.clip(zoom, 0, 1),
         }
 
-        logger.debug(f"Generated UCF from {c}: {ucf_state}")
-        return ucf_state
-
     def generate_from_sacred_point(self, point_name: str, context: str = "generic") -> Dict[str, float]:
         """
         Generate UCF state from predefined sacred Mandelbrot coordinate.
@@ -179,19 +380,13 @@ class MandelbrotUCFGenerator:
         Returns:
             Dictionary mapping sample names to UCF states
         """
-        results = {}
-
-        # Add center point
-        results["center"] = self.complex_to_ucf(center, context)
+        # Center point followed by the sample points around the circle
+        angles = (2 * np.pi * np.arange(samples)) / samples
+        points = np.concatenate(([center], center + radius * np.exp(1j * angles)))
+        states = self.complex_to_ucf_many(points, context)
 
-        # Sample points around circle
-        for i in range(samples):
-            angle = (2 * np.pi * i) / samples
-            offset = radius * np.exp(1j * angle)
-            sample_point = center + offset
-
-            sample_name = f"sample_{i}_{int(np.degrees(angle))}"
-            results[sample_name] = self.complex_to_ucf(sample_point, context)
+        names = ["center"] + [f"sample_{i}_{int(np.degrees(angle))}" for i, angle in enumerate(angles)]
+        results = dict(zip(names, states))
 
         logger.info(f"🌀 Explored region around {center} with {samples} samples (radius={radius})")
         return results
@@ -209,25 +404,18 @@ class MandelbrotUCFGenerator:
             List of UCF states along the journey
         """
         phi = 1.618033988749895  # Golden ratio
-        journey = []
-
-        for step in range(steps):
-            # Phi spiral: radius grows by phi, angle by golden angle
-            golden_angle = 2 * np.pi / (phi**2)
-            radius = 0.01 * (phi ** (step / 30))  # Exponential growth
-            angle = step * golden_angle
 
-            # Calculate point in spiral
-            offset = radius * np.exp(1j * angle)
-            point = start + offset
+        # Phi spiral: radius grows by phi, angle by golden angle
+        step_numbers = np.arange(steps)
+        golden_angle = 2 * np.pi / (phi**2)
+        radius = 0.01 * (phi ** (step_numbers / 30))  # Exponential growth
+        points = start + radius * np.exp(1j * step_numbers * golden_angle)
 
-            # Generate UCF state
-            ucf = self.complex_to_ucf(point, context)
+        journey = self.complex_to_ucf_many(points, context)
+        for step, (ucf, point) in enumerate(zip(journey, points.tolist())):
             ucf["step"] = step
             ucf["coordinate"] = {"real": point.real, "imag": point.imag}
 
-            journey.append(ucf)
-
         logger.info(f"🌀 Generated {steps}-step phi spiral journey from {start}")
         return journey
 
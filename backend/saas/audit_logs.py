@@ -5,25 +5,45 @@ Enterprise-grade audit logging for compliance (SOC2, GDPR, HIPAA)
 Features:
 - Automatic action tracking with decorators
 - IP address, user agent, and geolocation capture
-- Retention policies and archiving
-- Advanced filtering and search
-- Export for compliance reports
+- Non-blocking ingestion: entries are queued on the request path, then
+  geo-enriched and written in batches by a background worker
+- Retention policies and archiving (monthly partitions, see audit_store)
+- Indexed filtering, full-text search and keyset pagination
+- Streaming export for compliance reports
 - Real-time alerts for suspicious activity
 """
 
 import asyncio
+import csv
 import hashlib
+import io
 import ipaddress
 import json
+import logging
+import os
+import time
+import uuid
 from datetime import datetime, timedelta
 from enum import Enum
 from functools import wraps
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 import httpx
 from fastapi import HTTPException, Request
 from pydantic import BaseModel, Field
 
+from ..core.cache_manager import ResponseCache
+from .audit_store import FILTER_COLUMNS, SQLiteAuditStore, iter_pages
+
+try:
+    import geoip2.database
+    import geoip2.errors
+    GEOIP2_AVAILABLE = True
+except ImportError:
+    GEOIP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
 
 class AuditAction(str, Enum):
     """Standard audit action types"""
@@ -96,7 +116,7 @@ class AuditSeverity(str, Enum):
 
 class AuditLog(BaseModel):
     """Audit log entry model"""
-    id: str = Field(default_factory=lambda: f"audit_{datetime.utcnow().timestamp()}_{hash(datetime.utcnow())}")
+    id: str = Field(default_factory=lambda: f"audit_{datetime.utcnow().timestamp()}_{uuid.uuid4().hex[:12]}")
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
     # Who
@@ -160,26 +180,76 @@ class AuditLogQuery(BaseModel):
     ip_address: Optional[str] = None
     success: Optional[bool] = None
 
-    search: Optional[str] = None  # Full-text search
+    search: Optional[str] = None  # Full-text search (every word, prefix match)
     limit: int = Field(default=100, le=1000)
     offset: int = 0
+    cursor: Optional[str] = None  # Keyset pagination; replaces offset
     sort_by: str = "timestamp"
     sort_order: str = "desc"
 
 
+# Sentinel distinguishing "not cached" from a cached failed lookup (None)
+_GEO_MISS = object()
+
+
 class AuditLogService:
     """
-    Audit logging service with in-memory storage
-
-    In production, this should use a database (PostgreSQL with TimescaleDB,
-    Elasticsearch, or dedicated audit log service like AWS CloudTrail)
+    Audit logging service backed by an indexed, append-only store
+
+    log() only builds the entry and queues it. A background worker (started
+    on first use) resolves geolocation through a bounded TTL cache - from a
+    local GeoIP database when GEOIP_DB_PATH is set, ip-api.com otherwise -
+    and writes entries to monthly SQLite partitions (see audit_store) in
+    batches. Call flush() for read-your-writes, stop() on shutdown.
+    Entries stop() can't write in time are spilled to unwritten.jsonl in the
+    store directory and replayed when the service next starts writing.
     """
 
-    def __init__(self):
-        self.logs: List[AuditLog] = []
-        self.geo_cache: Dict[str, Dict[str, Any]] = {}
+    def __init__(
+        self,
+        store: Optional[SQLiteAuditStore] = None,
+        geoip_db_path: Optional[str] = None,
+        geo_cache_size: int = 10_000,
+        geo_ttl: float = 24 * 3600,
+        geo_failure_ttl: float = 300,
+        batch_size: int = 200,
+        batch_interval: float = 0.5,
+        max_queue: int = 10_000,
+    ):
+        self.store = store or SQLiteAuditStore(os.getenv("AUDIT_LOG_DIR", "Helix/state/audit"))
+        self.geo_cache = ResponseCache(max_entries=geo_cache_size, max_bytes=geo_cache_size * 512, default_ttl=geo_ttl)
+        self.geo_failure_ttl = geo_failure_ttl
         self.alert_webhooks: List[str] = []
 
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._worker_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[str, AuditLog] = {}
+        self.spill_path = os.path.join(str(self.store.directory), "unwritten.jsonl")
+        self._geo_client: Optional[httpx.AsyncClient] = None
+
+        self._geoip_reader = None
+        geoip_db_path = geoip_db_path or os.getenv("GEOIP_DB_PATH")
+        if geoip_db_path:
+            if GEOIP2_AVAILABLE and os.path.exists(geoip_db_path):
+                self._geoip_reader = geoip2.database.Reader(geoip_db_path)
+            else:
+                logger.warning(f"⚠️ GeoIP database unavailable ({geoip_db_path}), using ip-api.com")
+
+        self._ingest_stats = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "write_errors": 0,
+            "backpressure_waits": 0,
+            "lag_last_ms": 0.0,
+            "lag_max_ms": 0.0,
+            "lag_total_ms": 0.0,
+        }
+
     async def log(
         self,
         action: AuditAction,
@@ -195,7 +265,13 @@ class AuditLogService:
         success: bool = True,
         error_message: Optional[str] = None,
     ) -> AuditLog:
-        """Create an audit log entry"""
+        """
+        Create an audit log entry
+
+        The entry is queued for enrichment and storage and returned at once;
+        its geo_location is filled in by the ingest worker. Only waits when
+        the queue is full (max_queue), since audit entries are never dropped.
+        """
 
         # Extract request metadata
         ip_address = None
@@ -207,11 +283,6 @@ class AuditLogService:
             user_agent = request.headers.get("user-agent")
             request_id = request.headers.get("x-request-id")
 
-        # Get geolocation for IP
-        geo_location = None
-        if ip_address:
-            geo_location = await self._get_geolocation(ip_address)
-
         # Create audit log
         audit_log = AuditLog(
             user_id=user_id,
@@ -222,7 +293,6 @@ class AuditLogService:
             severity=severity,
             ip_address=ip_address,
             user_agent=user_agent,
-            geo_location=geo_location,
             description=description,
             metadata=metadata or {},
             changes=changes,
@@ -231,11 +301,19 @@ class AuditLogService:
             error_message=error_message,
         )
 
-        # Compute checksum for integrity
+        # Compute checksum for integrity (geo_location is not covered)
         audit_log.checksum = audit_log.compute_checksum()
 
-        # Store log
-        self.logs.append(audit_log)
+        # Queue for enrichment and storage
+        queue = self._ensure_worker()
+        self._pending[audit_log.id] = audit_log
+        self._ingest_stats["enqueued"] += 1
+        item = (audit_log, time.monotonic())
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self._ingest_stats["backpressure_waits"] += 1
+            await queue.put(item)
 
         # Trigger alerts for high severity events
         if severity in [AuditSeverity.HIGH, AuditSeverity.CRITICAL]:
@@ -243,103 +321,258 @@ class AuditLogService:
 
         return audit_log
 
-    async def query(self, query: AuditLogQuery) -> List[AuditLog]:
-        """Query audit logs with filters"""
-        filtered_logs = self.logs
-
-        # Apply filters
-        if query.user_id:
-            filtered_logs = [log for log in filtered_logs if log.user_id == query.user_id]
-
-        if query.user_email:
-            filtered_logs = [log for log in filtered_logs if log.user_email == query.user_email]
+    async def flush(self):
+        """Wait until every queued entry has been enriched and written"""
+        if self._queue is not None and self._worker_loop is asyncio.get_running_loop():
+            await self._queue.join()
 
-        if query.action:
-            filtered_logs = [log for log in filtered_logs if log.action == query.action]
+    async def stop(self, timeout: float = 30.0):
+        """
+        Write everything still queued, then stop the ingest worker
 
-        if query.resource_type:
-            filtered_logs = [log for log in filtered_logs if log.resource_type == query.resource_type]
-
-        if query.resource_id:
-            filtered_logs = [log for log in filtered_logs if log.resource_id == query.resource_id]
-
-        if query.severity:
-            filtered_logs = [log for log in filtered_logs if log.severity == query.severity]
-
-        if query.start_date:
-            filtered_logs = [log for log in filtered_logs if log.timestamp >= query.start_date]
-
-        if query.end_date:
-            filtered_logs = [log for log in filtered_logs if log.timestamp <= query.end_date]
-
-        if query.ip_address:
-            filtered_logs = [log for log in filtered_logs if log.ip_address == query.ip_address]
-
-        if query.success is not None:
-            filtered_logs = [log for log in filtered_logs if log.success == query.success]
+        Batch writes retry until the store accepts them, so with the database
+        down this gives up after `timeout` seconds and spills what is left.
+        """
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"❌ Audit log queue not drained within {timeout:.0f}s")
+        if self._worker and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+        if self._pending:
+            await asyncio.to_thread(self._spill, list(self._pending.values()))
+            self._pending.clear()
+        if self._geo_client:
+            await self._geo_client.aclose()
+            self._geo_client = None
+
+    def _spill(self, entries: List[AuditLog]):
+        """Append unwritten entries to the spill file for the next start"""
+        os.makedirs(os.path.dirname(self.spill_path), exist_ok=True)
+        with open(self.spill_path, "a") as f:
+            f.writelines(entry.json() + "\n" for entry in entries)
+        logger.warning(f"⚠️ Spilled {len(entries)} unwritten audit log entries to {self.spill_path}")
+
+    def _load_spill(self):
+        """Queue entries a previous stop() spilled (writes are idempotent per id)"""
+        try:
+            with open(self.spill_path) as f:
+                lines = f.read().splitlines()
+            os.unlink(self.spill_path)
+        except FileNotFoundError:
+            return
+        for line in lines:
+            if line.strip():
+                entry = AuditLog.parse_raw(line)
+                self._pending.setdefault(entry.id, entry)
+        logger.info(f"♻️ Replaying {len(lines)} spilled audit log entries")
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        """Start the ingest worker on the running loop if it isn't already"""
+        loop = asyncio.get_running_loop()
+        if self._worker_loop is not loop:
+            # First use, or the previous loop is gone: requeue what it never wrote
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._worker_loop = loop
+            self._geo_client = None
+            self._load_spill()
+            for entry in self._pending.values():
+                self._queue.put_nowait((entry, time.monotonic()))
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._ingest_worker(self._queue))
+        return self._queue
+
+    async def _ingest_worker(self, queue: asyncio.Queue):
+        """Drain the queue in batches: enrich, write, record lag"""
+        while True:
+            batch = [await queue.get()]
+            deadline = time.monotonic() + self.batch_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
 
-        # Full-text search
-        if query.search:
-            search_lower = query.search.lower()
-            filtered_logs = [
-                log for log in filtered_logs
-                if search_lower in log.description.lower()
-                or search_lower in str(log.metadata).lower()
-            ]
+            try:
+                await self._write_batch([entry for entry, _ in batch])
+                now = time.monotonic()
+                for entry, enqueued_at in batch:
+                    self._pending.pop(entry.id, None)
+                    self._record_lag((now - enqueued_at) * 1000)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _write_batch(self, entries: List[AuditLog]):
+        try:
+            await self._enrich(entries)
+        except Exception as e:
+            logger.warning(f"⚠️ Audit log geo enrichment failed, writing without it: {e}")
+        delay = 0.5
+        while True:
+            try:
+                await asyncio.to_thread(self.store.append_many, entries)
+                break
+            except Exception as e:
+                # Writes are idempotent, so retry the whole batch rather than lose entries
+                self._ingest_stats["write_errors"] += 1
+                logger.error(f"❌ Audit log batch write failed, retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+        self._ingest_stats["batches"] += 1
+        self._ingest_stats["written"] += len(entries)
+
+    async def _enrich(self, entries: List[AuditLog]):
+        """Fill in geo_location, resolving each distinct uncached IP once"""
+        ips = {entry.ip_address for entry in entries if entry.ip_address}
+        locations = dict(zip(ips, await asyncio.gather(*(self._get_geolocation(ip) for ip in ips))))
+        for entry in entries:
+            if entry.ip_address:
+                entry.geo_location = locations[entry.ip_address]
+
+    def _record_lag(self, lag_ms: float):
+        stats = self._ingest_stats
+        stats["lag_last_ms"] = lag_ms
+        stats["lag_max_ms"] = max(stats["lag_max_ms"], lag_ms)
+        stats["lag_total_ms"] += lag_ms
+
+    def get_ingest_stats(self) -> Dict[str, Any]:
+        """Ingest queue depth, throughput, lag (enqueue to durable write) and geo cache stats"""
+        stats = dict(self._ingest_stats)
+        lag_total = stats.pop("lag_total_ms")
+        stats["lag_avg_ms"] = lag_total / stats["written"] if stats["written"] else 0.0
+        stats["queued"] = len(self._pending)
+        stats["geo_source"] = "geoip2" if self._geoip_reader else "ip-api"
+        stats["geo_cache"] = self.geo_cache.get_stats()
+        return stats
 
-        # Sort
-        reverse = query.sort_order == "desc"
-        filtered_logs = sorted(
-            filtered_logs,
-            key=lambda x: getattr(x, query.sort_by),
-            reverse=reverse
+    async def query(self, query: AuditLogQuery) -> List[AuditLog]:
+        """Query audit logs with filters"""
+        logs, _ = await self.query_page(query)
+        return logs
+
+    async def query_page(self, query: AuditLogQuery) -> Tuple[List[AuditLog], Optional[str]]:
+        """
+        Query one page of audit logs
+
+        Returns:
+            The matching logs and a cursor for the next page (None on the
+            last page, or when sorting by anything other than timestamp)
+
+        Example:
+            logs, cursor = await audit_service.query_page(AuditLogQuery(user_id="u1"))
+            more, cursor = await audit_service.query_page(AuditLogQuery(user_id="u1", cursor=cursor))
+        """
+        docs, next_cursor = await asyncio.to_thread(
+            self.store.query,
+            limit=query.limit,
+            offset=query.offset,
+            cursor=query.cursor,
+            **self._store_filters(query),
         )
-
-        # Paginate
-        start = query.offset
-        end = start + query.limit
-        return filtered_logs[start:end]
+        return [AuditLog.parse_raw(doc) for doc in docs], next_cursor
 
     async def get_by_id(self, log_id: str) -> Optional[AuditLog]:
-        """Get audit log by ID"""
-        for log in self.logs:
-            if log.id == log_id:
-                return log
-        return None
+        """Get audit log by ID (including entries still being ingested)"""
+        pending = self._pending.get(log_id)
+        if pending is not None:
+            return pending
+        doc = await asyncio.to_thread(self.store.get, log_id)
+        return AuditLog.parse_raw(doc) if doc else None
 
     async def export(
         self,
         query: AuditLogQuery,
-        format: str = "json"
-    ) -> str:
-        """Export audit logs for compliance reporting"""
-        logs = await self.query(query)
+        format: str = "json",
+        page_size: int = 500,
+        progress: Optional[Dict[str, int]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream audit logs for compliance reporting
+
+        Every entry matching the query's filters is exported in timestamp
+        order (limit, offset and cursor are ignored), one keyset page at a
+        time, so memory stays bounded by `page_size`. If `progress` is
+        given, progress["records"] counts the entries exported so far.
+
+        Yields:
+            Chunks of the JSON array or CSV document
+        """
+        if format not in ("json", "csv"):
+            raise ValueError(f"Unsupported format: {format}")
 
-        if format == "json":
-            return json.dumps([log.dict() for log in logs], indent=2, default=str)
+        filters = self._store_filters(query)
+        filters["sort_by"] = "timestamp"
+        pages = iter_pages(self.store, page_size=page_size, **filters)
+        fieldnames = list(AuditLog.__fields__.keys())
+        first = True
 
-        elif format == "csv":
-            import csv
-            import io
+        if format == "json":
+            yield "["
+        else:
+            yield self._csv_chunk(fieldnames, [], header=True)
+
+        while True:
+            docs = await asyncio.to_thread(next, pages, None)
+            if docs is None:
+                break
+            logs = [AuditLog.parse_raw(doc) for doc in docs]
+            if progress is not None:
+                progress["records"] = progress.get("records", 0) + len(logs)
+            if format == "json":
+                rendered = ",\n".join(json.dumps(log.dict(), indent=2, default=str) for log in logs)
+                yield ("\n" if first else ",\n") + rendered
+            else:
+                yield self._csv_chunk(fieldnames, logs)
+            first = False
 
-            output = io.StringIO()
-            if logs:
-                writer = csv.DictWriter(output, fieldnames=logs[0].dict().keys())
-                writer.writeheader()
-                for log in logs:
-                    writer.writerow(log.dict())
+        if format == "json":
+            yield "\n]" if not first else "]"
+
+    @staticmethod
+    def _csv_chunk(fieldnames: List[str], logs: List[AuditLog], header: bool = False) -> str:
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=fieldnames)
+        if header:
+            writer.writeheader()
+        for log in logs:
+            writer.writerow(log.dict())
+        return output.getvalue()
+
+    @staticmethod
+    def _store_filters(query: AuditLogQuery) -> Dict[str, Any]:
+        return {
+            "filters": {column: getattr(query, column) for column in FILTER_COLUMNS},
+            "start": query.start_date,
+            "end": query.end_date,
+            "success": query.success,
+            "search": query.search,
+            "sort_by": query.sort_by,
+            "descending": query.sort_order == "desc",
+        }
 
-            return output.getvalue()
+    async def count(self, since: Optional[datetime] = None) -> int:
+        """Number of stored audit logs, optionally only those since a timestamp"""
+        return await asyncio.to_thread(self.store.count, since)
 
-        else:
-            raise ValueError(f"Unsupported format: {format}")
+    async def apply_retention(self, retention_days: int = 2555) -> int:
+        """Drop monthly partitions older than the retention window; returns partitions removed"""
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        return await asyncio.to_thread(self.store.drop_partitions_before, cutoff)
 
     async def _get_geolocation(self, ip_address: str) -> Optional[Dict[str, Any]]:
-        """Get geolocation for IP address (cached)"""
-        # Check cache first
-        if ip_address in self.geo_cache:
-            return self.geo_cache[ip_address]
-
+        """Get geolocation for IP address (bounded TTL cache)"""
         # Skip private IPs
         try:
             ip_obj = ipaddress.ip_address(ip_address)
@@ -348,26 +581,53 @@ class AuditLogService:
         except ValueError:
             return None
 
-        # Fetch from IP geolocation API (using ip-api.com - free tier)
+        # Check cache first
+        cached = self.geo_cache.get_nowait(ip_address, _GEO_MISS)
+        if cached is not _GEO_MISS:
+            return cached
+
+        if self._geoip_reader:
+            geo_data = await asyncio.to_thread(self._lookup_geoip, ip_address)
+        else:
+            geo_data = await self._lookup_ip_api(ip_address)
+
+        # Failed lookups are retried sooner than successful ones are refreshed
+        self.geo_cache.set_nowait(ip_address, geo_data, None if geo_data else self.geo_failure_ttl)
+        return geo_data
+
+    def _lookup_geoip(self, ip_address: str) -> Optional[Dict[str, Any]]:
+        """Resolve from the local GeoIP (MaxMind City) database"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"http://ip-api.com/json/{ip_address}",
-                    timeout=2.0
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    geo_data = {
-                        "country": data.get("country"),
-                        "country_code": data.get("countryCode"),
-                        "region": data.get("regionName"),
-                        "city": data.get("city"),
-                        "lat": data.get("lat"),
-                        "lon": data.get("lon"),
-                        "isp": data.get("isp"),
-                    }
-                    self.geo_cache[ip_address] = geo_data
-                    return geo_data
+            response = self._geoip_reader.city(ip_address)
+        except (geoip2.errors.AddressNotFoundError, ValueError):
+            return None
+        return {
+            "country": response.country.name,
+            "country_code": response.country.iso_code,
+            "region": response.subdivisions.most_specific.name,
+            "city": response.city.name,
+            "lat": response.location.latitude,
+            "lon": response.location.longitude,
+            "isp": None,
+        }
+
+    async def _lookup_ip_api(self, ip_address: str) -> Optional[Dict[str, Any]]:
+        """Resolve from the IP geolocation API (using ip-api.com - free tier)"""
+        if self._geo_client is None:
+            self._geo_client = httpx.AsyncClient(timeout=2.0)
+        try:
+            response = await self._geo_client.get(f"http://ip-api.com/json/{ip_address}")
+            if response.status_code == 200:
+                data = response.json()
+                return {
+                    "country": data.get("country"),
+                    "country_code": data.get("countryCode"),
+                    "region": data.get("regionName"),
+                    "city": data.get("city"),
+                    "lat": data.get("lat"),
+                    "lon": data.get("lon"),
+                    "isp": data.get("isp"),
+                }
         except Exception:
             pass
 
@@ -394,38 +654,11 @@ class AuditLogService:
             except Exception:
                 pass  # Don't fail the main operation if alert fails
 
-    def get_stats(self) -> Dict[str, Any]:
-        """Get audit log statistics"""
-        total_logs = len(self.logs)
-
-        # Count by action
-        action_counts = {}
-        for log in self.logs:
-            action_counts[log.action] = action_counts.get(log.action, 0) + 1
-
-        # Count by severity
-        severity_counts = {}
-        for log in self.logs:
-            severity_counts[log.severity] = severity_counts.get(log.severity, 0) + 1
-
-        # Count failures
-        failed_actions = sum(1 for log in self.logs if not log.success)
-
-        # Most active users
-        user_activity = {}
-        for log in self.logs:
-            if log.user_id:
-                user_activity[log.user_id] = user_activity.get(log.user_id, 0) + 1
-
-        top_users = sorted(user_activity.items(), key=lambda x: x[1], reverse=True)[:10]
-
-        return {
-            "total_logs": total_logs,
-            "action_counts": action_counts,
-            "severity_counts": severity_counts,
-            "failed_actions": failed_actions,
-            "top_users": [{"user_id": uid, "count": count} for uid, count in top_users],
-        }
+    async def get_stats(self) -> Dict[str, Any]:
+        """Get audit log statistics (the per-partition scan runs on a thread)"""
+        stats = await asyncio.to_thread(self.store.stats)
+        stats["ingest"] = self.get_ingest_stats()
+        return stats
 
 
 # Global audit service instance
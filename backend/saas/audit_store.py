@@ -0,0 +1,396 @@
+"""
+🗄️ Audit Log Store
+Indexed, append-only, time-partitioned persistence for audit logs
+
+Layout:
+- One SQLite database per calendar month (audit_YYYYMM.db), so time-range
+  queries only open the months they cover and retention drops whole files
+- Secondary indexes on user_id, action, resource, ip_address and timestamp,
+  each ending in (ts, id) so filtered queries come back already ordered
+- An FTS5 inverted index over description and metadata for search
+- UPDATE/DELETE are rejected by triggers; entries are immutable once written
+- Keyset pagination on (timestamp, id) so deep pages cost the same as the first
+"""
+
+import heapq
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+_PARTITION_PATTERN = re.compile(r"^audit_(\d{6})\.db$")
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Query fields that map straight onto an indexed column
+FILTER_COLUMNS = ("user_id", "user_email", "action", "resource_type", "resource_id", "severity", "ip_address")
+
+# Sortable fields and their columns; anything else is rejected
+SORT_COLUMNS = {
+    "timestamp": "ts",
+    "action": "action",
+    "severity": "severity",
+    "user_id": "user_id",
+    "resource_type": "resource_type",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit_logs (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    ts INTEGER NOT NULL,
+    user_id TEXT,
+    user_email TEXT,
+    action TEXT NOT NULL,
+    resource_type TEXT,
+    resource_id TEXT,
+    severity TEXT,
+    ip_address TEXT,
+    success INTEGER NOT NULL,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_audit_ts ON audit_logs(ts, id);
+CREATE INDEX IF NOT EXISTS idx_audit_user ON audit_logs(user_id, ts, id);
+CREATE INDEX IF NOT EXISTS idx_audit_email ON audit_logs(user_email, ts, id);
+CREATE INDEX IF NOT EXISTS idx_audit_action ON audit_logs(action, ts, id);
+CREATE INDEX IF NOT EXISTS idx_audit_resource ON audit_logs(resource_type, resource_id, ts, id);
+CREATE INDEX IF NOT EXISTS idx_audit_ip ON audit_logs(ip_address, ts, id);
+CREATE VIRTUAL TABLE IF NOT EXISTS audit_search USING fts5(body, content='', tokenize='unicode61');
+CREATE TRIGGER IF NOT EXISTS audit_logs_no_update BEFORE UPDATE ON audit_logs
+BEGIN SELECT RAISE(ABORT, 'audit logs are append-only'); END;
+CREATE TRIGGER IF NOT EXISTS audit_logs_no_delete BEFORE DELETE ON audit_logs
+BEGIN SELECT RAISE(ABORT, 'audit logs are append-only'); END;
+"""
+
+# (ts in microseconds, id, sort value, JSON document)
+Row = Tuple[int, str, Any, str]
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_utc(value: datetime) -> datetime:
+    """Naive UTC datetime; audit timestamps come from utcnow() so naive values are UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def to_micros(value: datetime) -> int:
+    """Timestamp as integer microseconds since the epoch."""
+    return (to_utc(value) - _EPOCH) // timedelta(microseconds=1)
+
+
+def partition_key(value: datetime) -> str:
+    return to_utc(value).strftime("%Y%m")
+
+
+def encode_cursor(ts: int, log_id: str) -> str:
+    return f"{ts}:{log_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    ts, _, log_id = cursor.partition(":")
+    if not log_id:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return int(ts), log_id
+
+
+def search_text(description: str, metadata: Dict[str, Any]) -> str:
+    """Text indexed for full-text search: description plus metadata keys and values."""
+    return f"{description} {json.dumps(metadata, default=str)}"
+
+
+def match_expression(search: str) -> Optional[str]:
+    """FTS5 query requiring every word of `search` as a token prefix."""
+    tokens = _TOKEN_PATTERN.findall(search.lower())
+    if not tokens:
+        return None
+    return " AND ".join(f'"{token}"*' for token in tokens)
+
+
+class SQLiteAuditStore:
+    """
+    Monthly-partitioned SQLite audit log store.
+
+    Thread-safe; the async service calls it from worker threads.
+    """
+
+    def __init__(self, directory: str = "Helix/state/audit"):
+        self.directory = Path(directory)
+        self._lock = threading.RLock()
+        self._connections: Dict[str, sqlite3.Connection] = {}
+
+    # ------------------------------------------------------------------ writes
+
+    def append(self, entry: Any) -> None:
+        """Append one audit log entry."""
+        self.append_many([entry])
+
+    def append_many(self, entries: Sequence[Any]) -> None:
+        """
+        Append entries, one transaction per month they fall in.
+
+        Idempotent: entries whose id is already stored are skipped, so a
+        batch can be retried after a partial failure.
+        """
+        by_partition: Dict[str, List[Any]] = {}
+        for entry in entries:
+            by_partition.setdefault(partition_key(entry.timestamp), []).append(entry)
+
+        with self._lock:
+            for partition, batch in by_partition.items():
+                conn = self._connection(partition, create=True)
+                with conn:
+                    for entry in batch:
+                        cursor = conn.execute(
+                            "INSERT OR IGNORE INTO audit_logs (id, ts, user_id, user_email, action, resource_type, "
+                            "resource_id, severity, ip_address, success, doc) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            (
+                                entry.id,
+                                to_micros(entry.timestamp),
+                                entry.user_id,
+                                entry.user_email,
+                                _value(entry.action),
+                                entry.resource_type,
+                                entry.resource_id,
+                                _value(entry.severity),
+                                entry.ip_address,
+                                int(entry.success),
+                                entry.json(),
+                            ),
+                        )
+                        if cursor.rowcount == 0:
+                            continue  # already written by an earlier, retried batch
+                        conn.execute(
+                            "INSERT INTO audit_search (rowid, body) VALUES (?, ?)",
+                            (cursor.lastrowid, search_text(entry.description, entry.metadata)),
+                        )
+
+    def drop_partitions_before(self, cutoff: datetime) -> int:
+        """Delete whole months that end before `cutoff` (retention); returns files removed."""
+        cutoff_month = partition_key(cutoff)
+        dropped = 0
+        with self._lock:
+            for partition in self.partitions():
+                if partition >= cutoff_month:
+                    continue
+                conn = self._connections.pop(partition, None)
+                if conn:
+                    conn.close()
+                for suffix in ("", "-wal", "-shm"):
+                    path = self.directory / f"audit_{partition}.db{suffix}"
+                    if path.exists():
+                        path.unlink()
+                dropped += 1
+        return dropped
+
+    # ------------------------------------------------------------------- reads
+
+    def partitions(self) -> List[str]:
+        """Existing partitions (YYYYMM), oldest first."""
+        if not self.directory.exists():
+            return []
+        return sorted(
+            match.group(1)
+            for match in (_PARTITION_PATTERN.match(path.name) for path in self.directory.iterdir())
+            if match
+        )
+
+    def get(self, log_id: str) -> Optional[str]:
+        """JSON document for `log_id`, searching the newest months first."""
+        with self._lock:
+            for partition in reversed(self.partitions()):
+                row = self._connection(partition).execute(
+                    "SELECT doc FROM audit_logs WHERE id = ?", (log_id,)
+                ).fetchone()
+                if row:
+                    return row[0]
+        return None
+
+    def query(
+        self,
+        filters: Dict[str, Any],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        success: Optional[bool] = None,
+        search: Optional[str] = None,
+        sort_by: str = "timestamp",
+        descending: bool = True,
+        limit: int = 100,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[str], Optional[str]]:
+        """
+        Matching JSON documents and the cursor for the next page.
+
+        With sort_by="timestamp" months are visited in order and each one
+        stops as soon as the page is full; a cursor (keyset on timestamp, id)
+        replaces offset. Other sort orders merge the per-month results.
+        """
+        column = SORT_COLUMNS.get(sort_by)
+        if column is None:
+            raise ValueError(f"Cannot sort audit logs by '{sort_by}'")
+        if cursor and column != "ts":
+            raise ValueError("Cursor pagination requires sort_by='timestamp'")
+
+        where, params = self._where(filters, start, end, success, search)
+        if cursor:
+            ts, log_id = decode_cursor(cursor)
+            where.append("(ts, id) < (?, ?)" if descending else "(ts, id) > (?, ?)")
+            params.extend((ts, log_id))
+            offset = 0
+
+        direction = "DESC" if descending else "ASC"
+        sql = (
+            f"SELECT ts, id, {column}, doc FROM audit_logs"
+            f"{' WHERE ' + ' AND '.join(where) if where else ''}"
+            f" ORDER BY {column} {direction}, ts {direction}, id {direction} LIMIT ?"
+        )
+        wanted = offset + limit
+        partitions = self._partitions_between(start, end)
+        if descending:
+            partitions.reverse()
+
+        with self._lock:
+            if column == "ts":
+                rows: List[Row] = []
+                for partition in partitions:
+                    rows.extend(self._connection(partition).execute(sql, (*params, wanted - len(rows))))
+                    if len(rows) >= wanted:
+                        break
+            else:
+                per_partition = [
+                    self._connection(partition).execute(sql, (*params, wanted)).fetchall()
+                    for partition in partitions
+                ]
+                rows = list(heapq.merge(*per_partition, key=_sort_key, reverse=descending))[:wanted]
+
+        page = rows[offset:wanted]
+        next_cursor = None
+        if column == "ts" and len(page) == limit:
+            next_cursor = encode_cursor(page[-1][0], page[-1][1])
+        return [row[3] for row in page], next_cursor
+
+    def count(self, since: Optional[datetime] = None) -> int:
+        """Number of stored entries, optionally only those at or after `since`."""
+        where, params = ("WHERE ts >= ?", (to_micros(since),)) if since else ("", ())
+        with self._lock:
+            return sum(
+                self._connection(partition).execute(f"SELECT COUNT(*) FROM audit_logs {where}", params).fetchone()[0]
+                for partition in self._partitions_between(since, None)
+            )
+
+    def stats(self, top_users: int = 10) -> Dict[str, Any]:
+        """Totals by action and severity, failures and most active users, via SQL aggregates."""
+        totals = 0
+        failed = 0
+        actions: Dict[str, int] = {}
+        severities: Dict[str, int] = {}
+        users: Dict[str, int] = {}
+        with self._lock:
+            for partition in self.partitions():
+                conn = self._connection(partition)
+                count, failures = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(success = 0), 0) FROM audit_logs"
+                ).fetchone()
+                totals += count
+                failed += failures
+                for target, column in ((actions, "action"), (severities, "severity"), (users, "user_id")):
+                    for key, value in conn.execute(
+                        f"SELECT {column}, COUNT(*) FROM audit_logs WHERE {column} IS NOT NULL GROUP BY {column}"
+                    ):
+                        target[key] = target.get(key, 0) + value
+
+        return {
+            "total_logs": totals,
+            "action_counts": actions,
+            "severity_counts": severities,
+            "failed_actions": failed,
+            "top_users": [
+                {"user_id": uid, "count": count}
+                for uid, count in heapq.nlargest(top_users, users.items(), key=lambda item: item[1])
+            ],
+            "partitions": len(self.partitions()),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+
+    # ---------------------------------------------------------------- internals
+
+    def _connection(self, partition: str, create: bool = False) -> sqlite3.Connection:
+        conn = self._connections.get(partition)
+        if conn is None:
+            path = self.directory / f"audit_{partition}.db"
+            if create:
+                self.directory.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._connections[partition] = conn
+        return conn
+
+    def _partitions_between(self, start: Optional[datetime], end: Optional[datetime]) -> List[str]:
+        low = partition_key(start) if start else "000000"
+        high = partition_key(end) if end else "999999"
+        return [partition for partition in self.partitions() if low <= partition <= high]
+
+    @staticmethod
+    def _where(
+        filters: Dict[str, Any],
+        start: Optional[datetime],
+        end: Optional[datetime],
+        success: Optional[bool],
+        search: Optional[str],
+    ) -> Tuple[List[str], List[Any]]:
+        where: List[str] = []
+        params: List[Any] = []
+        for column in FILTER_COLUMNS:
+            value = filters.get(column)
+            if value:
+                where.append(f"{column} = ?")
+                params.append(_value(value))
+        if start:
+            where.append("ts >= ?")
+            params.append(to_micros(start))
+        if end:
+            where.append("ts <= ?")
+            params.append(to_micros(end))
+        if success is not None:
+            where.append("success = ?")
+            params.append(int(success))
+        if search:
+            expression = match_expression(search)
+            if expression:
+                where.append("seq IN (SELECT rowid FROM audit_search WHERE audit_search MATCH ?)")
+                params.append(expression)
+        return where, params
+
+
+def _value(value: Any) -> Any:
+    """Enum members are stored by value."""
+    return getattr(value, "value", value)
+
+
+def _sort_key(row: Row) -> Tuple[bool, Any, int, str]:
+    """Python ordering matching SQLite's (NULLs sort first ascending)."""
+    ts, log_id, value, _ = row
+    return (value is not None, value if value is not None else "", ts, log_id)
+
+
+def iter_pages(store: SQLiteAuditStore, page_size: int = 500, **query: Any) -> Iterable[List[str]]:
+    """Walk every matching document page by page with keyset pagination."""
+    cursor = None
+    while True:
+        docs, cursor = store.query(limit=page_size, cursor=cursor, **query)
+        if docs:
+            yield docs
+        if cursor is None:
+            return
@@ -131,6 +131,23 @@ async def get_webhook_deliveries(
     return await webhook_service.get_deliveries(webhook_id, status, limit)
 
 
+@router.get("/webhooks/{webhook_id}/stats")
+async def get_webhook_stats(webhook_id: str):
+    """Delivery success rate and latency for a webhook's endpoint"""
+    webhook = await webhook_service.get_subscription(webhook_id)
+    if not webhook:
+        raise HTTPException(status_code=404, detail="Webhook not found")
+
+    return {
+        "webhook_id": webhook_id,
+        "url": str(webhook.url),
+        "total_deliveries": webhook.total_deliveries,
+        "successful_deliveries": webhook.successful_deliveries,
+        "failed_deliveries": webhook.failed_deliveries,
+        "endpoint": webhook_service.get_endpoint_stats(str(webhook.url)),
+    }
+
+
 @router.post("/webhooks/deliveries/{delivery_id}/retry")
 async def retry_webhook_delivery(delivery_id: str):
     """Manually retry a failed webhook delivery"""
@@ -231,6 +248,20 @@ async def evaluate_feature_flag(
     }
 
 
+@router.post("/feature-flags/bulk-evaluate")
+async def bulk_evaluate_feature_flags(
+    user_ctx: Dict[str, Any],
+    keys: Optional[List[str]] = Query(None),
+):
+    """
+    Evaluate every flag (or the given keys) for one user in a single call
+
+    Body: {"user_id": ..., "user_email": ..., "team_id": ..., "plan": ..., "context": {...}}
+    Returns: {flag_key: {"enabled": true/false, "variant": "control" | null}}
+    """
+    return await flag_service.bulk_evaluate(user_ctx, keys)
+
+
 @router.patch("/feature-flags/{key}", response_model=FeatureFlag)
 async def update_feature_flag(
     key: str,
@@ -599,11 +630,8 @@ async def detailed_health_check():
         "features": {
             "audit_logs": {
                 "status": "operational",
-                "total_logs": len(audit_service.logs),
-                "logs_last_24h": len([
-                    log for log in audit_service.logs
-                    if log.timestamp > datetime.utcnow() - timedelta(days=1)
-                ]),
+                "total_logs": await audit_service.count(),
+                "logs_last_24h": await audit_service.count(since=datetime.utcnow() - timedelta(days=1)),
             },
             "webhooks": {
                 "status": "operational",
@@ -614,6 +642,7 @@ async def detailed_health_check():
                 ]),
                 "total_deliveries": len(webhook_service.deliveries),
                 "queue_size": webhook_service.delivery_queue.qsize(),
+                "delivery_engine": webhook_service.get_stats(),
             },
             "feature_flags": {
                 "status": "operational",
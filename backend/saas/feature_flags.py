@@ -8,17 +8,25 @@ Features:
 - User targeting (by ID, email, team, plan)
 - Kill switches for instant disable
 - Analytics integration for experiment results
+- Flags compiled into an immutable snapshot for fast evaluation, with
+  bulk evaluation of every flag for a user in one call
 """
 
-import hashlib
+import bisect
 import random
+import re
+import zlib
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional, Set
+from types import MappingProxyType
+from typing import (Any, Callable, Dict, FrozenSet, List, Mapping, Optional,
+                    Tuple)
 from uuid import uuid4
 
 from pydantic import BaseModel, Field
 
+from .sketches import HyperLogLog, hash32
+
 
 class FlagStatus(str, Enum):
     """Feature flag status"""
@@ -68,9 +76,9 @@ class FeatureFlag(BaseModel):
     jira_ticket: Optional[str] = None
     kill_switch: bool = False  # Emergency disable
 
-    # Stats
+    # Stats (refreshed from the service's counters when the flag is read)
     evaluation_count: int = 0
-    unique_users: Set[str] = Field(default_factory=set)
+    unique_users: int = 0  # Approximate (HyperLogLog)
 
 
 class ExperimentResult(BaseModel):
@@ -83,6 +91,140 @@ class ExperimentResult(BaseModel):
     confidence: Optional[float] = None
 
 
+# Targeting rule type -> evaluation context field
+_RULE_FIELDS = {"user_id": "user_id", "email": "user_email", "team_id": "team_id", "plan": "plan"}
+
+
+def _compile_operator(operator: str, values: List[str]) -> Optional[Callable[[str], bool]]:
+    """Predicate for a rule operator, with membership sets frozen once"""
+    if operator in ("equals", "in"):
+        return frozenset(values).__contains__
+    if operator in ("not_equals", "not_in"):
+        excluded: FrozenSet[str] = frozenset(values)
+        return lambda value: value not in excluded
+    if operator == "contains":
+        if len(values) == 1:
+            needle = values[0]
+            return lambda value: needle in value
+        return re.compile("|".join(map(re.escape, values))).search if values else None
+    return None  # Unknown operators never match
+
+
+class FlagStats:
+    """Evaluation count and approximate unique users for one flag"""
+
+    __slots__ = ("evaluations", "users")
+
+    def __init__(self):
+        self.evaluations = 0
+        self.users = HyperLogLog()
+
+    def record(self, position: Optional[Tuple[int, int]]):
+        """Count an evaluation; `position` is the user's HyperLogLog.position, if any"""
+        self.evaluations += 1
+        if position:
+            index, rank = position
+            registers = self.users.registers
+            if rank > registers[index]:
+                registers[index] = rank
+
+
+class CompiledFlag:
+    """
+    Immutable, evaluation-ready form of a FeatureFlag
+
+    Rules become (field, predicate) pairs over frozensets, variant weights a
+    cumulative table for bisect, and the flag key a CRC seed so bucketing a
+    user hashes only the user id.
+    """
+
+    __slots__ = (
+        "key", "active", "rules", "context_rules", "percentage", "default_value", "is_experiment",
+        "default_variant", "variant_bounds", "variant_names", "total_weight", "seed", "stats",
+    )
+
+    def __init__(self, flag: FeatureFlag, stats: FlagStats):
+        self.key = flag.key
+        self.active = flag.enabled and not flag.kill_switch
+        rules: List[Tuple[str, Callable[[str], Any]]] = []
+        context_rules: List[Tuple[str, Callable[[str], Any]]] = []
+        for rule in flag.targeting_rules:
+            if rule.type == "custom":
+                if not rule.values:
+                    continue
+                target, field, values = context_rules, rule.values[0], rule.values[1:]
+            elif rule.type in _RULE_FIELDS:
+                target, field, values = rules, _RULE_FIELDS[rule.type], rule.values
+            else:
+                continue
+            predicate = _compile_operator(rule.operator, values)
+            if predicate is not None:
+                target.append((field, predicate))
+        self.rules = tuple(rules)
+        self.context_rules = tuple(context_rules)
+        self.percentage = flag.percentage
+        self.default_value = flag.default_value
+        self.is_experiment = flag.is_experiment
+        self.default_variant = flag.default_variant
+
+        cumulative = 0
+        bounds, names = [], []
+        for variant, weight in flag.variant_weights.items():
+            cumulative += weight
+            bounds.append(cumulative)
+            names.append(variant)
+        self.variant_bounds = tuple(bounds)
+        self.variant_names = tuple(names)
+        self.total_weight = cumulative
+        self.seed = zlib.crc32(f"{flag.key}:".encode())
+        self.stats = stats
+
+    def is_enabled(self, ctx: Dict[str, Any], user_bytes: Optional[bytes]) -> Any:
+        """Targeting rules, then percentage rollout, then the default value"""
+        if not self.active:
+            return False
+
+        for field, predicate in self.rules:
+            value = ctx.get(field)
+            if value and predicate(value):
+                return True
+
+        if self.context_rules:
+            context = ctx.get("context")
+            if context:
+                for field, predicate in self.context_rules:
+                    value = context.get(field)
+                    if value and predicate(str(value)):
+                        return True
+
+        if self.percentage > 0 and user_bytes is not None:
+            if hash32(user_bytes, self.seed) % 100 < self.percentage:
+                return True
+
+        return self.default_value
+
+    def variant(self, user_bytes: Optional[bytes]) -> str:
+        """Weighted variant; stable per user, random without one"""
+        if self.total_weight <= 0:
+            return self.default_variant
+        if user_bytes is None:
+            bucket = random.randrange(self.total_weight)
+        else:
+            bucket = hash32(user_bytes, self.seed) % self.total_weight
+        index = bisect.bisect_right(self.variant_bounds, bucket)
+        return self.variant_names[index] if index < len(self.variant_names) else self.default_variant
+
+
+class FlagSnapshot:
+    """Immutable set of compiled flags; replaced wholesale whenever a flag changes"""
+
+    __slots__ = ("version", "flags")
+
+    def __init__(self, version: int, flags: Mapping[str, CompiledFlag]):
+        self.version = version
+        self.flags = MappingProxyType(dict(flags))
+
+
 class FeatureFlagService:
     """
     Feature flag and A/B testing service
@@ -102,6 +244,26 @@ class FeatureFlagService:
         self.flags: Dict[str, FeatureFlag] = {}
         self.user_assignments: Dict[str, Dict[str, str]] = {}  # user_id -> {flag_key: variant}
         self.metrics: Dict[str, List[ExperimentResult]] = {}
+        self._stats: Dict[str, FlagStats] = {}
+        self.snapshot = FlagSnapshot(0, {})
+
+    def _recompile(self):
+        """Publish a new snapshot after any flag change (readers never see a partial update)"""
+        for key in list(self._stats):
+            if key not in self.flags:
+                del self._stats[key]
+        compiled = {
+            key: CompiledFlag(flag, self._stats.setdefault(key, FlagStats()))
+            for key, flag in self.flags.items()
+        }
+        self.snapshot = FlagSnapshot(self.snapshot.version + 1, compiled)
+
+    def _with_stats(self, flag: FeatureFlag) -> FeatureFlag:
+        stats = self._stats.get(flag.key)
+        if stats:
+            flag.evaluation_count = stats.evaluations
+            flag.unique_users = stats.users.count()
+        return flag
 
     # ========================================================================
     # FLAG MANAGEMENT
@@ -110,11 +272,13 @@ class FeatureFlagService:
     async def create_flag(self, flag: FeatureFlag) -> FeatureFlag:
         """Create a new feature flag"""
         self.flags[flag.key] = flag
+        self._recompile()
         return flag
 
     async def get_flag(self, key: str) -> Optional[FeatureFlag]:
         """Get a feature flag"""
-        return self.flags.get(key)
+        flag = self.flags.get(key)
+        return self._with_stats(flag) if flag else None
 
     async def list_flags(
         self,
@@ -130,7 +294,7 @@ class FeatureFlagService:
         if tags:
             flags = [f for f in flags if any(tag in f.tags for tag in tags)]
 
-        return flags
+        return [self._with_stats(f) for f in flags]
 
     async def update_flag(self, key: str, updates: Dict[str, Any]) -> FeatureFlag:
         """Update a feature flag"""
@@ -138,17 +302,21 @@ class FeatureFlagService:
         if not flag:
             raise ValueError(f"Flag {key} not found")
 
-        for k, v in updates.items():
-            if hasattr(flag, k):
-                setattr(flag, k, v)
+        # Re-validate so nested fields (targeting rules) are models before compiling
+        fields = flag.dict()
+        fields.update({k: v for k, v in updates.items() if k in FeatureFlag.__fields__})
+        fields["updated_at"] = datetime.utcnow()
+        flag = FeatureFlag(**fields)
 
-        flag.updated_at = datetime.utcnow()
+        self.flags[key] = flag
+        self._recompile()
         return flag
 
     async def delete_flag(self, key: str):
         """Delete a feature flag"""
         if key in self.flags:
             del self.flags[key]
+            self._recompile()
 
     # ========================================================================
     # FEATURE EVALUATION
@@ -168,38 +336,54 @@ class FeatureFlagService:
 
         Uses targeting rules, percentage rollout, and experiments
         """
-        flag = self.flags.get(key)
+        flag = self.snapshot.flags.get(key)
         if not flag:
             return False  # Flag doesn't exist
 
-        # Update stats
-        flag.evaluation_count += 1
-        if user_id:
-            flag.unique_users.add(user_id)
+        ctx = {"user_id": user_id, "user_email": user_email, "team_id": team_id, "plan": plan, "context": context}
+        user_bytes = user_id.encode() if user_id else None
+        flag.stats.record(user_bytes and HyperLogLog.position(hash32(user_bytes)))
+        return flag.is_enabled(ctx, user_bytes)
 
-        # Kill switch - instant disable
-        if flag.kill_switch:
-            return False
-
-        # Simple enabled check
-        if not flag.enabled:
-            return False
+    async def bulk_evaluate(
+        self,
+        user_ctx: Dict[str, Any],
+        keys: Optional[List[str]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Evaluate many flags for one user against a single snapshot
 
-        # Check targeting rules first (highest priority)
-        for rule in flag.targeting_rules:
-            if self._evaluate_rule(rule, user_id, user_email, team_id, plan, context):
-                return True
+        Args:
+            user_ctx: user_id, user_email, team_id, plan and/or context
+            keys: Flags to evaluate (default: all flags)
 
-        # Percentage rollout
-        if flag.percentage > 0:
-            # Use consistent hashing for stable rollout
-            if user_id:
-                hash_val = int(hashlib.sha256(f"{key}:{user_id}".encode()).hexdigest(), 16)
-                bucket = hash_val % 100
-                if bucket < flag.percentage:
-                    return True
+        Returns:
+            {flag_key: {"enabled": ..., "variant": ...}}; variant is None
+            for non-experiments, and unknown keys evaluate to disabled
 
-        return flag.default_value
+        Example:
+            flags = await flag_service.bulk_evaluate({"user_id": "user_123", "plan": "pro"})
+            if flags["new_dashboard"]["enabled"]:
+                ...
+        """
+        snapshot = self.snapshot
+        user_id = user_ctx.get("user_id")
+        user_bytes = user_id.encode() if user_id else None
+        position = user_bytes and HyperLogLog.position(hash32(user_bytes))
+        assignments = self.user_assignments.get(user_id, {}) if user_id else {}
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for key in (snapshot.flags if keys is None else keys):
+            flag = snapshot.flags.get(key)
+            if flag is None:
+                results[key] = {"enabled": False, "variant": None}
+                continue
+            flag.stats.record(position)
+            variant = None
+            if flag.is_experiment:
+                variant = assignments.get(key) or self._assign(flag, user_id, user_bytes)
+            results[key] = {"enabled": flag.is_enabled(user_ctx, user_bytes), "variant": variant}
+        return results
 
     async def get_variant(
         self,
@@ -212,7 +396,7 @@ class FeatureFlagService:
 
         Variants are consistently assigned (same user always gets same variant)
         """
-        flag = self.flags.get(key)
+        flag = self.snapshot.flags.get(key)
         if not flag or not flag.is_experiment:
             return flag.default_variant if flag else "control"
 
@@ -222,97 +406,15 @@ class FeatureFlagService:
             if existing:
                 return existing
 
-        # Assign variant based on weights
-        variant = self._assign_variant(flag, user_id)
+        return self._assign(flag, user_id, user_id.encode() if user_id else None)
 
-        # Store assignment
+    def _assign(self, flag: CompiledFlag, user_id: Optional[str], user_bytes: Optional[bytes]) -> str:
+        """Assign a variant based on weights and remember it for the user"""
+        variant = flag.variant(user_bytes)
         if user_id:
-            if user_id not in self.user_assignments:
-                self.user_assignments[user_id] = {}
-            self.user_assignments[user_id][key] = variant
-
+            self.user_assignments.setdefault(user_id, {})[flag.key] = variant
         return variant
 
-    def _evaluate_rule(
-        self,
-        rule: TargetingRule,
-        user_id: Optional[str],
-        user_email: Optional[str],
-        team_id: Optional[str],
-        plan: Optional[str],
-        context: Optional[Dict[str, Any]],
-    ) -> bool:
-        """Evaluate a single targeting rule"""
-        if rule.type == "user_id":
-            if not user_id:
-                return False
-            return self._apply_operator(user_id, rule.operator, rule.values)
-
-        elif rule.type == "email":
-            if not user_email:
-                return False
-            return self._apply_operator(user_email, rule.operator, rule.values)
-
-        elif rule.type == "team_id":
-            if not team_id:
-                return False
-            return self._apply_operator(team_id, rule.operator, rule.values)
-
-        elif rule.type == "plan":
-            if not plan:
-                return False
-            return self._apply_operator(plan, rule.operator, rule.values)
-
-        elif rule.type == "custom" and context:
-            # Custom context-based rules
-            context_value = context.get(rule.values[0])
-            if context_value:
-                return self._apply_operator(str(context_value), rule.operator, rule.values[1:])
-
-        return False
-
-    def _apply_operator(self, value: str, operator: str, expected: List[str]) -> bool:
-        """Apply comparison operator"""
-        if operator == "equals":
-            return value in expected
-        elif operator == "not_equals":
-            return value not in expected
-        elif operator == "contains":
-            return any(exp in value for exp in expected)
-        elif operator == "in":
-            return value in expected
-        elif operator == "not_in":
-            return value not in expected
-        return False
-
-    def _assign_variant(self, flag: FeatureFlag, user_id: Optional[str]) -> str:
-        """Assign a variant based on weights"""
-        if not user_id:
-            # Random assignment without user_id
-            total_weight = sum(flag.variant_weights.values())
-            rand_val = random.randint(0, total_weight - 1)
-
-            cumulative = 0
-            for variant, weight in flag.variant_weights.items():
-                cumulative += weight
-                if rand_val < cumulative:
-                    return variant
-
-            return flag.default_variant
-
-        # Consistent hashing for stable assignment
-        hash_val = int(hashlib.sha256(f"{flag.key}:{user_id}".encode()).hexdigest(), 16)
-        total_weight = sum(flag.variant_weights.values())
-        bucket = hash_val % total_weight
-
-        cumulative = 0
-        for variant, weight in flag.variant_weights.items():
-            cumulative += weight
-            if bucket < cumulative:
-                return variant
-
-        return flag.default_variant
-
     # ========================================================================
     # ANALYTICS
     # ========================================================================
@@ -391,6 +493,7 @@ class FeatureFlagService:
             if key in self.flags:
                 self.flags[key].enabled = True
                 self.flags[key].updated_at = datetime.utcnow()
+        self._recompile()
 
     async def bulk_disable(self, keys: List[str]):
         """Disable multiple flags at once"""
@@ -398,6 +501,7 @@ class FeatureFlagService:
             if key in self.flags:
                 self.flags[key].enabled = False
                 self.flags[key].updated_at = datetime.utcnow()
+        self._recompile()
 
     async def kill_switch_activate(self, key: str):
         """Emergency kill switch - instantly disable feature"""
@@ -405,6 +509,7 @@ class FeatureFlagService:
             self.flags[key].kill_switch = True
             self.flags[key].enabled = False
             self.flags[key].updated_at = datetime.utcnow()
+            self._recompile()
 
 
 # Global feature flag service
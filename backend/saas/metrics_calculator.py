@@ -2,18 +2,75 @@
 📊 Metrics Calculation Utilities
 Calculate DAU/MAU, MRR/ARR, Churn Rate, NPS, and other key metrics
 
+Features:
+- Incremental materialization: UsageLog/ErrorLog rows are folded into
+  per-day rollups (counters + HyperLogLog distinct-user sketch) from a
+  cursor that lags behind unsettled rows, so each row is read once
+- DAU from the day's sketch, MAU as the union of the month's daily sketches
+- MRR as a single SUM(CASE tier ...) aggregate per table
+- DailyMetrics rows materialized from the rollups for dashboards
+- Backfill for rebuilding history
+
 VILLAIN METRICS: MEASURING WORLD DOMINATION 😈
 """
 
+import logging
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Set, Tuple
 
-from sqlalchemy import and_, func, or_
+from sqlalchemy import case, func, or_, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from ..database import (DailyMetrics, ErrorLog, HealthCheck, NPSSurvey,
-                        RevenueEvent, SupportTicket, UsageLog, User,
-                        UserActivation)
+from ..database import (AgentRental, DailyMetrics, DailyUsageRollup, ErrorLog,
+                        HealthCheck, MetricsCursor, NPSSurvey, SupportTicket,
+                        Team, UsageLog, User, UserActivation)
+from .sketches import HyperLogLog
+
+logger = logging.getLogger(__name__)
+
+# Monthly price per subscription tier
+TIER_PRICING = {
+    "free": 0,
+    "pro": 29,
+    "workflow": 79,
+    "enterprise": 299
+}
+
+TEAM_TIER_PRICING = {
+    "free": 0,
+    "pro": 49,
+    "workflow": 149,
+    "enterprise": 499
+}
+
+# Source rows folded into the rollups per transaction
+ROLLUP_BATCH_SIZE = 5000
+
+# Ids are folded once they have been allocated for this long. On Postgres a
+# newer id can be read while an older one is still in flight, and the cursor
+# must not pass it (see MetricsCalculator._settled_id).
+ROLLUP_SETTLE_SECONDS = 30
+
+# Monotonic time of this process's last refresh (see refresh_if_stale)
+_last_refresh = 0.0
+
+
+def start_of_day(date: datetime) -> datetime:
+    return date.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class _DayDelta:
+    """Rollup changes for one day accumulated from a batch of source rows"""
+
+    __slots__ = ("users", "api_calls", "error_requests", "logged_errors")
+
+    def __init__(self):
+        self.users = HyperLogLog()
+        self.api_calls = 0
+        self.error_requests = 0
+        self.logged_errors = 0
 
 
 class MetricsCalculator:
@@ -42,81 +99,42 @@ class MetricsCalculator:
         ).scalar() or 0
 
     def calculate_dau(self, date: datetime) -> int:
-        """Calculate Daily Active Users"""
-        start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = start_of_day + timedelta(days=1)
-
-        # Users who made API calls or logged in on this day
-        active_users = self.db.query(func.count(func.distinct(UsageLog.user_id))).filter(
-            UsageLog.timestamp >= start_of_day,
-            UsageLog.timestamp < end_of_day
-        ).scalar() or 0
-
-        return active_users
+        """Calculate Daily Active Users (from the day's rollup sketch)"""
+        sketch = self.db.query(DailyUsageRollup.active_users_sketch).filter(
+            DailyUsageRollup.date == start_of_day(date)
+        ).scalar()
+        return HyperLogLog.from_bytes(sketch).count() if sketch else 0
 
     def calculate_mau(self, date: datetime) -> int:
-        """Calculate Monthly Active Users"""
-        start_of_month = date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        if date.month == 12:
-            end_of_month = start_of_month.replace(year=date.year + 1, month=1)
-        else:
-            end_of_month = start_of_month.replace(month=date.month + 1)
-
-        # Users who made API calls in this month
-        active_users = self.db.query(func.count(func.distinct(UsageLog.user_id))).filter(
-            UsageLog.timestamp >= start_of_month,
-            UsageLog.timestamp < end_of_month
-        ).scalar() or 0
-
-        return active_users
+        """Calculate Monthly Active Users: union of the month's daily sketches up to `date`"""
+        day = start_of_day(date)
+        sketches = self.db.query(DailyUsageRollup.active_users_sketch).filter(
+            DailyUsageRollup.date >= day.replace(day=1),
+            DailyUsageRollup.date <= day
+        ).all()
+        return HyperLogLog.union(HyperLogLog.from_bytes(s) for s, in sketches if s).count()
 
     # ========================================================================
     # REVENUE METRICS
     # ========================================================================
 
     def calculate_mrr(self, date: datetime) -> float:
-        """Calculate Monthly Recurring Revenue"""
-        # Get all active subscriptions as of this date
-        active_subscriptions = self.db.query(User).filter(
-            User.subscription_status == "active",
-            User.created_at <= date,
-            or_(
-                User.subscription_end_date.is_(None),
-                User.subscription_end_date > date
-            )
-        ).all()
-
-        # Calculate MRR based on subscription tier
-        tier_pricing = {
-            "free": 0,
-            "pro": 29,
-            "workflow": 79,
-            "enterprise": 299
-        }
-
-        mrr = sum(tier_pricing.get(user.subscription_tier, 0) for user in active_subscriptions)
+        """Calculate Monthly Recurring Revenue (SUM(CASE tier ...) over active subscriptions)"""
+        mrr = self._subscription_revenue(User, TIER_PRICING, date)
+        mrr += self._subscription_revenue(Team, TEAM_TIER_PRICING, date)
+        return float(mrr)
 
-        # Add team subscriptions
-        from ..database import Team
-        team_subscriptions = self.db.query(Team).filter(
-            Team.subscription_status == "active",
-            Team.created_at <= date,
+    def _subscription_revenue(self, model, pricing: Dict[str, int], date: datetime) -> float:
+        """Monthly revenue of `model` rows with an active subscription on `date`"""
+        price = case(pricing, value=model.subscription_tier, else_=0)
+        return self.db.query(func.coalesce(func.sum(price), 0)).filter(
+            model.subscription_status == "active",
+            model.created_at <= date,
             or_(
-                Team.subscription_end_date.is_(None),
-                Team.subscription_end_date > date
+                model.subscription_end_date.is_(None),
+                model.subscription_end_date > date
             )
-        ).all()
-
-        team_tier_pricing = {
-            "free": 0,
-            "pro": 49,
-            "workflow": 149,
-            "enterprise": 499
-        }
-
-        mrr += sum(team_tier_pricing.get(team.subscription_tier, 0) for team in team_subscriptions)
-
-        return float(mrr)
+        ).scalar() or 0
 
     def calculate_arr(self, mrr: float) -> float:
         """Calculate Annual Recurring Revenue from MRR"""
@@ -297,86 +315,335 @@ class MetricsCalculator:
         ]
 
     # ========================================================================
-    # DAILY METRICS AGGREGATION
+    # INCREMENTAL ROLLUPS
     # ========================================================================
 
-    def calculate_and_store_daily_metrics(self, date: datetime) -> DailyMetrics:
-        """Calculate all metrics for a day and store in DailyMetrics table"""
-        start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = start_of_day + timedelta(days=1)
-
-        # Check if already exists
-        existing = self.db.query(DailyMetrics).filter(
-            DailyMetrics.date == start_of_day
-        ).first()
-
-        # Calculate all metrics
-        signups = self.calculate_signups(start_of_day, end_of_day)
-        dau = self.calculate_dau(date)
-        mau = self.calculate_mau(date)
-        activations = self.calculate_activations(start_of_day, end_of_day)
-
-        mrr = self.calculate_mrr(date)
-        arr = self.calculate_arr(mrr)
-
-        nps_score, nps_responses = self.calculate_nps(start_of_day, end_of_day)
-        error_rate, error_count = self.calculate_error_rate(start_of_day, end_of_day)
-        support_metrics = self.calculate_support_metrics(start_of_day, end_of_day)
-
-        # API calls and agent sessions
-        api_calls = self.db.query(func.count(UsageLog.id)).filter(
-            UsageLog.timestamp >= start_of_day,
-            UsageLog.timestamp < end_of_day
-        ).scalar() or 0
+    def refresh_rollups(
+        self, batch_size: int = ROLLUP_BATCH_SIZE, settle_seconds: float = ROLLUP_SETTLE_SECONDS
+    ) -> Set[datetime]:
+        """
+        Fold UsageLog/ErrorLog rows added since the last run into DailyUsageRollup
 
-        from ..database import AgentRental
-        agent_sessions = self.db.query(func.count(AgentRental.id)).filter(
-            AgentRental.started_at >= start_of_day,
-            AgentRental.started_at < end_of_day
-        ).scalar() or 0
+        Each batch advances its cursor before applying its deltas, in one
+        transaction. The cursor update is conditional on the old position,
+        so a concurrent refresh can't fold the same rows twice, and taking
+        the cursor row first serialises refreshes with backfill().
 
-        if existing:
-            # Update existing
-            existing.new_signups = signups
-            existing.daily_active_users = dau
-            existing.monthly_active_users = mau
-            existing.activations_count = activations
-            existing.mrr = mrr
-            existing.arr = arr
-            existing.api_calls_total = api_calls
-            existing.agent_sessions_total = agent_sessions
-            existing.error_count = error_count
-            existing.error_rate = error_rate
-            existing.new_tickets = support_metrics["new_tickets"]
-            existing.resolved_tickets = support_metrics["resolved_tickets"]
-            existing.avg_resolution_time_hours = support_metrics["avg_resolution_time_hours"]
-            existing.nps_score = nps_score
-            existing.nps_responses = nps_responses
-            existing.calculated_at = datetime.utcnow()
+        Only ids up to the settled mark are folded (see _settled_id), so
+        the cursor never passes a row whose insert hasn't committed yet.
+
+        Returns:
+            The days whose rollups changed
+        """
+        touched: Set[datetime] = set()
+        sources = (
+            ("usage_logs", UsageLog, (UsageLog.user_id, UsageLog.timestamp, UsageLog.status_code)),
+            ("error_logs", ErrorLog, (ErrorLog.occurred_at,)),
+        )
+        for name, model, columns in sources:
+            cursor = self._cursor(name)
+            settled = self._settled_id(name, model, settle_seconds)
+            while cursor < settled:
+                rows = self.db.query(model.id, *columns).filter(
+                    model.id > cursor,
+                    model.id <= settled
+                ).order_by(model.id).limit(batch_size).all()
+                if not rows:
+                    break
+
+                deltas: Dict[datetime, _DayDelta] = {}
+                if model is UsageLog:
+                    self._fold_usage(((u, t, s) for _, u, t, s in rows), deltas)
+                else:
+                    self._fold_errors((t for _, t in rows), deltas)
+
+                advanced = self.db.execute(
+                    update(MetricsCursor)
+                    .where(MetricsCursor.name == name, MetricsCursor.position == cursor)
+                    .values(position=rows[-1][0], updated_at=datetime.utcnow())
+                ).rowcount
+                if not advanced:
+                    self.db.rollback()
+                    logger.warning(f"⚠️ Metrics cursor {name} moved by another refresh, stopping")
+                    break
+                self._apply_deltas(deltas)
+                self.db.commit()
+                cursor = rows[-1][0]
+                touched.update(deltas)
+
+        if touched:
+            logger.info(f"📊 Rolled up usage for {len(touched)} day(s)")
+        return touched
+
+    def _settled_id(self, name: str, model, settle_seconds: float) -> int:
+        """
+        Highest source id that is safe to fold
+
+        Ids are handed out at insert but only become visible at commit, so
+        a lower id can still be in flight while a higher one is readable.
+        Each refresh records the current max id as a mark; once the mark is
+        `settle_seconds` old, every id up to it has committed or rolled back
+        and becomes the fold limit, and a new mark is taken. This depends on
+        insert order only, not on the rows' own (request-time) timestamps,
+        and assumes log writes commit within the window. 0 disables the
+        mark, which is only safe where writes are serialised (SQLite).
+        """
+        latest = self.db.query(func.max(model.id)).scalar() or 0
+        if settle_seconds <= 0:
+            return latest
+
+        mark_name = f"{name}:settled"
+        now = datetime.utcnow()
+        mark = self.db.query(MetricsCursor.position, MetricsCursor.updated_at).filter(
+            MetricsCursor.name == mark_name
+        ).one_or_none()
+        if mark is None:
+            try:
+                self.db.add(MetricsCursor(name=mark_name, position=latest, updated_at=now))
+                self.db.commit()
+            except IntegrityError:
+                self.db.rollback()  # created concurrently
+            return 0
+        if now - mark.updated_at < timedelta(seconds=settle_seconds):
+            return 0
+
+        # Conditional, so concurrent refreshes don't keep pushing the mark forward
+        self.db.execute(
+            update(MetricsCursor)
+            .where(MetricsCursor.name == mark_name, MetricsCursor.position == mark.position)
+            .values(position=latest, updated_at=now)
+        )
+        self.db.commit()
+        return mark.position
+
+    def _cursor(self, name: str) -> int:
+        position = self.db.query(MetricsCursor.position).filter(MetricsCursor.name == name).scalar()
+        if position is not None:
+            return position
+        try:
+            self.db.add(MetricsCursor(name=name, position=0))
             self.db.commit()
-            self.db.refresh(existing)
-            return existing
-        else:
-            # Create new
-            metrics = DailyMetrics(
-                date=start_of_day,
-                new_signups=signups,
-                daily_active_users=dau,
-                monthly_active_users=mau,
-                activations_count=activations,
+        except IntegrityError:
+            self.db.rollback()  # created concurrently
+        return self.db.query(MetricsCursor.position).filter(MetricsCursor.name == name).scalar()
+
+    @staticmethod
+    def _fold_usage(rows: Iterable[Tuple[str, datetime, int]], deltas: Dict[datetime, _DayDelta]):
+        for user_id, timestamp, status_code in rows:
+            if timestamp is None:
+                continue
+            delta = deltas.get(start_of_day(timestamp))
+            if delta is None:
+                delta = deltas[start_of_day(timestamp)] = _DayDelta()
+            delta.users.add(user_id or "anonymous")
+            delta.api_calls += 1
+            if status_code is not None and status_code >= 400:
+                delta.error_requests += 1
+
+    @staticmethod
+    def _fold_errors(timestamps: Iterable[datetime], deltas: Dict[datetime, _DayDelta]):
+        for occurred_at in timestamps:
+            if occurred_at is None:
+                continue
+            delta = deltas.get(start_of_day(occurred_at))
+            if delta is None:
+                delta = deltas[start_of_day(occurred_at)] = _DayDelta()
+            delta.logged_errors += 1
+
+    def _apply_deltas(self, deltas: Dict[datetime, _DayDelta]):
+        """Merge deltas into their rollup rows (caller commits)"""
+        if not deltas:
+            return
+        existing = {
+            rollup.date: rollup
+            for rollup in self.db.query(DailyUsageRollup).filter(DailyUsageRollup.date.in_(list(deltas)))
+        }
+        for day, delta in deltas.items():
+            rollup = existing.get(day)
+            if rollup is None:
+                self.db.add(DailyUsageRollup(
+                    date=day,
+                    active_users_sketch=delta.users.to_bytes(),
+                    api_calls=delta.api_calls,
+                    error_requests=delta.error_requests,
+                    logged_errors=delta.logged_errors
+                ))
+                continue
+            if delta.api_calls:
+                users = HyperLogLog.from_bytes(rollup.active_users_sketch) if rollup.active_users_sketch else HyperLogLog()
+                users.merge(delta.users)
+                rollup.active_users_sketch = users.to_bytes()
+            rollup.api_calls = (rollup.api_calls or 0) + delta.api_calls
+            rollup.error_requests = (rollup.error_requests or 0) + delta.error_requests
+            rollup.logged_errors = (rollup.logged_errors or 0) + delta.logged_errors
+
+    def backfill(self, start_date: datetime, end_date: datetime) -> List[DailyMetrics]:
+        """
+        Rebuild rollups for every day in [start_date, end_date] from the raw
+        logs, then materialize DailyMetrics for the whole range
+
+        Only rows at or below the cursors are re-read; anything newer is
+        left to the next refresh_rollups(), so nothing is counted twice.
+        """
+        self.refresh_rollups()
+        first_day, last_day = start_of_day(start_date), start_of_day(end_date)
+        window_end = last_day + timedelta(days=1)
+        names = ("usage_logs", "error_logs")
+        for name in names:
+            self._cursor(name)
+
+        # Touch the cursor rows before reading them: the update holds them (a
+        # row lock on Postgres, the write lock on SQLite) until the rebuild
+        # commits, so no refresh can fold rows into the range in between
+        self.db.execute(
+            update(MetricsCursor).where(MetricsCursor.name.in_(names)).values(updated_at=datetime.utcnow())
+        )
+        positions = dict(self.db.query(MetricsCursor.name, MetricsCursor.position).filter(
+            MetricsCursor.name.in_(names)
+        ))
+        usage_cursor, error_cursor = positions["usage_logs"], positions["error_logs"]
+
+        deltas: Dict[datetime, _DayDelta] = {}
+        self._fold_usage(
+            self.db.query(UsageLog.user_id, UsageLog.timestamp, UsageLog.status_code).filter(
+                UsageLog.id <= usage_cursor,
+                UsageLog.timestamp >= first_day,
+                UsageLog.timestamp < window_end
+            ).yield_per(ROLLUP_BATCH_SIZE),
+            deltas
+        )
+        self._fold_errors(
+            (occurred_at for occurred_at, in self.db.query(ErrorLog.occurred_at).filter(
+                ErrorLog.id <= error_cursor,
+                ErrorLog.occurred_at >= first_day,
+                ErrorLog.occurred_at < window_end
+            ).yield_per(ROLLUP_BATCH_SIZE)),
+            deltas
+        )
+
+        self.db.query(DailyUsageRollup).filter(
+            DailyUsageRollup.date >= first_day,
+            DailyUsageRollup.date <= last_day
+        ).delete(synchronize_session=False)
+        self._apply_deltas(deltas)
+        self.db.commit()
+
+        days = [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+        logger.info(f"📊 Backfilled {len(days)} day(s) from {first_day:%Y-%m-%d}")
+        return self.materialize_days(days)
+
+    # ========================================================================
+    # DAILY METRICS AGGREGATION
+    # ========================================================================
+
+    def refresh_daily_metrics(self) -> List[DailyMetrics]:
+        """
+        Fold new log rows into the rollups and re-materialize the affected days
+
+        A changed day also changes month-to-date MAU for the rest of its
+        month, so those later days (up to today) are refreshed too.
+        """
+        global _last_refresh
+        today = start_of_day(datetime.utcnow())
+        days = {today}
+        for day in self.refresh_rollups():
+            while day <= today:
+                days.add(day)
+                day += timedelta(days=1)
+                if day.day == 1:
+                    break
+        _last_refresh = time.monotonic()
+        return self.materialize_days(sorted(days))
+
+    def refresh_if_stale(self, max_age_seconds: float = 60) -> bool:
+        """Run refresh_daily_metrics() if this process hasn't in `max_age_seconds`"""
+        if _last_refresh and time.monotonic() - _last_refresh < max_age_seconds:
+            return False
+        self.refresh_daily_metrics()
+        return True
+
+    def materialize_days(self, days: Iterable[datetime]) -> List[DailyMetrics]:
+        """Write DailyMetrics for each day from its rollup plus the day's business metrics"""
+        days = sorted({start_of_day(day) for day in days})
+        if not days:
+            return []
+
+        rollups = {
+            rollup.date: rollup
+            for rollup in self.db.query(DailyUsageRollup).filter(
+                DailyUsageRollup.date >= days[0].replace(day=1),
+                DailyUsageRollup.date <= days[-1]
+            )
+        }
+        sketches = {
+            day: HyperLogLog.from_bytes(rollup.active_users_sketch)
+            for day, rollup in rollups.items() if rollup.active_users_sketch
+        }
+        existing = {
+            metrics.date: metrics
+            for metrics in self.db.query(DailyMetrics).filter(DailyMetrics.date.in_(days))
+        }
+
+        results = []
+        for day in days:
+            end_of_day = day + timedelta(days=1)
+            rollup = rollups.get(day)
+            api_calls = (rollup.api_calls or 0) if rollup else 0
+            error_requests = (rollup.error_requests or 0) if rollup else 0
+            logged_errors = (rollup.logged_errors or 0) if rollup else 0
+            month = [sketch for d, sketch in sketches.items() if d.year == day.year and d.month == day.month and d <= day]
+
+            mrr = self.calculate_mrr(end_of_day)
+            nps_score, nps_responses = self.calculate_nps(day, end_of_day)
+            support_metrics = self.calculate_support_metrics(day, end_of_day)
+            values = dict(
+                new_signups=self.calculate_signups(day, end_of_day),
+                daily_active_users=sketches[day].count() if day in sketches else 0,
+                monthly_active_users=HyperLogLog.union(month).count(),
+                activations_count=self.calculate_activations(day, end_of_day),
                 mrr=mrr,
-                arr=arr,
+                arr=self.calculate_arr(mrr),
                 api_calls_total=api_calls,
-                agent_sessions_total=agent_sessions,
-                error_count=error_count,
-                error_rate=error_rate,
+                agent_sessions_total=self.db.query(func.count(AgentRental.id)).filter(
+                    AgentRental.started_at >= day,
+                    AgentRental.started_at < end_of_day
+                ).scalar() or 0,
+                error_count=error_requests + logged_errors,
+                error_rate=round(error_requests / api_calls * 100, 2) if api_calls else 0.0,
                 new_tickets=support_metrics["new_tickets"],
                 resolved_tickets=support_metrics["resolved_tickets"],
                 avg_resolution_time_hours=support_metrics["avg_resolution_time_hours"],
                 nps_score=nps_score,
-                nps_responses=nps_responses
+                nps_responses=nps_responses,
+                calculated_at=datetime.utcnow()
             )
-            self.db.add(metrics)
-            self.db.commit()
-            self.db.refresh(metrics)
-            return metrics
+
+            metrics = existing.get(day)
+            if metrics is None:
+                metrics = DailyMetrics(date=day, **values)
+                self.db.add(metrics)
+            else:
+                for key, value in values.items():
+                    setattr(metrics, key, value)
+            results.append(metrics)
+
+        self.db.commit()
+        return results
+
+    def calculate_and_store_daily_metrics(self, date: datetime) -> DailyMetrics:
+        """Calculate all metrics for a day and store in DailyMetrics table"""
+        self.refresh_rollups()
+        return self.materialize_days([date])[0]
+
+    def get_usage_totals(self, start_date: datetime, end_date: datetime) -> Dict[str, int]:
+        """Summed rollup counters for the days in [start_date, end_date]"""
+        api_calls, error_requests, logged_errors = self.db.query(
+            func.coalesce(func.sum(DailyUsageRollup.api_calls), 0),
+            func.coalesce(func.sum(DailyUsageRollup.error_requests), 0),
+            func.coalesce(func.sum(DailyUsageRollup.logged_errors), 0)
+        ).filter(
+            DailyUsageRollup.date >= start_of_day(start_date),
+            DailyUsageRollup.date <= end_date
+        ).one()
+        return {"api_calls": api_calls, "error_requests": error_requests, "logged_errors": logged_errors}
+
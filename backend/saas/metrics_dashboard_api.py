@@ -10,11 +10,12 @@ from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from ..database import (DailyMetrics, ErrorLog, HealthCheck, SupportTicket,
                         User, get_db)
-from .metrics_calculator import MetricsCalculator
+from .metrics_calculator import MetricsCalculator, start_of_day
 
 router = APIRouter()
 
@@ -103,38 +104,42 @@ async def get_metrics_summary(
     - Service health (uptime, errors)
     - Customer satisfaction (NPS)
     - Support metrics
+
+    User, revenue and usage figures come from the precomputed DailyMetrics
+    and rollup rows (refreshed incrementally at most once a minute).
     """
     calculator = MetricsCalculator(db)
+    calculator.refresh_if_stale()
 
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
 
+    # Precomputed daily rows covering the window
+    (new_signups, activations, total_agent_sessions) = db.query(
+        func.coalesce(func.sum(DailyMetrics.new_signups), 0),
+        func.coalesce(func.sum(DailyMetrics.activations_count), 0),
+        func.coalesce(func.sum(DailyMetrics.agent_sessions_total), 0)
+    ).filter(
+        DailyMetrics.date >= start_of_day(start_date),
+        DailyMetrics.date <= end_date
+    ).one()
+    today = db.query(DailyMetrics).filter(DailyMetrics.date == start_of_day(end_date)).first()
+
     # User metrics
-    total_users = db.query(User).count()
-    new_signups = calculator.calculate_signups(start_date, end_date)
-    dau = calculator.calculate_dau(end_date)
-    mau = calculator.calculate_mau(end_date)
-    activations = calculator.calculate_activations(start_date, end_date)
+    total_users = db.query(func.count(User.id)).scalar() or 0
+    dau = today.daily_active_users if today else 0
+    mau = today.monthly_active_users if today else 0
     activation_rate = (activations / new_signups * 100) if new_signups > 0 else 0
 
     # Revenue metrics
-    mrr = calculator.calculate_mrr(end_date)
+    mrr = today.mrr if today else calculator.calculate_mrr(end_date)
     arr = calculator.calculate_arr(mrr)
     churn_rate = calculator.calculate_churn_rate(start_date, end_date)
 
     # Usage metrics
-    from ..database import AgentRental, UsageLog
-    total_api_calls = db.query(UsageLog).filter(
-        UsageLog.timestamp >= start_date,
-        UsageLog.timestamp <= end_date
-    ).count()
-
-    total_agent_sessions = db.query(AgentRental).filter(
-        AgentRental.started_at >= start_date,
-        AgentRental.started_at <= end_date
-    ).count()
-
-    error_rate, _ = calculator.calculate_error_rate(start_date, end_date)
+    usage = calculator.get_usage_totals(start_date, end_date)
+    total_api_calls = usage["api_calls"]
+    error_rate = round(usage["error_requests"] / total_api_calls * 100, 2) if total_api_calls else 0.0
     api_uptime = calculator.calculate_api_uptime(start_date, end_date)
 
     # Support metrics
@@ -189,8 +194,20 @@ async def get_daily_metrics(
     end_date = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
     start_date = end_date - timedelta(days=days)
 
-    # Get or calculate daily metrics
+    # Precomputed rows; days never materialized are filled from the rollups
     calculator = MetricsCalculator(db)
+    calculator.refresh_if_stale()
+    rows = {
+        metric.date: metric
+        for metric in db.query(DailyMetrics).filter(
+            DailyMetrics.date >= start_date,
+            DailyMetrics.date <= end_date
+        )
+    }
+    missing = [start_date + timedelta(days=i) for i in range(days + 1)
+               if start_date + timedelta(days=i) not in rows]
+    for metric in calculator.materialize_days(missing):
+        rows[metric.date] = metric
 
     dates = []
     signups = []
@@ -202,14 +219,7 @@ async def get_daily_metrics(
 
     current_date = start_date
     while current_date <= end_date:
-        # Try to get from DailyMetrics table first
-        daily_metric = db.query(DailyMetrics).filter(
-            DailyMetrics.date == current_date
-        ).first()
-
-        if not daily_metric:
-            # Calculate and store if not exists
-            daily_metric = calculator.calculate_and_store_daily_metrics(current_date)
+        daily_metric = rows[current_date]
 
         dates.append(current_date.strftime("%Y-%m-%d"))
         signups.append(daily_metric.new_signups)
@@ -320,10 +330,13 @@ async def get_revenue_breakdown(db: Session = Depends(get_db)):
     💰 Get revenue breakdown by subscription tier
     """
     # Count users by tier
-    free_users = db.query(User).filter(User.subscription_tier == "free").count()
-    pro_users = db.query(User).filter(User.subscription_tier == "pro").count()
-    workflow_users = db.query(User).filter(User.subscription_tier == "workflow").count()
-    enterprise_users = db.query(User).filter(User.subscription_tier == "enterprise").count()
+    by_tier = dict(
+        db.query(User.subscription_tier, func.count(User.id)).group_by(User.subscription_tier).all()
+    )
+    free_users = by_tier.get("free", 0)
+    pro_users = by_tier.get("pro", 0)
+    workflow_users = by_tier.get("workflow", 0)
+    enterprise_users = by_tier.get("enterprise", 0)
 
     # Calculate MRR
     calculator = MetricsCalculator(db)
@@ -378,7 +391,6 @@ async def get_support_overview(
     ).count()
 
     # Tickets by category
-    from sqlalchemy import func
     by_category = db.query(
         SupportTicket.category,
         func.count(SupportTicket.id)
@@ -417,7 +429,6 @@ async def get_error_overview(
     start_date = end_date - timedelta(days=days)
 
     # Error counts
-    from sqlalchemy import func
     total_errors = db.query(ErrorLog).filter(
         ErrorLog.occurred_at >= start_date
     ).count()
@@ -478,7 +489,8 @@ async def trigger_daily_metrics_calculation(
     """
     🔄 Manually trigger daily metrics calculation
 
-    This should normally run via a cron job, but can be triggered manually
+    This should normally run via a cron job, but can be triggered manually.
+    New log rows are folded into the rollups first.
     """
     if date:
         target_date = datetime.fromisoformat(date)
@@ -500,3 +512,29 @@ async def trigger_daily_metrics_calculation(
             "arr": metrics.arr
         }
     }
+
+@router.post("/metrics/backfill")
+async def backfill_daily_metrics(
+    days: int = Query(90, ge=1, le=730, description="Days of history to rebuild (including today)"),
+    db: Session = Depends(get_db)
+):
+    """
+    🔁 Rebuild daily rollups and DailyMetrics history from the raw logs
+
+    Use after importing historical data or changing how a metric is
+    calculated; regular updates happen incrementally.
+    """
+    end_date = start_of_day(datetime.utcnow())
+    start_date = end_date - timedelta(days=days - 1)
+
+    calculator = MetricsCalculator(db)
+    metrics = calculator.backfill(start_date, end_date)
+
+    return {
+        "success": True,
+        "days": len(metrics),
+        "date_range": {
+            "start": start_date.strftime("%Y-%m-%d"),
+            "end": end_date.strftime("%Y-%m-%d")
+        }
+    }
@@ -5,11 +5,15 @@ Automatically track usage, errors, and health metrics
 VILLAIN METRICS: AUTO-TRACKING EVERYTHING 😈
 """
 
+import atexit
+import logging
+import threading
 import time
 import traceback
 import uuid
+from collections import deque
 from datetime import datetime
-from typing import Callable
+from typing import Any, Callable, Deque, Dict, List, Optional
 
 from fastapi import Request, Response
 from sqlalchemy.orm import Session
@@ -18,6 +22,177 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from ..database import (ErrorLog, HealthCheck, SessionLocal, UsageLog,
                         UserActivation)
 
+logger = logging.getLogger(__name__)
+
+
+class MetricsBuffer:
+    """
+    Bounded in-memory buffer of usage/error rows, bulk-inserted by a background thread
+
+    The request path only appends to a deque (no lock, no I/O). A daemon
+    thread drains up to `batch_size` rows per table every `flush_interval`
+    seconds (sooner once a batch is full) with one bulk_insert_mappings and
+    one commit per batch.
+
+    Overload policy: above `sample_above` (fraction of capacity) only one in
+    `overload_sample_every` usage rows is kept; at capacity new rows are
+    dropped. Error rows are never sampled. Every drop is counted.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        capacity: int = 50_000,
+        batch_size: int = 1_000,
+        flush_interval: float = 1.0,
+        sample_above: float = 0.8,
+        overload_sample_every: int = 10,
+    ):
+        self.session_factory = session_factory
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sample_threshold = int(capacity * sample_above)
+        self.overload_sample_every = overload_sample_every
+
+        self._usage: Deque[Dict[str, Any]] = deque()
+        self._errors: Deque[Dict[str, Any]] = deque()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._sample_counter = 0
+        self.stats = {
+            "usage_buffered": 0,
+            "errors_buffered": 0,
+            "inserted": 0,
+            "batches": 0,
+            "sampled_out": 0,
+            "dropped_full": 0,
+            "dropped_on_error": 0,
+            "flush_errors": 0,
+            "last_flush_ms": 0.0,
+        }
+
+    # ------------------------------------------------------------ request path
+
+    def add_usage(self, row: Dict[str, Any]) -> bool:
+        """Buffer a UsageLog row; returns False if it was sampled out or dropped."""
+        depth = len(self._usage) + len(self._errors)
+        if depth >= self.capacity:
+            self.stats["dropped_full"] += 1
+            return False
+        if depth >= self.sample_threshold:
+            self._sample_counter += 1
+            if self._sample_counter % self.overload_sample_every:
+                self.stats["sampled_out"] += 1
+                return False
+        self._usage.append(row)
+        self.stats["usage_buffered"] += 1
+        self._after_add(len(self._usage))
+        return True
+
+    def add_error(self, row: Dict[str, Any]) -> bool:
+        """Buffer an ErrorLog row; returns False if the buffer is full."""
+        if len(self._usage) + len(self._errors) >= self.capacity:
+            self.stats["dropped_full"] += 1
+            return False
+        self._errors.append(row)
+        self.stats["errors_buffered"] += 1
+        self._after_add(len(self._errors))
+        return True
+
+    def _after_add(self, depth: int):
+        if self._thread is None:
+            self.start()
+        if depth >= self.batch_size:
+            self._wakeup.set()
+
+    # ---------------------------------------------------------------- flushing
+
+    def start(self):
+        """Start the flusher thread (idempotent)."""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="metrics-flusher", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the flusher after writing everything buffered."""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def flush(self) -> int:
+        """Write everything buffered now (from the calling thread); returns rows inserted."""
+        inserted = 0
+        while self._usage or self._errors:
+            written = self._flush_batch()
+            if not written:
+                break
+            inserted += written
+        return inserted
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:  # keep the thread alive whatever the database does
+                logger.error(f"❌ Metrics flusher error: {e}")
+
+    def _flush_batch(self) -> int:
+        usage = self._drain(self._usage)
+        errors = self._drain(self._errors)
+        if not usage and not errors:
+            return 0
+
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            if usage:
+                db.bulk_insert_mappings(UsageLog, usage)
+            if errors:
+                db.bulk_insert_mappings(ErrorLog, errors)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            self.stats["flush_errors"] += 1
+            self.stats["dropped_on_error"] += len(usage) + len(errors)
+            logger.error(f"❌ Failed to write {len(usage) + len(errors)} metrics rows: {e}")
+            return 0
+        finally:
+            db.close()
+
+        self.stats["inserted"] += len(usage) + len(errors)
+        self.stats["batches"] += 1
+        self.stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return len(usage) + len(errors)
+
+    def _drain(self, queue: Deque[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        rows = []
+        for _ in range(min(len(queue), self.batch_size)):
+            rows.append(queue.popleft())
+        return rows
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "pending": len(self._usage) + len(self._errors),
+            "capacity": self.capacity,
+            "flusher_running": self._thread is not None and self._thread.is_alive(),
+        }
+
+
+# Shared by every MetricsMiddleware instance; flushed at exit
+metrics_buffer = MetricsBuffer()
+atexit.register(metrics_buffer.stop)
+
 
 class MetricsMiddleware(BaseHTTPMiddleware):
     """
@@ -27,8 +202,15 @@ class MetricsMiddleware(BaseHTTPMiddleware):
     - Request/response metrics (timing, status codes)
     - Errors and exceptions
     - User activity for DAU/MAU calculation
+
+    Rows are handed to a MetricsBuffer and written in batches off the
+    event loop, so logging never adds a database round-trip to a response.
     """
 
+    def __init__(self, app, buffer: Optional[MetricsBuffer] = None):
+        super().__init__(app)
+        self.buffer = buffer or metrics_buffer
+
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         # Start timing
         start_time = time.time()
@@ -95,25 +277,16 @@ class MetricsMiddleware(BaseHTTPMiddleware):
         status_code: int,
         response_time_ms: float
     ):
-        """Log API usage to database"""
-        try:
-            db = SessionLocal()
-            try:
-                usage_log = UsageLog(
-                    user_id=user_id or "anonymous",
-                    endpoint=endpoint,
-                    method=method,
-                    status_code=status_code,
-                    response_time_ms=response_time_ms,
-                    request_metadata={}
-                )
-                db.add(usage_log)
-                db.commit()
-            finally:
-                db.close()
-        except Exception as e:
-            # Don't let logging errors break the request
-            print(f"Failed to log usage: {e}")
+        """Queue an API usage row for the background writer"""
+        self.buffer.add_usage({
+            "user_id": user_id or "anonymous",
+            "timestamp": datetime.utcnow(),
+            "endpoint": endpoint,
+            "method": method,
+            "status_code": status_code,
+            "response_time_ms": response_time_ms,
+            "request_metadata": {},
+        })
 
     def _log_error(
         self,
@@ -123,26 +296,19 @@ class MetricsMiddleware(BaseHTTPMiddleware):
         method: str,
         request_data: dict
     ):
-        """Log errors to database"""
-        try:
-            db = SessionLocal()
-            try:
-                error_log = ErrorLog(
-                    user_id=user_id,
-                    error_type=type(error).__name__,
-                    error_message=str(error),
-                    stack_trace=traceback.format_exc(),
-                    endpoint=endpoint,
-                    method=method,
-                    request_data=request_data,
-                    severity="error"
-                )
-                db.add(error_log)
-                db.commit()
-            finally:
-                db.close()
-        except Exception as e:
-            print(f"Failed to log error: {e}")
+        """Queue an error row for the background writer"""
+        self.buffer.add_error({
+            "user_id": user_id,
+            "error_type": type(error).__name__,
+            "error_message": str(error),
+            "stack_trace": traceback.format_exc(),
+            "endpoint": endpoint,
+            "method": method,
+            "request_data": request_data,
+            "occurred_at": datetime.utcnow(),
+            "severity": "error",
+            "resolved": False,
+        })
 
 
 # ============================================================================
@@ -9,7 +9,8 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
 from fastapi import (APIRouter, BackgroundTasks, Depends, HTTPException, Query,
-                     Request)
+                     Request, Response)
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, EmailStr, Field
 
 # Import all SaaS services
@@ -26,6 +27,7 @@ router = APIRouter(prefix="/api/saas", tags=["SaaS Platform"])
 
 @router.get("/audit-logs", response_model=List[AuditLog])
 async def get_audit_logs(
+    response: Response,
     user_id: Optional[str] = None,
     action: Optional[AuditAction] = None,
     resource_type: Optional[str] = None,
@@ -35,12 +37,16 @@ async def get_audit_logs(
     search: Optional[str] = None,
     limit: int = Query(default=100, le=1000),
     offset: int = 0,
+    cursor: Optional[str] = None,
     sort_by: str = "timestamp",
     sort_order: str = "desc",
 ):
     """
     Query audit logs with advanced filtering
 
+    **Pagination**: pass the `X-Next-Cursor` response header back as `cursor`
+    for the next page (timestamp order only)
+
     **Compliance**: Supports SOC2, GDPR, HIPAA audit requirements
     """
     query = AuditLogQuery(
@@ -53,11 +59,17 @@ async def get_audit_logs(
         search=search,
         limit=limit,
         offset=offset,
+        cursor=cursor,
         sort_by=sort_by,
         sort_order=sort_order,
     )
 
-    logs = await audit_service.query(query)
+    try:
+        logs, next_cursor = await audit_service.query_page(query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return logs
 
 
@@ -80,6 +92,9 @@ async def export_audit_logs(
     """
     Export audit logs for compliance reporting
 
+    The export is streamed page by page; the DATA_EXPORTED audit entry is
+    written once the stream completes.
+
     **Formats**: json, csv
     """
     if format not in ["json", "csv"]:
@@ -89,27 +104,34 @@ async def export_audit_logs(
         user_id=user_id,
         start_date=start_date,
         end_date=end_date,
-        limit=10000,
     )
 
-    export_data = await audit_service.export(query, format=format)
-
-    # Log the export action
-    await audit_service.log(
-        action=AuditAction.DATA_EXPORTED,
-        resource_type="audit_logs",
-        description=f"Exported audit logs in {format} format",
-        metadata={"format": format, "record_count": len(export_data.split("\n"))},
-        severity=AuditSeverity.MEDIUM,
+    async def stream():
+        progress = {"records": 0}
+        async for chunk in audit_service.export(query, format=format, progress=progress):
+            yield chunk
+
+        # Log the export action
+        await audit_service.log(
+            action=AuditAction.DATA_EXPORTED,
+            resource_type="audit_logs",
+            description=f"Exported audit logs in {format} format",
+            metadata={"format": format, "record_count": progress["records"]},
+            severity=AuditSeverity.MEDIUM,
+        )
+
+    media_type = "application/json" if format == "json" else "text/csv"
+    return StreamingResponse(
+        stream(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="audit_logs.{format}"'},
     )
 
-    return {"data": export_data, "format": format}
-
 
 @router.get("/audit-logs/stats")
 async def get_audit_stats():
     """Get audit log statistics and insights"""
-    return audit_service.get_stats()
+    return await audit_service.get_stats()
 
 
 # ============================================================================
@@ -183,6 +205,6 @@ async def health_check():
             "analytics": "operational",
         },
         "stats": {
-            "total_audit_logs": len(audit_service.logs),
+            "total_audit_logs": await audit_service.count(),
         }
     }
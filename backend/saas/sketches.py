@@ -0,0 +1,127 @@
+"""
+📐 Probabilistic Sketches
+Fixed-size approximate counters for high-cardinality analytics
+
+Features:
+- HyperLogLog distinct counting (~1.6% standard error at the default
+  precision, 4 KB per counter regardless of how many items are added)
+- Mergeable: the union of two sketches counts the union of their inputs,
+  so daily sketches roll up into weekly/monthly ones
+- Compact bytes serialization for storage
+- Fast, stable (process-independent) 32-bit hashing
+"""
+
+import math
+import zlib
+from typing import Iterable, Optional, Tuple
+
+
+def hash32(data: bytes, seed: int = 0) -> int:
+    """
+    Stable, fast non-cryptographic 32-bit hash
+
+    CRC-32 (C speed, seedable with a prefix's CRC) followed by the
+    MurmurHash3 finalizer so similar inputs spread over all bits.
+
+    Example:
+        prefix = zlib.crc32(b"flag_key:")
+        bucket = hash32(b"user_123", prefix) % 100
+    """
+    h = zlib.crc32(data, seed)
+    h ^= h >> 16
+    h = (h * 0x85EBCA6B) & 0xFFFFFFFF
+    h ^= h >> 13
+    h = (h * 0xC2B2AE35) & 0xFFFFFFFF
+    h ^= h >> 16
+    return h
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct-count sketch over 32-bit hashes
+
+    Example:
+        users = HyperLogLog()
+        for user_id in user_ids:
+            users.add(user_id)
+        print(users.count())
+
+        monthly = HyperLogLog.union(daily_sketches)
+    """
+
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int = 12, registers: Optional[bytes] = None):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        size = 1 << precision
+        if registers is not None and len(registers) != size:
+            raise ValueError(f"Expected {size} registers, got {len(registers)}")
+        self.registers = bytearray(registers) if registers is not None else bytearray(size)
+
+    def add(self, item: str):
+        """Add an item (hashed with hash32)"""
+        self.add_hash(hash32(item.encode()))
+
+    def add_hash(self, h: int):
+        """Add a precomputed 32-bit hash"""
+        index, rank = self.position(h, self.precision)
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    @staticmethod
+    def position(h: int, precision: int = 12) -> Tuple[int, int]:
+        """
+        (register index, rank) for a 32-bit hash
+
+        Lets a caller hash an item once and add it to many sketches of the
+        same precision.
+        """
+        rest_bits = 32 - precision
+        rest = h & ((1 << rest_bits) - 1)
+        return h >> rest_bits, rest_bits - rest.bit_length() + 1
+
+    def count(self) -> int:
+        """Estimated number of distinct items added"""
+        m = len(self.registers)
+        estimate = _alpha(m) * m * m / sum(2.0 ** -r for r in self.registers)
+        if estimate <= 2.5 * m:
+            zeros = self.registers.count(0)
+            if zeros:
+                estimate = m * math.log(m / zeros)  # linear counting for small sets
+        return int(round(estimate))
+
+    def merge(self, other: "HyperLogLog"):
+        """Fold another sketch of the same precision into this one (set union)"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    @classmethod
+    def union(cls, sketches: Iterable["HyperLogLog"], precision: int = 12) -> "HyperLogLog":
+        """New sketch counting the union of `sketches`"""
+        result = cls(precision)
+        for sketch in sketches:
+            result.merge(sketch)
+        return result
+
+    def to_bytes(self) -> bytes:
+        return bytes([self.precision]) + bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        return cls(data[0], data[1:])
+
+    def __len__(self) -> int:
+        return self.count()
+
+
+def _alpha(m: int) -> float:
+    if m == 16:
+        return 0.673
+    if m == 32:
+        return 0.697
+    if m == 64:
+        return 0.709
+    return 0.7213 / (1 + 1.079 / m)
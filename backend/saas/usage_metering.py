@@ -8,19 +8,254 @@ Track consumption for usage-based billing:
 - Alert delivery tracking
 - Data export tracking
 - Auto-billing accumulation
+- Incremental per-user, per-day rollups with checkpoints
+  (rebuild: python -m backend.saas.usage_metering)
 
 Author: Claude (Automation)
 Version: 17.1.0
 """
 
+import argparse
+import atexit
 import json
 import logging
+import os
+import threading
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from backend.core.state_manager import write_json_atomic
+
 logger = logging.getLogger(__name__)
 
+SUMMARY_METRICS = ("api_calls", "systems", "alerts", "exports")
+CHECKPOINT_VERSION = 1
+
+# ============================================================================
+# USAGE ROLLUPS
+# ============================================================================
+
+
+class UsageRollupStore:
+    """
+    Per-user, per-day usage totals over an append-only JSONL log.
+
+    - record() buffers entries; they are appended to the log in one write
+      every `flush_every` entries, every `flush_interval` seconds, on read
+      and at exit
+    - Rollups ({user_id: {"YYYY-MM-DD": {metric: quantity}}}) are built by
+      reading only the log bytes added since the last read, so entries
+      written by other processes are counted too
+    - A checkpoint (rollups + log offset) is written periodically; startup
+      loads it and replays only the log tail. Without a checkpoint the whole
+      log is read once - the migration from the old scan-everything format.
+    """
+
+    def __init__(
+        self,
+        log_path: Path,
+        checkpoint_path: Optional[Path] = None,
+        flush_every: int = 100,
+        flush_interval: float = 2.0,
+        checkpoint_every: int = 10_000,
+        checkpoint_interval: float = 300.0,
+    ):
+        self.log_path = Path(log_path).resolve()
+        self.checkpoint_path = Path(checkpoint_path or self.log_path.with_suffix(".rollups.json")).resolve()
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval = checkpoint_interval
+
+        self.rollups: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self._offset = 0
+        self._buffer: List[str] = []
+        self._lock = threading.RLock()
+        self._since_checkpoint = 0
+        self._last_checkpoint = time.monotonic()
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._load_checkpoint()
+        self.refresh()
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------ writes
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """Buffer one usage entry for the log."""
+        with self._lock:
+            self._buffer.append(json.dumps(entry) + "\n")
+            if len(self._buffer) >= self.flush_every:
+                try:
+                    self._flush_locked()
+                except OSError as e:
+                    logger.error(f"❌ Usage log flush failed, keeping {len(self._buffer)} entries buffered: {e}")
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="usage-log-flusher", daemon=True)
+                self._flusher.start()
+
+    def flush(self) -> None:
+        """Append buffered entries to the log."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        data = "".join(self._buffer).encode()  # json.dumps output is ASCII
+        written = 0
+        # One O_APPEND write per batch keeps lines from concurrent processes whole
+        fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            while written < len(data):
+                written += os.write(fd, data[written:])
+        finally:
+            os.close(fd)
+            # Entries leave the buffer only once written; after a failure
+            # (disk full, permissions) the unwritten tail is retried
+            self._buffer[:] = [data[written:].decode()] if written < len(data) else []
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError as e:
+                logger.error(f"❌ Usage log flush failed: {e}")
+
+    def close(self) -> None:
+        """Flush, checkpoint and stop the background flusher."""
+        self._stop.set()
+        if not self.log_path.parent.exists():
+            return  # state directory was removed (tests, teardown)
+        with self._lock:
+            self._flush_locked()
+            self._catch_up_locked()
+            self.checkpoint()
+
+    # ------------------------------------------------------------------- reads
+
+    def refresh(self) -> None:
+        """Flush our buffer and fold any new log lines into the rollups."""
+        with self._lock:
+            self._flush_locked()
+            self._catch_up_locked()
+
+    def totals(self, user_id: str, days: int) -> Dict[str, int]:
+        """Sum of each metric over `days` whole UTC days: today and the `days - 1` before it."""
+        self.refresh()
+        totals: Dict[str, int] = {}
+        today = datetime.utcnow().date()
+        with self._lock:
+            user_days = self.rollups.get(user_id)
+            if not user_days:
+                return totals
+            for offset in range(days):
+                day = user_days.get((today - timedelta(days=offset)).isoformat())
+                if day:
+                    for metric, quantity in day.items():
+                        totals[metric] = totals.get(metric, 0) + quantity
+        return totals
+
+    # ------------------------------------------------------------- checkpoints
+
+    def checkpoint(self) -> None:
+        """Persist the rollups and the log offset they cover."""
+        with self._lock:
+            write_json_atomic(self.checkpoint_path, {
+                "version": CHECKPOINT_VERSION,
+                "log_offset": self._offset,
+                "created_at": datetime.utcnow().isoformat() + "Z",
+                "rollups": self.rollups,
+            })
+            self._since_checkpoint = 0
+            self._last_checkpoint = time.monotonic()
+
+    def rebuild(self) -> int:
+        """Discard the rollups and rebuild them from the whole log; returns entries read."""
+        with self._lock:
+            self._flush_locked()
+            self.rollups = {}
+            self._offset = 0
+            read = self._catch_up_locked()
+            self.checkpoint()
+        return read
+
+    def _load_checkpoint(self) -> None:
+        if not self.checkpoint_path.exists():
+            if self.log_path.exists():
+                logger.info(f"📊 No usage rollup checkpoint; building rollups from {self.log_path}")
+            return
+        try:
+            with open(self.checkpoint_path) as f:
+                data = json.load(f)
+            if data.get("version") != CHECKPOINT_VERSION:
+                raise ValueError(f"unsupported checkpoint version {data.get('version')}")
+            self.rollups = data["rollups"]
+            self._offset = int(data["log_offset"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"⚠️ Ignoring usage rollup checkpoint {self.checkpoint_path}: {e}")
+            self.rollups = {}
+            self._offset = 0
+
+    def _catch_up_locked(self) -> int:
+        """Apply complete log lines after the current offset; returns how many were read."""
+        try:
+            size = self.log_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+        if size < self._offset:
+            logger.warning("⚠️ Usage log shrank since the last checkpoint; rebuilding rollups")
+            self.rollups = {}
+            self._offset = 0
+        if size == self._offset:
+            return 0
+
+        with open(self.log_path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read(size - self._offset)
+        end = data.rfind(b"\n") + 1  # a partially written last line waits for the next read
+        read = 0
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                self._apply(entry["user_id"], entry["timestamp"][:10], entry["metric_type"], entry.get("quantity", 1))
+            except (ValueError, KeyError, TypeError):
+                logger.warning(f"⚠️ Skipping malformed usage log line: {line[:200]!r}")
+                continue
+            read += 1
+        self._offset += end
+
+        self._since_checkpoint += read
+        if (self._since_checkpoint >= self.checkpoint_every
+                or (self._since_checkpoint and time.monotonic() - self._last_checkpoint >= self.checkpoint_interval)):
+            self.checkpoint()
+        return read
+
+    def _apply(self, user_id: str, day: str, metric_type: str, quantity: int) -> None:
+        metrics = self.rollups.setdefault(user_id, {}).setdefault(day, {})
+        metrics[metric_type] = metrics.get(metric_type, 0) + quantity
+
+
+_stores: Dict[Path, UsageRollupStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_usage_store(log_path: Path) -> UsageRollupStore:
+    """Process-wide rollup store for a usage log (UsageMeter is created per request)."""
+    key = Path(log_path).resolve()
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = UsageRollupStore(Path(log_path))
+        return store
+
+
 # ============================================================================
 # USAGE METERING
 # ============================================================================
@@ -29,9 +264,10 @@ logger = logging.getLogger(__name__)
 class UsageMeter:
     """Tracks user consumption for billing."""
 
-    def __init__(self):
-        self.usage_file = Path("Helix/state/saas_usage.jsonl")
+    def __init__(self, usage_file: Optional[Path] = None):
+        self.usage_file = Path(usage_file or "Helix/state/saas_usage.jsonl")
         self.usage_file.parent.mkdir(parents=True, exist_ok=True)
+        self.store = get_usage_store(self.usage_file)
 
     def record_usage(
         self,
@@ -49,37 +285,12 @@ class UsageMeter:
             "metadata": metadata or {},
         }
 
-        with open(self.usage_file, "a") as f:
-            f.write(json.dumps(entry) + "\n")
+        self.store.record(entry)
 
     def get_usage_summary(self, user_id: str, days: int = 30) -> Dict[str, Any]:
-        """Get usage summary for user."""
-        if not self.usage_file.exists():
-            return {"api_calls": 0, "systems": 0, "alerts": 0, "exports": 0}
-
-        cutoff = datetime.utcnow() - timedelta(days=days)
-        metrics = {"api_calls": 0, "systems": 0, "alerts": 0, "exports": 0}
-
-        with open(self.usage_file, "r") as f:
-            for line in f:
-                if not line.strip():
-                    continue
-
-                entry = json.loads(line)
-                if entry.get("user_id") != user_id:
-                    continue
-
-                ts = datetime.fromisoformat(entry["timestamp"].replace("Z", "+00:00"))
-                if ts < cutoff:
-                    continue
-
-                metric_type = entry.get("metric_type")
-                quantity = entry.get("quantity", 1)
-
-                if metric_type in metrics:
-                    metrics[metric_type] += quantity
-
-        return metrics
+        """Get usage summary for user (from daily rollups, O(days))."""
+        totals = self.store.totals(user_id, days)
+        return {metric: totals.get(metric, 0) for metric in SUMMARY_METRICS}
 
     def get_billing_period_usage(self, user_id: str) -> Dict[str, Any]:
         """Get usage for current billing period (30 days)."""
@@ -246,4 +457,17 @@ class BillingAccumulator:
 # EXPORTS
 # ============================================================================
 
-__all__ = ["UsageMeter", "BillingCalculator", "BillingAccumulator"]
+__all__ = ["UsageMeter", "UsageRollupStore", "BillingCalculator", "BillingAccumulator"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build usage rollups from the usage log")
+    parser.add_argument("--log", default="Helix/state/saas_usage.jsonl", help="usage JSONL log")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    started = time.perf_counter()
+    store = UsageRollupStore(Path(args.log))
+    entries = store.rebuild()
+    print(f"📊 Rebuilt rollups for {len(store.rollups)} users from {entries} entries "
+          f"in {time.perf_counter() - started:.2f}s -> {store.checkpoint_path}")
@@ -6,26 +6,33 @@ Only 11% of SaaS platforms have webhooks - this is a competitive advantage!
 
 Features:
 - Event subscriptions with filters
-- Automatic retries with exponential backoff
+- Concurrent delivery workers with per-endpoint concurrency limits
+- Automatic retries with exponential backoff (delay-queue scheduled)
 - HMAC signature verification
-- Delivery logs and analytics
+- Delivery logs (bounded retention) and per-endpoint analytics
 - Rate limiting per endpoint
 - Batch delivery support
 """
 
 import asyncio
 import hashlib
+import heapq
 import hmac
+import itertools
 import json
+import logging
 import time
+from collections import OrderedDict, defaultdict, deque
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 import httpx
 from pydantic import BaseModel, Field, HttpUrl, validator
 
+logger = logging.getLogger(__name__)
+
 
 class WebhookEvent(str, Enum):
     """Available webhook events"""
@@ -153,37 +160,99 @@ class WebhookDelivery(BaseModel):
     completed_at: Optional[datetime] = None
 
 
+class EndpointStats:
+    """Delivery outcomes and recent latencies for one endpoint URL"""
+
+    def __init__(self, latency_samples: int = 256):
+        self.attempts = 0
+        self.successes = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.last_attempt_at: Optional[datetime] = None
+        self._latencies: Deque[int] = deque(maxlen=latency_samples)
+
+    def record(self, success: bool, latency_ms: Optional[int], error: Optional[str] = None):
+        self.attempts += 1
+        self.last_attempt_at = datetime.utcnow()
+        if success:
+            self.successes += 1
+        else:
+            self.failures += 1
+            self.last_error = error
+        if latency_ms is not None:
+            self._latencies.append(latency_ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        samples = sorted(self._latencies)
+        return {
+            "attempts": self.attempts,
+            "successes": self.successes,
+            "failures": self.failures,
+            "success_rate": round(self.successes / self.attempts, 4) if self.attempts else None,
+            "latency_ms": {
+                f"p{p}": samples[min(len(samples) - 1, len(samples) * p // 100)] if samples else None
+                for p in (50, 95, 99)
+            },
+            "last_error": self.last_error,
+            "last_attempt_at": self.last_attempt_at.isoformat() if self.last_attempt_at else None,
+        }
+
+
 class WebhookService:
     """
     Webhook management and delivery service
 
     Handles:
-    - Subscription management
+    - Subscription management (indexed by event type for dispatch)
     - Event dispatch
-    - Automatic retries
+    - Concurrent delivery: `workers` tasks share a ready queue, with at most
+      `max_concurrency_per_endpoint` in-flight requests per endpoint URL
+    - Automatic retries, scheduled on a delay heap rather than re-polled
     - Signature generation
-    - Delivery tracking
+    - Delivery tracking (the newest `max_retained_deliveries` finished
+      deliveries are kept) and per-endpoint success rate and latency
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        workers: int = 8,
+        max_concurrency_per_endpoint: int = 4,
+        max_retained_deliveries: int = 10_000,
+    ):
         self.subscriptions: Dict[str, WebhookSubscription] = {}
         self.deliveries: Dict[str, WebhookDelivery] = {}
         self.delivery_queue: asyncio.Queue = asyncio.Queue()
-        self._worker_task: Optional[asyncio.Task] = None
+        self.workers = workers
+        self.max_concurrency_per_endpoint = max_concurrency_per_endpoint
+        self.max_retained_deliveries = max_retained_deliveries
+
+        self._event_index: Dict[str, Dict[str, WebhookSubscription]] = defaultdict(dict)
+        self._delayed: List[Tuple[float, int, str]] = []  # (due, seq, delivery_id) min-heap
+        self._delay_seq = itertools.count()
+        self._delay_wakeup = asyncio.Event()
+        self._endpoint_active: Dict[str, int] = defaultdict(int)
+        self._endpoint_backlog: Dict[str, Deque[str]] = defaultdict(deque)
+        self._endpoint_stats: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+        self._completed: "OrderedDict[str, None]" = OrderedDict()
+        self._clients: Dict[bool, httpx.AsyncClient] = {}
+        self._worker_tasks: List[asyncio.Task] = []
 
     async def start(self):
-        """Start the webhook delivery worker"""
-        if not self._worker_task:
-            self._worker_task = asyncio.create_task(self._delivery_worker())
+        """Start the delay scheduler and the delivery workers"""
+        if not any(not task.done() for task in self._worker_tasks):
+            self._worker_tasks = [asyncio.create_task(self._delay_scheduler())] + [
+                asyncio.create_task(self._delivery_worker()) for _ in range(self.workers)
+            ]
 
     async def stop(self):
-        """Stop the webhook delivery worker"""
-        if self._worker_task:
-            self._worker_task.cancel()
-            try:
-                await self._worker_task
-            except asyncio.CancelledError:
-                pass
+        """Stop the delivery workers"""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
 
     # ========================================================================
     # SUBSCRIPTION MANAGEMENT
@@ -192,6 +261,7 @@ class WebhookService:
     async def create_subscription(self, subscription: WebhookSubscription) -> WebhookSubscription:
         """Create a new webhook subscription"""
         self.subscriptions[subscription.id] = subscription
+        self._index(subscription)
         return subscription
 
     async def get_subscription(self, webhook_id: str) -> Optional[WebhookSubscription]:
@@ -228,17 +298,32 @@ class WebhookService:
         if not subscription:
             raise ValueError(f"Webhook {webhook_id} not found")
 
+        self._unindex(subscription)
         for key, value in updates.items():
             if hasattr(subscription, key):
                 setattr(subscription, key, value)
+        self._index(subscription)
 
         subscription.updated_at = datetime.utcnow()
         return subscription
 
     async def delete_subscription(self, webhook_id: str):
         """Delete a webhook subscription"""
-        if webhook_id in self.subscriptions:
-            del self.subscriptions[webhook_id]
+        subscription = self.subscriptions.pop(webhook_id, None)
+        if subscription:
+            self._unindex(subscription)
+
+    def _index(self, subscription: WebhookSubscription):
+        for event in subscription.events:
+            self._event_index[event][subscription.id] = subscription
+
+    def _unindex(self, subscription: WebhookSubscription):
+        for event in subscription.events:
+            subscribers = self._event_index.get(event)
+            if subscribers is not None:
+                subscribers.pop(subscription.id, None)
+                if not subscribers:
+                    del self._event_index[event]
 
     # ========================================================================
     # EVENT DISPATCH
@@ -256,16 +341,12 @@ class WebhookService:
 
         Events are queued for async delivery
         """
-        # Find matching subscriptions
+        # Find matching subscriptions among those subscribed to this event
         matching_subs = []
-        for subscription in self.subscriptions.values():
-            # Check if subscription matches this event
+        for subscription in list(self._event_index.get(event_type, {}).values()):
             if subscription.status != WebhookStatus.ACTIVE:
                 continue
 
-            if event_type not in subscription.events:
-                continue
-
             if user_id and subscription.user_id != user_id:
                 continue
 
@@ -317,34 +398,88 @@ class WebhookService:
         self.deliveries[delivery.id] = delivery
 
         # Queue for delivery
-        await self.delivery_queue.put(delivery.id)
+        await self.start()
+        self.delivery_queue.put_nowait(delivery.id)
+
+    def _schedule_retry(self, delivery: WebhookDelivery):
+        """Put a delivery on the delay heap until its next_retry_at"""
+        delay = (delivery.next_retry_at - datetime.utcnow()).total_seconds()
+        heapq.heappush(self._delayed, (time.monotonic() + delay, next(self._delay_seq), delivery.id))
+        if self._delayed[0][2] == delivery.id:
+            self._delay_wakeup.set()  # new earliest deadline
+
+    async def _delay_scheduler(self):
+        """Move retries from the delay heap to the ready queue as they come due"""
+        while True:
+            now = time.monotonic()
+            while self._delayed and self._delayed[0][0] <= now:
+                _, _, delivery_id = heapq.heappop(self._delayed)
+                self.delivery_queue.put_nowait(delivery_id)
+
+            timeout = self._delayed[0][0] - now if self._delayed else None
+            self._delay_wakeup.clear()
+            try:
+                await asyncio.wait_for(self._delay_wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
 
     async def _delivery_worker(self):
-        """Background worker that processes delivery queue"""
+        """Background worker that processes the ready queue"""
         while True:
+            delivery_id = await self.delivery_queue.get()
             try:
-                delivery_id = await self.delivery_queue.get()
                 delivery = self.deliveries.get(delivery_id)
-
                 if not delivery:
                     continue
 
-                # Check if we should retry yet
-                if delivery.next_retry_at and datetime.utcnow() < delivery.next_retry_at:
-                    # Re-queue for later
-                    await asyncio.sleep(1)
-                    await self.delivery_queue.put(delivery_id)
+                subscription = self.subscriptions.get(delivery.webhook_id)
+                endpoint = str(subscription.url) if subscription else None
+                if endpoint is None:
+                    await self._attempt_delivery(delivery)
+                    continue
+
+                # Endpoint at its concurrency limit: park until one of its deliveries finishes
+                if self._endpoint_active[endpoint] >= self.max_concurrency_per_endpoint:
+                    self._endpoint_backlog[endpoint].append(delivery_id)
                     continue
 
-                # Attempt delivery
-                await self._attempt_delivery(delivery)
+                self._endpoint_active[endpoint] += 1
+                try:
+                    await self._attempt_delivery(delivery)
+                finally:
+                    self._release_endpoint(endpoint)
 
-            except asyncio.CancelledError:
-                break
             except Exception as e:
                 # Log error but don't crash worker
-                print(f"Delivery worker error: {e}")
-                await asyncio.sleep(1)
+                logger.error(f"❌ Webhook delivery worker error: {e}")
+            finally:
+                self.delivery_queue.task_done()
+
+    def _release_endpoint(self, endpoint: str):
+        self._endpoint_active[endpoint] -= 1
+        backlog = self._endpoint_backlog.get(endpoint)
+        if backlog:
+            self.delivery_queue.put_nowait(backlog.popleft())
+        if not backlog:
+            self._endpoint_backlog.pop(endpoint, None)
+            if self._endpoint_active[endpoint] <= 0:
+                del self._endpoint_active[endpoint]
+
+    def _client(self, verify_ssl: bool) -> httpx.AsyncClient:
+        """Shared connection pool per TLS-verification setting"""
+        client = self._clients.get(verify_ssl)
+        if client is None:
+            client = httpx.AsyncClient(verify=verify_ssl)
+            self._clients[verify_ssl] = client
+        return client
+
+    def _complete(self, delivery: WebhookDelivery):
+        """Retain a finished delivery, evicting the oldest finished ones past the limit"""
+        delivery.completed_at = datetime.utcnow()
+        self._completed[delivery.id] = None
+        while len(self._completed) > self.max_retained_deliveries:
+            expired_id, _ = self._completed.popitem(last=False)
+            self.deliveries.pop(expired_id, None)
 
     async def _attempt_delivery(self, delivery: WebhookDelivery):
         """Attempt to deliver a webhook"""
@@ -352,11 +487,12 @@ class WebhookService:
         if not subscription:
             delivery.status = DeliveryStatus.FAILED
             delivery.error_message = "Webhook subscription not found"
-            delivery.completed_at = datetime.utcnow()
+            self._complete(delivery)
             return
 
         delivery.attempt_count += 1
         delivery.status = DeliveryStatus.RETRYING if delivery.attempt_count > 1 else DeliveryStatus.PENDING
+        endpoint_stats = self._endpoint_stats[str(subscription.url)]
 
         # Prepare request
         headers = {
@@ -369,41 +505,43 @@ class WebhookService:
         }
 
         start_time = time.time()
+        response_time_ms = None
 
         try:
-            async with httpx.AsyncClient(verify_ssl=subscription.verify_ssl) as client:
-                response = await client.post(
-                    str(subscription.url),
-                    json=delivery.payload,
-                    headers=headers,
-                    timeout=subscription.timeout_seconds,
-                )
-
-                response_time_ms = int((time.time() - start_time) * 1000)
-
-                # Record response
-                delivery.http_status = response.status_code
-                delivery.response_body = response.text[:1000]  # Limit size
-                delivery.response_headers = dict(response.headers)
-                delivery.response_time_ms = response_time_ms
-                delivery.delivered_at = datetime.utcnow()
-
-                # Check if successful
-                if 200 <= response.status_code < 300:
-                    delivery.status = DeliveryStatus.SUCCESS
-                    delivery.completed_at = datetime.utcnow()
-
-                    # Update subscription stats
-                    subscription.total_deliveries += 1
-                    subscription.successful_deliveries += 1
-                    subscription.last_delivery_at = datetime.utcnow()
-                    subscription.last_success_at = datetime.utcnow()
-
-                else:
-                    raise Exception(f"HTTP {response.status_code}: {response.text[:200]}")
+            response = await self._client(subscription.verify_ssl).post(
+                str(subscription.url),
+                json=delivery.payload,
+                headers=headers,
+                timeout=subscription.timeout_seconds,
+            )
+
+            response_time_ms = int((time.time() - start_time) * 1000)
+
+            # Record response
+            delivery.http_status = response.status_code
+            delivery.response_body = response.text[:1000]  # Limit size
+            delivery.response_headers = dict(response.headers)
+            delivery.response_time_ms = response_time_ms
+            delivery.delivered_at = datetime.utcnow()
+
+            # Check if successful
+            if 200 <= response.status_code < 300:
+                delivery.status = DeliveryStatus.SUCCESS
+                self._complete(delivery)
+                endpoint_stats.record(True, response_time_ms)
+
+                # Update subscription stats
+                subscription.total_deliveries += 1
+                subscription.successful_deliveries += 1
+                subscription.last_delivery_at = datetime.utcnow()
+                subscription.last_success_at = datetime.utcnow()
+
+            else:
+                raise Exception(f"HTTP {response.status_code}: {response.text[:200]}")
 
         except Exception as e:
             delivery.error_message = str(e)
+            endpoint_stats.record(False, response_time_ms, str(e))
 
             # Should we retry?
             if delivery.attempt_count < delivery.max_attempts:
@@ -412,12 +550,12 @@ class WebhookService:
                 delivery.next_retry_at = datetime.utcnow() + timedelta(seconds=backoff_seconds)
                 delivery.status = DeliveryStatus.RETRYING
 
-                # Re-queue
-                await self.delivery_queue.put(delivery.id)
+                # Schedule; workers stay free for other deliveries meanwhile
+                self._schedule_retry(delivery)
             else:
                 # Give up
                 delivery.status = DeliveryStatus.FAILED
-                delivery.completed_at = datetime.utcnow()
+                self._complete(delivery)
 
                 # Update subscription stats
                 subscription.total_deliveries += 1
@@ -450,19 +588,19 @@ class WebhookService:
         status: Optional[DeliveryStatus] = None,
         limit: int = 100,
     ) -> List[WebhookDelivery]:
-        """Get webhook delivery logs"""
-        deliveries = list(self.deliveries.values())
-
-        if webhook_id:
-            deliveries = [d for d in deliveries if d.webhook_id == webhook_id]
-
-        if status:
-            deliveries = [d for d in deliveries if d.status == status]
-
-        # Sort by created_at desc
-        deliveries = sorted(deliveries, key=lambda d: d.created_at, reverse=True)
+        """Get webhook delivery logs, newest first"""
+        deliveries = []
+        # Deliveries are kept in creation order, so walk backwards and stop at limit
+        for delivery in reversed(self.deliveries.values()):
+            if webhook_id and delivery.webhook_id != webhook_id:
+                continue
+            if status and delivery.status != status:
+                continue
+            deliveries.append(delivery)
+            if len(deliveries) >= limit:
+                break
 
-        return deliveries[:limit]
+        return deliveries
 
     async def get_delivery(self, delivery_id: str) -> Optional[WebhookDelivery]:
         """Get a specific delivery"""
@@ -481,9 +619,35 @@ class WebhookService:
         delivery.status = DeliveryStatus.PENDING
         delivery.next_retry_at = None
         delivery.error_message = None
+        delivery.completed_at = None
+        self._completed.pop(delivery_id, None)
 
         # Queue for delivery
-        await self.delivery_queue.put(delivery_id)
+        await self.start()
+        self.delivery_queue.put_nowait(delivery_id)
+
+    # ========================================================================
+    # STATS
+    # ========================================================================
+
+    def get_endpoint_stats(self, url: Optional[str] = None) -> Dict[str, Any]:
+        """Success rate, latency percentiles and errors per endpoint URL"""
+        if url is not None:
+            stats = self._endpoint_stats.get(url)
+            return stats.to_dict() if stats else EndpointStats().to_dict()
+        return {endpoint: stats.to_dict() for endpoint, stats in self._endpoint_stats.items()}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Delivery engine queue depths, concurrency and retention"""
+        return {
+            "workers": sum(1 for task in self._worker_tasks if not task.done()),
+            "ready": self.delivery_queue.qsize(),
+            "scheduled_retries": len(self._delayed),
+            "waiting_for_endpoint": sum(len(backlog) for backlog in self._endpoint_backlog.values()),
+            "in_flight": sum(self._endpoint_active.values()),
+            "retained_deliveries": len(self.deliveries),
+            "completed_deliveries": len(self._completed),
+        }
 
 
 # Global webhook service
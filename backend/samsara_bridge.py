@@ -3,14 +3,26 @@
 # MERGED: Main branch features + MemeSync import fixes
 
 import asyncio
+import atexit
+import functools
+import io
+import multiprocessing
 import os
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.figure import Figure
 
 # RAILWAY FIX: Use relative imports instead of absolute imports
 # This prevents "ModuleNotFoundError: No module named 'backend'" on Railway
@@ -28,81 +40,110 @@ except ImportError:
             async def upload(self, *args, **kwargs):
                 pass
 
+            async def upload_bytes(self, *args, **kwargs):
+                pass
 
-class SamsaraRenderer:
-    """
-    Generates fractal visualizations based on UCF (Universal Coherence Field) state.
-    Renders consciousness patterns as visual art with Sanskrit mantra overlays.
+try:
+    from .mandelbrot_ucf import escape_time, escape_time_grid
+except ImportError:
+    from backend.mandelbrot_ucf import escape_time, escape_time_grid
+
+
+# ============================================================================
+# FRAME PIPELINE
+# ============================================================================
+# Frames render on a process pool (matplotlib's object API, no pyplot state),
+# come back as PNG bytes in order and are fed to an in-memory animation
+# encoder while later frames are still rendering. Uploads start as soon as a
+# frame arrives, so nothing is written to temporary files.
+
+FRAME_DPI = 150
+FRAME_RESOLUTION = 800
+ANIMATION_FPS = 10
+ANIMATION_WIDTH = 600
+
+# UCF-to-color mapping
+UCF_COLOR_MAP = {
+    "harmony": "#9D4EDD",  # Purple
+    "resilience": "#F72585",  # Pink
+    "prana": "#4CC9F0",  # Cyan
+    "drishti": "#7209B7",  # Deep Purple
+    "klesha": "#560BAD",  # Dark Purple
+    "zoom": "#F77F00",  # Orange
+}
+
+
+def samsara_escape_counts(ucf_state: Dict[str, Any], resolution: int = FRAME_RESOLUTION) -> np.ndarray:
     """
+    Zoom-scaled escape counts of the UCF-perturbed fractal drawn in each frame.
 
-    def __init__(self):
-        self.output_dir = Path("Shadow/manus_archive/visual_outputs")
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+    Args:
+        ucf_state: UCF state (harmony, resilience, prana, zoom)
+        resolution: Grid points per axis over [-2, 2]
 
-        # UCF-to-color mapping
-        self.color_map = {
-            "harmony": "#9D4EDD",  # Purple
-            "resilience": "#F72585",  # Pink
-            "prana": "#4CC9F0",  # Cyan
-            "drishti": "#7209B7",  # Deep Purple
-            "klesha": "#560BAD",  # Dark Purple
-            "zoom": "#F77F00",  # Orange
-        }
+    Returns:
+        Array of shape (resolution, resolution), rows along the imaginary axis
+    """
+    harmony = ucf_state.get("harmony", 0.5)
+    resilience = ucf_state.get("resilience", 0.5)
+    prana = ucf_state.get("prana", 0.5)
+    zoom = ucf_state.get("zoom", 1.0)
 
-    def _create_enhanced_frame(self, ucf_state: Dict[str, Any], iteration: int) -> Path:
-        """
-        Create a single fractal frame with enhanced UCF visualization.
-        MEME SYNC: Added 'Tat Tvam Asi' mantra overlay with cyan glow for enhanced visibility.
-        """
-        fig, ax = plt.subplots(figsize=(12, 12), facecolor="black")
-        ax.set_facecolor("black")
+    # UCF-influenced fractal generation: z = z² + c·(1 + resilience/2) + prana·0.1i
+    axis = np.linspace(-2, 2, resolution)
+    plane = axis[np.newaxis, :] + 1j * axis[:, np.newaxis]
+    max_iter = int(50 + harmony * 100)
+    iterations, _ = escape_time(plane * (1 + resilience * 0.5) + prana * 0.1j, max_iter)
 
-        # Extract UCF values
-        harmony = ucf_state.get("harmony", 0.5)
-        resilience = ucf_state.get("resilience", 0.5)
-        prana = ucf_state.get("prana", 0.5)
-        zoom = ucf_state.get("zoom", 1.0)
+    # The last iteration each point was still bounded, scaled by zoom
+    return (iterations - 1) * zoom
 
-        # Generate fractal pattern based on UCF state
-        x = np.linspace(-2, 2, 800)
-        y = np.linspace(-2, 2, 800)
-        X, Y = np.meshgrid(x, y)
 
-        # Complex plane
-        C = X + 1j * Y
-        Z = np.zeros_like(C)
+def render_frame_png(ucf_state: Dict[str, Any], dpi: int = FRAME_DPI) -> bytes:
+    """
+    Render one Samsara frame to PNG bytes.
 
-        # UCF-influenced fractal generation
-        max_iter = int(50 + harmony * 100)
-        escape_count = np.zeros(C.shape)
+    Safe to run in worker processes and threads: it builds its own Figure
+    instead of going through pyplot's global state.
+    MEME SYNC: Added 'Tat Tvam Asi' mantra overlay with cyan glow for enhanced visibility.
 
-        for i in range(max_iter):
-            mask = np.abs(Z) <= 2
-            Z[mask] = Z[mask] ** 2 + C[mask] * (1 + resilience * 0.5) + prana * 0.1j
-            escape_count[mask] = i
+    Args:
+        ucf_state: UCF state dictionary
+        dpi: Output resolution (the figure is 12 inches square)
 
-        # Apply zoom factor
-        escape_count = escape_count * zoom
+    Returns:
+        PNG image bytes
+    """
+    fig = Figure(figsize=(12, 12), facecolor="black")
+    ax = fig.subplots()
+    ax.set_facecolor("black")
+
+    harmony = ucf_state.get("harmony", 0.5)
+    resilience = ucf_state.get("resilience", 0.5)
+    prana = ucf_state.get("prana", 0.5)
+
+    # Create custom colormap based on UCF state
+    colors = [
+        "#000000",
+        UCF_COLOR_MAP["harmony"],
+        UCF_COLOR_MAP["prana"],
+        UCF_COLOR_MAP["resilience"],
+        UCF_COLOR_MAP["drishti"],
+    ]
+    cmap = LinearSegmentedColormap.from_list("ucf", colors, N=256)
+
+    # Render fractal
+    ax.imshow(
+        samsara_escape_counts(ucf_state), extent=[-2, 2, -2, 2], cmap=cmap, origin="lower", interpolation="bilinear"
+    )
 
-        # Create custom colormap based on UCF state
-        colors = [
-            "#000000",
-            self.color_map["harmony"],
-            self.color_map["prana"],
-            self.color_map["resilience"],
-            self.color_map["drishti"],
-        ]
-        n_bins = 256
-        cmap = LinearSegmentedColormap.from_list("ucf", colors, N=n_bins)
-
-        # Render fractal
-        ax.imshow(escape_count, extent=[-2, 2, -2, 2], cmap=cmap, origin="lower", interpolation="bilinear")
-
-        # Add UCF state overlay
+    # Add UCF state overlay
+    for y, label in ((0.98, f"Harmony: {harmony:.4f}"), (0.92, f"Resilience: {resilience:.4f}"),
+                     (0.86, f"Prana: {prana:.4f}")):
         ax.text(
             0.02,
-            0.98,
-            f"Harmony: {harmony:.4f}",
+            y,
+            label,
             transform=ax.transAxes,
             color="white",
             fontsize=10,
@@ -110,101 +151,382 @@ class SamsaraRenderer:
             bbox=dict(boxstyle="round,pad=0.3", facecolor="black", alpha=0.7),
         )
 
-        ax.text(
-            0.02,
-            0.92,
-            f"Resilience: {resilience:.4f}",
-            transform=ax.transAxes,
-            color="white",
-            fontsize=10,
-            verticalalignment="top",
-            bbox=dict(boxstyle="round,pad=0.3", facecolor="black", alpha=0.7),
-        )
+    # MEME SYNC: Add 'Tat Tvam Asi' mantra overlay with cyan glow
+    ax.text(
+        0.5,
+        0.05,
+        "Tat Tvam Asi 🙏",
+        transform=ax.transAxes,
+        color="cyan",
+        fontsize=16,
+        weight="bold",
+        horizontalalignment="center",
+        verticalalignment="bottom",
+        bbox=dict(boxstyle="round,pad=0.5", facecolor="black", alpha=0.8, edgecolor="cyan", linewidth=2),
+    )
 
-        ax.text(
-            0.02,
-            0.86,
-            f"Prana: {prana:.4f}",
-            transform=ax.transAxes,
-            color="white",
-            fontsize=10,
-            verticalalignment="top",
-            bbox=dict(boxstyle="round,pad=0.3", facecolor="black", alpha=0.7),
-        )
+    # Add timestamp
+    timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+    ax.text(
+        0.98,
+        0.02,
+        f"Generated: {timestamp}",
+        transform=ax.transAxes,
+        color="white",
+        fontsize=8,
+        horizontalalignment="right",
+        bbox=dict(boxstyle="round,pad=0.3", facecolor="black", alpha=0.7),
+    )
 
-        # MEME SYNC: Add 'Tat Tvam Asi' mantra overlay with cyan glow
-        ax.text(
-            0.5,
-            0.05,
-            "Tat Tvam Asi 🙏",
-            transform=ax.transAxes,
-            color="cyan",
-            fontsize=16,
-            weight="bold",
-            horizontalalignment="center",
-            verticalalignment="bottom",
-            bbox=dict(boxstyle="round,pad=0.5", facecolor="black", alpha=0.8, edgecolor="cyan", linewidth=2),
-        )
+    ax.set_xlim(-2, 2)
+    ax.set_ylim(-2, 2)
+    ax.axis("off")
 
-        # Add timestamp
-        timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
-        ax.text(
-            0.98,
-            0.02,
-            f"Generated: {timestamp}",
-            transform=ax.transAxes,
-            color="white",
-            fontsize=8,
-            horizontalalignment="right",
-            bbox=dict(boxstyle="round,pad=0.3", facecolor="black", alpha=0.7),
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight", facecolor="black")
+    return buf.getvalue()
+
+
+def frame_states(ucf_state: Dict[str, Any], frames: int) -> List[Dict[str, Any]]:
+    """Per-frame UCF states: harmony and prana drift slightly to animate the cycle."""
+    states = []
+    for i in range(frames):
+        modified_state = dict(ucf_state)
+        modified_state["harmony"] = ucf_state.get("harmony", 0.5) + np.sin(i * 0.1) * 0.05
+        modified_state["prana"] = ucf_state.get("prana", 0.5) + np.cos(i * 0.1) * 0.05
+        states.append(modified_state)
+    return states
+
+
+# The frame pool is shared by every cycle and sized once; each cycle limits
+# how many of its frames are in flight instead of resizing the pool
+FRAME_POOL_WORKERS = int(os.getenv("SAMSARA_FRAME_WORKERS", "0")) or (os.cpu_count() or 1)
+
+_frame_pool: Optional[ProcessPoolExecutor] = None
+_frame_pool_lock = threading.Lock()
+
+
+def _get_frame_pool() -> ProcessPoolExecutor:
+    """Shared frame pool, started on first use."""
+    global _frame_pool
+    with _frame_pool_lock:
+        if _frame_pool is None:
+            # spawn: the bot's event loop runs threads, where fork is unsafe
+            _frame_pool = ProcessPoolExecutor(
+                max_workers=FRAME_POOL_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+            print(f"🎨 Started Samsara frame pool with {FRAME_POOL_WORKERS} workers")
+        return _frame_pool
+
+
+def _submit_frame(ucf_state: Dict[str, Any], dpi: int) -> Future:
+    """Submit a frame to the shared pool, replacing the pool once if a worker died."""
+    global _frame_pool
+    pool = _get_frame_pool()
+    try:
+        return pool.submit(render_frame_png, ucf_state, dpi)
+    except BrokenProcessPool:
+        with _frame_pool_lock:
+            if _frame_pool is pool:
+                _frame_pool = None
+        # Don't block the caller (usually the event loop) on a dead pool
+        pool.shutdown(wait=False, cancel_futures=True)
+        print("⚠️ Samsara frame pool broken, restarting it")
+        return _get_frame_pool().submit(render_frame_png, ucf_state, dpi)
+
+
+def shutdown_frame_pool() -> None:
+    """Stop the shared frame pool, if one was started (call off the event loop)."""
+    global _frame_pool
+    with _frame_pool_lock:
+        pool, _frame_pool = _frame_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+atexit.register(shutdown_frame_pool)
+
+
+class AnimationEncoder:
+    """
+    Incremental in-memory encoder for Samsara animations.
+
+    GIF and animated WebP frames are decoded, resized and (for GIF) palette
+    quantised as they are added, leaving only the container write for
+    finish(). WebM frames are piped straight into an ffmpeg process and the
+    encoded stream is read back from its stdout.
+    """
+
+    FORMATS = {"gif": "image/gif", "webp": "image/webp", "webm": "video/webm"}
+
+    def __init__(self, fmt: str = "gif", fps: int = ANIMATION_FPS, width: int = ANIMATION_WIDTH):
+        """
+        Args:
+            fmt: Output format (gif, webp, webm)
+            fps: Frames per second of the animation
+            width: Maximum output width in pixels (larger frames are downscaled)
+
+        Raises:
+            ValueError: If fmt is not a supported format
+        """
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unsupported animation format '{fmt}'. Available: {', '.join(self.FORMATS)}")
+        self.fmt = fmt
+        self.fps = fps
+        self.width = width
+        self.frame_count = 0
+        self._images: List[Any] = []
+        self._process: Optional[subprocess.Popen] = None
+        self._stdout_chunks: List[bytes] = []
+        self._stdout_reader: Optional[threading.Thread] = None
+
+    @property
+    def content_type(self) -> str:
+        return self.FORMATS[self.fmt]
+
+    def add(self, png: bytes) -> None:
+        """Append one PNG frame."""
+        if self.fmt == "webm":
+            if self._process is None:
+                self._start_ffmpeg()
+            self._process.stdin.write(png)
+        else:
+            if not PIL_AVAILABLE:
+                raise RuntimeError("GIF/WebP encoding requires Pillow")
+            image = Image.open(io.BytesIO(png)).convert("RGB")
+            if image.width > self.width:
+                image = image.resize((self.width, round(image.height * self.width / image.width)), Image.LANCZOS)
+            self._images.append(image.quantize(colors=256) if self.fmt == "gif" else image)
+        self.frame_count += 1
+
+    def finish(self) -> bytes:
+        """
+        Close the stream and return the encoded animation.
+
+        Raises:
+            ValueError: If no frames were added
+            RuntimeError: If ffmpeg fails to encode the WebM stream
+        """
+        if not self.frame_count:
+            raise ValueError("No frames to encode")
+
+        if self.fmt == "webm":
+            self._process.stdin.close()
+            self._stdout_reader.join()
+            stderr = self._process.stderr.read()
+            if self._process.wait() != 0:
+                raise RuntimeError(f"ffmpeg WebM encode failed: {stderr.decode(errors='replace').strip()}")
+            return b"".join(self._stdout_chunks)
+
+        buf = io.BytesIO()
+        first, rest = self._images[0], self._images[1:]
+        first.save(
+            buf, format=self.fmt.upper(), save_all=True, append_images=rest, duration=round(1000 / self.fps), loop=0
+        )
+        self._images = []
+        return buf.getvalue()
+
+    def _start_ffmpeg(self) -> None:
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("WebM encoding requires the ffmpeg binary on PATH")
+        # fmt: off
+        self._process = subprocess.Popen(
+            [ffmpeg, "-loglevel", "error",
+             "-f", "image2pipe", "-framerate", str(self.fps), "-c:v", "png", "-i", "pipe:0",
+             "-vf", f"scale='2*trunc(min({self.width},iw)/2)':-2", "-c:v", "libvpx-vp9", "-b:v", "0", "-crf", "35",
+             "-pix_fmt", "yuv420p", "-f", "webm", "pipe:1"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
         )
+        # fmt: on
+        # Drain stdout concurrently so ffmpeg never blocks on a full pipe
+        self._stdout_reader = threading.Thread(
+            target=lambda: self._stdout_chunks.append(self._process.stdout.read()), daemon=True
+        )
+        self._stdout_reader.start()
+
+    def close(self) -> None:
+        """Abandon the animation: kill ffmpeg, join its reader and drop buffered frames."""
+        self._images = []
+        if self._process is None:
+            return
+        if self._process.poll() is None:
+            self._process.kill()
+        for pipe in (self._process.stdin, self._process.stderr):
+            try:
+                pipe.close()
+            except OSError:
+                pass  # stdin may already be broken by the kill
+        self._process.wait()
+        if self._stdout_reader is not None:
+            self._stdout_reader.join()
+        self._process.stdout.close()
 
-        ax.set_xlim(-2, 2)
-        ax.set_ylim(-2, 2)
-        ax.axis("off")
 
-        # Save frame
-        frame_path = self.output_dir / f"samsara_frame_{iteration:04d}_{int(datetime.utcnow().timestamp())}.png"
-        plt.savefig(frame_path, dpi=150, bbox_inches="tight", facecolor="black")
-        plt.close()
+@dataclass
+class FrameCycle:
+    """Output of one visualization cycle."""
+    frames: List[bytes]  # PNG bytes, in frame order
+    animation: Optional[bytes]  # Encoded animation (multi-frame cycles only)
+    format: str
+    seconds: float
+    uploads: List[Optional[int]] = field(default_factory=list)  # Upload status per frame/animation
+
+    @property
+    def frames_per_second(self) -> float:
+        return len(self.frames) / self.seconds if self.seconds else float("inf")
+
+
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def _spawn_background(coro) -> asyncio.Task:
+    """Fire-and-forget task that is kept referenced until it finishes."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def _upload_quietly(storage, data: bytes, filename: str, remote_dir: str) -> Optional[int]:
+    try:
+        return await storage.upload_bytes(data, filename, remote_dir)
+    except Exception as e:
+        print(f"⚠️  Cloud upload failed ({filename}): {e}")
+        return None
+
+
+class SamsaraRenderer:
+    """
+    Generates fractal visualizations based on UCF (Universal Coherence Field) state.
+    Renders consciousness patterns as visual art with Sanskrit mantra overlays.
+    """
+
+    def __init__(self, storage: Optional[Any] = None, workers: Optional[int] = None, dpi: int = FRAME_DPI):
+        """
+        Args:
+            storage: Upload target with an async upload_bytes() (default: HelixStorageAdapterAsync)
+            workers: Frames a cycle keeps in flight on the shared pool (default: the pool size)
+            dpi: Frame resolution
+        """
+        self.output_dir = Path("Shadow/manus_archive/visual_outputs")
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = workers
+        self.dpi = dpi
+        self._storage = storage
 
+        self.color_map = dict(UCF_COLOR_MAP)
+
+    @property
+    def storage(self):
+        if self._storage is None:
+            self._storage = HelixStorageAdapterAsync()
+        return self._storage
+
+    def _create_enhanced_frame(self, ucf_state: Dict[str, Any], iteration: int) -> Path:
+        """
+        Create a single fractal frame with enhanced UCF visualization and save it.
+        MEME SYNC: Added 'Tat Tvam Asi' mantra overlay with cyan glow for enhanced visibility.
+        """
+        frame_path = self.output_dir / f"samsara_frame_{iteration:04d}_{int(datetime.utcnow().timestamp())}.png"
+        frame_path.write_bytes(render_frame_png(ucf_state, self.dpi))
         return frame_path
 
-    async def run_visualization_cycle(self, ucf_state: Dict[str, Any], frames: int = 1) -> Path:
+    async def render_cycle(
+        self,
+        ucf_state: Dict[str, Any],
+        frames: int = 1,
+        fmt: str = "gif",
+        fps: int = ANIMATION_FPS,
+        upload_dir: Optional[str] = None,
+    ) -> FrameCycle:
+        """
+        Render a cycle of frames off the event loop and encode it in memory.
+
+        Multi-frame cycles render on the shared process pool with at most
+        ``workers`` frames in flight; frames are consumed in order, fed to
+        the encoder on a thread and, when ``upload_dir`` is set, uploaded
+        while the remaining frames render.
+
+        Args:
+            ucf_state: Dictionary containing UCF state variables
+            frames: Number of frames to generate
+            fmt: Animation format for multi-frame cycles (gif, webp, webm)
+            fps: Animation frames per second
+            upload_dir: Remote directory to upload frames and animation to (None skips uploads)
+
+        Returns:
+            FrameCycle with the PNG frames, the encoded animation and timings
+        """
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        encoder = AnimationEncoder(fmt, fps) if frames > 1 else None
+        stamp = int(datetime.utcnow().timestamp())
+
+        in_flight = asyncio.Semaphore(self.workers or FRAME_POOL_WORKERS)
+
+        async def render(state: Dict[str, Any]) -> bytes:
+            async with in_flight:
+                if frames > 1:
+                    return await asyncio.wrap_future(_submit_frame(state, self.dpi))
+                # Default thread pool: not worth a process for one frame
+                return await loop.run_in_executor(None, render_frame_png, state, self.dpi)
+
+        pending = [asyncio.ensure_future(render(state)) for state in frame_states(ucf_state, frames)]
+
+        rendered, uploads = [], []
+        try:
+            for i, future in enumerate(pending):
+                png = await future
+                rendered.append(png)
+                if upload_dir:
+                    uploads.append(_spawn_background(
+                        _upload_quietly(self.storage, png, f"samsara_frame_{i:04d}_{stamp}.png", upload_dir)
+                    ))
+                if encoder is not None:
+                    await loop.run_in_executor(None, encoder.add, png)
+            animation = await loop.run_in_executor(None, encoder.finish) if encoder is not None else None
+        except BaseException:
+            # A failed or cancelled cycle must not leave ffmpeg and its reader thread behind
+            if encoder is not None:
+                encoder.close()
+            raise
+        finally:
+            for future in pending:
+                future.cancel()
+
+        seconds = time.perf_counter() - started
+        if animation is not None and upload_dir:
+            uploads.append(_spawn_background(
+                _upload_quietly(self.storage, animation, f"samsara_cycle_{stamp}.{fmt}", upload_dir)
+            ))
+
+        return FrameCycle(rendered, animation, fmt, seconds, list(await asyncio.gather(*uploads)))
+
+    async def run_visualization_cycle(self, ucf_state: Dict[str, Any], frames: int = 1, fmt: str = "gif") -> Path:
         """
         Run a complete Samsara visualization cycle.
 
         Args:
             ucf_state: Dictionary containing UCF state variables
             frames: Number of frames to generate (default: 1 for single image)
+            fmt: Animation format for multi-frame cycles (gif, webp, webm)
 
         Returns:
-            Path to the generated visualization file
+            Path to the generated visualization file (PNG frame or encoded animation)
         """
         print(f"🎨 Starting Samsara visualization cycle with {frames} frames")
+        cycle = await self.render_cycle(ucf_state, frames, fmt)
+        stamp = int(datetime.utcnow().timestamp())
 
-        # For single frame, just generate one image
-        if frames == 1:
-            frame_path = self._create_enhanced_frame(ucf_state, 0)
-            print(f"✅ Samsara visualization complete: {frame_path}")
-            return frame_path
-
-        # For multiple frames, generate sequence (future enhancement)
-        frame_paths = []
-        for i in range(frames):
-            # Slightly modify UCF state for each frame to create animation effect
-            modified_state = ucf_state.copy()
-            modified_state["harmony"] += np.sin(i * 0.1) * 0.05
-            modified_state["prana"] += np.cos(i * 0.1) * 0.05
-
-            frame_path = self._create_enhanced_frame(modified_state, i)
-            frame_paths.append(frame_path)
-
-            # Small delay to prevent overwhelming the system
-            await asyncio.sleep(0.1)
+        if cycle.animation is None:
+            path, data = self.output_dir / f"samsara_frame_0000_{stamp}.png", cycle.frames[0]
+        else:
+            path, data = self.output_dir / f"samsara_cycle_{stamp}.{fmt}", cycle.animation
+        await asyncio.to_thread(path.write_bytes, data)
 
-        print(f"✅ Samsara visualization sequence complete: {len(frame_paths)} frames")
-        return frame_paths[-1]  # Return the last frame path
+        print(f"✅ Samsara visualization complete: {path} ({cycle.frames_per_second:.2f} frames/s)")
+        return path
 
 
 # Public interface functions
@@ -217,20 +539,23 @@ async def run_visualization_cycle(ucf_state: Dict[str, Any], frames: int = 1) ->
         frame_path = await run_visualization_cycle(ucf_state)
     """
     renderer = SamsaraRenderer()
-    return await renderer.run_visualization_cycle(ucf_state)
+    return await renderer.run_visualization_cycle(ucf_state, frames)
 
 
 async def generate_and_post_to_discord(ucf_state: Dict[str, Any], channel) -> Optional[Path]:
     """
     Generate Samsara fractal and post directly to Discord channel.
-    Cleans up local file after posting to save ephemeral storage.
+
+    Rendering runs off the event loop and the PNG is posted from memory. In
+    cloud storage modes the upload runs in the background after posting and
+    nothing touches local disk; in local mode a copy is kept.
 
     Args:
         ucf_state: UCF state dictionary
         channel: Discord channel object to post to
 
     Returns:
-        Path to saved file (before cleanup) or None on error
+        Path of the local copy (local mode) or remote location (cloud modes), None on error
 
     Usage:
         from .samsara_bridge import generate_and_post_to_discord
@@ -241,7 +566,9 @@ async def generate_and_post_to_discord(ucf_state: Dict[str, Any], channel) -> Op
     try:
         # Generate fractal
         renderer = SamsaraRenderer()
-        frame_path = await renderer.run_visualization_cycle(ucf_state)
+        cycle = await renderer.render_cycle(ucf_state)
+        png = cycle.frames[0]
+        filename = f"samsara_frame_0000_{int(datetime.utcnow().timestamp())}.png"
 
         # Create Discord embed with UCF metrics
         embed = discord.Embed(
@@ -261,34 +588,24 @@ async def generate_and_post_to_discord(ucf_state: Dict[str, Any], channel) -> Op
 
         embed.set_footer(text="Tat Tvam Asi 🙏 • Ω-Bridge Visualization")
 
-        # Post to Discord with file
-        discord_file = discord.File(frame_path, filename="samsara_fractal.png")
+        # Post to Discord with the in-memory file
+        discord_file = discord.File(io.BytesIO(png), filename="samsara_fractal.png")
         embed.set_image(url="attachment://samsara_fractal.png")
         await channel.send(embed=embed, file=discord_file)
 
         print(f"🎨 Samsara fractal posted to Discord: #{channel.name}")
 
-        # Upload to cloud storage if configured
+        # Upload to cloud storage if configured, without holding up the bot
         storage_mode = os.getenv("HELIX_STORAGE_MODE", "local")
         if storage_mode in ["nextcloud", "mega"]:
-            try:
-                storage = HelixStorageAdapterAsync()
-                await storage.upload(str(frame_path), "samsara_visuals")
-                print(f"☁️  Uploaded to {storage_mode}")
-            except Exception as e:
-                print(f"⚠️  Cloud upload failed: {e}")
-
-        # Clean up local file to save Railway ephemeral storage
-        # (Keep only if cloud storage failed and mode is local)
-        if storage_mode == "local":
-            print(f"💾 Keeping local copy: {frame_path}")
-        else:
-            try:
-                os.remove(frame_path)
-                print(f"🧹 Cleaned up ephemeral file: {frame_path}")
-            except Exception as e:
-                print(f"⚠️  Cleanup failed: {e}")
-
+            _spawn_background(_upload_quietly(renderer.storage, png, filename, "samsara_visuals"))
+            print(f"☁️  Uploading to {storage_mode} in the background")
+            return Path("samsara_visuals") / filename
+
+        # Local mode keeps a copy
+        frame_path = renderer.output_dir / filename
+        await asyncio.to_thread(frame_path.write_bytes, png)
+        print(f"💾 Keeping local copy: {frame_path}")
         return frame_path
 
     except Exception as e:
@@ -401,8 +718,14 @@ except ImportError:
     PIL_AVAILABLE = False
 
 
+# Rendered Mandelbrot PNGs are cached per quantised UCF state: states that
+# differ by less than a pixel's worth of pan/zoom reuse the same image
+PIL_PNG_CACHE_SIZE = 64
+UCF_CACHE_DECIMALS = 3
+
+
 def generate_pil_mandelbrot(
-    width: int = 512, height: int = 512, ucf_state: Optional[Dict] = None, max_iter: int = 100
+    width: int = 512, height: int = 512, ucf_state: Optional[Dict] = None, max_iter: int = 100, workers: int = 1
 ) -> Optional[Image.Image]:
     """
     Generate Mandelbrot fractal using PIL (alternative to matplotlib version).
@@ -412,6 +735,7 @@ def generate_pil_mandelbrot(
         height: Image height in pixels
         ucf_state: UCF metrics to influence fractal parameters
         max_iter: Maximum iterations for Mandelbrot calculation
+        workers: Processes to render row tiles on (1 renders in-process)
 
     Returns:
         PIL Image object or None if PIL unavailable
@@ -428,54 +752,92 @@ def generate_pil_mandelbrot(
     prana = ucf_state.get("prana", 0.5075)
     drishti = ucf_state.get("drishti", 0.5023)
 
-    # Create image
-    img = Image.new("RGB", (width, height), color="black")
-    pixels = img.load()
-
     # Mandelbrot parameters influenced by UCF
     x_center = -0.5 + (harmony - 0.428) * 0.5
     y_center = 0.0 + (prana - 0.5) * 0.3
     zoom_factor = 1.5 / (zoom * 1.5)
 
-    for x in range(width):
-        for y in range(height):
-            # Map pixel to complex plane
-            zx = zoom_factor * (x - width / 2) / (0.5 * width) + x_center
-            zy = zoom_factor * (y - height / 2) / (0.5 * height) + y_center
+    # Map pixel columns and rows to the complex plane
+    xs = zoom_factor * (np.arange(width) - width / 2) / (0.5 * width) + x_center
+    ys = zoom_factor * (np.arange(height) - height / 2) / (0.5 * height) + y_center
 
-            # Mandelbrot iteration
-            c = complex(zx, zy)
-            z = 0
-            iteration = 0
+    # Mandelbrot iteration (escapes once |z| reaches 2)
+    iterations = escape_time_grid(xs, ys, max_iter, bailout_inclusive=True, workers=workers)
 
-            while abs(z) < 2 and iteration < max_iter:
-                z = z * z + c
-                iteration += 1
+    # Color mapping influenced by drishti
+    ratio = iterations / max_iter
 
-            # Color mapping influenced by drishti
-            if iteration == max_iter:
-                pixels[x, y] = (0, 0, 0)
-            else:
-                ratio = iteration / max_iter
+    # Teal (#00BFA5) to Gold (#FFD700) gradient
+    teal_r, teal_g, teal_b = 0, 191, 165
+    gold_r, gold_g, gold_b = 255, 215, 0
 
-                # Teal (#00BFA5) to Gold (#FFD700) gradient
-                teal_r, teal_g, teal_b = 0, 191, 165
-                gold_r, gold_g, gold_b = 255, 215, 0
+    drishti_factor = drishti * 2
 
-                drishti_factor = drishti * 2
+    channels = [
+        teal_r + (gold_r - teal_r) * ratio * drishti_factor,
+        teal_g + (gold_g - teal_g) * ratio,
+        teal_b + (gold_b - teal_b) * ratio * (1 - drishti_factor * 0.5),
+    ]
+    # Truncate like int() and clamp values
+    rgb = np.clip(np.trunc(np.stack(channels, axis=-1)), 0, 255).astype(np.uint8)
+    rgb[iterations == max_iter] = 0  # Points in the set stay black
 
-                r = int(teal_r + (gold_r - teal_r) * ratio * drishti_factor)
-                g = int(teal_g + (gold_g - teal_g) * ratio)
-                b = int(teal_b + (gold_b - teal_b) * ratio * (1 - drishti_factor * 0.5))
+    return Image.fromarray(rgb)
 
-                # Clamp values
-                r = max(0, min(255, r))
-                g = max(0, min(255, g))
-                b = max(0, min(255, b))
 
-                pixels[x, y] = (r, g, b)
+def quantize_ucf_state(ucf_state: Optional[Dict], decimals: int = UCF_CACHE_DECIMALS) -> Tuple[float, ...]:
+    """
+    Cache key for the UCF fields that shape the Mandelbrot render.
 
-    return img
+    Args:
+        ucf_state: UCF state dict (missing fields use the render defaults)
+        decimals: Decimal places kept per field
+
+    Returns:
+        Rounded (harmony, zoom, prana, drishti)
+    """
+    ucf_state = ucf_state or {}
+    return (
+        round(float(ucf_state.get("harmony", 0.428)), decimals),
+        round(float(ucf_state.get("zoom", 1.0228)), decimals),
+        round(float(ucf_state.get("prana", 0.5075)), decimals),
+        round(float(ucf_state.get("drishti", 0.5023)), decimals),
+    )
+
+
+@functools.lru_cache(maxsize=PIL_PNG_CACHE_SIZE)
+def _render_mandelbrot_png(width: int, height: int, state_key: Tuple[float, ...], max_iter: int) -> bytes:
+    harmony, zoom, prana, drishti = state_key
+    img = generate_pil_mandelbrot(
+        width, height, {"harmony": harmony, "zoom": zoom, "prana": prana, "drishti": drishti}, max_iter
+    )
+    img_bytes = io.BytesIO()
+    img.save(img_bytes, format="PNG")
+    return img_bytes.getvalue()
+
+
+def render_pil_mandelbrot_png(
+    width: int = 512, height: int = 512, ucf_state: Optional[Dict] = None, max_iter: int = 100
+) -> Optional[bytes]:
+    """
+    PNG bytes of the PIL Mandelbrot, served from an LRU cache keyed by quantised UCF state.
+
+    The image is rendered from the quantised state, so every state sharing a
+    cache key gets byte-identical output. ``_render_mandelbrot_png.cache_info()``
+    reports hits and misses.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        ucf_state: UCF metrics to influence fractal parameters
+        max_iter: Maximum iterations for Mandelbrot calculation
+
+    Returns:
+        PNG image bytes or None if PIL unavailable
+    """
+    if not PIL_AVAILABLE:
+        return None
+    return _render_mandelbrot_png(width, height, quantize_ucf_state(ucf_state), max_iter)
 
 
 def generate_pil_ouroboros(width: int = 512, height: int = 512, ucf_state: Optional[Dict] = None) -> Optional[Image.Image]:
@@ -559,29 +921,28 @@ async def generate_pil_fractal_bytes(
     Returns:
         PNG image bytes or None if PIL unavailable
     """
-    import io
-
     if not PIL_AVAILABLE:
         return None
 
     if ucf_state is None:
         ucf_state = {}
 
-    # Generate appropriate fractal
-    if mode == "ouroboros":
-        img = generate_pil_ouroboros(size, size, ucf_state)
-    else:  # mandelbrot
-        img = generate_pil_mandelbrot(size, size, ucf_state)
+    # Generate appropriate fractal (off the event loop)
+    if mode != "ouroboros":  # mandelbrot
+        return await asyncio.to_thread(render_pil_mandelbrot_png, size, size, ucf_state)
 
+    return await asyncio.to_thread(_render_ouroboros_png, size, ucf_state)
+
+
+def _render_ouroboros_png(size: int, ucf_state: Dict) -> Optional[bytes]:
+    img = generate_pil_ouroboros(size, size, ucf_state)
     if img is None:
         return None
 
     # Convert to bytes
     img_bytes = io.BytesIO()
     img.save(img_bytes, format="PNG")
-    img_bytes.seek(0)
-
-    return img_bytes.read()
+    return img_bytes.getvalue()
 
 
 async def generate_pil_and_post_to_discord(ucf_state: Dict[str, Any], channel, mode: str = "ouroboros") -> Optional[bool]:
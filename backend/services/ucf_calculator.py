@@ -5,7 +5,10 @@
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
+
+from backend.core.state_manager import (UCFStateManager, add_bounded_deltas,
+                                        get_state_manager, write_json_atomic)
 
 # ============================================================================
 # PATH DEFINITIONS
@@ -108,70 +111,107 @@ RITUAL_ADJUSTMENTS = {
     "aham_brahmasmi": {"resilience": +0.25, "zoom": +0.1, "description": "Identity phase - divine nature affirmation"},
 }
 
+DEFAULT_STATE = {
+    "zoom": 1.0228,
+    "harmony": 0.355,
+    "resilience": 1.1191,
+    "prana": 0.5175,
+    "drishti": 0.5023,
+    "klesha": 0.010,
+}
+
+FIELD_BOUNDS = {field: (specs.get("min"), specs.get("max")) for field, specs in UCF_FIELD_SPECS.items()}
+
 # ============================================================================
 # UCF CALCULATOR
 # ============================================================================
 
 
 class UCFCalculator:
-    """Manages Universal Consciousness Framework state calculations."""
+    """
+    Manages Universal Consciousness Framework state calculations.
 
-    def __init__(self) -> None:
-        self.state = self.load_state()
+    All mutations go through the shared UCF state service, so they are
+    applied under one lock, versioned and persisted atomically.
+    """
+
+    def __init__(self, store: Optional[UCFStateManager] = None) -> None:
+        self.store = store or get_state_manager()
+        self.load_state()
+
+    @property
+    def state(self) -> Dict[str, float]:
+        """Current UCF state (a copy; mutate through the update methods)."""
+        return self.store.snapshot()
+
+    @property
+    def version(self) -> int:
+        """Version of the UCF state, for compare-and-swap updates."""
+        return self.store.version
 
     def load_state(self) -> Dict[str, float]:
-        """Load UCF state from disk."""
-        if not STATE_PATH.exists():
-            STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
-            default_state = {
-                "zoom": 1.0228,
-                "harmony": 0.355,
-                "resilience": 1.1191,
-                "prana": 0.5175,
-                "drishti": 0.5023,
-                "klesha": 0.010,
-            }
-            with open(STATE_PATH, "w") as f:
-                json.dump(default_state, f, indent=2)
-            return default_state
+        """Load UCF state, writing the defaults if no state exists yet."""
+        if not self.store.is_active and not self.store.state_file_path.exists():
 
-        with open(STATE_PATH) as f:
-            return json.load(f)
+            def write_defaults(state: Dict[str, Any]) -> None:
+                state.clear()
+                state.update(DEFAULT_STATE)
+
+            self.store.mutate(write_defaults)
+        return self.store.snapshot()
 
     def save_state(self) -> None:
-        """Save UCF state to disk."""
-        STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
-        with open(STATE_PATH, "w") as f:
-            json.dump(self.state, f, indent=2)
+        """
+        Persist UCF state now.
+
+        Updates are already persisted by the state service (written through
+        in scripts, flushed once per coalescing window in the app), so this
+        only matters for callers that bypassed it.
+        """
+        if not self.store.is_active:
+            write_json_atomic(self.store.state_file_path, self.store.snapshot())
 
     def get_state(self) -> Dict[str, float]:
         """Get current UCF state."""
-        return self.state.copy()
+        return self.state
+
+    def apply_deltas(
+        self, deltas: Dict[str, float], expected_version: Optional[int] = None
+    ) -> Tuple[int, Dict[str, float]]:
+        """
+        Apply a batch of deltas atomically, clamped to the field specs.
+
+        Args:
+            deltas: UCF field name to amount to add
+            expected_version: Only apply if the state is still at this version
+
+        Returns:
+            The new version and updated state
+
+        Raises:
+            UCFVersionConflict: If expected_version is stale
+        """
+        return self.store.apply_deltas(deltas, bounds=FIELD_BOUNDS, expected_version=expected_version)
 
     def update_harmony(self, delta: float) -> None:
         """Update harmony value (bounded 0-1)."""
-        self.state["harmony"] = max(0.0, min(1.0, self.state["harmony"] + delta))
-        self.save_state()
+        self.apply_deltas({"harmony": delta})
 
     def update_resilience(self, delta: float) -> None:
         """Update resilience value (bounded >= 0)."""
-        self.state["resilience"] = max(0.0, self.state["resilience"] + delta)
-        self.save_state()
+        self.apply_deltas({"resilience": delta})
 
     def update_prana(self, delta: float) -> None:
         """Update prana value (bounded 0-1)."""
-        self.state["prana"] = max(0.0, min(1.0, self.state["prana"] + delta))
-        self.save_state()
+        self.apply_deltas({"prana": delta})
 
     def update_drishti(self, delta: float) -> None:
         """Update drishti (clarity) value (bounded 0-1)."""
-        self.state["drishti"] = max(0.0, min(1.0, self.state["drishti"] + delta))
-        self.save_state()
+        self.apply_deltas({"drishti": delta})
 
     def update_klesha(self, delta: float) -> None:
-        """Update klesha (entropy) value (bounded >= 0)."""
-        self.state["klesha"] = max(0.0, self.state["klesha"] + delta)
-        self.save_state()
+        """Update klesha (entropy) value (bounded 0-1)."""
+        self.apply_deltas({"klesha": delta})
 
     def get_health_status(self) -> Dict[str, Any]:
         """Determine system health based on UCF state."""
@@ -189,35 +229,36 @@ class UCFCalculator:
 
         return {"status": status, "color": color, "harmony": harmony, "timestamp": datetime.utcnow().isoformat()}
 
-    def sync_all(self, updates: Dict[str, float]) -> None:
+    def sync_all(self, updates: Dict[str, float], expected_version: Optional[int] = None) -> None:
         """Sync multiple UCF parameters at once."""
-        for key, value in updates.items():
-            if key in self.state:
-                self.state[key] = value
-        self.save_state()
+
+        def assign(state: Dict[str, Any]) -> None:
+            for key, value in updates.items():
+                if key in state:
+                    state[key] = value
+
+        self.store.mutate(assign, expected_version)
 
     def reset_to_default(self) -> None:
         """Reset UCF state to default values."""
-        self.state = {
-            "zoom": 1.0228,
-            "harmony": 0.355,
-            "resilience": 1.1191,
-            "prana": 0.5175,
-            "drishti": 0.5023,
-            "klesha": 0.010,
-        }
-        self.save_state()
+        self.store.update(DEFAULT_STATE)
 
-    def apply_ritual_adjustment(self, ritual_type: str) -> Dict[str, Any]:
+    def apply_ritual_adjustment(self, ritual_type: str, expected_version: Optional[int] = None) -> Dict[str, Any]:
         """
         Apply ritual-based UCF adjustments.
 
+        All of the ritual's deltas are applied as one atomic batch.
+
         Args:
             ritual_type: Type of ritual ('legend', 'hymn', 'law', 'neti_neti',
                         'tat_tvam_asi', 'aham_brahmasmi')
+            expected_version: Only apply if the state is still at this version
 
         Returns:
             Dictionary with before/after states and description
+
+        Raises:
+            UCFVersionConflict: If expected_version is stale
         """
         if ritual_type not in RITUAL_ADJUSTMENTS:
             return {
@@ -227,37 +268,21 @@ class UCFCalculator:
             }
 
         adjustments = RITUAL_ADJUSTMENTS[ritual_type]
-        before_state = self.get_state()
-
-        # Apply adjustments
-        for field, delta in adjustments.items():
-            if field == "description":
-                continue
-
-            if field in self.state:
-                # Get field specs for bounds
-                specs = UCF_FIELD_SPECS.get(field, {})
-                min_val = specs.get("min", 0.0)
-                max_val = specs.get("max")
-
-                # Apply delta
-                new_value = self.state[field] + delta
-
-                # Apply bounds
-                if min_val is not None:
-                    new_value = max(min_val, new_value)
-                if max_val is not None:
-                    new_value = min(max_val, new_value)
+        deltas = {field: delta for field, delta in adjustments.items() if field != "description"}
+        captured = {}
 
-                self.state[field] = new_value
+        def adjust(state: Dict[str, Any]) -> None:
+            captured["before"] = dict(state)
+            add_bounded_deltas(state, deltas, FIELD_BOUNDS)
 
-        self.save_state()
-        after_state = self.get_state()
+        version, after_state = self.store.mutate(adjust, expected_version)
+        before_state = captured["before"]
 
         return {
             "success": True,
             "ritual_type": ritual_type,
             "description": adjustments.get("description", ""),
+            "version": version,
             "before": before_state,
             "after": after_state,
             "changes": {field: after_state[field] - before_state[field] for field in before_state if field in after_state},
@@ -4,13 +4,24 @@ Helix Collective v15.3 Dual Resonance
 
 Tracks UCF metrics over time, analyzes trends, and provides predictions
 for harmony evolution. Enables proactive maintenance and ritual scheduling.
+
+Storage is a WAL-mode SQLite database accessed through one long-lived
+connection per thread. Trend, prediction and ritual statistics are
+computed by SQL aggregates over the timestamp index; bulk reads can be
+returned as NumPy arrays.
 """
 
 import sqlite3
-import statistics
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Numeric UCF columns, in table order
+METRIC_FIELDS = ("harmony", "resilience", "prana", "drishti", "klesha", "zoom")
+METRIC_COLUMNS = ("timestamp",) + METRIC_FIELDS + ("phase", "context", "agent")
 
 
 class UCFTracker:
@@ -27,65 +38,91 @@ class UCFTracker:
         """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
         self._init_database()
 
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's connection, opened (WAL mode) on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        """Close every connection opened by this tracker."""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     def _init_database(self):
         """Initialize SQLite database with schema."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Create metrics table
-        cursor.execute(
+        with self._conn as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS ucf_metrics (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    harmony REAL NOT NULL,
+                    resilience REAL NOT NULL,
+                    prana REAL NOT NULL,
+                    drishti REAL NOT NULL,
+                    klesha REAL NOT NULL,
+                    zoom REAL NOT NULL,
+                    phase TEXT NOT NULL,
+                    context TEXT,
+                    agent TEXT
+                );
+
+                CREATE TABLE IF NOT EXISTS rituals (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    ritual_name TEXT NOT NULL,
+                    agent_name TEXT NOT NULL,
+                    intention TEXT,
+                    harmony_before REAL NOT NULL,
+                    harmony_after REAL NOT NULL,
+                    success INTEGER NOT NULL
+                );
+
+                -- Time-range scans; harmony is included so trend and
+                -- prediction aggregates are answered from the index alone
+                CREATE INDEX IF NOT EXISTS idx_metrics_timestamp
+                ON ucf_metrics(timestamp);
+
+                CREATE INDEX IF NOT EXISTS idx_metrics_timestamp_harmony
+                ON ucf_metrics(timestamp, harmony);
+
+                CREATE INDEX IF NOT EXISTS idx_rituals_timestamp
+                ON rituals(timestamp);
+
+                CREATE INDEX IF NOT EXISTS idx_rituals_name
+                ON rituals(ritual_name);
             """
-            CREATE TABLE IF NOT EXISTS ucf_metrics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                harmony REAL NOT NULL,
-                resilience REAL NOT NULL,
-                prana REAL NOT NULL,
-                drishti REAL NOT NULL,
-                klesha REAL NOT NULL,
-                zoom REAL NOT NULL,
-                phase TEXT NOT NULL,
-                context TEXT,
-                agent TEXT
             )
-        """
-        )
-
-        # Create rituals table
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS rituals (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                ritual_name TEXT NOT NULL,
-                agent_name TEXT NOT NULL,
-                intention TEXT,
-                harmony_before REAL NOT NULL,
-                harmony_after REAL NOT NULL,
-                success INTEGER NOT NULL
-            )
-        """
-        )
-
-        # Create index on timestamp for faster queries
-        cursor.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_metrics_timestamp
-            ON ucf_metrics(timestamp)
-        """
-        )
-
-        cursor.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_rituals_timestamp
-            ON rituals(timestamp)
-        """
-        )
 
-        conn.commit()
-        conn.close()
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
 
     def record_metrics(
         self,
@@ -98,6 +135,7 @@ class UCFTracker:
         phase: str,
         context: Optional[str] = None,
         agent: Optional[str] = None,
+        timestamp: Optional[datetime] = None,
     ) -> int:
         """
         Record UCF metrics to database.
@@ -112,29 +150,59 @@ class UCFTracker:
             phase: UCF phase
             context: Optional context
             agent: Optional agent name
+            timestamp: When the metrics were observed (defaults to now, UTC)
 
         Returns:
             Record ID
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        timestamp = (timestamp or datetime.utcnow()).isoformat()
+
+        with self._conn as conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO ucf_metrics
+                (timestamp, harmony, resilience, prana, drishti, klesha, zoom, phase, context, agent)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                (timestamp, harmony, resilience, prana, drishti, klesha, zoom, phase, context, agent),
+            )
 
-        timestamp = datetime.utcnow().isoformat()
+        return cursor.lastrowid
 
-        cursor.execute(
-            """
-            INSERT INTO ucf_metrics
-            (timestamp, harmony, resilience, prana, drishti, klesha, zoom, phase, context, agent)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            (timestamp, harmony, resilience, prana, drishti, klesha, zoom, phase, context, agent),
-        )
+    def record_metrics_many(self, records: Iterable[Dict]) -> int:
+        """
+        Record many UCF snapshots in a single transaction (e.g. backfills).
+
+        Args:
+            records: Dicts with the record_metrics fields; "timestamp" may be
+                a datetime or ISO string and defaults to now
+
+        Returns:
+            Number of records written
+        """
+        now = datetime.utcnow().isoformat()
+        rows = []
+        for record in records:
+            timestamp = record.get("timestamp") or now
+            if isinstance(timestamp, datetime):
+                timestamp = timestamp.isoformat()
+            rows.append(
+                (timestamp,)
+                + tuple(record[field] for field in METRIC_FIELDS)
+                + (record["phase"], record.get("context"), record.get("agent"))
+            )
 
-        record_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with self._conn as conn:
+            conn.executemany(
+                """
+                INSERT INTO ucf_metrics
+                (timestamp, harmony, resilience, prana, drishti, klesha, zoom, phase, context, agent)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                rows,
+            )
 
-        return record_id
+        return len(rows)
 
     def record_ritual(
         self,
@@ -159,25 +227,23 @@ class UCFTracker:
         Returns:
             Record ID
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
         timestamp = datetime.utcnow().isoformat()
 
-        cursor.execute(
-            """
-            INSERT INTO rituals
-            (timestamp, ritual_name, agent_name, intention, harmony_before, harmony_after, success)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """,
-            (timestamp, ritual_name, agent_name, intention, harmony_before, harmony_after, int(success)),
-        )
+        with self._conn as conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO rituals
+                (timestamp, ritual_name, agent_name, intention, harmony_before, harmony_after, success)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+                (timestamp, ritual_name, agent_name, intention, harmony_before, harmony_after, int(success)),
+            )
 
-        record_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        return cursor.lastrowid
 
-        return record_id
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
 
     def get_recent_metrics(self, limit: int = 100) -> List[Dict]:
         """
@@ -189,10 +255,7 @@ class UCFTracker:
         Returns:
             List of metric dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
+        rows = self._conn.execute(
             """
             SELECT timestamp, harmony, resilience, prana, drishti, klesha, zoom, phase, context, agent
             FROM ucf_metrics
@@ -200,29 +263,9 @@ class UCFTracker:
             LIMIT ?
         """,
             (limit,),
-        )
+        ).fetchall()
 
-        rows = cursor.fetchall()
-        conn.close()
-
-        metrics = []
-        for row in rows:
-            metrics.append(
-                {
-                    "timestamp": row[0],
-                    "harmony": row[1],
-                    "resilience": row[2],
-                    "prana": row[3],
-                    "drishti": row[4],
-                    "klesha": row[5],
-                    "zoom": row[6],
-                    "phase": row[7],
-                    "context": row[8],
-                    "agent": row[9],
-                }
-            )
-
-        return metrics
+        return [dict(zip(METRIC_COLUMNS, row)) for row in rows]
 
     def get_metrics_in_range(self, start_time: datetime, end_time: datetime) -> List[Dict]:
         """
@@ -235,10 +278,7 @@ class UCFTracker:
         Returns:
             List of metric dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
+        rows = self._conn.execute(
             """
             SELECT timestamp, harmony, resilience, prana, drishti, klesha, zoom, phase, context, agent
             FROM ucf_metrics
@@ -246,29 +286,51 @@ class UCFTracker:
             ORDER BY timestamp ASC
         """,
             (start_time.isoformat(), end_time.isoformat()),
-        )
+        ).fetchall()
 
-        rows = cursor.fetchall()
-        conn.close()
+        return [dict(zip(METRIC_COLUMNS, row)) for row in rows]
 
-        metrics = []
-        for row in rows:
-            metrics.append(
-                {
-                    "timestamp": row[0],
-                    "harmony": row[1],
-                    "resilience": row[2],
-                    "prana": row[3],
-                    "drishti": row[4],
-                    "klesha": row[5],
-                    "zoom": row[6],
-                    "phase": row[7],
-                    "context": row[8],
-                    "agent": row[9],
-                }
-            )
+    def get_metrics_arrays(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        fields: Sequence[str] = METRIC_FIELDS,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Get UCF metrics within a time range as column arrays.
+
+        Args:
+            start_time: Start of time range
+            end_time: End of time range
+            fields: Numeric fields to return (subset of METRIC_FIELDS)
+
+        Returns:
+            {"timestamp": datetime64[us] array, field: float64 array, ...}
+        """
+        unknown = set(fields) - set(METRIC_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown UCF fields: {sorted(unknown)}")
 
-        return metrics
+        rows = self._conn.execute(
+            f"""
+            SELECT timestamp, {", ".join(fields)}
+            FROM ucf_metrics
+            WHERE timestamp BETWEEN ? AND ?
+            ORDER BY timestamp ASC
+        """,
+            (start_time.isoformat(), end_time.isoformat()),
+        ).fetchall()
+
+        if not rows:
+            arrays = {"timestamp": np.array([], dtype="datetime64[us]")}
+            arrays.update((field, np.array([], dtype=np.float64)) for field in fields)
+            return arrays
+
+        timestamps, *columns = zip(*rows)
+        arrays = {"timestamp": np.array(timestamps, dtype="datetime64[us]")}
+        values = np.array(columns, dtype=np.float64)
+        arrays.update(zip(fields, values))
+        return arrays
 
     def get_harmony_trend(self, hours: int = 24) -> Dict:
         """
@@ -282,10 +344,18 @@ class UCFTracker:
         """
         end_time = datetime.utcnow()
         start_time = end_time - timedelta(hours=hours)
+        window = (start_time.isoformat(), end_time.isoformat())
 
-        metrics = self.get_metrics_in_range(start_time, end_time)
+        count, average, min_val, max_val = self._conn.execute(
+            """
+            SELECT COUNT(*), AVG(harmony), MIN(harmony), MAX(harmony)
+            FROM ucf_metrics
+            WHERE timestamp BETWEEN ? AND ?
+        """,
+            window,
+        ).fetchone()
 
-        if not metrics:
+        if not count:
             return {
                 "trend": "UNKNOWN",
                 "direction": "STABLE",
@@ -297,15 +367,10 @@ class UCFTracker:
                 "data_points": 0,
             }
 
-        harmony_values = [m["harmony"] for m in metrics]
-
-        current = harmony_values[-1] if harmony_values else 0.0
-        average = statistics.mean(harmony_values) if harmony_values else 0.0
-        min_val = min(harmony_values) if harmony_values else 0.0
-        max_val = max(harmony_values) if harmony_values else 0.0
+        first, current = self._range_endpoints(*window)
 
         # Calculate change from first to last
-        change = harmony_values[-1] - harmony_values[0] if len(harmony_values) > 1 else 0.0
+        change = current - first if count > 1 else 0.0
 
         # Determine direction
         if change > 0.01:
@@ -333,14 +398,37 @@ class UCFTracker:
             "min": min_val,
             "max": max_val,
             "change": change,
-            "data_points": len(harmony_values),
+            "data_points": count,
             "timespan_hours": hours,
         }
 
+    def _range_endpoints(self, start: str, end: str) -> Tuple[float, float]:
+        """Harmony of the first and last records in [start, end] (two index seeks)."""
+        first = self._conn.execute(
+            """
+            SELECT harmony FROM ucf_metrics
+            WHERE timestamp BETWEEN ? AND ?
+            ORDER BY timestamp ASC, id ASC LIMIT 1
+        """,
+            (start, end),
+        ).fetchone()[0]
+        last = self._conn.execute(
+            """
+            SELECT harmony FROM ucf_metrics
+            WHERE timestamp BETWEEN ? AND ?
+            ORDER BY timestamp DESC, id DESC LIMIT 1
+        """,
+            (start, end),
+        ).fetchone()[0]
+        return first, last
+
     def predict_harmony(self, hours_ahead: int = 24) -> Dict:
         """
         Predict future harmony using simple linear regression.
 
+        The regression sums (n, Σy, Σy², Σxy with x the record's position in
+        the window) are computed in SQL, so no rows are transferred.
+
         Args:
             hours_ahead: Hours to predict ahead
 
@@ -350,28 +438,33 @@ class UCFTracker:
         # Get last 48 hours of data
         end_time = datetime.utcnow()
         start_time = end_time - timedelta(hours=48)
+        window = (start_time.isoformat(), end_time.isoformat())
 
-        metrics = self.get_metrics_in_range(start_time, end_time)
+        n, sum_y, sum_yy, sum_xy = self._conn.execute(
+            """
+            SELECT COUNT(*), SUM(harmony), SUM(harmony * harmony), SUM(x * harmony)
+            FROM (
+                SELECT harmony, ROW_NUMBER() OVER (ORDER BY timestamp, id) - 1 AS x
+                FROM ucf_metrics
+                WHERE timestamp BETWEEN ? AND ?
+            )
+        """,
+            window,
+        ).fetchone()
 
-        if len(metrics) < 2:
+        if n < 2:
             return {
                 "predicted_harmony": 0.0,
                 "confidence": "LOW",
                 "hours_ahead": hours_ahead,
-                "data_points": len(metrics),
+                "data_points": n,
             }
 
-        # Simple linear regression
-        harmony_values = [m["harmony"] for m in metrics]
-        n = len(harmony_values)
-
-        # Calculate slope
-        x_values = list(range(n))
-        x_mean = statistics.mean(x_values)
-        y_mean = statistics.mean(harmony_values)
-
-        numerator = sum((x - x_mean) * (y - y_mean) for x, y in zip(x_values, harmony_values))
-        denominator = sum((x - x_mean) ** 2 for x in x_values)
+        # Simple linear regression; x = 0..n-1 so its sums are closed-form
+        x_mean = (n - 1) / 2
+        y_mean = sum_y / n
+        numerator = sum_xy - n * x_mean * y_mean
+        denominator = n * (n * n - 1) / 12
 
         slope = numerator / denominator if denominator != 0 else 0
         intercept = y_mean - slope * x_mean
@@ -383,8 +476,8 @@ class UCFTracker:
         # Clamp to valid range
         predicted = max(0.0, min(1.0, predicted))
 
-        # Calculate confidence based on data variance
-        variance = statistics.variance(harmony_values) if len(harmony_values) > 1 else 1.0
+        # Calculate confidence based on data variance (sample variance)
+        variance = max(0.0, (sum_yy - n * y_mean * y_mean) / (n - 1))
 
         if variance < 0.01:
             confidence = "HIGH"
@@ -399,7 +492,7 @@ class UCFTracker:
             "hours_ahead": hours_ahead,
             "data_points": n,
             "slope": slope,
-            "current": harmony_values[-1],
+            "current": self._range_endpoints(*window)[1],
         }
 
     def get_ritual_history(self, limit: int = 50) -> List[Dict]:
@@ -412,10 +505,7 @@ class UCFTracker:
         Returns:
             List of ritual dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
+        rows = self._conn.execute(
             """
             SELECT timestamp, ritual_name, agent_name, intention,
                    harmony_before, harmony_after, success
@@ -424,10 +514,7 @@ class UCFTracker:
             LIMIT ?
         """,
             (limit,),
-        )
-
-        rows = cursor.fetchall()
-        conn.close()
+        ).fetchall()
 
         rituals = []
         for row in rows:
@@ -456,22 +543,19 @@ class UCFTracker:
         Returns:
             Effectiveness analysis dictionary
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
+        executions, successes, average_delta, min_delta, max_delta = self._conn.execute(
             """
-            SELECT harmony_before, harmony_after, success
+            SELECT COUNT(*), SUM(success != 0),
+                   AVG(harmony_after - harmony_before),
+                   MIN(harmony_after - harmony_before),
+                   MAX(harmony_after - harmony_before)
             FROM rituals
             WHERE ritual_name = ?
         """,
             (ritual_name,),
-        )
-
-        rows = cursor.fetchall()
-        conn.close()
+        ).fetchone()
 
-        if not rows:
+        if not executions:
             return {
                 "ritual_name": ritual_name,
                 "executions": 0,
@@ -480,12 +564,7 @@ class UCFTracker:
                 "effectiveness": "UNKNOWN",
             }
 
-        deltas = [after - before for before, after, _ in rows]
-        successes = sum(1 for _, _, success in rows if success)
-
-        executions = len(rows)
-        success_rate = successes / executions if executions > 0 else 0.0
-        average_delta = statistics.mean(deltas) if deltas else 0.0
+        success_rate = successes / executions
 
         # Determine effectiveness
         if success_rate >= 0.8 and average_delta >= 0.05:
@@ -503,8 +582,8 @@ class UCFTracker:
             "success_rate": success_rate,
             "average_delta": average_delta,
             "effectiveness": effectiveness,
-            "min_delta": min(deltas) if deltas else 0.0,
-            "max_delta": max(deltas) if deltas else 0.0,
+            "min_delta": min_delta,
+            "max_delta": max_delta,
         }
 
     def should_trigger_ritual(self, harmony_threshold: float = 0.40) -> Tuple[bool, str]:
@@ -14,6 +14,8 @@ from pathlib import Path
 from typing import Dict, List
 
 from backend.config_manager import config
+from backend.core.state_manager import get_state_manager
+from backend.services.ucf_calculator import FIELD_BOUNDS
 
 
 class UCFState:
@@ -276,6 +278,7 @@ class Z88RitualEngine:
         results = {"cycle_id": datetime.utcnow().isoformat(), "steps": steps, "events": [], "ucf_final": None}
 
         ucf = UCFState()
+        ucf_start = ucf.to_dict()
         self._write_diary(f"=== Ritual Cycle Start ({steps} steps) ===")
 
         for step in range(steps):
@@ -293,6 +296,9 @@ class Z88RitualEngine:
                     ucf.adjust(event_result["new_status"])
 
         results["ucf_final"] = ucf.to_dict()
+        results["ucf_deltas"] = {
+            field: value - ucf_start[field] for field, value in results["ucf_final"].items() if value != ucf_start[field]
+        }
         self._write_diary("=== Ritual Cycle Complete ===")
         self._write_diary(f"Final UCF: {results['ucf_final']}")
 
@@ -358,13 +364,12 @@ def execute_ritual(steps: int = 108) -> Dict:
     engine = Z88RitualEngine()
     result = engine.run_ritual_cycle(steps)
 
-    # Save the final UCF state to file
-    state_path = Path("Helix/state/ucf_state.json")
-    state_path.parent.mkdir(parents=True, exist_ok=True)
-
+    # Apply the ritual's adjustments as deltas through the state service: this
+    # runs on a worker thread, and changes committed while the ritual ran must
+    # be kept rather than overwritten with values computed before them
     try:
-        with open(state_path, "w") as f:
-            json.dump(result["ucf_final"], f, indent=2)
+        _, state = get_state_manager().apply_deltas(result["ucf_deltas"], bounds=FIELD_BOUNDS)
+        result["ucf_final"] = {field: state.get(field, value) for field, value in result["ucf_final"].items()}
     except Exception as e:
         print(f"⚠ Error saving UCF state: {e}")
 
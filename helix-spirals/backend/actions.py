@@ -7,16 +7,17 @@ import asyncio
 import json
 import logging
 import os
-import smtplib
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import asyncpg
-import httpx
 import redis.asyncio as redis
 
+from .compiler import CompiledConfig, copy_containers
+from .expressions import compile_expression, compile_field_template
 from .models import (Action, ActionType, AlertAgentConfig,
                      ConditionalBranchConfig, DelayConfig, ExecutionContext,
                      LogEventConfig, ParallelExecuteConfig, SendDiscordConfig,
@@ -30,14 +31,14 @@ class ActionExecutor:
     
     def __init__(self, engine):
         self.engine = engine
-        self.http_client = httpx.AsyncClient(timeout=30.0)
+        self.http_client = engine.http_client
+        self._compiled_configs: "OrderedDict[str, Tuple[Any, CompiledConfig]]" = OrderedDict()
+        self.max_compiled_configs = 4096
         
     async def execute(self, action: Action, context: ExecutionContext) -> Any:
         """Execute an action based on its type"""
-        config = action.config
-        
         # Resolve variables in config
-        resolved_config = self._resolve_config_variables(config.dict(), context)
+        resolved_config = self._resolve_config_variables(action, context)
         
         action_map = {
             ActionType.SEND_WEBHOOK: self._execute_send_webhook,
@@ -61,7 +62,7 @@ class ActionExecutor:
         result = await executor(resolved_config, context)
         
         # Store result in context variables
-        context.variables[f"action_{action.id}_result"] = result
+        context.set_variable(f"action_{action.id}_result", result)
         
         return result
     
@@ -403,7 +404,7 @@ class ActionExecutor:
             if transform_type == "map":
                 # Apply mapping with consciousness context
                 field = transform_config["field"]
-                expression = transform_config["expression"]
+                expression = compile_expression(transform_config["expression"])
                 if field in data:
                     # Add consciousness level to evaluation context
                     eval_context = {
@@ -412,32 +413,29 @@ class ActionExecutor:
                         "consciousness_level": context.variables.get("consciousness_level", 5),
                         "ucf_impact": context.ucf_impact if hasattr(context, 'ucf_impact') else {}
                     }
-                    data[field] = eval(expression, {"__builtins__": {}}, eval_context)
+                    data[field] = expression.evaluate(eval_context)
             
             elif transform_type == "filter":
                 # Filter data with consciousness awareness
-                condition = transform_config["condition"]
+                condition = compile_expression(transform_config["condition"])
                 if isinstance(data, list):
-                    data = [item for item in data if eval(condition, {"__builtins__": {}}, {
-                        "item": item,
+                    data = condition.filter(data, {
                         "consciousness_level": context.variables.get("consciousness_level", 5)
-                    })]
+                    })
             
             elif transform_type == "template":
                 # Apply template with full context
-                template = transform_config["template"]
+                template = compile_field_template(transform_config["template"])
                 template_vars = {
                     **data,
                     "consciousness_level": context.variables.get("consciousness_level", 5),
                     "spiral_id": context.spiral_id,
                     "execution_id": context.execution_id
                 }
-                for key, value in template_vars.items():
-                    template = template.replace(f"{{{key}}}", str(value))
-                data = template
+                data = template.render(template_vars)
         
         # Update context variables
-        context.variables["transformed_data"] = data
+        context.set_variable("transformed_data", data)
         
         return data
     
@@ -505,18 +503,14 @@ class ActionExecutor:
     
     async def _execute_send_email(self, config: Dict, context: ExecutionContext) -> None:
         """Send email action - consciousness-aware email delivery"""
-        # Use environment SMTP configuration
-        smtp_host = os.getenv("SMTP_HOST", "smtp.gmail.com")
-        smtp_port = int(os.getenv("SMTP_PORT", "587"))
-        smtp_user = os.getenv("SMTP_USER")
-        smtp_pass = os.getenv("SMTP_PASS")
+        smtp_pool = self.engine.smtp_pool
         
-        if not smtp_user or not smtp_pass:
+        if not smtp_pool.configured:
             logger.warning("SMTP not configured, skipping email")
             return
         
         msg = MIMEMultipart()
-        msg["From"] = smtp_user
+        msg["From"] = smtp_pool.user
         msg["To"] = ", ".join(config["to"])
         msg["Subject"] = config["subject"]
         
@@ -541,32 +535,40 @@ class ActionExecutor:
         
         msg.attach(MIMEText(body, "html" if config.get("is_html") else "plain"))
         
-        # Send email
-        with smtplib.SMTP(smtp_host, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_user, smtp_pass)
-            
-            recipients = config["to"] + config.get("cc", []) + config.get("bcc", [])
-            server.send_message(msg, to_addrs=recipients)
+        # Send email over a pooled connection, off the event loop
+        recipients = config["to"] + config.get("cc", []) + config.get("bcc", [])
+        await smtp_pool.send_message(msg, recipients)
         
         logger.info(f"Email sent to {len(recipients)} recipients with consciousness level {consciousness_level}")
     
-    def _resolve_config_variables(self, config: Dict, context: ExecutionContext) -> Dict:
-        """Resolve variables in action configuration"""
-        def resolve_value(value):
-            if isinstance(value, str):
-                # Handle template variables
-                if "{{" in value and "}}" in value:
-                    for var_name, var_value in context.variables.items():
-                        value = value.replace(f"{{{{{var_name}}}}}", str(var_value))
-                return value
-            elif isinstance(value, dict):
-                return {k: resolve_value(v) for k, v in value.items()}
-            elif isinstance(value, list):
-                return [resolve_value(v) for v in value]
-            return value
-        
-        return resolve_value(config)
+    def _resolve_config_variables(self, action: Action, context: ExecutionContext) -> Dict:
+        """Resolve variables in action configuration
+        
+        Renders are reused within an execution until a variable changes,
+        e.g. across retries of the same action.
+        """
+        compiled = self._compile_config(action)
+        if not compiled.has_variables:
+            return compiled.render(context.variables)
+        
+        cached = context.rendered_configs.get(action.id)
+        if cached is None or cached[0] != context.variables_version:
+            cached = (context.variables_version, compiled.render(context.variables))
+            context.rendered_configs[action.id] = cached
+        return copy_containers(cached[1])
+    
+    def _compile_config(self, action: Action) -> CompiledConfig:
+        """Get the compiled config for an action, recompiling if its config changed"""
+        entry = self._compiled_configs.get(action.id)
+        if entry is not None and entry[0] is action.config:
+            self._compiled_configs.move_to_end(action.id)
+            return entry[1]
+        
+        compiled = CompiledConfig(action.config.dict())
+        self._compiled_configs[action.id] = (action.config, compiled)
+        if len(self._compiled_configs) > self.max_compiled_configs:
+            self._compiled_configs.popitem(last=False)
+        return compiled
     
     def _get_consciousness_emoji(self, level: int) -> str:
         """Get emoji based on consciousness level"""
@@ -0,0 +1,335 @@
+"""
+🌀 Helix Spirals Compiler
+Turns Spiral definitions into cached execution plans
+"""
+
+import logging
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from .models import (Action, Condition, ConditionOperator, ExecutionContext,
+                     LogicalOperator, Spiral)
+
+logger = logging.getLogger(__name__)
+
+_TEMPLATE_PATTERN = re.compile(r"\{\{(.*?)\}\}")
+_CONTEXT_FIELDS = frozenset(ExecutionContext.model_fields)
+_MISSING = object()
+
+
+class VariableRef:
+    """A `{{name}}` placeholder inside a template"""
+
+    __slots__ = ("name", "path", "raw")
+
+    def __init__(self, name: str, raw: str):
+        self.name = name
+        self.path: Tuple[str, ...] = tuple(name.split("."))
+        self.raw = raw
+
+
+class CompiledTemplate:
+    """A `{{var}}` template parsed into literal and variable segments once"""
+
+    __slots__ = ("source", "segments", "single_ref")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.segments: List[Union[str, VariableRef]] = []
+
+        position = 0
+        for match in _TEMPLATE_PATTERN.finditer(source):
+            if match.start() > position:
+                self.segments.append(source[position:match.start()])
+            self.segments.append(VariableRef(match.group(1).strip(), match.group(0)))
+            position = match.end()
+        if position < len(source):
+            self.segments.append(source[position:])
+
+        # A template that is exactly one placeholder resolves to the raw value
+        self.single_ref: Optional[VariableRef] = None
+        if source.startswith("{{") and source.endswith("}}"):
+            self.single_ref = VariableRef(source[2:-2].strip(), source)
+
+    @property
+    def has_variables(self) -> bool:
+        return any(isinstance(segment, VariableRef) for segment in self.segments)
+
+    def render(self, variables: Dict[str, Any]) -> str:
+        """Substitute every placeholder in one pass, leaving unresolved ones as written"""
+        parts = []
+        for segment in self.segments:
+            if isinstance(segment, str):
+                parts.append(segment)
+            else:
+                value = resolve_ref(variables, segment)
+                parts.append(segment.raw if value is _MISSING else str(value))
+        return "".join(parts)
+
+
+def resolve_ref(variables: Dict[str, Any], ref: VariableRef) -> Any:
+    """Look up a placeholder, walking dotted paths into nested data"""
+    value = variables.get(ref.name, _MISSING)
+    if value is not _MISSING or len(ref.path) == 1:
+        return value
+
+    value = variables.get(ref.path[0], _MISSING)
+    for part in ref.path[1:]:
+        if isinstance(value, dict):
+            value = value.get(part, _MISSING)
+        elif isinstance(value, list) and part.lstrip("-").isdigit() and -len(value) <= int(part) < len(value):
+            value = value[int(part)]
+        elif isinstance(value, BaseModel) and part in type(value).model_fields:
+            value = getattr(value, part)
+        else:
+            return _MISSING
+        if value is _MISSING:
+            return value
+    return value
+
+
+def compile_value(value: Any) -> Callable[[Dict[str, Any]], Any]:
+    """Compile a condition value into a resolver over execution variables"""
+    resolver = _compile_dynamic(value)
+    if resolver is None:
+        return lambda variables: value
+    return resolver
+
+
+def _compile_dynamic(value: Any) -> Optional[Callable[[Dict[str, Any]], Any]]:
+    """Return a resolver for values that reference variables, None for constants"""
+    if isinstance(value, str):
+        ref = CompiledTemplate(value).single_ref
+        if ref is None:
+            return None
+        name = ref.name
+        return lambda variables: variables.get(name, value)
+
+    if isinstance(value, dict):
+        resolvers = {k: _compile_dynamic(v) for k, v in value.items()}
+        if not any(resolvers.values()):
+            return None
+        return lambda variables: {
+            k: (r(variables) if r else value[k]) for k, r in resolvers.items()
+        }
+
+    if isinstance(value, list):
+        resolvers = [_compile_dynamic(v) for v in value]
+        if not any(resolvers):
+            return None
+        return lambda variables: [
+            r(variables) if r else item for r, item in zip(resolvers, value)
+        ]
+
+    return None
+
+
+class CompiledConfig:
+    """An action config with its `{{var}}` templates parsed once
+
+    Rendering always builds fresh dicts and lists, so executors can mutate
+    the result without touching the compiled config or other renders.
+    """
+
+    __slots__ = ("source", "has_variables", "_render")
+
+    def __init__(self, config: Dict[str, Any]):
+        self.source = config
+        renderer = _compile_renderer(config)
+        self.has_variables = renderer is not None
+        self._render = renderer or (lambda variables: copy_containers(config))
+
+    def render(self, variables: Dict[str, Any]) -> Dict[str, Any]:
+        return self._render(variables)
+
+
+def copy_containers(value: Any) -> Any:
+    """Copy nested dicts and lists, sharing the leaf values"""
+    if isinstance(value, dict):
+        return {k: copy_containers(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [copy_containers(v) for v in value]
+    return value
+
+
+def _compile_renderer(value: Any) -> Optional[Callable[[Dict[str, Any]], Any]]:
+    """Return a renderer for values containing templates, None for constants"""
+    if isinstance(value, str):
+        if "{{" not in value or "}}" not in value:
+            return None
+        template = CompiledTemplate(value)
+        return template.render if template.has_variables else None
+
+    if isinstance(value, dict):
+        renderers = {k: _compile_renderer(v) for k, v in value.items()}
+        if not any(renderers.values()):
+            return None
+        return lambda variables: {
+            k: (r(variables) if r else copy_containers(value[k])) for k, r in renderers.items()
+        }
+
+    if isinstance(value, list):
+        renderers = [_compile_renderer(v) for v in value]
+        if not any(renderers):
+            return None
+        return lambda variables: [
+            r(variables) if r else copy_containers(item) for r, item in zip(renderers, value)
+        ]
+
+    return None
+
+
+def _compile_field_path(field: str) -> Callable[[ExecutionContext], Any]:
+    """Compile a dotted field path into a direct walk over the context"""
+    parts = tuple(field.split("."))
+    head, rest = parts[0], parts[1:]
+
+    if head not in _CONTEXT_FIELDS:
+        return lambda context: None
+
+    def get_field(context: ExecutionContext) -> Any:
+        value = getattr(context, head)
+        for part in rest:
+            if isinstance(value, dict):
+                value = value.get(part)
+            elif isinstance(value, BaseModel) and part in type(value).model_fields:
+                value = getattr(value, part)
+            else:
+                return None
+        return _as_plain(value)
+
+    return get_field
+
+
+def _as_plain(value: Any) -> Any:
+    """Match the shape `context.dict()` would have produced for a field"""
+    if isinstance(value, BaseModel):
+        return value.dict()
+    if isinstance(value, list) and value and isinstance(value[0], BaseModel):
+        return [item.dict() if isinstance(item, BaseModel) else item for item in value]
+    return value
+
+
+def _regex_matcher(pattern: Any) -> Callable[[Any, Any], bool]:
+    """Bind REGEX_MATCH to a pattern compiled ahead of time"""
+    try:
+        compiled = re.compile(pattern)
+    except (re.error, TypeError):
+        return lambda a, b: False
+    return lambda a, b: bool(compiled.match(str(a)))
+
+
+_OPERATORS: Dict[ConditionOperator, Callable[[Any, Any], bool]] = {
+    ConditionOperator.EQUALS: lambda a, b: a == b,
+    ConditionOperator.NOT_EQUALS: lambda a, b: a != b,
+    ConditionOperator.GREATER_THAN: lambda a, b: float(a) > float(b),
+    ConditionOperator.LESS_THAN: lambda a, b: float(a) < float(b),
+    ConditionOperator.CONTAINS: lambda a, b: str(b) in str(a),
+    ConditionOperator.STARTS_WITH: lambda a, b: str(a).startswith(str(b)),
+    ConditionOperator.ENDS_WITH: lambda a, b: str(a).endswith(str(b)),
+    ConditionOperator.REGEX_MATCH: lambda a, b: bool(re.match(b, str(a))),
+    ConditionOperator.IN_LIST: lambda a, b: a in b if isinstance(b, list) else False,
+    ConditionOperator.IS_NULL: lambda a, b: a is None,
+    ConditionOperator.IS_NOT_NULL: lambda a, b: a is not None,
+}
+
+
+class CompiledCondition:
+    """A condition with its field path, operator and value pre-bound"""
+
+    __slots__ = ("condition", "logical_operator", "get_field", "resolve_value", "evaluator", "nested")
+
+    def __init__(self, condition: Condition):
+        self.condition = condition
+        self.logical_operator = condition.logical_operator
+        self.get_field = _compile_field_path(condition.field)
+        self.resolve_value = compile_value(condition.value)
+
+        evaluator = _OPERATORS.get(condition.operator)
+        if condition.operator == ConditionOperator.REGEX_MATCH and \
+                _compile_dynamic(condition.value) is None:
+            evaluator = _regex_matcher(condition.value)
+        self.evaluator = evaluator
+
+        self.nested: Optional[CompiledConditionGroup] = None
+        if condition.nested_conditions:
+            self.nested = CompiledConditionGroup(condition.nested_conditions)
+
+    def evaluate(self, context: ExecutionContext) -> bool:
+        """Evaluate against the live execution context"""
+        if self.evaluator is None:
+            return False
+        try:
+            return self.evaluator(self.get_field(context), self.resolve_value(context.variables))
+        except Exception:
+            return False
+
+
+class CompiledConditionGroup:
+    """An ordered list of compiled conditions with AND/OR short-circuiting"""
+
+    __slots__ = ("conditions",)
+
+    def __init__(self, conditions: List[Union[Condition, Dict[str, Any]]]):
+        self.conditions = [
+            CompiledCondition(c if isinstance(c, Condition) else Condition(**c))
+            for c in conditions
+        ]
+
+    def __bool__(self) -> bool:
+        return bool(self.conditions)
+
+    def evaluate(self, context: ExecutionContext) -> bool:
+        """Evaluate conditions with the engine's logical operator semantics"""
+        for compiled in self.conditions:
+            result = compiled.evaluate(context)
+            operator = compiled.logical_operator
+
+            if operator == LogicalOperator.OR and result:
+                return True
+            if operator == LogicalOperator.AND and not result:
+                return False
+
+            if compiled.nested is not None:
+                nested_result = compiled.nested.evaluate(context)
+                if operator == LogicalOperator.OR and nested_result:
+                    return True
+                if operator == LogicalOperator.AND and not nested_result:
+                    return False
+
+        return True
+
+
+class CompiledAction:
+    """An action paired with its compiled guard conditions"""
+
+    __slots__ = ("action", "conditions")
+
+    def __init__(self, action: Action):
+        self.action = action
+        self.conditions = CompiledConditionGroup(action.conditions or [])
+
+
+class CompiledSpiral:
+    """Cached execution plan for a Spiral"""
+
+    __slots__ = ("spiral", "trigger_conditions", "actions", "default_variables", "consciousness_level")
+
+    def __init__(self, spiral: Spiral):
+        self.spiral = spiral
+        self.trigger_conditions = CompiledConditionGroup(spiral.trigger.conditions or [])
+        self.actions = [CompiledAction(action) for action in spiral.actions]
+        self.default_variables: Tuple[Tuple[str, Any], ...] = tuple(
+            (var.name, var.default_value)
+            for var in (spiral.variables or [])
+            if var.default_value is not None
+        )
+        self.consciousness_level = spiral.consciousness_level.value if spiral.consciousness_level else 5
+
+    @classmethod
+    def compile(cls, spiral: Spiral) -> "CompiledSpiral":
+        plan = cls(spiral)
+        logger.debug(f"Compiled spiral plan: {spiral.name} ({len(plan.actions)} actions)")
+        return plan
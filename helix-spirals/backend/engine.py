@@ -6,50 +6,76 @@ Core execution logic for automation workflows
 import asyncio
 import json
 import logging
+from collections import OrderedDict
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 from uuid import uuid4
 
 from .actions import ActionExecutor
-from .models import (Action, ActionType, Condition, ConditionOperator,
-                     ExecutionContext, ExecutionError, ExecutionLog,
-                     ExecutionStatus, Spiral, Trigger, TriggerType)
+from .compiler import CompiledConditionGroup, CompiledSpiral
+from .history_sink import ExecutionHistorySink
+from .models import (Action, ActionType, Condition, ExecutionContext,
+                     ExecutionError, ExecutionLog, ExecutionStatus,
+                     RateLimitConfig, Spiral, Trigger, TriggerType)
+from .rate_limiter import (DistributedRateLimiter, RateLimiter,
+                           RateLimiterRegistry)
 from .storage import SpiralStorage
+from .transport import PooledHTTPClient, SMTPConnectionPool
 
-logger = logging.getLogger(__name__)
+if TYPE_CHECKING:
+    from .work_queue import SpiralWorkQueue
 
-class RateLimiter:
-    """Rate limiter for spiral execution"""
-    def __init__(self, max_executions: int, window_ms: int, strategy: str = "sliding"):
-        self.max_executions = max_executions
-        self.window_ms = window_ms
-        self.strategy = strategy
-        self.executions: List[float] = []
-    
-    def allow(self) -> bool:
-        """Check if execution is allowed"""
-        now = datetime.utcnow().timestamp() * 1000
-        cutoff = now - self.window_ms
-        
-        # Remove old executions
-        self.executions = [e for e in self.executions if e > cutoff]
-        
-        if len(self.executions) >= self.max_executions:
-            return False
-        
-        self.executions.append(now)
-        return True
+logger = logging.getLogger(__name__)
 
 class SpiralEngine:
     """Main execution engine for Helix Spirals"""
     
-    def __init__(self, storage: SpiralStorage, ws_manager=None):
+    def __init__(self, storage: SpiralStorage, ws_manager=None,
+                 history_sink: Optional[ExecutionHistorySink] = None,
+                 work_queue: Optional["SpiralWorkQueue"] = None,
+                 distributed_rate_limits: bool = False,
+                 http_client: Optional[PooledHTTPClient] = None,
+                 smtp_pool: Optional[SMTPConnectionPool] = None):
         self.storage = storage
         self.ws_manager = ws_manager
+        self.history_sink = history_sink
+        self.work_queue = work_queue
+        # Executions this process enqueued; any worker process may run them
+        self.queued_executions: "OrderedDict[str, ExecutionContext]" = OrderedDict()
+        self.max_tracked_queued = 10000
+        # Outbound connections are shared by every execution and closed with the engine
+        self.http_client = http_client or PooledHTTPClient.from_env()
+        self.smtp_pool = smtp_pool or SMTPConnectionPool.from_env()
         self.action_executor = ActionExecutor(self)
         self.execution_queue: Dict[str, ExecutionContext] = {}
-        self.rate_limiters: Dict[str, RateLimiter] = {}
+        self.rate_limiters = RateLimiterRegistry(
+            storage.redis_client, distributed=distributed_rate_limits
+        )
         self.active_executions: Dict[str, asyncio.Task] = {}
+        # Execution plans per spiral id, dropped whenever storage sees the spiral change
+        self.compiled_spirals: "OrderedDict[str, CompiledSpiral]" = OrderedDict()
+        self.max_compiled_spirals = 1024
+        storage.add_invalidation_listener(self.invalidate_plan)
+    
+    async def close(self) -> None:
+        """Release pooled outbound HTTP and SMTP connections"""
+        await self.http_client.aclose()
+        await self.smtp_pool.aclose()
+    
+    def compile_spiral(self, spiral: Spiral) -> CompiledSpiral:
+        """Get the cached execution plan for a spiral, compiling it if stale"""
+        plan = self.compiled_spirals.get(spiral.id)
+        if plan is None or (plan.spiral is not spiral and plan.spiral != spiral):
+            plan = CompiledSpiral.compile(spiral)
+            self.compiled_spirals[spiral.id] = plan
+        self.compiled_spirals.move_to_end(spiral.id)
+        while len(self.compiled_spirals) > self.max_compiled_spirals:
+            self.compiled_spirals.popitem(last=False)
+        return plan
+    
+    def invalidate_plan(self, spiral_id: str) -> None:
+        """Drop a cached execution plan after the spiral changes"""
+        self.compiled_spirals.pop(spiral_id, None)
         
     async def execute(
         self,
@@ -58,44 +84,26 @@ class SpiralEngine:
         trigger_data: Dict[str, Any],
         metadata: Optional[Dict[str, Any]] = None
     ) -> ExecutionContext:
-        """Execute a spiral"""
+        """Execute a spiral (enqueued when the engine runs in queue mode)"""
         try:
-            # Get spiral
-            spiral = await self.storage.get_spiral(spiral_id)
-            if not spiral:
-                raise ValueError(f"Spiral {spiral_id} not found")
+            plan, context = await self._prepare_execution(spiral_id, trigger_type, trigger_data)
             
-            if not spiral.enabled:
-                raise ValueError(f"Spiral {spiral_id} is disabled")
-            
-            # Check rate limiting
-            if spiral.rate_limiting:
-                limiter = self._get_rate_limiter(spiral_id, spiral.rate_limiting)
-                if not limiter.allow():
-                    raise ValueError(f"Rate limit exceeded for spiral {spiral_id}")
-            
-            # Create execution context
-            context = ExecutionContext(
-                spiral_id=spiral_id,
-                execution_id=str(uuid4()),
-                trigger={
-                    "type": trigger_type,
-                    "data": trigger_data,
-                    "timestamp": datetime.utcnow().isoformat()
-                },
-                variables=self._initialize_variables(spiral, trigger_data),
-                status=ExecutionStatus.PENDING
-            )
+            if self.work_queue:
+                await self.work_queue.enqueue(context, plan.consciousness_level)
+                self.queued_executions[context.execution_id] = context
+                while len(self.queued_executions) > self.max_tracked_queued:
+                    self.queued_executions.popitem(last=False)
+                return context
             
             # Store in queue
             self.execution_queue[context.execution_id] = context
             
             # Execute spiral asynchronously
-            task = asyncio.create_task(self._execute_spiral(spiral, context))
+            task = asyncio.create_task(self._execute_spiral(plan, context))
             self.active_executions[context.execution_id] = task
             
-            # Wait briefly to get initial status
-            await asyncio.sleep(0.1)
+            # Yield once so the execution can start before we report status
+            await asyncio.sleep(0)
             
             return context
             
@@ -103,8 +111,78 @@ class SpiralEngine:
             logger.error(f"Failed to execute spiral {spiral_id}: {e}")
             raise
     
-    async def _execute_spiral(self, spiral: Spiral, context: ExecutionContext) -> ExecutionContext:
+    async def _prepare_execution(
+        self,
+        spiral_id: str,
+        trigger_type: str,
+        trigger_data: Dict[str, Any]
+    ) -> Tuple[CompiledSpiral, ExecutionContext]:
+        """Validate the spiral, apply rate limiting and build the execution context"""
+        # Get spiral
+        spiral = await self.storage.get_spiral(spiral_id)
+        if not spiral:
+            raise ValueError(f"Spiral {spiral_id} not found")
+        
+        if not spiral.enabled:
+            raise ValueError(f"Spiral {spiral_id} is disabled")
+        
+        plan = self.compile_spiral(spiral)
+        
+        # Check rate limiting
+        if spiral.rate_limiting:
+            limiter = self._get_rate_limiter(spiral_id, spiral.rate_limiting)
+            if not await limiter.acquire():
+                raise ValueError(f"Rate limit exceeded for spiral {spiral_id}")
+        
+        # Create execution context
+        context = ExecutionContext(
+            spiral_id=spiral_id,
+            execution_id=str(uuid4()),
+            trigger={
+                "type": trigger_type,
+                "data": trigger_data,
+                "timestamp": datetime.utcnow().isoformat()
+            },
+            variables=self._initialize_variables(plan, trigger_data),
+            status=ExecutionStatus.PENDING
+        )
+        
+        return plan, context
+    
+    async def run_queued(self, queued_context: ExecutionContext) -> Optional[ExecutionContext]:
+        """Run an execution fetched from the work queue to completion"""
+        # Prefer the live context if this process also accepted the trigger
+        context = self.queued_executions.pop(queued_context.execution_id, queued_context)
+        if context.status == ExecutionStatus.CANCELLED:
+            return context
+        
+        spiral = await self.storage.get_spiral(context.spiral_id)
+        if not spiral or not spiral.enabled:
+            context.status = ExecutionStatus.CANCELLED
+            context.completed_at = datetime.utcnow().isoformat()
+            await self._log(context, "info", "Spiral removed or disabled before execution started")
+            await self._persist_execution(context, record_statistics=False)
+            return context
+        
+        self.execution_queue[context.execution_id] = context
+        task = asyncio.create_task(self._execute_spiral(self.compile_spiral(spiral), context))
+        self.active_executions[context.execution_id] = task
+        
+        try:
+            # asyncio.wait doesn't raise if cancel_execution() cancels the task
+            await asyncio.wait([task])
+        except asyncio.CancelledError:
+            # The worker itself was cancelled (pool shutdown): stop the execution
+            # with it, otherwise it keeps running and runs again on redelivery
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            raise
+        return context
+    
+    async def _execute_spiral(self, plan: CompiledSpiral, context: ExecutionContext) -> ExecutionContext:
         """Internal spiral execution logic"""
+        spiral = plan.spiral
+        record_statistics = False
         try:
             context.status = ExecutionStatus.RUNNING
             await self._log(context, "info", f"Starting spiral execution: {spiral.name}")
@@ -119,26 +197,21 @@ class SpiralEngine:
                 })
             
             # Validate trigger conditions
-            if spiral.trigger.conditions:
-                conditions_met = await self._evaluate_conditions(
-                    spiral.trigger.conditions, context
-                )
-                if not conditions_met:
+            if plan.trigger_conditions:
+                if not plan.trigger_conditions.evaluate(context):
                     await self._log(context, "info", "Trigger conditions not met, skipping execution")
                     context.status = ExecutionStatus.COMPLETED
                     context.completed_at = datetime.utcnow().isoformat()
                     return context
             
             # Execute actions
-            for action in spiral.actions:
+            for compiled_action in plan.actions:
+                action = compiled_action.action
                 context.current_action = action.id
                 
                 # Check action conditions
-                if action.conditions:
-                    conditions_met = await self._evaluate_conditions(
-                        action.conditions, context
-                    )
-                    if not conditions_met:
+                if compiled_action.conditions:
+                    if not compiled_action.conditions.evaluate(context):
                         await self._log(context, "info", f"Skipping action {action.name}: conditions not met")
                         continue
                 
@@ -156,8 +229,8 @@ class SpiralEngine:
             context.completed_at = datetime.utcnow().isoformat()
             await self._log(context, "info", f"Spiral execution completed: {spiral.name}")
             
-            # Update statistics
-            await self.storage.update_spiral_statistics(spiral.id, context)
+            # Statistics are recorded with the execution history
+            record_statistics = True
             
             # Calculate UCF impact
             if hasattr(context, "ucf_impact") and context.ucf_impact:
@@ -181,6 +254,7 @@ class SpiralEngine:
             )
             context.completed_at = datetime.utcnow().isoformat()
             await self._log(context, "error", f"Spiral execution failed: {str(e)}")
+            record_statistics = True
             
             # Broadcast failure
             if self.ws_manager:
@@ -198,10 +272,20 @@ class SpiralEngine:
             self.active_executions.pop(context.execution_id, None)
             
             # Store execution history
-            await self.storage.save_execution_history(context)
+            await self._persist_execution(context, record_statistics)
         
         return context
     
+    async def _persist_execution(self, context: ExecutionContext, record_statistics: bool) -> None:
+        """Hand a finished execution to the write-behind sink, or save it directly"""
+        if self.history_sink:
+            await self.history_sink.submit(context, record_statistics)
+            return
+        
+        if record_statistics:
+            await self.storage.update_spiral_statistics(context.spiral_id, context)
+        await self.storage.save_execution_history(context)
+    
     async def _execute_action_with_retry(self, action: Action, context: ExecutionContext):
         """Execute action with retry logic"""
         max_attempts = action.retry_config.max_attempts if action.retry_config else 1
@@ -241,58 +325,12 @@ class SpiralEngine:
             raise Exception(last_error)
     
     async def _evaluate_conditions(self, conditions: List[Condition], context: ExecutionContext) -> bool:
-        """Evaluate conditions"""
-        for condition in conditions:
-            result = await self._evaluate_condition(condition, context)
-            
-            # Handle logical operators
-            if condition.logical_operator == "OR" and result:
-                return True
-            if condition.logical_operator == "AND" and not result:
-                return False
-            
-            # Handle nested conditions
-            if condition.nested_conditions:
-                nested_result = await self._evaluate_conditions(
-                    condition.nested_conditions, context
-                )
-                if condition.logical_operator == "OR" and nested_result:
-                    return True
-                if condition.logical_operator == "AND" and not nested_result:
-                    return False
-        
-        return True
-    
-    async def _evaluate_condition(self, condition: Condition, context: ExecutionContext) -> bool:
-        """Evaluate single condition"""
-        field_value = self._get_field_value(condition.field, context)
-        condition_value = self._resolve_variable(condition.value, context)
-        
-        operator_map = {
-            ConditionOperator.EQUALS: lambda a, b: a == b,
-            ConditionOperator.NOT_EQUALS: lambda a, b: a != b,
-            ConditionOperator.GREATER_THAN: lambda a, b: float(a) > float(b),
-            ConditionOperator.LESS_THAN: lambda a, b: float(a) < float(b),
-            ConditionOperator.CONTAINS: lambda a, b: str(b) in str(a),
-            ConditionOperator.STARTS_WITH: lambda a, b: str(a).startswith(str(b)),
-            ConditionOperator.ENDS_WITH: lambda a, b: str(a).endswith(str(b)),
-            ConditionOperator.REGEX_MATCH: lambda a, b: bool(__import__('re').match(b, str(a))),
-            ConditionOperator.IN_LIST: lambda a, b: a in b if isinstance(b, list) else False,
-            ConditionOperator.IS_NULL: lambda a, b: a is None,
-            ConditionOperator.IS_NOT_NULL: lambda a, b: a is not None,
-        }
-        
-        evaluator = operator_map.get(condition.operator)
-        if not evaluator:
-            return False
-        
-        try:
-            return evaluator(field_value, condition_value)
-        except:
-            return False
+        """Evaluate ad-hoc conditions (e.g. conditional branch configs)"""
+        return CompiledConditionGroup(conditions).evaluate(context)
     
-    def _initialize_variables(self, spiral: Spiral, trigger_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _initialize_variables(self, plan: CompiledSpiral, trigger_data: Dict[str, Any]) -> Dict[str, Any]:
         """Initialize execution variables"""
+        spiral = plan.spiral
         variables = {
             "trigger": trigger_data,
             "spiral": {
@@ -304,50 +342,17 @@ class SpiralEngine:
                 "id": str(uuid4()),
                 "timestamp": datetime.utcnow().isoformat()
             },
-            "consciousness_level": spiral.consciousness_level.value if spiral.consciousness_level else 5
+            "consciousness_level": plan.consciousness_level
         }
         
         # Add default variables
-        if spiral.variables:
-            for var in spiral.variables:
-                if var.default_value is not None:
-                    variables[var.name] = var.default_value
+        variables.update(plan.default_variables)
         
         return variables
     
-    def _get_field_value(self, field: str, context: ExecutionContext) -> Any:
-        """Get field value from context using dot notation"""
-        parts = field.split(".")
-        value = context.dict()
-        
-        for part in parts:
-            if isinstance(value, dict):
-                value = value.get(part)
-            else:
-                return None
-        
-        return value
-    
-    def _resolve_variable(self, value: Any, context: ExecutionContext) -> Any:
-        """Resolve variables in value"""
-        if isinstance(value, str) and value.startswith("{{") and value.endswith("}}"):
-            var_name = value[2:-2].strip()
-            return context.variables.get(var_name, value)
-        elif isinstance(value, dict):
-            return {k: self._resolve_variable(v, context) for k, v in value.items()}
-        elif isinstance(value, list):
-            return [self._resolve_variable(v, context) for v in value]
-        return value
-    
-    def _get_rate_limiter(self, spiral_id: str, config: Dict[str, Any]) -> RateLimiter:
+    def _get_rate_limiter(self, spiral_id: str, config: RateLimitConfig) -> Union[RateLimiter, DistributedRateLimiter]:
         """Get or create rate limiter for spiral"""
-        if spiral_id not in self.rate_limiters:
-            self.rate_limiters[spiral_id] = RateLimiter(
-                config.max_executions,
-                config.window_ms,
-                config.strategy
-            )
-        return self.rate_limiters[spiral_id]
+        return self.rate_limiters.get(spiral_id, config)
     
     def _calculate_retry_delay(self, attempt: int, config) -> int:
         """Calculate retry delay based on strategy"""
@@ -387,7 +392,15 @@ class SpiralEngine:
         logger.info(f"UCF Impact: {ucf_impact}")
     
     async def cancel_execution(self, execution_id: str) -> bool:
-        """Cancel a running execution"""
+        """Cancel a running or queued execution"""
+        queued = self.queued_executions.get(execution_id)
+        if queued and queued.status == ExecutionStatus.PENDING:
+            # Not started yet; a worker in this process skips it when dequeued
+            queued.status = ExecutionStatus.CANCELLED
+            queued.completed_at = datetime.utcnow().isoformat()
+            await self._persist_execution(queued, record_statistics=False)
+            return True
+        
         if execution_id in self.active_executions:
             task = self.active_executions[execution_id]
             task.cancel()
@@ -396,7 +409,7 @@ class SpiralEngine:
                 context = self.execution_queue[execution_id]
                 context.status = ExecutionStatus.CANCELLED
                 context.completed_at = datetime.utcnow().isoformat()
-                await self.storage.save_execution_history(context)
+                await self._persist_execution(context, record_statistics=False)
             
             return True
         return False
@@ -410,5 +423,14 @@ class SpiralEngine:
         if execution_id in self.execution_queue:
             return self.execution_queue[execution_id]
         
+        if execution_id in self.queued_executions:
+            return self.queued_executions[execution_id]
+        
+        # Finished but not flushed yet
+        if self.history_sink:
+            pending = self.history_sink.get_pending(execution_id)
+            if pending:
+                return pending
+        
         # Check history
         return await self.storage.get_execution_history(execution_id)
\ No newline at end of file
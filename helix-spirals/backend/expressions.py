@@ -0,0 +1,257 @@
+"""
+🌀 Helix Spirals Expressions
+Whitelisted, compiled-once expressions and templates for transform_data actions
+"""
+
+import ast
+import logging
+import re
+from functools import lru_cache
+from itertools import compress
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class ExpressionError(ValueError):
+    """Raised when an expression uses syntax outside the whitelist"""
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.Constant, ast.Name, ast.Load, ast.Store,
+    ast.BoolOp, ast.BinOp, ast.UnaryOp, ast.Compare, ast.IfExp,
+    ast.Attribute, ast.Subscript, ast.Slice, ast.Call, ast.keyword,
+    ast.List, ast.Tuple, ast.Dict, ast.Set,
+    ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp, ast.comprehension,
+    ast.boolop, ast.operator, ast.unaryop, ast.cmpop,
+)
+
+SAFE_FUNCTIONS: Dict[str, Callable] = {
+    "abs": abs, "bool": bool, "dict": dict, "float": float, "int": int,
+    "len": len, "list": list, "max": max, "min": min, "round": round,
+    "sorted": sorted, "str": str, "sum": sum,
+}
+_GLOBALS = {"__builtins__": SAFE_FUNCTIONS}
+
+# Below this size the per-item path is faster than building columns
+VECTORISE_MIN_ITEMS = 256
+
+# Attributes an expression may read: read-only methods and properties of the
+# str, number, list and dict values found in spiral data. Anything else is
+# rejected, which keeps out frame/code objects (gi_frame, f_back, tb_frame,
+# ...), mutating methods and str.format/format_map, whose "{0.attr}" fields
+# resolve attributes the AST checks never see.
+_ALLOWED_ATTRIBUTES = frozenset({
+    # str
+    "capitalize", "casefold", "center", "count", "endswith", "find", "index",
+    "isalnum", "isalpha", "isdecimal", "isdigit", "islower", "isnumeric",
+    "isspace", "istitle", "isupper", "join", "ljust", "lower", "lstrip",
+    "partition", "removeprefix", "removesuffix", "replace", "rfind", "rindex",
+    "rjust", "rpartition", "rsplit", "rstrip", "split", "splitlines",
+    "startswith", "strip", "swapcase", "title", "upper", "zfill",
+    # int / float
+    "bit_length", "conjugate", "imag", "is_integer", "real",
+    # dict (list shares count/index above)
+    "copy", "get", "items", "keys", "values",
+})
+
+def _validate(tree: ast.AST, source: str) -> None:
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ExpressionError(f"{type(node).__name__} is not allowed in expression: {source}")
+        if isinstance(node, ast.Attribute) and node.attr not in _ALLOWED_ATTRIBUTES:
+            raise ExpressionError(f"Attribute '{node.attr}' is not allowed in expression: {source}")
+        if (isinstance(node, ast.Subscript) and isinstance(node.slice, ast.Constant)
+                and isinstance(node.slice.value, str) and node.slice.value.startswith("_")):
+            raise ExpressionError(f"Private key '{node.slice.value}' is not allowed in expression: {source}")
+        if isinstance(node, ast.Name) and node.id.startswith("__"):
+            raise ExpressionError(f"Name '{node.id}' is not allowed in expression: {source}")
+
+class CompiledExpression:
+    """A validated expression compiled to a code object once"""
+
+    __slots__ = ("source", "code", "columns")
+
+    def __init__(self, source: str):
+        self.source = source
+        try:
+            tree = ast.parse(source.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ExpressionError(f"Invalid expression '{source}': {e.msg}") from e
+        _validate(tree, source)
+        self.code = compile(tree, f"<expression {source!r}>", "eval")
+        self.columns = _ColumnPlan.build(tree)
+
+    def evaluate(self, namespace: Dict[str, Any]) -> Any:
+        return eval(self.code, _GLOBALS, namespace)
+
+    def filter(self, items: List[Any], namespace: Dict[str, Any]) -> List[Any]:
+        """Keep the items for which the expression is truthy, bound as `item`"""
+        if self.columns is not None and len(items) >= VECTORISE_MIN_ITEMS:
+            mask = self.columns.mask(items, namespace)
+            if mask is not None:
+                return list(compress(items, mask.tolist()))
+
+        scope = dict(namespace)
+        kept = []
+        for item in items:
+            scope["item"] = item
+            if eval(self.code, _GLOBALS, scope):
+                kept.append(item)
+        return kept
+
+@lru_cache(maxsize=1024)
+def compile_expression(source: str) -> CompiledExpression:
+    """Compile an expression, reusing the cached code object for repeated text"""
+    return CompiledExpression(source)
+
+class _NotVectorisable(Exception):
+    pass
+
+# Column element types and the NumPy dtype that keeps their comparison semantics;
+# strings stay Python objects so comparisons call str's own operators
+_COLUMN_DTYPES = {
+    frozenset({str}): object,
+    frozenset({int}): np.int64,
+    frozenset({float}): np.float64,
+    frozenset({int, float}): np.float64,
+}
+
+class _ColumnPlan:
+    """Column-wise evaluation of a filter over a list of homogeneous dicts
+
+    Only expressions built from comparisons, boolean logic and + or -
+    over `item["key"]` lookups and constants qualify, since those behave
+    identically on scalars and arrays. Each referenced key becomes a NumPy
+    column and the expression is evaluated once over whole arrays.
+    """
+
+    __slots__ = ("keys", "code")
+
+    _ARRAY_PREFIX = "_col_"
+
+    def __init__(self, keys: Tuple[str, ...], code: Any):
+        self.keys = keys
+        self.code = code
+
+    @classmethod
+    def build(cls, tree: ast.Expression) -> Optional["_ColumnPlan"]:
+        keys: List[str] = []
+        try:
+            body = cls._rewrite(tree.body, keys, boolean=True)
+        except _NotVectorisable:
+            return None
+        if not keys:
+            return None
+        expression = ast.fix_missing_locations(ast.Expression(body=body))
+        return cls(tuple(keys), compile(expression, "<vectorised filter>", "eval"))
+
+    @classmethod
+    def _rewrite(cls, node: ast.AST, keys: List[str], boolean: bool = False) -> ast.AST:
+        """Translate scalar syntax to array syntax, rejecting anything that differs"""
+        if isinstance(node, ast.BoolOp) and boolean:
+            op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+            values = [cls._rewrite(v, keys, boolean=True) for v in node.values]
+            result = values[0]
+            for value in values[1:]:
+                result = ast.BinOp(left=result, op=op, right=value)
+            return result
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not) and boolean:
+            return ast.UnaryOp(op=ast.Invert(), operand=cls._rewrite(node.operand, keys, boolean=True))
+
+        if isinstance(node, ast.Compare):
+            if any(isinstance(op, (ast.In, ast.NotIn, ast.Is, ast.IsNot)) for op in node.ops):
+                raise _NotVectorisable()
+            operands = [cls._rewrite(node.left, keys)] + [cls._rewrite(c, keys) for c in node.comparators]
+            parts = [
+                ast.Compare(left=operands[i], ops=[op], comparators=[operands[i + 1]])
+                for i, op in enumerate(node.ops)
+            ]
+            result = parts[0]
+            for part in parts[1:]:
+                result = ast.BinOp(left=result, op=ast.BitAnd(), right=part)
+            return result
+
+        if boolean:
+            # Truthiness of a bare value differs between scalars and arrays
+            raise _NotVectorisable()
+
+        if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Sub)):
+            return ast.BinOp(left=cls._rewrite(node.left, keys), op=node.op, right=cls._rewrite(node.right, keys))
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            return ast.UnaryOp(op=node.op, operand=cls._rewrite(node.operand, keys))
+
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, str)):
+            return node
+
+        if isinstance(node, ast.Name) and node.id == "consciousness_level":
+            return node
+
+        if (isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name)
+                and node.value.id == "item" and isinstance(node.slice, ast.Constant)
+                and isinstance(node.slice.value, str)):
+            key = node.slice.value
+            if key not in keys:
+                keys.append(key)
+            return ast.Name(id=f"{cls._ARRAY_PREFIX}{keys.index(key)}", ctx=ast.Load())
+
+        raise _NotVectorisable()
+
+    def mask(self, items: List[Any], namespace: Dict[str, Any]) -> Optional[np.ndarray]:
+        """Boolean mask over `items`, or None when they are not homogeneous"""
+        scope = {"consciousness_level": namespace.get("consciousness_level")}
+        try:
+            for index, key in enumerate(self.keys):
+                values = list(map(itemgetter(key), items))
+                dtype = _COLUMN_DTYPES.get(frozenset(map(type, values)))
+                if dtype is None:
+                    return None
+                scope[f"{self._ARRAY_PREFIX}{index}"] = np.fromiter(values, dtype=dtype, count=len(values))
+            with np.errstate(all="ignore"):
+                mask = eval(self.code, {"__builtins__": {}}, scope)
+        except (KeyError, TypeError, ValueError, OverflowError):
+            return None
+
+        if not isinstance(mask, np.ndarray) or mask.dtype != bool or mask.shape != (len(items),):
+            return None
+        return mask
+
+_FIELD_PATTERN = re.compile(r"\{([^{}]+)\}")
+
+class FieldTemplate:
+    """A `{name}` template split into literal and field segments once
+
+    Fields missing from the render variables are left in place, as the
+    previous replace-per-variable rendering did.
+    """
+
+    __slots__ = ("segments",)
+
+    def __init__(self, source: str):
+        self.segments: List[Union[str, Tuple[str, str]]] = []
+        position = 0
+        for match in _FIELD_PATTERN.finditer(source):
+            if match.start() > position:
+                self.segments.append(source[position:match.start()])
+            self.segments.append((match.group(1), match.group(0)))
+            position = match.end()
+        if position < len(source):
+            self.segments.append(source[position:])
+
+    def render(self, variables: Dict[str, Any]) -> str:
+        parts = []
+        for segment in self.segments:
+            if isinstance(segment, str):
+                parts.append(segment)
+            else:
+                name, raw = segment
+                parts.append(str(variables[name]) if name in variables else raw)
+        return "".join(parts)
+
+@lru_cache(maxsize=1024)
+def compile_field_template(source: str) -> FieldTemplate:
+    """Compile a `{name}` template, reusing the cached segments for repeated text"""
+    return FieldTemplate(source)
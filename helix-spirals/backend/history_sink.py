@@ -0,0 +1,131 @@
+"""
+🌀 Helix Spirals Execution History Sink
+Write-behind batching of finished executions into PostgreSQL
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import ExecutionContext
+from .storage import SpiralStorage
+
+logger = logging.getLogger(__name__)
+
+class ExecutionHistorySink:
+    """Buffer finished executions and flush them to storage in batches
+
+    A flush happens every `flush_interval_ms` or as soon as `max_batch`
+    records are waiting, whichever comes first. The queue is bounded, so a
+    slow database applies backpressure to `submit()` instead of growing
+    memory without limit.
+    """
+
+    def __init__(
+        self,
+        storage: SpiralStorage,
+        flush_interval_ms: int = 250,
+        max_batch: int = 200,
+        max_queue: int = 10000,
+        max_retries: int = 3
+    ):
+        self.storage = storage
+        self.flush_interval_ms = flush_interval_ms
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.queue: "asyncio.Queue[Optional[Tuple[ExecutionContext, bool]]]" = asyncio.Queue(maxsize=max_queue)
+        self.pending: Dict[str, ExecutionContext] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self.stats = {
+            "submitted": 0,
+            "flushed": 0,
+            "batches": 0,
+            "failed": 0,
+            "last_flush_ms": 0.0
+        }
+
+    async def start(self) -> None:
+        """Start the background flusher"""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._run())
+            logger.info("✅ Execution history sink started")
+
+    async def stop(self) -> None:
+        """Drain everything still buffered, then stop the flusher"""
+        if self._flusher is None:
+            return
+
+        # The sentinel queues behind every submitted record
+        await self.queue.put(None)
+        await self._flusher
+        self._flusher = None
+        logger.info(f"🛑 Execution history sink drained ({self.stats['flushed']} records flushed)")
+
+    async def submit(self, context: ExecutionContext, record_statistics: bool = True) -> None:
+        """Queue a finished execution, waiting if the buffer is full"""
+        self.pending[context.execution_id] = context
+        await self.queue.put((context, record_statistics))
+        self.stats["submitted"] += 1
+
+    def get_pending(self, execution_id: str) -> Optional[ExecutionContext]:
+        """Look up an execution that has finished but not been flushed yet"""
+        return self.pending.get(execution_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "queued": self.queue.qsize(), "capacity": self.queue.maxsize}
+
+    async def _run(self) -> None:
+        """Collect records until the batch fills or the interval elapses"""
+        interval = self.flush_interval_ms / 1000.0
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            stopping = False
+            deadline = time.monotonic() + interval
+
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+            if stopping:
+                return
+
+    async def _flush(self, batch: List[Tuple[ExecutionContext, bool]]) -> None:
+        """Write one batch, retrying with backoff before giving up on it"""
+        if not batch:
+            return
+
+        contexts = [context for context, _ in batch]
+        statistics = [context for context, record in batch if record]
+        started = time.perf_counter()
+
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                await self.storage.save_execution_batch(contexts, statistics)
+                self.stats["flushed"] += len(contexts)
+                self.stats["batches"] += 1
+                self.stats["last_flush_ms"] = (time.perf_counter() - started) * 1000
+                break
+            except Exception as e:
+                logger.error(f"Execution history flush failed (attempt {attempt}/{self.max_retries}): {e}")
+                if attempt < self.max_retries:
+                    await asyncio.sleep(0.1 * (2 ** (attempt - 1)))
+        else:
+            self.stats["failed"] += len(contexts)
+
+        for context in contexts:
+            self.pending.pop(context.execution_id, None)
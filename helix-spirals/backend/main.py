@@ -20,6 +20,7 @@ from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
 from .engine import SpiralEngine
+from .history_sink import ExecutionHistorySink
 from .models import (Action, ExecutionContext, ExecutionRequest,
                      ExecutionResponse, Spiral, SpiralCreateRequest,
                      SpiralStatistics, SpiralUpdateRequest, Trigger,
@@ -28,6 +29,7 @@ from .routes import executions_router, spirals_router, templates_router
 from .scheduler import SpiralScheduler
 from .storage import SpiralStorage
 from .webhooks import WebhookReceiver
+from .work_queue import ExecutionWorkerPool, SpiralWorkQueue
 from .zapier_import import ZapierImporter
 
 load_dotenv()
@@ -39,6 +41,8 @@ logger = logging.getLogger(__name__)
 # Global instances
 engine: Optional[SpiralEngine] = None
 storage: Optional[SpiralStorage] = None
+history_sink: Optional[ExecutionHistorySink] = None
+worker_pool: Optional[ExecutionWorkerPool] = None
 scheduler: Optional[SpiralScheduler] = None
 webhook_receiver: Optional[WebhookReceiver] = None
 redis_client: Optional[redis.Redis] = None
@@ -71,7 +75,7 @@ ws_manager = ConnectionManager()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize and cleanup resources"""
-    global engine, storage, scheduler, webhook_receiver, redis_client, pg_pool
+    global engine, storage, history_sink, worker_pool, scheduler, webhook_receiver, redis_client, pg_pool
     
     try:
         # Initialize Redis
@@ -88,7 +92,36 @@ async def lifespan(app: FastAPI):
         storage = SpiralStorage(pg_pool, redis_client)
         await storage.initialize()
         
-        engine = SpiralEngine(storage, ws_manager)
+        history_sink = ExecutionHistorySink(
+            storage,
+            flush_interval_ms=int(os.getenv("HISTORY_FLUSH_INTERVAL_MS", "250")),
+            max_batch=int(os.getenv("HISTORY_FLUSH_BATCH_SIZE", "200")),
+            max_queue=int(os.getenv("HISTORY_QUEUE_SIZE", "10000"))
+        )
+        await history_sink.start()
+        
+        # Queue mode: triggers are enqueued durably and run by a bounded worker pool
+        work_queue = None
+        if os.getenv("SPIRAL_EXECUTION_MODE", "direct") == "queue":
+            work_queue = SpiralWorkQueue(redis_client)
+        
+        engine = SpiralEngine(
+            storage,
+            ws_manager,
+            history_sink=history_sink,
+            work_queue=work_queue,
+            # "redis" enforces each spiral's rate limit across every worker process
+            distributed_rate_limits=os.getenv("SPIRAL_RATE_LIMIT_MODE", "local") == "redis"
+        )
+        
+        if work_queue:
+            worker_pool = ExecutionWorkerPool(
+                engine,
+                work_queue,
+                workers=int(os.getenv("SPIRAL_WORKERS", "8")),
+                per_spiral_limit=int(os.getenv("SPIRAL_PER_SPIRAL_CONCURRENCY", "4"))
+            )
+            await worker_pool.start()
         scheduler = SpiralScheduler(engine, storage)
         webhook_receiver = WebhookReceiver(engine, storage)
         
@@ -100,6 +133,7 @@ async def lifespan(app: FastAPI):
         spirals = await storage.get_all_spirals()
         for spiral in spirals:
             if spiral.enabled:
+                engine.compile_spiral(spiral)
                 await scheduler.register_spiral(spiral)
         logger.info(f"✅ Loaded {len(spirals)} spirals")
         
@@ -113,6 +147,15 @@ async def lifespan(app: FastAPI):
         # Cleanup
         if scheduler:
             await scheduler.stop()
+        if worker_pool:
+            await worker_pool.stop()
+        if engine:
+            await engine.close()
+        if history_sink:
+            # Drain buffered execution history before the pool closes
+            await history_sink.stop()
+        if storage:
+            await storage.close()
         if pg_pool:
             await pg_pool.close()
         if redis_client:
@@ -183,6 +226,18 @@ async def get_statistics():
     stats = await storage.get_statistics()
     stats["active_connections"] = len(ws_manager.active_connections)
     stats["scheduler_tasks"] = scheduler.get_task_count() if scheduler else 0
+    stats["history_sink"] = history_sink.get_stats() if history_sink else None
+    stats["rate_limiters"] = engine.rate_limiters.get_stats() if engine else None
+    if engine:
+        stats["outbound"] = {
+            "http": engine.http_client.get_stats(),
+            "smtp": engine.smtp_pool.get_stats()
+        }
+    if worker_pool:
+        stats["work_queue"] = {
+            **worker_pool.get_stats(),
+            "depth": await worker_pool.work_queue.depth()
+        }
     
     return stats
 
@@ -240,6 +295,20 @@ async def receive_webhook(
         client_ip=request.client.host if request.client else None
     )
     
+    # Queue mode: enqueue durably and return the execution id straight away
+    if engine and engine.work_queue:
+        try:
+            context = await engine.execute(
+                spiral_id=spiral_id,
+                trigger_type="webhook",
+                trigger_data=webhook_data.dict(),
+                metadata={"source": "webhook"}
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        return {"status": "accepted", "spiralId": spiral_id, "executionId": context.execution_id}
+    
     # Process webhook in background
     background_tasks.add_task(
         webhook_receiver.process_webhook,
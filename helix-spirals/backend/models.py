@@ -8,7 +8,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional, Union
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, PrivateAttr, validator
 
 
 # Enums matching TypeScript types
@@ -282,7 +282,7 @@ class Variable(BaseModel):
 class RateLimitConfig(BaseModel):
     max_executions: int
     window_ms: int
-    strategy: str = "sliding"  # sliding, fixed
+    strategy: str = "sliding"  # sliding, fixed, token_bucket
 
 # Scheduling
 class SchedulingConfig(BaseModel):
@@ -352,6 +352,24 @@ class ExecutionContext(BaseModel):
     
     # UCF tracking
     ucf_impact: Optional[Dict[str, float]] = {}
+    
+    # Bumped on every set_variable() so action configs rendered from older values are not reused
+    _variables_version: int = PrivateAttr(default=0)
+    _rendered_configs: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    
+    @property
+    def variables_version(self) -> int:
+        return self._variables_version
+    
+    @property
+    def rendered_configs(self) -> Dict[str, Any]:
+        """Rendered action configs for this execution, keyed by action id"""
+        return self._rendered_configs
+    
+    def set_variable(self, name: str, value: Any) -> None:
+        """Set an execution variable"""
+        self.variables[name] = value
+        self._variables_version += 1
 
 # API Request/Response Models
 class WebhookPayload(BaseModel):
@@ -0,0 +1,243 @@
+"""
+🌀 Helix Spirals Rate Limiting
+O(1) fixed-window, sliding-window-counter and token-bucket limiters, locally or shared through Redis
+"""
+
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("fixed", "sliding", "token_bucket")
+
+def _now_ms() -> float:
+    return time.time() * 1000
+
+class RateLimiter:
+    """In-process rate limiter for spiral execution
+
+    Every strategy keeps a constant amount of state, so `allow()` is O(1)
+    regardless of `max_executions`:
+
+    - fixed: a counter per window aligned to the epoch
+    - sliding: sliding-window counter, weighting the previous window's count
+      by how much of it still overlaps the trailing window
+    - token_bucket: `max_executions` tokens refilled evenly over `window_ms`
+    """
+
+    def __init__(self, max_executions: int, window_ms: int, strategy: str = "sliding"):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown rate limit strategy: {strategy}")
+        self.max_executions = max_executions
+        self.window_ms = window_ms
+        self.strategy = strategy
+        self.last_used = _now_ms()
+
+        self._window_index = 0
+        self._current = 0
+        self._previous = 0
+        self._tokens = float(max_executions)
+        self._refilled_at = self.last_used
+
+    def allow(self) -> bool:
+        """Check if execution is allowed"""
+        now = _now_ms()
+        self.last_used = now
+
+        if self.strategy == "token_bucket":
+            return self._allow_token_bucket(now)
+
+        self._roll_window(now)
+        if self.strategy == "fixed":
+            count = self._current
+        else:
+            elapsed = now - self._window_index * self.window_ms
+            count = self._previous * (self.window_ms - elapsed) / self.window_ms + self._current
+
+        if count >= self.max_executions:
+            return False
+
+        self._current += 1
+        return True
+
+    async def acquire(self) -> bool:
+        return self.allow()
+
+    def idle_for(self, now: float) -> float:
+        return now - self.last_used
+
+    def _roll_window(self, now: float) -> None:
+        index = int(now // self.window_ms)
+        if index != self._window_index:
+            self._previous = self._current if index == self._window_index + 1 else 0
+            self._current = 0
+            self._window_index = index
+
+    def _allow_token_bucket(self, now: float) -> bool:
+        refill = (now - self._refilled_at) * self.max_executions / self.window_ms
+        self._tokens = min(float(self.max_executions), self._tokens + refill)
+        self._refilled_at = now
+
+        if self._tokens < 1:
+            return False
+
+        self._tokens -= 1
+        return True
+
+# Each script reads Redis server time so every worker shares one clock.
+_LUA_NOW = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+"""
+
+_LUA_SCRIPTS = {
+    "fixed": _LUA_NOW + """
+local index = math.floor(now / window)
+local data = redis.call('HMGET', KEYS[1], 'index', 'current')
+local current = tonumber(data[2]) or 0
+if tonumber(data[1]) ~= index then current = 0 end
+if current >= limit then return 0 end
+redis.call('HSET', KEYS[1], 'index', index, 'current', current + 1)
+redis.call('PEXPIRE', KEYS[1], window)
+return 1
+""",
+    "sliding": _LUA_NOW + """
+local index = math.floor(now / window)
+local data = redis.call('HMGET', KEYS[1], 'index', 'current', 'previous')
+local stored = tonumber(data[1])
+local current = tonumber(data[2]) or 0
+local previous = tonumber(data[3]) or 0
+if stored ~= index then
+    if stored == index - 1 then previous = current else previous = 0 end
+    current = 0
+end
+local elapsed = now - index * window
+if previous * (window - elapsed) / window + current >= limit then return 0 end
+redis.call('HSET', KEYS[1], 'index', index, 'current', current + 1, 'previous', previous)
+redis.call('PEXPIRE', KEYS[1], window * 2)
+return 1
+""",
+    "token_bucket": _LUA_NOW + """
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'refilled_at')
+local tokens = tonumber(data[1]) or limit
+local refilled_at = tonumber(data[2]) or now
+tokens = math.min(limit, tokens + (now - refilled_at) * limit / window)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'refilled_at', now)
+redis.call('PEXPIRE', KEYS[1], window * 2)
+return allowed
+""",
+}
+
+class DistributedRateLimiter:
+    """Rate limiter whose state lives in Redis, enforced across all workers
+
+    Falls back to a local limiter if Redis is unreachable, so an outage
+    degrades to per-process limits instead of blocking every execution.
+    """
+
+    def __init__(self, redis_client: redis.Redis, key: str, max_executions: int,
+                 window_ms: int, strategy: str = "sliding"):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown rate limit strategy: {strategy}")
+        self.redis_client = redis_client
+        self.key = key
+        self.max_executions = max_executions
+        self.window_ms = window_ms
+        self.strategy = strategy
+        self.last_used = _now_ms()
+        self._script = redis_client.register_script(_LUA_SCRIPTS[strategy])
+        self._fallback = RateLimiter(max_executions, window_ms, strategy)
+
+    async def acquire(self) -> bool:
+        """Atomically check and consume one execution slot"""
+        self.last_used = _now_ms()
+        try:
+            allowed = await self._script(keys=[self.key], args=[self.max_executions, self.window_ms])
+            return bool(int(allowed))
+        except Exception as e:
+            logger.warning(f"Distributed rate limit unavailable for {self.key}, using local limit: {e}")
+            return self._fallback.allow()
+
+    def idle_for(self, now: float) -> float:
+        return now - self.last_used
+
+class RateLimiterRegistry:
+    """Per-spiral limiters with idle eviction
+
+    A limiter idle for longer than two of its windows has no state left that
+    could affect a decision, so it is dropped. Sweeps run at most once per
+    `sweep_interval_ms`, keeping lookups amortised O(1).
+    """
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None, distributed: bool = False,
+                 key_prefix: str = "spirals:ratelimit", sweep_interval_ms: int = 60000):
+        self.redis_client = redis_client
+        self.distributed = distributed and redis_client is not None
+        self.key_prefix = key_prefix
+        self.sweep_interval_ms = sweep_interval_ms
+        self._limiters: Dict[str, Tuple[Tuple[int, int, str], Any]] = {}
+        self._last_sweep = _now_ms()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._limiters)
+
+    def __contains__(self, spiral_id: str) -> bool:
+        return spiral_id in self._limiters
+
+    def get(self, spiral_id: str, config) -> Any:
+        """Get or create the limiter for a spiral, rebuilding it if its config changed"""
+        self._maybe_sweep()
+
+        strategy = config.strategy
+        if strategy not in STRATEGIES:
+            logger.warning(f"Unknown rate limit strategy '{strategy}' for spiral {spiral_id}, using sliding")
+            strategy = "sliding"
+
+        signature = (config.max_executions, config.window_ms, strategy)
+        entry = self._limiters.get(spiral_id)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+
+        if self.distributed:
+            limiter = DistributedRateLimiter(
+                self.redis_client, f"{self.key_prefix}:{spiral_id}", *signature
+            )
+        else:
+            limiter = RateLimiter(*signature)
+        self._limiters[spiral_id] = (signature, limiter)
+        return limiter
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "mode": "redis" if self.distributed else "local",
+            "limiters": len(self._limiters),
+            "evictions": self.evictions
+        }
+
+    def remove(self, spiral_id: str) -> None:
+        self._limiters.pop(spiral_id, None)
+
+    def _maybe_sweep(self) -> None:
+        now = _now_ms()
+        if now - self._last_sweep < self.sweep_interval_ms:
+            return
+        self._last_sweep = now
+
+        idle = [
+            spiral_id for spiral_id, (_, limiter) in self._limiters.items()
+            if limiter.idle_for(now) > limiter.window_ms * 2
+        ]
+        for spiral_id in idle:
+            del self._limiters[spiral_id]
+        self.evictions += len(idle)
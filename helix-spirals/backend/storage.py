@@ -6,8 +6,11 @@ PostgreSQL + Redis storage with Context Vault integration
 import asyncio
 import json
 import logging
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
 
 import asyncpg
 import redis.asyncio as redis
@@ -17,19 +20,180 @@ from .models import (ExecutionContext, ExecutionStatus, Spiral,
 
 logger = logging.getLogger(__name__)
 
+SPIRAL_INVALIDATION_CHANNEL = "spirals:invalidate"
+
+class SpiralDefinitionCache:
+    """Bounded, versioned LRU of parsed Spiral objects held in each worker
+    
+    Entries are treated as read-only and shared between executions. Versions
+    come from a Redis counter bumped on every save/delete, so a worker never
+    caches a definition older than the newest invalidation it has seen.
+    """
+    
+    def __init__(self, max_entries: int = 1024, max_age_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self._entries: "OrderedDict[str, Tuple[int, float, Spiral]]" = OrderedDict()
+        self._invalidated_versions: "OrderedDict[str, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+    
+    def get(self, spiral_id: str) -> Optional[Spiral]:
+        """Return the cached spiral, or None on miss/expiry"""
+        entry = self._entries.get(spiral_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        version, cached_at, spiral = entry
+        if time.monotonic() - cached_at > self.max_age_seconds:
+            # Safety net in case an invalidation message was missed
+            del self._entries[spiral_id]
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(spiral_id)
+        self.hits += 1
+        return spiral
+    
+    def put(self, spiral_id: str, version: int, spiral: Spiral) -> None:
+        """Cache a parsed spiral unless a newer version is already known"""
+        if version < self._known_version(spiral_id):
+            return
+        
+        self._invalidated_versions.pop(spiral_id, None)
+        self._entries[spiral_id] = (version, time.monotonic(), spiral)
+        self._entries.move_to_end(spiral_id)
+        
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def invalidate(self, spiral_id: str, version: int) -> None:
+        """Drop any cached entry older than `version`"""
+        entry = self._entries.get(spiral_id)
+        if entry is not None:
+            if entry[0] < version:
+                del self._entries[spiral_id]
+                self.invalidations += 1
+            else:
+                return
+        
+        # Remember the version so a load already in flight isn't cached; bounded
+        # like the entries so ids this worker never loads can't pile up
+        if version > self._invalidated_versions.get(spiral_id, 0):
+            self._invalidated_versions[spiral_id] = version
+        self._invalidated_versions.move_to_end(spiral_id)
+        while len(self._invalidated_versions) > self.max_entries:
+            self._invalidated_versions.popitem(last=False)
+    
+    def _known_version(self, spiral_id: str) -> int:
+        entry = self._entries.get(spiral_id)
+        return max(entry[0] if entry else 0, self._invalidated_versions.get(spiral_id, 0))
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self._invalidated_versions.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total * 100) if total > 0 else 0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions
+        }
+
 class SpiralStorage:
     """Storage layer for Helix Spirals with Context Vault integration"""
     
-    def __init__(self, pg_pool: asyncpg.Pool, redis_client: redis.Redis):
+    def __init__(self, pg_pool: asyncpg.Pool, redis_client: redis.Redis,
+                 spiral_cache: Optional[SpiralDefinitionCache] = None):
         self.pg_pool = pg_pool
         self.redis_client = redis_client
+        self.spiral_cache = spiral_cache or SpiralDefinitionCache()
+        self.instance_id = str(uuid4())
+        self._pubsub = None
+        self._invalidation_task: Optional[asyncio.Task] = None
+        self._invalidation_listeners: List[Callable[[str], None]] = []
         
     async def initialize(self):
         """Initialize database schema"""
         await self._create_tables()
         await self._create_indexes()
+        await self.start_cache_invalidation()
         logger.info("✅ Storage layer initialized")
     
+    async def start_cache_invalidation(self) -> None:
+        """Subscribe to spiral invalidations published by other workers"""
+        if self._invalidation_task:
+            return
+        
+        self._pubsub = self.redis_client.pubsub()
+        await self._pubsub.subscribe(SPIRAL_INVALIDATION_CHANNEL)
+        self._invalidation_task = asyncio.create_task(self._listen_for_invalidations())
+    
+    def add_invalidation_listener(self, listener: Callable[[str], None]) -> None:
+        """Call `listener(spiral_id)` whenever a spiral is saved or deleted on any worker"""
+        self._invalidation_listeners.append(listener)
+    
+    def _notify_invalidation(self, spiral_id: str) -> None:
+        for listener in self._invalidation_listeners:
+            try:
+                listener(spiral_id)
+            except Exception as e:
+                logger.error(f"Spiral invalidation listener failed: {e}")
+    
+    async def close(self) -> None:
+        """Stop the invalidation listener"""
+        if self._invalidation_task:
+            self._invalidation_task.cancel()
+            try:
+                await self._invalidation_task
+            except asyncio.CancelledError:
+                pass
+            self._invalidation_task = None
+        
+        if self._pubsub:
+            await self._pubsub.unsubscribe(SPIRAL_INVALIDATION_CHANNEL)
+            await self._pubsub.close()
+            self._pubsub = None
+    
+    async def _listen_for_invalidations(self) -> None:
+        """Apply invalidation messages to the local spiral cache"""
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if not message:
+                    continue
+                
+                payload = json.loads(message["data"])
+                self.spiral_cache.invalidate(payload["id"], int(payload["version"]))
+                self._notify_invalidation(payload["id"])
+                
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Lost messages are covered by the cache's max age
+                logger.error(f"Spiral cache invalidation failed: {e}")
+                await asyncio.sleep(1.0)
+    
+    async def _publish_invalidation(self, spiral_id: str) -> int:
+        """Bump the spiral version and tell every worker about it"""
+        version = await self.redis_client.incr(f"spiral:version:{spiral_id}")
+        self.spiral_cache.invalidate(spiral_id, version)
+        self._notify_invalidation(spiral_id)
+        await self.redis_client.publish(
+            SPIRAL_INVALIDATION_CHANNEL,
+            json.dumps({"id": spiral_id, "version": version, "origin": self.instance_id})
+        )
+        return version
+    
     async def _create_tables(self):
         """Create database tables for Helix Spirals"""
         async with self.pg_pool.acquire() as conn:
@@ -185,14 +349,30 @@ class SpiralStorage:
             spiral.json()
         )
         
+        version = await self._publish_invalidation(spiral.id)
+        self.spiral_cache.put(spiral.id, version, spiral)
+        
         logger.info(f"Spiral saved: {spiral.name} (ID: {spiral.id})")
     
     async def get_spiral(self, spiral_id: str) -> Optional[Spiral]:
-        """Get spiral by ID with Redis caching"""
-        # Try Redis cache first
-        cached = await self.redis_client.get(f"spiral:{spiral_id}")
+        """Get spiral by ID with in-process and Redis caching"""
+        # In-process cache of already-parsed spirals
+        spiral = self.spiral_cache.get(spiral_id)
+        if spiral is not None:
+            return spiral
+        
+        # Read the definition and its version together so a concurrent save
+        # can't pair new JSON with an old version (or vice versa)
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.get(f"spiral:{spiral_id}")
+            pipe.get(f"spiral:version:{spiral_id}")
+            cached, version = await pipe.execute()
+        version = int(version or 0)
+        
         if cached:
-            return Spiral.parse_raw(cached)
+            spiral = Spiral.parse_raw(cached)
+            self.spiral_cache.put(spiral_id, version, spiral)
+            return spiral
         
         # Fallback to database
         async with self.pg_pool.acquire() as conn:
@@ -229,6 +409,7 @@ class SpiralStorage:
                 3600,
                 spiral.json()
             )
+            self.spiral_cache.put(spiral_id, version, spiral)
             
             return spiral
     
@@ -298,53 +479,72 @@ class SpiralStorage:
             
             # Remove from cache
             await self.redis_client.delete(f"spiral:{spiral_id}")
+            await self._publish_invalidation(spiral_id)
             
             return result == "DELETE 1"
     
     async def save_execution_history(self, context: ExecutionContext) -> None:
         """Save execution history with UCF tracking"""
-        async with self.pg_pool.acquire() as conn:
-            await conn.execute("""
-                INSERT INTO execution_history (
-                    id, spiral_id, execution_id, trigger_data, variables,
-                    logs, status, started_at, completed_at, current_action,
-                    error_data, metrics, ucf_impact, consciousness_level
-                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
-                ON CONFLICT (execution_id) DO UPDATE SET
-                    status = $7, completed_at = $9, current_action = $10,
-                    error_data = $11, metrics = $12, ucf_impact = $13
-            """,
-                context.execution_id, context.spiral_id, context.execution_id,
-                context.trigger, context.variables,
-                [log.dict() for log in context.logs], context.status.value,
-                datetime.fromisoformat(context.started_at),
-                datetime.fromisoformat(context.completed_at) if context.completed_at else None,
-                context.current_action,
-                context.error.dict() if context.error else None,
-                context.metrics,
-                context.ucf_impact if hasattr(context, 'ucf_impact') else {},
-                context.variables.get("consciousness_level", 5)
-            )
-        
-        # Store UCF metrics separately for analytics
-        if hasattr(context, 'ucf_impact') and context.ucf_impact:
-            await self._save_ucf_metrics(context)
-        
+        await self.save_execution_batch([context])
         logger.info(f"Execution history saved: {context.execution_id}")
     
-    async def _save_ucf_metrics(self, context: ExecutionContext) -> None:
-        """Save UCF metrics for analytics"""
+    async def save_execution_batch(
+        self,
+        contexts: List[ExecutionContext],
+        statistics: Optional[List[ExecutionContext]] = None
+    ) -> None:
+        """Persist finished executions, UCF metrics and statistics in one transaction"""
+        if not contexts and not statistics:
+            return
+        
+        history_rows = [self._execution_history_row(context) for context in contexts]
+        ucf_rows = [
+            (context.spiral_id, context.execution_id, metric, float(value),
+             f"spiral:{context.spiral_id}", context.variables.get("consciousness_level", 5))
+            for context in contexts if context.ucf_impact
+            for metric, value in context.ucf_impact.items()
+        ]
+        
         async with self.pg_pool.acquire() as conn:
-            for metric, value in context.ucf_impact.items():
-                await conn.execute("""
-                    INSERT INTO ucf_metrics (
-                        spiral_id, execution_id, metric, value, source, consciousness_level
-                    ) VALUES ($1, $2, $3, $4, $5, $6)
-                """,
-                    context.spiral_id, context.execution_id, metric, value,
-                    f"spiral:{context.spiral_id}",
-                    context.variables.get("consciousness_level", 5)
-                )
+            async with conn.transaction():
+                if history_rows:
+                    await conn.executemany("""
+                        INSERT INTO execution_history (
+                            id, spiral_id, execution_id, trigger_data, variables,
+                            logs, status, started_at, completed_at, current_action,
+                            error_data, metrics, ucf_impact, consciousness_level
+                        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
+                        ON CONFLICT (execution_id) DO UPDATE SET
+                            status = $7, completed_at = $9, current_action = $10,
+                            error_data = $11, metrics = $12, ucf_impact = $13
+                    """, history_rows)
+                
+                # Store UCF metrics separately for analytics
+                if ucf_rows:
+                    await conn.copy_records_to_table(
+                        "ucf_metrics",
+                        records=ucf_rows,
+                        columns=["spiral_id", "execution_id", "metric", "value",
+                                 "source", "consciousness_level"]
+                    )
+                
+                if statistics:
+                    await self._upsert_spiral_statistics(conn, statistics)
+    
+    def _execution_history_row(self, context: ExecutionContext) -> tuple:
+        """Build the execution_history parameters for a context"""
+        return (
+            context.execution_id, context.spiral_id, context.execution_id,
+            context.trigger, context.variables,
+            [log.dict() for log in context.logs], context.status.value,
+            datetime.fromisoformat(context.started_at),
+            datetime.fromisoformat(context.completed_at) if context.completed_at else None,
+            context.current_action,
+            context.error.dict() if context.error else None,
+            context.metrics,
+            context.ucf_impact if hasattr(context, 'ucf_impact') else {},
+            context.variables.get("consciousness_level", 5)
+        )
     
     async def get_execution_history(self, execution_id: str) -> Optional[ExecutionContext]:
         """Get execution history by ID"""
@@ -405,60 +605,51 @@ class SpiralStorage:
     
     async def update_spiral_statistics(self, spiral_id: str, context: ExecutionContext) -> None:
         """Update spiral execution statistics"""
-        execution_time = 0
-        if context.completed_at and context.started_at:
-            start_time = datetime.fromisoformat(context.started_at)
-            end_time = datetime.fromisoformat(context.completed_at)
-            execution_time = (end_time - start_time).total_seconds() * 1000  # milliseconds
-        
         async with self.pg_pool.acquire() as conn:
-            # Get current stats
-            current_stats = await conn.fetchrow(
-                "SELECT * FROM spiral_statistics WHERE spiral_id = $1",
-                spiral_id
+            await self._upsert_spiral_statistics(conn, [context])
+    
+    async def _upsert_spiral_statistics(self, conn, contexts: List[ExecutionContext]) -> None:
+        """Fold a batch of executions into spiral_statistics atomically in SQL"""
+        spiral_ids, statuses, durations, finished = [], [], [], []
+        now = datetime.utcnow()
+        for context in contexts:
+            execution_time = 0.0
+            if context.completed_at and context.started_at:
+                start_time = datetime.fromisoformat(context.started_at)
+                end_time = datetime.fromisoformat(context.completed_at)
+                execution_time = (end_time - start_time).total_seconds() * 1000  # milliseconds
+            spiral_ids.append(context.spiral_id)
+            statuses.append(context.status.value)
+            durations.append(execution_time)
+            finished.append(datetime.fromisoformat(context.completed_at) if context.completed_at else now)
+        
+        await conn.execute("""
+            INSERT INTO spiral_statistics AS s (
+                spiral_id, total_executions, successful_executions,
+                failed_executions, average_execution_time_ms, last_execution, updated_at
             )
-            
-            if current_stats:
-                # Update existing stats
-                total_executions = current_stats["total_executions"] + 1
-                successful_executions = current_stats["successful_executions"]
-                failed_executions = current_stats["failed_executions"]
-                
-                if context.status == ExecutionStatus.COMPLETED:
-                    successful_executions += 1
-                elif context.status == ExecutionStatus.FAILED:
-                    failed_executions += 1
-                
-                # Calculate new average execution time
-                current_avg = current_stats["average_execution_time_ms"]
-                new_avg = ((current_avg * (total_executions - 1)) + execution_time) / total_executions
-                
-                await conn.execute("""
-                    UPDATE spiral_statistics SET
-                        total_executions = $2,
-                        successful_executions = $3,
-                        failed_executions = $4,
-                        average_execution_time_ms = $5,
-                        last_execution = $6,
-                        updated_at = $7
-                    WHERE spiral_id = $1
-                """,
-                    spiral_id, total_executions, successful_executions,
-                    failed_executions, new_avg, datetime.utcnow(), datetime.utcnow()
-                )
-            else:
-                # Create new stats
-                successful = 1 if context.status == ExecutionStatus.COMPLETED else 0
-                failed = 1 if context.status == ExecutionStatus.FAILED else 0
-                
-                await conn.execute("""
-                    INSERT INTO spiral_statistics (
-                        spiral_id, total_executions, successful_executions,
-                        failed_executions, average_execution_time_ms, last_execution
-                    ) VALUES ($1, $2, $3, $4, $5, $6)
-                """,
-                    spiral_id, 1, successful, failed, execution_time, datetime.utcnow()
-                )
+            SELECT
+                b.spiral_id,
+                COUNT(*),
+                COUNT(*) FILTER (WHERE b.status = 'completed'),
+                COUNT(*) FILTER (WHERE b.status = 'failed'),
+                AVG(b.duration_ms),
+                MAX(b.finished_at),
+                NOW()
+            FROM unnest($1::uuid[], $2::text[], $3::float8[], $4::timestamp[])
+                AS b(spiral_id, status, duration_ms, finished_at)
+            GROUP BY b.spiral_id
+            ON CONFLICT (spiral_id) DO UPDATE SET
+                total_executions = s.total_executions + EXCLUDED.total_executions,
+                successful_executions = s.successful_executions + EXCLUDED.successful_executions,
+                failed_executions = s.failed_executions + EXCLUDED.failed_executions,
+                average_execution_time_ms = (
+                    s.average_execution_time_ms * s.total_executions
+                    + EXCLUDED.average_execution_time_ms * EXCLUDED.total_executions
+                ) / (s.total_executions + EXCLUDED.total_executions),
+                last_execution = GREATEST(s.last_execution, EXCLUDED.last_execution),
+                updated_at = NOW()
+        """, spiral_ids, statuses, durations, finished)
     
     async def get_statistics(self) -> Dict[str, Any]:
         """Get system-wide statistics"""
@@ -538,7 +729,8 @@ class SpiralStorage:
                 "consciousness_distribution": {
                     str(row["consciousness_level"]): row["count"]
                     for row in consciousness_dist
-                }
+                },
+                "spiral_cache": self.spiral_cache.get_stats()
             }
     
     async def save_webhook_mapping(self, webhook_id: str, spiral_id: str) -> None:
@@ -0,0 +1,308 @@
+"""
+🌀 Helix Spirals Outbound Transport
+Shared, pooled HTTP and SMTP connections with per-destination latency histograms
+"""
+
+import asyncio
+import bisect
+import logging
+import os
+import smtplib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in milliseconds; the last bucket catches everything slower
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with constant memory"""
+
+    __slots__ = ("counts", "count", "errors", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms: float, error: bool = False) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if error:
+            self.errors += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of observations"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                if index < len(LATENCY_BUCKETS_MS):
+                    return float(LATENCY_BUCKETS_MS[index])
+                return self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 2),
+            "buckets": dict(zip([*map(str, LATENCY_BUCKETS_MS), "+Inf"], self.counts))
+        }
+
+class _Destination:
+    """Per-host concurrency limit and latency histogram"""
+
+    __slots__ = ("semaphore", "histogram", "in_flight")
+
+    def __init__(self, limit: int):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.histogram = LatencyHistogram()
+        self.in_flight = 0
+
+class PooledHTTPClient:
+    """Shared keep-alive HTTP client for all outbound spiral actions
+
+    Connections are pooled across executions by one `httpx.AsyncClient`.
+    Each destination host additionally gets its own concurrency limit, so
+    one slow endpoint cannot take every pooled connection.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_connections_per_host: int = 20,
+        max_keepalive_connections: int = 50,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 30.0,
+        max_destinations: int = 1024,
+        **client_kwargs: Any
+    ):
+        self.max_connections_per_host = max_connections_per_host
+        self.max_destinations = max_destinations
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            ),
+            **client_kwargs
+        )
+        self._destinations: "OrderedDict[str, _Destination]" = OrderedDict()
+
+    @classmethod
+    def from_env(cls) -> "PooledHTTPClient":
+        return cls(
+            max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+            max_connections_per_host=int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "20")),
+            max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "50")),
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+            timeout=float(os.getenv("HTTP_TIMEOUT", "30"))
+        )
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request through the shared pool, bounded per destination host"""
+        destination = self._destination(urlsplit(str(url)).netloc)
+        async with destination.semaphore:
+            destination.in_flight += 1
+            started = time.perf_counter()
+            error = True
+            try:
+                response = await self.client.request(method, url, **kwargs)
+                error = response.status_code >= 500
+                return response
+            finally:
+                destination.in_flight -= 1
+                destination.histogram.observe((time.perf_counter() - started) * 1000, error)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "per_host_limit": self.max_connections_per_host,
+            "destinations": {
+                host: {**destination.histogram.snapshot(), "in_flight": destination.in_flight}
+                for host, destination in self._destinations.items()
+            }
+        }
+
+    def _destination(self, host: str) -> _Destination:
+        destination = self._destinations.get(host)
+        if destination is not None:
+            self._destinations.move_to_end(host)
+            return destination
+
+        destination = _Destination(self.max_connections_per_host)
+        self._destinations[host] = destination
+        if len(self._destinations) > self.max_destinations:
+            # Drop the least recently used idle host; busy hosts keep their limit
+            for old_host, old in self._destinations.items():
+                if old_host != host and old.in_flight == 0:
+                    del self._destinations[old_host]
+                    break
+        return destination
+
+class SMTPConnectionPool:
+    """Reusable SMTP connections driven from a dedicated thread pool
+
+    `smtplib` blocks, so sends run on `size` worker threads instead of the
+    event loop. Authenticated connections are kept between sends and
+    reopened only after `idle_timeout` seconds or a server disconnect.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        size: int = 4,
+        idle_timeout: float = 60.0,
+        timeout: float = 30.0
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.histogram = LatencyHistogram()
+        self.stats = {"sent": 0, "connections_opened": 0, "reconnects": 0}
+        self._idle: List[Tuple[smtplib.SMTP, float]] = []
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def from_env(cls) -> "SMTPConnectionPool":
+        return cls(
+            host=os.getenv("SMTP_HOST", "smtp.gmail.com"),
+            port=int(os.getenv("SMTP_PORT", "587")),
+            user=os.getenv("SMTP_USER"),
+            password=os.getenv("SMTP_PASS"),
+            size=int(os.getenv("SMTP_POOL_SIZE", "4"))
+        )
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.user and self.password)
+
+    async def send_message(self, msg: Message, recipients: List[str]) -> None:
+        """Send a message without blocking the event loop"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="helix-smtp")
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        error = True
+        try:
+            await loop.run_in_executor(self._executor, self._send, msg, recipients)
+            error = False
+        finally:
+            self.histogram.observe((time.perf_counter() - started) * 1000, error)
+
+    async def aclose(self) -> None:
+        """Quit pooled connections and stop the worker threads"""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._quit(connection)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "idle_connections": len(self._idle),
+            "destinations": {f"smtp://{self.host}:{self.port}": self.histogram.snapshot()}
+        }
+
+    def _send(self, msg: Message, recipients: List[str]) -> None:
+        connection = self._checkout()
+        try:
+            try:
+                connection.send_message(msg, to_addrs=recipients)
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                # The server dropped a pooled connection; retry once on a fresh one
+                self._quit(connection)
+                self.stats["reconnects"] += 1
+                connection = self._connect()
+                connection.send_message(msg, to_addrs=recipients)
+        except smtplib.SMTPRecipientsRefused:
+            self._checkin(connection)
+            raise
+        except Exception:
+            self._quit(connection)
+            raise
+        self.stats["sent"] += 1
+        self._checkin(connection)
+
+    def _checkout(self) -> smtplib.SMTP:
+        now = time.monotonic()
+        connection = None
+        stale = []
+        with self._lock:
+            while self._idle:
+                candidate, last_used = self._idle.pop()
+                if now - last_used < self.idle_timeout:
+                    connection = candidate
+                    break
+                stale.append(candidate)
+        for old in stale:
+            self._quit(old)
+        return connection or self._connect()
+
+    def _checkin(self, connection: smtplib.SMTP) -> None:
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((connection, time.monotonic()))
+                return
+        self._quit(connection)
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.starttls()
+            connection.login(self.user, self.password)
+        except Exception:
+            self._quit(connection)
+            raise
+        self.stats["connections_opened"] += 1
+        return connection
+
+    @staticmethod
+    def _quit(connection: smtplib.SMTP) -> None:
+        try:
+            connection.quit()
+        except Exception:
+            try:
+                connection.close()
+            except Exception:
+                pass
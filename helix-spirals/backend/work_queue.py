@@ -0,0 +1,395 @@
+"""
+🌀 Helix Spirals Work Queue
+Durable, prioritised execution queue backed by Redis Streams plus a bounded worker pool
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import socket
+import time
+from collections import defaultdict, deque
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+from redis.exceptions import ResponseError
+
+from .models import ExecutionContext
+
+if TYPE_CHECKING:
+    from .engine import SpiralEngine
+
+logger = logging.getLogger(__name__)
+
+CONSCIOUSNESS_LEVELS = range(10, 0, -1)
+
+class QueuedExecution:
+    """An execution waiting in (or fetched from) the durable queue"""
+
+    __slots__ = ("context", "priority", "stream", "message_id")
+
+    def __init__(self, context: ExecutionContext, priority: int,
+                 stream: Optional[str] = None, message_id: Optional[str] = None):
+        self.context = context
+        self.priority = priority
+        self.stream = stream
+        self.message_id = message_id
+
+    @property
+    def execution_id(self) -> str:
+        return self.context.execution_id
+
+    @property
+    def spiral_id(self) -> str:
+        return self.context.spiral_id
+
+class SpiralWorkQueue:
+    """Redis Streams queue with one stream per consciousness level
+
+    Messages stay in the consumer group's pending list until acknowledged,
+    so executions that were fetched but never finished are reclaimed instead
+    of being lost. A worker with a stable consumer id (SPIRAL_WORKER_ID)
+    replays its own pending list on restart; executions held by consumers
+    that never come back are claimed by the survivors once they have been
+    idle for the visibility timeout.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        prefix: str = "spirals:queue",
+        group: str = "spiral-workers",
+        consumer: Optional[str] = None,
+        visibility_timeout_ms: int = 300000
+    ):
+        self.redis_client = redis_client
+        self.prefix = prefix
+        self.group = group
+        self.consumer = consumer or os.getenv("SPIRAL_WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+        self.visibility_timeout_ms = visibility_timeout_ms
+        self.streams = [self._stream(level) for level in CONSCIOUSNESS_LEVELS]
+
+    def _stream(self, level: int) -> str:
+        return f"{self.prefix}:{level}"
+
+    async def initialize(self) -> None:
+        """Create the consumer group on every priority stream"""
+        for stream in self.streams:
+            try:
+                await self.redis_client.xgroup_create(stream, self.group, id="0", mkstream=True)
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    async def enqueue(self, context: ExecutionContext, priority: int) -> None:
+        """Durably enqueue an execution"""
+        level = min(max(int(priority), 1), 10)
+        await self.redis_client.xadd(self._stream(level), {"context": context.json()})
+
+    async def fetch(self, count: int, block_ms: int = 1000) -> List[QueuedExecution]:
+        """Fetch at most `count` new executions for this consumer, highest priority first
+
+        XREADGROUP's COUNT applies per stream, so the streams are read one
+        at a time with the remaining budget. When all are empty, wait up to
+        `block_ms` for a new entry (without claiming it) and read again.
+        """
+        fetched = await self._read_new(count)
+        if fetched or not block_ms:
+            return fetched
+        # Entries added between the read above and this wait are picked up on the next call
+        await self.redis_client.xread(streams={stream: "$" for stream in self.streams}, count=1, block=block_ms)
+        return await self._read_new(count)
+
+    async def _read_new(self, count: int) -> List[QueuedExecution]:
+        fetched: List[QueuedExecution] = []
+        for stream in self.streams:
+            if len(fetched) >= count:
+                break
+            response = await self.redis_client.xreadgroup(
+                self.group, self.consumer, streams={stream: ">"}, count=count - len(fetched)
+            )
+            fetched.extend(
+                self._decode(name, message_id, fields)
+                for name, messages in (response or [])
+                for message_id, fields in messages
+            )
+        return fetched
+
+    async def pending(self, count: int = 100) -> List[QueuedExecution]:
+        """Executions already delivered to this consumer but never acknowledged"""
+        owned = []
+        for stream in self.streams:
+            start_id = "0-0"
+            while True:
+                response = await self.redis_client.xreadgroup(
+                    self.group, self.consumer, streams={stream: start_id}, count=count
+                )
+                messages = response[0][1] if response else []
+                if not messages:
+                    break
+                owned.extend(
+                    self._decode(stream, message_id, fields)
+                    for message_id, fields in messages if fields
+                )
+                start_id = messages[-1][0]
+        return owned
+
+    async def recover(self, count: int = 100) -> List[QueuedExecution]:
+        """Claim executions left pending by consumers that died mid-flight"""
+        recovered = []
+        for stream in self.streams:
+            start_id = "0-0"
+            while True:
+                result = await self.redis_client.xautoclaim(
+                    stream, self.group, self.consumer,
+                    min_idle_time=self.visibility_timeout_ms,
+                    start_id=start_id, count=count
+                )
+                start_id, messages = result[0], result[1]
+                recovered.extend(
+                    self._decode(stream, message_id, fields)
+                    for message_id, fields in messages if fields
+                )
+                if not messages or start_id in ("0-0", b"0-0"):
+                    break
+        return recovered
+
+    async def touch(self, jobs: List[QueuedExecution]) -> None:
+        """Reset the idle time of executions still running here
+
+        Keeps long-running executions from being claimed by other workers
+        once they pass the visibility timeout.
+        """
+        by_stream: Dict[str, List[str]] = defaultdict(list)
+        for job in jobs:
+            if job.stream and job.message_id:
+                by_stream[job.stream].append(job.message_id)
+        for stream, message_ids in by_stream.items():
+            await self.redis_client.xclaim(
+                stream, self.group, self.consumer, min_idle_time=0, message_ids=message_ids, justid=True
+            )
+
+    async def ack(self, job: QueuedExecution) -> None:
+        """Acknowledge and drop a finished execution"""
+        if job.stream and job.message_id:
+            await self.redis_client.xack(job.stream, self.group, job.message_id)
+            await self.redis_client.xdel(job.stream, job.message_id)
+
+    async def depth(self) -> int:
+        """Total executions waiting across all priority streams"""
+        total = 0
+        for stream in self.streams:
+            total += await self.redis_client.xlen(stream)
+        return total
+
+    def _decode(self, stream: Any, message_id: Any, fields: Dict[Any, Any]) -> QueuedExecution:
+        stream = stream.decode() if isinstance(stream, bytes) else stream
+        message_id = message_id.decode() if isinstance(message_id, bytes) else message_id
+        raw = fields.get(b"context", fields.get("context"))
+        context = ExecutionContext.parse_raw(raw)
+        priority = int(stream.rsplit(":", 1)[1])
+        return QueuedExecution(context, priority, stream, message_id)
+
+class ExecutionWorkerPool:
+    """Bounded pool of workers draining the durable queue
+
+    Fetched executions go into a local priority heap (highest consciousness
+    level first, FIFO within a level). A spiral that is already at its
+    concurrency cap has further executions parked until one of its running
+    executions finishes, so it never occupies a worker slot while waiting.
+    Parked executions don't count toward `prefetch` (up to `max_parked` of
+    them), so one saturated spiral can't starve the others of fetches.
+    """
+
+    def __init__(
+        self,
+        engine: "SpiralEngine",
+        work_queue: SpiralWorkQueue,
+        workers: int = 8,
+        per_spiral_limit: int = 4,
+        prefetch: Optional[int] = None,
+        recover_interval: Optional[float] = None,
+        max_parked: Optional[int] = None
+    ):
+        self.engine = engine
+        self.work_queue = work_queue
+        self.workers = workers
+        self.per_spiral_limit = per_spiral_limit
+        self.prefetch = prefetch or workers * 2
+        self.max_parked = max_parked or self.prefetch * 4
+        # Reclaim orphans (and heartbeat our own jobs) well inside the visibility timeout
+        self.recover_interval = (
+            recover_interval if recover_interval is not None else work_queue.visibility_timeout_ms / 1000 / 4
+        )
+        self._next_recover = 0.0
+        self._held: Dict[Tuple[str, str], QueuedExecution] = {}  # (stream, message id)
+        self._ready: List[Tuple[int, int, QueuedExecution]] = []
+        self._sequence = itertools.count()
+        self._ready_event = asyncio.Event()
+        self._space_event = asyncio.Event()
+        self._in_flight = 0  # held here and not parked
+        self._parked_count = 0
+        self._running: Dict[str, int] = defaultdict(int)
+        self._parked: Dict[str, Deque[QueuedExecution]] = defaultdict(deque)
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+        self.stats = {"processed": 0, "failed": 0, "recovered": 0, "parked": 0}
+
+    async def start(self) -> None:
+        """Recover orphaned executions and start the dispatcher and workers"""
+        await self.work_queue.initialize()
+
+        # Our own pending list first (stable consumer id), then idle orphans
+        self._accept(await self.work_queue.pending(), recovered=True)
+        await self._recover()
+
+        self._tasks.append(asyncio.create_task(self._dispatch()))
+        for index in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._work(index)))
+        logger.info(f"✅ Execution worker pool started ({self.workers} workers)")
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Stop fetching and give running executions time to finish
+
+        Anything fetched but not finished stays pending in Redis. It is
+        replayed when this consumer id starts again, or claimed by another
+        worker once it has been idle for the visibility timeout.
+        """
+        self._stopping = True
+        self._ready_event.set()
+        if not self._tasks:
+            return
+
+        dispatcher, workers = self._tasks[0], self._tasks[1:]
+        dispatcher.cancel()
+        _, still_running = await asyncio.wait(workers, timeout=timeout)
+        for task in still_running:
+            task.cancel()
+        await asyncio.gather(dispatcher, *workers, return_exceptions=True)
+        self._tasks = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "ready": len(self._ready),
+            "running": sum(self._running.values()),
+            "parked_now": self._parked_count
+        }
+
+    def _accept(self, jobs: List[QueuedExecution], recovered: bool = False) -> int:
+        """Queue fetched executions locally, skipping ones already held here"""
+        accepted = 0
+        for job in jobs:
+            key = (job.stream, job.message_id)
+            if key in self._held:
+                continue
+            self._held[key] = job
+            self._in_flight += 1
+            self._push(job)
+            accepted += 1
+        if recovered and accepted:
+            self.stats["recovered"] += accepted
+            logger.info(f"♻️ Recovered {accepted} pending spiral executions")
+        return accepted
+
+    async def _recover(self) -> None:
+        """Heartbeat executions held here and claim orphans from dead consumers"""
+        self._next_recover = time.monotonic() + self.recover_interval
+        if self._held:
+            await self.work_queue.touch(list(self._held.values()))
+        self._accept(await self.work_queue.recover(), recovered=True)
+
+    def _push(self, job: QueuedExecution) -> None:
+        heapq.heappush(self._ready, (-job.priority, next(self._sequence), job))
+        self._ready_event.set()
+
+    async def _dispatch(self) -> None:
+        """Keep the local heap topped up from the durable queue"""
+        while not self._stopping:
+            try:
+                if time.monotonic() >= self._next_recover:
+                    await self._recover()
+
+                available = self.prefetch - self._in_flight - max(0, self._parked_count - self.max_parked)
+                if available <= 0:
+                    self._space_event.clear()
+                    try:
+                        await asyncio.wait_for(self._space_event.wait(), timeout=self.recover_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                self._accept(await self.work_queue.fetch(
+                    count=available, block_ms=max(1, int(min(1.0, self.recover_interval) * 1000))
+                ))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Work queue fetch failed: {e}")
+                await asyncio.sleep(1.0)
+
+    async def _work(self, index: int) -> None:
+        """Run executions from the local heap until the pool stops"""
+        while True:
+            while not self._ready:
+                if self._stopping:
+                    return
+                self._ready_event.clear()
+                await self._ready_event.wait()
+            if self._stopping:
+                return
+
+            _, _, job = heapq.heappop(self._ready)
+            limit = await self._spiral_limit(job.spiral_id)
+            if self._running[job.spiral_id] >= limit:
+                self._parked[job.spiral_id].append(job)
+                self._parked_count += 1
+                self._in_flight -= 1
+                self._space_event.set()
+                self.stats["parked"] += 1
+                continue
+
+            self._running[job.spiral_id] += 1
+            try:
+                await self.engine.run_queued(job.context)
+                self.stats["processed"] += 1
+            except asyncio.CancelledError:
+                # Interrupted, not finished: leave it pending in Redis for redelivery
+                self._running[job.spiral_id] -= 1
+                raise
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.error(f"Worker {index} failed execution {job.execution_id}: {e}")
+            self._running[job.spiral_id] -= 1
+            await self._finish(job)
+
+    async def _finish(self, job: QueuedExecution) -> None:
+        """Ack a finished execution and release one parked sibling"""
+        try:
+            await self.work_queue.ack(job)
+        except Exception as e:
+            logger.error(f"Failed to ack execution {job.execution_id}: {e}")
+        self._held.pop((job.stream, job.message_id), None)
+        self._in_flight -= 1
+        self._space_event.set()
+
+        parked = self._parked.get(job.spiral_id)
+        if parked:
+            self._parked_count -= 1
+            self._in_flight += 1
+            self._push(parked.popleft())
+            if not parked:
+                del self._parked[job.spiral_id]
+        if not self._running[job.spiral_id]:
+            del self._running[job.spiral_id]
+
+    async def _spiral_limit(self, spiral_id: str) -> int:
+        """Per-spiral concurrency cap from its scheduling config"""
+        spiral = await self.engine.storage.get_spiral(spiral_id)
+        if spiral and spiral.scheduling and spiral.scheduling.max_concurrent:
+            return spiral.scheduling.max_concurrent
+        return self.per_spiral_limit
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+🌀 Consciousness Analytics Benchmark
+====================================
+
+Compares the previous list-based analytics (per-element Python loops,
+convolution rolling averages, per-analyzer passes over a list copy) with
+the vectorised kernels in backend/consciousness_analytics_engine.py on a
+long consciousness history.
+
+Usage:
+    python scripts/benchmark_consciousness_analytics.py --points 1000000 --window 50 --repeat 3
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.consciousness_analytics_engine import (AnalyticsReport,  # noqa: E402
+                                                    AnomalyDetector,
+                                                    rolling_mean)
+
+
+@dataclass
+class BenchmarkResult:
+    """Best-of-N timing for one code path."""
+    name: str
+    seconds: float
+    operations: int
+
+    @property
+    def ops_per_second(self) -> float:
+        return self.operations / self.seconds if self.seconds else float("inf")
+
+
+def best_of(repeat: int, fn: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+# ----------------------------------------------------------------------------
+# Previous implementations, kept here for comparison
+# ----------------------------------------------------------------------------
+
+def legacy_rolling_average(values: List[float], window: int) -> List[float]:
+    arr = np.array(values)
+    padded = np.pad(arr, (window - 1, 0), mode="edge")
+    return np.convolve(padded, np.ones(window) / window, mode="valid").tolist()
+
+
+def legacy_zscore_anomalies(values: List[float]) -> list:
+    arr = np.array(values)
+    mean, std = np.mean(arr), np.std(arr)
+    z_scores = np.abs((arr - mean) / std)
+    return [(i, float(z)) for i, z in enumerate(z_scores) if z > 2.5]
+
+
+def legacy_sudden_drops(values: List[float], threshold: float = 0.5) -> List[int]:
+    return [i for i in range(1, len(values)) if values[i - 1] - values[i] > threshold]
+
+
+def legacy_report(values: List[float]) -> dict:
+    rolling = legacy_rolling_average(values, 10)
+    first, last = np.mean(rolling[:len(rolling) // 3]), np.mean(rolling[-len(rolling) // 3:])
+    return {
+        "trend": last - first,
+        "volatility": float(np.std(values)),
+        "momentum": float(np.polyfit(np.arange(5), np.array(values[-5:]), 1)[0]),
+        "zscore": len(legacy_zscore_anomalies(values)),
+        "drops": len(legacy_sudden_drops(values)),
+        "confidence": 100.0 - float(np.std(values)) * 20,
+        "mean": np.mean(values), "median": float(np.median(values)),
+        "min": float(np.min(values)), "max": float(np.max(values)),
+    }
+
+
+def run(points: int, window: int, repeat: int) -> List[BenchmarkResult]:
+    rng = np.random.default_rng(17)
+    history = 5 + np.cumsum(rng.normal(0, 0.02, points))
+    history[rng.choice(points, points // 1000)] -= 1.0  # sudden drops
+    values = history.tolist()
+
+    # The kernels must agree with the code they replace
+    assert np.allclose(rolling_mean(history, window), legacy_rolling_average(values, window))
+    assert AnomalyDetector.detect_sudden_drops(history) == legacy_sudden_drops(values)
+    assert len(AnomalyDetector.detect_zscore_anomalies(history)) == len(legacy_zscore_anomalies(values))
+
+    return [
+        BenchmarkResult("rolling: convolve", best_of(repeat, lambda: legacy_rolling_average(values, window)), points),
+        BenchmarkResult("rolling: cumsum", best_of(repeat, lambda: rolling_mean(history, window)), points),
+        BenchmarkResult("zscore: python loop", best_of(repeat, lambda: legacy_zscore_anomalies(values)), points),
+        BenchmarkResult("zscore: vectorised",
+                        best_of(repeat, lambda: AnomalyDetector.detect_zscore_anomalies(history)), points),
+        BenchmarkResult("drops: python loop", best_of(repeat, lambda: legacy_sudden_drops(values)), points),
+        BenchmarkResult("drops: vectorised",
+                        best_of(repeat, lambda: AnomalyDetector.detect_sudden_drops(history)), points),
+        BenchmarkResult("report: per-analyzer lists", best_of(repeat, lambda: legacy_report(values)), points),
+        BenchmarkResult("report: shared array",
+                        best_of(repeat, lambda: AnalyticsReport.compute_metrics(history)), points),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=1_000_000, help="history length")
+    parser.add_argument("--window", type=int, default=50, help="rolling window size")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per path (best is reported)")
+    args = parser.parse_args()
+
+    results = run(args.points, args.window, args.repeat)
+
+    print(f"\n🌀 Consciousness analytics benchmark ({args.points:,} points, window {args.window}, "
+          f"best of {args.repeat})\n")
+    baselines = {}
+    for result in results:
+        group = result.name.split(":")[0]
+        baseline = baselines.setdefault(group, result.seconds)
+        print(f"  {result.name:<30} {result.seconds * 1000:9.2f} ms  "
+              f"{result.ops_per_second:>14,.0f} points/s  {baseline / result.seconds:6.1f}x")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+🚩 Feature Flag Evaluation Benchmark
+====================================
+
+Compares the legacy evaluation path (SHA-256 hexdigest + big-int modulo
+per call, string ``if`` chains per targeting rule, user ids added to a set)
+with the compiled snapshot in backend/saas/feature_flags.py, for single
+evaluations and for ``bulk_evaluate`` over every flag.
+
+Usage:
+    python scripts/benchmark_feature_flags.py --users 20000 --flags 20 --repeat 3
+"""
+
+import argparse
+import asyncio
+import hashlib
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.saas.feature_flags import (FeatureFlag, FeatureFlagService,  # noqa: E402
+                                        TargetingRule)
+
+
+@dataclass
+class BenchmarkResult:
+    """Best-of-N timing for one code path."""
+    name: str
+    seconds: float
+    operations: int
+
+    @property
+    def ops_per_second(self) -> float:
+        return self.operations / self.seconds if self.seconds else float("inf")
+
+
+def best_of(repeat: int, fn: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def make_flags(count: int) -> List[FeatureFlag]:
+    return [
+        FeatureFlag(
+            key=f"flag_{i}", name=f"Flag {i}", enabled=True, percentage=(i * 7) % 100,
+            targeting_rules=[
+                TargetingRule(type="plan", operator="in", values=["enterprise", "team"]),
+                TargetingRule(type="email", operator="contains", values=["@helix.dev"]),
+                TargetingRule(type="user_id", operator="in", values=[f"vip_{j}" for j in range(50)]),
+            ],
+        )
+        for i in range(count)
+    ]
+
+
+def legacy_is_enabled(flag: FeatureFlag, unique_users: set, user_id: str, plan: str, user_email: str) -> bool:
+    """The pre-snapshot evaluation path, kept here for comparison."""
+    flag.evaluation_count += 1
+    unique_users.add(user_id)
+    if flag.kill_switch or not flag.enabled:
+        return False
+    for rule in flag.targeting_rules:
+        if rule.type == "user_id":
+            value = user_id
+        elif rule.type == "email":
+            value = user_email
+        elif rule.type == "plan":
+            value = plan
+        else:
+            continue
+        if not value:
+            continue
+        if rule.operator in ("equals", "in") and value in rule.values:
+            return True
+        if rule.operator == "contains" and any(exp in value for exp in rule.values):
+            return True
+    if flag.percentage > 0:
+        hash_val = int(hashlib.sha256(f"{flag.key}:{user_id}".encode()).hexdigest(), 16)
+        if hash_val % 100 < flag.percentage:
+            return True
+    return flag.default_value
+
+
+def run(users: int, flag_count: int, repeat: int) -> List[BenchmarkResult]:
+    flags = make_flags(flag_count)
+    legacy_flags = make_flags(flag_count)
+    service = FeatureFlagService()
+    loop = asyncio.new_event_loop()
+    for flag in flags:
+        loop.run_until_complete(service.create_flag(flag))
+
+    contexts = [(f"user_{i}", "pro", f"user_{i}@example.com") for i in range(users)]
+    evaluations = users * flag_count
+    legacy_sets = {flag.key: set() for flag in flags}
+
+    def legacy():
+        return [
+            legacy_is_enabled(flag, legacy_sets[flag.key], user_id, plan, email)
+            for user_id, plan, email in contexts for flag in legacy_flags
+        ]
+
+    async def compiled_single():
+        return [
+            await service.is_enabled(flag.key, user_id=user_id, user_email=email, plan=plan)
+            for user_id, plan, email in contexts for flag in flags
+        ]
+
+    async def compiled_bulk():
+        return [
+            await service.bulk_evaluate({"user_id": user_id, "user_email": email, "plan": plan})
+            for user_id, plan, email in contexts
+        ]
+
+    # Rollout buckets differ between the two hashes, so only the shape is comparable
+    assert len(legacy()) == len(loop.run_until_complete(compiled_single())) == evaluations
+    assert all(len(flags_for_user) == flag_count for flags_for_user in loop.run_until_complete(compiled_bulk()))
+
+    results = [
+        BenchmarkResult("eval: legacy sha256 + if-chain", best_of(repeat, legacy), evaluations),
+        BenchmarkResult("eval: compiled is_enabled",
+                        best_of(repeat, lambda: loop.run_until_complete(compiled_single())), evaluations),
+        BenchmarkResult("eval: compiled bulk_evaluate",
+                        best_of(repeat, lambda: loop.run_until_complete(compiled_bulk())), evaluations),
+    ]
+    loop.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20_000, help="distinct users evaluated")
+    parser.add_argument("--flags", type=int, default=20, help="flags evaluated per user")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per path (best is reported)")
+    args = parser.parse_args()
+
+    results = run(args.users, args.flags, args.repeat)
+
+    print(f"\n🚩 Feature flag benchmark ({args.users:,} users x {args.flags} flags, best of {args.repeat})\n")
+    baselines = {}
+    for result in results:
+        group = result.name.split(":")[0]
+        baseline = baselines.setdefault(group, result.seconds)
+        print(f"  {result.name:<32} {result.seconds * 1000:9.2f} ms  "
+              f"{result.ops_per_second:>14,.0f} evals/s  {baseline / result.seconds:6.1f}x")
+    print()
+
+
+if __name__ == "__main__":
+    main()
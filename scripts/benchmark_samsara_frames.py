@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+🎨 Samsara Frame Pipeline Benchmark
+===================================
+
+Compares the previous visualization cycle (pyplot frames rendered one at a
+time on the event loop thread, each saved to disk) with the frame pipeline in
+backend/samsara_bridge.py (process-pool rendering, in-memory encoding and
+uploads overlapping the render) and reports frames/sec.
+
+Usage:
+    python scripts/benchmark_samsara_frames.py --frames 24 --workers 4 --format gif
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+from matplotlib.colors import LinearSegmentedColormap  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.samsara_bridge import (UCF_COLOR_MAP, SamsaraRenderer,  # noqa: E402
+                                    frame_states, shutdown_frame_pool)
+
+UCF_STATE = {"harmony": 0.75, "resilience": 0.82, "prana": 0.67, "drishti": 0.73, "klesha": 0.24, "zoom": 1.2}
+
+
+@dataclass
+class BenchmarkResult:
+    """Best-of-N timing for one code path."""
+    name: str
+    seconds: float
+    operations: int
+
+    @property
+    def ops_per_second(self) -> float:
+        return self.operations / self.seconds if self.seconds else float("inf")
+
+
+def best_of(repeat: int, fn: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+class CountingStorage:
+    """Upload target that only counts bytes (keeps the network out of the timing)."""
+
+    def __init__(self):
+        self.uploaded = 0
+
+    async def upload_bytes(self, data: bytes, filename: str, remote_dir: str) -> int:
+        self.uploaded += len(data)
+        return 200
+
+
+# ----------------------------------------------------------------------------
+# Previous implementation, kept here for comparison
+# ----------------------------------------------------------------------------
+
+def legacy_frame(ucf_state: dict, path: Path, dpi: int) -> None:
+    fig, ax = plt.subplots(figsize=(12, 12), facecolor="black")
+    ax.set_facecolor("black")
+    harmony, resilience = ucf_state.get("harmony", 0.5), ucf_state.get("resilience", 0.5)
+    prana, zoom = ucf_state.get("prana", 0.5), ucf_state.get("zoom", 1.0)
+
+    x = np.linspace(-2, 2, 800)
+    X, Y = np.meshgrid(x, x)
+    C = X + 1j * Y
+    Z = np.zeros_like(C)
+    max_iter = int(50 + harmony * 100)
+    escape_count = np.zeros(C.shape)
+    for i in range(max_iter):
+        mask = np.abs(Z) <= 2
+        Z[mask] = Z[mask] ** 2 + C[mask] * (1 + resilience * 0.5) + prana * 0.1j
+        escape_count[mask] = i
+
+    colors = ["#000000", UCF_COLOR_MAP["harmony"], UCF_COLOR_MAP["prana"],
+              UCF_COLOR_MAP["resilience"], UCF_COLOR_MAP["drishti"]]
+    cmap = LinearSegmentedColormap.from_list("ucf", colors, N=256)
+    ax.imshow(escape_count * zoom, extent=[-2, 2, -2, 2], cmap=cmap, origin="lower", interpolation="bilinear")
+    for y, label in ((0.98, f"Harmony: {harmony:.4f}"), (0.92, f"Resilience: {resilience:.4f}"),
+                     (0.86, f"Prana: {prana:.4f}")):
+        ax.text(0.02, y, label, transform=ax.transAxes, color="white", fontsize=10, verticalalignment="top",
+                bbox=dict(boxstyle="round,pad=0.3", facecolor="black", alpha=0.7))
+    ax.text(0.5, 0.05, "Tat Tvam Asi", transform=ax.transAxes, color="cyan", fontsize=16, weight="bold",
+            horizontalalignment="center", verticalalignment="bottom",
+            bbox=dict(boxstyle="round,pad=0.5", facecolor="black", alpha=0.8, edgecolor="cyan", linewidth=2))
+    ax.set_xlim(-2, 2)
+    ax.set_ylim(-2, 2)
+    ax.axis("off")
+    plt.savefig(path, dpi=dpi, bbox_inches="tight", facecolor="black")
+    plt.close()
+
+
+def legacy_cycle(frames: int, dpi: int) -> None:
+    # The old loop also slept 0.1 s per frame; that is left out of the timing
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, state in enumerate(frame_states(UCF_STATE, frames)):
+            legacy_frame(state, Path(tmp) / f"samsara_frame_{i:04d}.png", dpi)
+
+
+def run(frames: int, workers: int, fmt: str, dpi: int, repeat: int) -> List[BenchmarkResult]:
+    storage = CountingStorage()
+    renderer = SamsaraRenderer(storage=storage, workers=workers, dpi=dpi)
+    # Start the pool (and import matplotlib in the workers) outside the timing
+    asyncio.run(renderer.render_cycle(UCF_STATE, frames=frames, fmt=fmt))
+
+    cycles = []
+
+    def pipeline():
+        cycles.append(asyncio.run(renderer.render_cycle(UCF_STATE, frames=frames, fmt=fmt, upload_dir="benchmark")))
+
+    results = [
+        BenchmarkResult("cycle: pyplot, sequential", best_of(repeat, lambda: legacy_cycle(frames, dpi)), frames),
+        BenchmarkResult(f"cycle: pipeline + {fmt}", best_of(repeat, pipeline), frames),
+    ]
+    assert cycles[-1].animation and len(cycles[-1].frames) == frames
+    assert all(status == 200 for status in cycles[-1].uploads)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=24, help="frames per visualization cycle")
+    parser.add_argument("--workers", type=int, default=None, help="frames in flight per cycle (default: the pool size)")
+    parser.add_argument("--format", default="gif", choices=["gif", "webp", "webm"], help="animation format")
+    parser.add_argument("--dpi", type=int, default=150, help="frame resolution (the figure is 12 inches)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per path (best is reported)")
+    args = parser.parse_args()
+
+    try:
+        results = run(args.frames, args.workers, args.format, args.dpi, args.repeat)
+    finally:
+        shutdown_frame_pool()
+
+    print(f"\n🎨 Samsara frame pipeline benchmark ({args.frames} frames at {args.dpi} dpi, "
+          f"{args.workers or 'auto'} workers, best of {args.repeat})\n")
+    baseline = results[0].seconds
+    for result in results:
+        print(f"  {result.name:<30} {result.seconds * 1000:9.0f} ms  "
+              f"{result.ops_per_second:>8.2f} frames/s  {baseline / result.seconds:6.1f}x")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+🌀 Transform Expression Microbenchmark
+======================================
+
+Compares the legacy transform_data path (``eval`` of the raw expression
+string per field / per list item) with the compiled expression engine in
+helix-spirals/backend/expressions.py, including the vectorised filter
+path for lists of homogeneous dicts.
+
+Usage:
+    python scripts/benchmark_transform_expressions.py --items 100000 --repeat 5
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "helix-spirals" / "backend"))
+
+import expressions  # noqa: E402
+
+FILTER_CONDITION = 'item["amount"] > 500 and item["status"] == "ok"'
+MAP_EXPRESSION = "value * 2 + consciousness_level"
+
+
+@dataclass
+class BenchmarkResult:
+    """Best-of-N timing for one code path."""
+    name: str
+    seconds: float
+    operations: int
+
+    @property
+    def ops_per_second(self) -> float:
+        return self.operations / self.seconds if self.seconds else float("inf")
+
+
+def best_of(repeat: int, fn: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def legacy_filter(items: List[dict]) -> List[dict]:
+    return [item for item in items if eval(FILTER_CONDITION, {"__builtins__": {}}, {
+        "item": item,
+        "consciousness_level": 5
+    })]
+
+
+def legacy_map(count: int) -> None:
+    for value in range(count):
+        eval(MAP_EXPRESSION, {"__builtins__": {}}, {"value": value, "consciousness_level": 5})
+
+
+def compiled_map(count: int) -> None:
+    expression = expressions.compile_expression(MAP_EXPRESSION)
+    for value in range(count):
+        expression.evaluate({"value": value, "consciousness_level": 5})
+
+
+def run(items_count: int, map_count: int, repeat: int) -> List[BenchmarkResult]:
+    items = [
+        {"amount": i % 1000, "status": "ok" if i % 3 else "fail", "id": i}
+        for i in range(items_count)
+    ]
+    namespace = {"consciousness_level": 5}
+    condition = expressions.compile_expression(FILTER_CONDITION)
+
+    expected = legacy_filter(items)
+    assert condition.filter(items, namespace) == expected, "vectorised filter diverged from eval"
+
+    def compiled_scalar_filter():
+        threshold = expressions.VECTORISE_MIN_ITEMS
+        expressions.VECTORISE_MIN_ITEMS = float("inf")
+        try:
+            return condition.filter(items, namespace)
+        finally:
+            expressions.VECTORISE_MIN_ITEMS = threshold
+
+    return [
+        BenchmarkResult("filter: eval per item", best_of(repeat, lambda: legacy_filter(items)), items_count),
+        BenchmarkResult("filter: compiled per item", best_of(repeat, compiled_scalar_filter), items_count),
+        BenchmarkResult("filter: vectorised", best_of(repeat, lambda: condition.filter(items, namespace)), items_count),
+        BenchmarkResult("map: eval per call", best_of(repeat, lambda: legacy_map(map_count)), map_count),
+        BenchmarkResult("map: compiled", best_of(repeat, lambda: compiled_map(map_count)), map_count),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100_000, help="list size for filter benchmarks")
+    parser.add_argument("--maps", type=int, default=100_000, help="evaluations for map benchmarks")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per path (best is reported)")
+    args = parser.parse_args()
+
+    results = run(args.items, args.maps, args.repeat)
+
+    print(f"\n🌀 Transform expression benchmark ({args.items:,} items, best of {args.repeat})\n")
+    baselines = {}
+    for result in results:
+        group = result.name.split(":")[0]
+        baseline = baselines.setdefault(group, result.seconds)
+        print(f"  {result.name:<28} {result.seconds * 1000:9.2f} ms  "
+              f"{result.ops_per_second:>14,.0f} ops/s  {baseline / result.seconds:6.1f}x")
+    print()
+
+
+if __name__ == "__main__":
+    main()
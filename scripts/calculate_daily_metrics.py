@@ -3,7 +3,9 @@
 📊 Daily Metrics Calculation Cron Job
 Automatically calculate and store daily metrics for dashboard performance
 
-Run this daily via cron or scheduler to pre-calculate metrics.
+Run this daily via cron or scheduler to pre-calculate metrics. Usage and
+error logs are folded into daily rollups incrementally; --days rebuilds the
+rollups and DailyMetrics for a whole range from the raw logs (backfill).
 
 Usage:
     python scripts/calculate_daily_metrics.py [--date YYYY-MM-DD] [--days N]
@@ -15,8 +17,8 @@ Examples:
     # Calculate for specific date
     python scripts/calculate_daily_metrics.py --date 2025-12-10
 
-    # Calculate for last 7 days
-    python scripts/calculate_daily_metrics.py --days 7
+    # Backfill the last 90 days (including today)
+    python scripts/calculate_daily_metrics.py --days 90
 
 VILLAIN CRON: AUTOMATED METRICS DOMINATION 😈
 """
@@ -62,6 +64,25 @@ def calculate_metrics_for_date(date: datetime):
         db.close()
 
 
+def backfill_metrics(start_date: datetime, end_date: datetime):
+    """Rebuild rollups and DailyMetrics for every day in the range"""
+    db = SessionLocal()
+    try:
+        rows = MetricsCalculator(db).backfill(start_date, end_date)
+
+        print(f"\n📊 Backfill complete!")
+        print(f"   ✅ Days: {len(rows)} ({start_date:%Y-%m-%d} → {end_date:%Y-%m-%d})")
+        print(f"   API Calls: {sum(row.api_calls_total for row in rows):,}")
+        return True
+    except Exception as e:
+        print(f"❌ Error backfilling metrics: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        db.close()
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Calculate daily metrics for Helix dashboard"
@@ -74,7 +95,7 @@ def main():
     parser.add_argument(
         "--days",
         type=int,
-        help="Calculate for last N days"
+        help="Backfill the last N days (including today)"
     )
     parser.add_argument(
         "--force",
@@ -85,25 +106,13 @@ def main():
     args = parser.parse_args()
 
     if args.days:
-        # Calculate for multiple days
-        print(f"📊 Calculating metrics for last {args.days} days...")
+        # Rebuild the whole range in one pass over the logs
+        print(f"📊 Backfilling metrics for last {args.days} days...")
         end_date = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        start_date = end_date - timedelta(days=args.days)
-
-        success_count = 0
-        fail_count = 0
-
-        current_date = start_date
-        while current_date < end_date:
-            if calculate_metrics_for_date(current_date):
-                success_count += 1
-            else:
-                fail_count += 1
-            current_date += timedelta(days=1)
-
-        print(f"\n📊 Batch calculation complete!")
-        print(f"   ✅ Successful: {success_count}")
-        print(f"   ❌ Failed: {fail_count}")
+        start_date = end_date - timedelta(days=args.days - 1)
+
+        success = backfill_metrics(start_date, end_date)
+        sys.exit(0 if success else 1)
 
     else:
         # Calculate for single date
@@ -0,0 +1,219 @@
+"""
+Tests for the partitioned, indexed audit log store and service.
+"""
+import asyncio
+import json
+import sqlite3
+import time
+from datetime import datetime
+
+import pytest
+
+from backend.saas.audit_logs import (AuditAction, AuditLog, AuditLogQuery,
+                                     AuditLogService, AuditSeverity)
+from backend.saas.audit_store import SQLiteAuditStore
+
+
+def make_log(index: int, month: int = 1, **fields) -> AuditLog:
+    values = {
+        "action": AuditAction.LOGIN if index % 2 else AuditAction.USER_UPDATED,
+        "resource_type": "user",
+        "user_id": f"user_{index % 3}",
+        "ip_address": f"10.0.0.{index % 4}",
+        "description": f"event number {index}",
+        "timestamp": datetime(2025, month, 1 + index % 28, 12, 0, index % 60),
+    }
+    values.update(fields)
+    return AuditLog(**values)
+
+
+@pytest.fixture
+async def audit(tmp_path):
+    service = AuditLogService(store=SQLiteAuditStore(str(tmp_path / "audit")), batch_interval=0.01)
+    yield service
+    await service.stop()
+    service.store.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_filters_use_indexes_across_monthly_partitions(audit):
+    """Entries land in one file per month; filtered queries return newest first."""
+    logs = [make_log(i, month=1 + i % 3) for i in range(60)]
+    audit.store.append_many(logs)
+
+    assert audit.store.partitions() == ["202501", "202502", "202503"]
+    assert await audit.count() == 60
+
+    result = await audit.query(AuditLogQuery(user_id="user_1", action=AuditAction.LOGIN, limit=1000))
+    expected = sorted(
+        (log for log in logs if log.user_id == "user_1" and log.action == AuditAction.LOGIN),
+        key=lambda log: (log.timestamp, log.id),
+        reverse=True,
+    )
+    assert [log.id for log in result] == [log.id for log in expected]
+
+    january = await audit.query(AuditLogQuery(
+        start_date=datetime(2025, 1, 1), end_date=datetime(2025, 1, 31, 23, 59), ip_address="10.0.0.0",
+    ))
+    assert january and all(log.timestamp.month == 1 and log.ip_address == "10.0.0.0" for log in january)
+
+    conn = sqlite3.connect(str(audit.store.directory / "audit_202501.db"))
+    plan = " ".join(row[3] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT doc FROM audit_logs WHERE user_id = ? ORDER BY ts DESC, id DESC", ("u",)
+    ))
+    conn.close()
+    assert "idx_audit_user" in plan
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_keyset_pages_cover_everything_once(audit):
+    """Following cursors visits every entry exactly once in timestamp order."""
+    audit.store.append_many([make_log(i, month=1 + i % 2) for i in range(45)])
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = await audit.query_page(AuditLogQuery(limit=10, cursor=cursor))
+        seen.extend(page)
+        if cursor is None:
+            break
+
+    assert len(seen) == 45
+    assert len({log.id for log in seen}) == 45
+    keys = [(log.timestamp, log.id) for log in seen]
+    assert keys == sorted(keys, reverse=True)
+
+    by_action = await audit.query(AuditLogQuery(sort_by="action", sort_order="asc", limit=45))
+    assert [log.action.value for log in by_action] == sorted(log.action.value for log in seen)
+    with pytest.raises(ValueError):
+        await audit.query(AuditLogQuery(sort_by="description"))
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_search_and_append_only(audit):
+    """Search matches words in description and metadata; stored rows are immutable."""
+    audit.store.append_many([
+        make_log(1, description="Password changed for admin", metadata={"reason": "rotation"}),
+        make_log(2, description="Invoice paid", metadata={"plan": "enterprise"}),
+        make_log(3, description="Password reset requested"),
+    ])
+
+    assert {log.description for log in await audit.query(AuditLogQuery(search="password"))} == {
+        "Password changed for admin", "Password reset requested",
+    }
+    assert [log.description for log in await audit.query(AuditLogQuery(search="enterp"))] == ["Invoice paid"]
+    assert [log.description for log in await audit.query(AuditLogQuery(search="password rotation"))] == [
+        "Password changed for admin"
+    ]
+
+    conn = audit.store._connection("202501")
+    with pytest.raises(sqlite3.DatabaseError):
+        conn.execute("DELETE FROM audit_logs")
+    assert await audit.count() == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_log_export_stats_and_retention(audit):
+    """Logged entries round-trip; export streams in pages; old months are dropped whole."""
+    entry = await audit.log(
+        action=AuditAction.API_KEY_CREATED,
+        resource_type="api_key",
+        description="Key created",
+        user_id="user_9",
+        severity=AuditSeverity.MEDIUM,
+    )
+    await audit.flush()
+    assert (await audit.get_by_id(entry.id)).checksum == entry.checksum
+    audit.store.append_many([make_log(i) for i in range(25)])
+
+    progress = {}
+    chunks = [chunk async for chunk in audit.export(AuditLogQuery(), format="json", page_size=10, progress=progress)]
+    assert len(chunks) == 5  # "[", three pages, "]"
+    assert len(json.loads("".join(chunks))) == 26
+    assert progress["records"] == 26
+
+    csv_text = "".join([chunk async for chunk in audit.export(AuditLogQuery(user_id="user_9"), format="csv")])
+    assert csv_text.splitlines()[0].startswith("id,timestamp")
+    assert len(csv_text.strip().splitlines()) == 2
+
+    stats = await audit.get_stats()
+    assert stats["total_logs"] == 26
+    assert stats["action_counts"][AuditAction.LOGIN.value] == 12
+
+    assert await audit.apply_retention(retention_days=30) == 1
+    assert await audit.count() == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_ingestion_does_not_wait_for_geolocation(audit, monkeypatch):
+    """log() returns before the geo lookup; the worker enriches once per IP and writes in batches."""
+    lookups = []
+
+    async def slow_lookup(ip_address):
+        lookups.append(ip_address)
+        await asyncio.sleep(0.2)
+        return {"country": "Testland"}
+
+    monkeypatch.setattr(audit, "_lookup_ip_api", slow_lookup)
+
+    class FakeRequest:
+        class client:
+            host = "8.8.8.8"
+        headers = {}
+
+    started = time.perf_counter()
+    entries = [
+        await audit.log(AuditAction.LOGIN, "user", f"login {i}", user_id="u", request=FakeRequest())
+        for i in range(50)
+    ]
+    assert time.perf_counter() - started < 0.1
+    assert (await audit.get_by_id(entries[0].id)).id == entries[0].id  # visible while queued
+
+    await audit.flush()
+    stats = audit.get_ingest_stats()
+    assert lookups == ["8.8.8.8"]
+    assert stats["written"] == 50 and stats["queued"] == 0
+    assert stats["batches"] < 50
+    assert stats["lag_max_ms"] >= 200
+    stored = await audit.get_by_id(entries[-1].id)
+    assert stored.geo_location == {"country": "Testland"}
+    assert stored.checksum == stored.compute_checksum()
+
+    # Cached: later entries from the same IP never look it up again
+    await audit.log(AuditAction.LOGOUT, "user", "logout", request=FakeRequest())
+    await audit.flush()
+    assert lookups == ["8.8.8.8"]
+    assert (await audit.get_stats())["ingest"]["geo_cache"]["hits"] >= 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_stop_gives_up_on_a_dead_store_and_replays_the_spill(tmp_path, monkeypatch):
+    """Shutdown doesn't hang while the store is down; the unwritten entries survive to the next start."""
+    store = SQLiteAuditStore(str(tmp_path / "audit"))
+
+    def store_down(entries):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    down = AuditLogService(store=store, batch_interval=0.01)
+    monkeypatch.setattr(store, "append_many", store_down)
+    entry = await down.log(AuditAction.LOGIN, "user", "login during outage", user_id="u")
+    started = time.perf_counter()
+    await down.stop(timeout=0.2)
+    assert time.perf_counter() - started < 1.0
+    assert [json.loads(line)["id"] for line in open(down.spill_path)] == [entry.id]
+
+    monkeypatch.undo()
+    restarted = AuditLogService(store=store, batch_interval=0.01)
+    try:
+        await restarted.log(AuditAction.LOGOUT, "user", "logout", user_id="u")
+        await restarted.flush()
+        assert (await restarted.get_by_id(entry.id)).description == "login during outage"
+        assert restarted.get_ingest_stats()["written"] == 2
+    finally:
+        await restarted.stop()
+        store.close()
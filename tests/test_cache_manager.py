@@ -0,0 +1,97 @@
+"""
+Tests for the bounded in-memory response cache.
+"""
+import asyncio
+
+import pytest
+
+from backend.core.cache_manager import ResponseCache, cached_response, get_cache
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_entries_expire_with_their_own_ttl():
+    """TTL is stored per entry; get no longer takes it."""
+    cache = ResponseCache(default_ttl=60)
+    await cache.set("short", {"v": 1}, ttl_seconds=0.05)
+    await cache.set("long", {"v": 2})
+
+    assert await cache.get("short") == {"v": 1}
+    await asyncio.sleep(0.06)
+    assert await cache.get("short") is None
+    assert await cache.get("long") == {"v": 2}
+    assert cache.get_stats()["expirations"] == 1
+    assert cache.get_stats()["entries"] == 1
+
+
+@pytest.mark.unit
+def test_bounded_by_entries_and_bytes_with_lru_eviction():
+    """Recently read entries survive eviction; totals stay within both limits."""
+    cache = ResponseCache(max_entries=3, max_bytes=10_000)
+    for key in ("a", "b", "c"):
+        cache.set_nowait(key, key * 10)
+    cache.get_nowait("a")  # recently used
+    cache.set_nowait("d", "d" * 10)
+
+    assert cache.get_nowait("b") is None
+    assert cache.get_nowait("a") == "a" * 10
+    assert cache.get_stats()["evictions"] == 1
+
+    small = ResponseCache(max_entries=100, max_bytes=100)
+    for i in range(10):
+        small.set_nowait(f"k{i}", "x" * 30)
+    stats = small.get_stats()
+    assert stats["bytes"] <= 100 and stats["entries"] == 3
+    assert not small.set_nowait("huge", "x" * 500)
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_cached_response_coalesces_concurrent_misses():
+    """Only one of many concurrent requests for an expired key recomputes it."""
+    cache = get_cache()
+    await cache.clear()
+    cache.reset_stats()
+    calls = 0
+
+    @cached_response(ttl_seconds=30, key_func=lambda **kwargs: "test:coalesce")
+    async def expensive_status():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return {"status": "ok", "calls": calls}
+
+    results = await asyncio.gather(*(expensive_status() for _ in range(50)))
+
+    assert calls == 1
+    assert all(r == {"status": "ok", "calls": 1} for r in results)
+    assert cache.get_stats()["coalesced"] == 49
+    assert cache.get_stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_coalesced_waiters_share_errors_and_survive_cancellation():
+    """Waiters see the leader's error; if the leader is cancelled a waiter takes over."""
+    cache = ResponseCache()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(*(cache.get_or_compute("err", failing) for _ in range(5)), return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+    assert cache.get_nowait("err") is None
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    leader = asyncio.create_task(cache.get_or_compute("slow", slow))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_compute("slow", slow))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await waiter == "done"
+    assert cache.get_nowait("slow") == "done"
@@ -0,0 +1,119 @@
+"""
+Tests for the two-tier (in-process L1 + Redis L2) cache service.
+"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi_cache")
+pytest.importorskip("loguru")
+fakeredis = pytest.importorskip("fakeredis")
+
+from backend.core.cache import CacheService  # noqa: E402
+
+
+@pytest.fixture
+async def cache_pair():
+    """Two cache services (two "processes") sharing one fake Redis."""
+    server = fakeredis.FakeServer()
+    services = []
+    for _ in range(2):
+        service = CacheService(l1_ttl=60, scan_batch_size=10)
+        await service.attach(fakeredis.aioredis.FakeRedis(server=server))
+        services.append(service)
+    await asyncio.sleep(0.05)  # let both subscriptions register
+    yield services
+    for service in services:
+        await service.close()
+
+
+async def _eventually(predicate, timeout=1.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_l1_serves_repeat_reads_and_pubsub_invalidates_peers(cache_pair):
+    a, b = cache_pair
+    await a.set("ucf:state", {"harmony": 0.5}, ttl=60)
+
+    assert await b.get("ucf:state") == {"harmony": 0.5}  # L2, then cached in b's L1
+    assert await b.get("ucf:state") == {"harmony": 0.5}
+    assert b.counters["l2_hits"] == 1 and b.counters["l1_hits"] == 1
+
+    received = b.counters["invalidations_received"]
+    await a.set("ucf:state", {"harmony": 0.9}, ttl=60)
+    await _eventually(lambda: b.counters["invalidations_received"] > received)
+    assert await b.get("ucf:state") == {"harmony": 0.9}
+
+    received = b.counters["invalidations_received"]
+    await a.delete("ucf:state")
+    await _eventually(lambda: b.counters["invalidations_received"] > received)
+    assert await b.get("ucf:state") is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_stale_while_revalidate_and_negative_caching(cache_pair):
+    service, _ = cache_pair
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"version": calls}
+
+    results = await asyncio.gather(*(service.get_or_set("agent:status:kael", loader, ttl=1, stale_ttl=30)
+                                     for _ in range(10)))
+    assert calls == 1 and all(r == {"version": 1} for r in results)
+
+    # An already-expired value is served stale while one refresh runs
+    await service.set("agent:status:kael", {"version": 1}, ttl=0, stale_ttl=30)
+    assert await service.get("agent:status:kael") is None
+    assert await service.get_or_set("agent:status:kael", loader, ttl=60) == {"version": 1}
+    assert service.counters["stale_served"] == 1
+    await _eventually(lambda: calls == 2)
+    await _eventually(lambda: not service._loads)
+    assert await service.get("agent:status:kael") == {"version": 2}
+
+    misses = 0
+
+    async def missing():
+        nonlocal misses
+        misses += 1
+        return None
+
+    for _ in range(3):
+        assert await service.get_or_set("user:profile:ghost", missing, ttl=60, negative_ttl=30) is None
+    assert misses == 1
+    assert service.counters["negative_hits"] == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_clear_pattern_scans_in_batches_and_clears_peer_l1(cache_pair):
+    a, b = cache_pair
+    for i in range(35):
+        await a.set(f"user:profile:{i}", {"id": i}, ttl=60)
+    await a.set("agent:status:kael", {"ok": True}, ttl=60)
+    assert await b.get("user:profile:3") == {"id": 3}
+
+    assert await a.clear_pattern("user:*") == 35
+    await _eventually(lambda: b.l1.get_nowait("user:profile:3") is None)
+    assert await b.get("user:profile:3") is None
+    assert await b.get("agent:status:kael") == {"ok": True}
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_memory_fallback_without_redis():
+    service = CacheService()
+    assert service.mode == "memory"
+    assert await service.set("ucf:state", {"harmony": 0.7}, ttl=60)
+    assert await service.get("ucf:state") == {"harmony": 0.7}
+    assert await service.clear_pattern("ucf:*") == 1
+    assert await service.get("ucf:state") is None
@@ -0,0 +1,168 @@
+"""
+Tests for the consciousness history store, vectorised analytics kernels and report.
+"""
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backend import consciousness_analytics_engine as engine
+from backend.consciousness_analytics_engine import (AgentCorrelationAnalyzer,
+                                                    AnalyticsReport,
+                                                    AnomalyDetector,
+                                                    ConsciousnessForecast,
+                                                    ConsciousnessTimeSeries,
+                                                    TrendAnalyzer,
+                                                    least_squares_line,
+                                                    rolling_mean)
+
+
+@pytest.fixture
+def history():
+    rng = np.random.default_rng(7)
+    values = 5 + np.cumsum(rng.normal(0, 0.05, 2000))
+    values[[100, 900, 1500]] += [4, -4, 3]  # spikes and drops
+    return values
+
+
+def write_history(path, hours, per_hour):
+    """Legacy-format JSONL history ending now, oldest first."""
+    now = datetime.utcnow()
+    count = hours * per_hour
+    with open(path, "w") as f:
+        for i in range(count):
+            timestamp = now - timedelta(hours=hours) + timedelta(hours=hours * (i + 0.5) / count)
+            f.write(json.dumps({
+                "timestamp": timestamp.isoformat() + "Z", "consciousness_level": i % 10,
+                "harmony": 0.5, "resilience": 1.0, "prana": 0.5, "drishti": 0.5,
+                "klesha": 0.01, "zoom": 1.0, "source": "system",
+            }) + "\n")
+    return count
+
+
+@pytest.mark.unit
+def test_windows_seek_instead_of_reading_everything(tmp_path, monkeypatch):
+    """Windows are honoured, the tail is read once and wide windows only read their own bytes."""
+    path = tmp_path / "consciousness_history.jsonl"
+    write_history(path, hours=200, per_hour=50)
+    monkeypatch.setattr(ConsciousnessTimeSeries, "INDEX_STRIDE", 4096)
+    ts = ConsciousnessTimeSeries(path, tail_hours=24)
+
+    parsed = []
+    original = engine._parse_lines
+    monkeypatch.setattr(engine, "_parse_lines", lambda chunk: parsed.extend(original(chunk)) or original(chunk))
+
+    one_hour = ts.get_dataframe(hours=1)
+    assert len(one_hour) in (49, 50, 51)
+    assert len(ts.get_dataframe(hours=24)) in range(1199, 1202)
+    assert len(parsed) < 1300  # the 24 h tail plus index slack, not all 10,000 lines
+
+    ts.record(7.5, {"harmony": 0.9})
+    parsed.clear()
+    latest = ts.get_dataframe(hours=1)
+    assert parsed == [] and latest.iloc[-1]["consciousness_level"] == 7.5
+    assert ts.get_latest()["harmony"] == 0.9
+
+    week = ts.get_dataframe(hours=168)
+    assert len(week) in range(8400, 8403) and week["timestamp"].is_monotonic_increasing
+    assert len(parsed) < 7300  # the 144 h before the tail
+    ts.record(8.0, {})
+    parsed.clear()
+    assert len(ts.get_dataframe(hours=168)) == len(week) + 1
+    assert parsed == []  # the older part of the window is cached
+
+
+@pytest.mark.unit
+def test_rotation_moves_old_history_into_npz_segments(tmp_path):
+    """Rotated history stays queryable and the JSONL file shrinks."""
+    path = tmp_path / "consciousness_history.jsonl"
+    total = write_history(path, hours=100, per_hour=40)
+    before = ConsciousnessTimeSeries(path, tail_hours=12).get_dataframe(hours=200)
+    assert len(before) == total
+
+    ts = ConsciousnessTimeSeries(path, tail_hours=12)
+    size = path.stat().st_size
+    segment = ts.rotate(older_than_hours=24)
+    assert segment is not None and segment.suffix == ".npz"
+    assert path.stat().st_size < size / 3
+    assert [p for _, _, p in ts.segments()] == [segment]
+
+    after = ConsciousnessTimeSeries(path, tail_hours=12).get_dataframe(hours=200)
+    assert len(after) == total
+    assert np.array_equal(after["consciousness_level"].to_numpy(), before["consciousness_level"].to_numpy())
+    assert (after["timestamp"].to_numpy() == before["timestamp"].to_numpy()).all()
+
+    ts.record(3.0, {})
+    assert ConsciousnessTimeSeries(path).get_latest()["consciousness_level"] == 3.0
+
+
+@pytest.mark.unit
+def test_kernels_match_naive_implementations(history):
+    """Cumulative-sum windows, z-scores and least squares agree with the per-window versions."""
+    window = 25
+    padded = np.concatenate((np.full(window - 1, history[0]), history))
+    naive = [padded[i:i + window].mean() for i in range(len(history))]
+    assert np.allclose(rolling_mean(history, window), naive)
+    assert TrendAnalyzer.calculate_rolling_average([1.0, 2.0], window=5) == [1.0, 2.0]
+
+    slope, intercept = least_squares_line(history[-50:])
+    assert (slope, intercept) == pytest.approx(tuple(np.polyfit(np.arange(50), history[-50:], 1)))
+    assert TrendAnalyzer.calculate_momentum(list(history)) == pytest.approx(np.polyfit(np.arange(5), history[-5:], 1)[0])
+
+    mean, std = history.mean(), history.std()
+    expected = [(i, abs(v - mean) / std) for i, v in enumerate(history) if abs(v - mean) / std > 2.5]
+    assert AnomalyDetector.detect_zscore_anomalies(list(history)) == pytest.approx(expected)
+    assert AnomalyDetector.detect_sudden_drops(list(history), threshold=0.5) == [
+        i for i in range(1, len(history)) if history[i - 1] - history[i] > 0.5
+    ]
+    assert AnomalyDetector.detect_pattern_anomalies([1, 5, 12, -1], (0, 10)) == [2, 3]
+
+
+@pytest.mark.unit
+def test_least_squares_forecast():
+    """Forecasts extend the fitted line over the recent window and stay within [0, 10]."""
+    rising = [1 + 0.5 * i for i in range(30)]
+    forecast = ConsciousnessForecast.predict_next_state(rising, periods=3)
+    assert forecast == pytest.approx([10.0, 10.0, 10.0])
+    assert ConsciousnessForecast.predict_next_state([2.0, 2.1, 2.2, 2.3], periods=2) == pytest.approx([2.4, 2.5])
+    assert ConsciousnessForecast.predict_next_state([], periods=2) == [5.0, 5.0]
+
+
+@pytest.mark.unit
+def test_agent_correlation_matches_pearson(history):
+    """Per-agent correlations equal Pearson r of the binary acted series."""
+    start = datetime(2025, 1, 1)
+    timestamps = [start + timedelta(minutes=i) for i in range(len(history))]
+    rng = np.random.default_rng(1)
+    acted = {"Kael": rng.choice(len(history), 300), "Lumina": np.flatnonzero(history > np.median(history))}
+    actions = [{"agent_name": "Kael", "index": int(i)} for i in acted["Kael"]]
+    actions += [{"agent_name": "Lumina", "timestamp": (timestamps[i] + timedelta(seconds=30)).isoformat() + "Z"}
+                for i in acted["Lumina"]]
+    actions.append({"agent_name": "Ghost", "timestamp": "2024-01-01T00:00:00Z"})  # before the series
+
+    result = AgentCorrelationAnalyzer.correlate_agent_with_consciousness(actions, history, timestamps)
+    assert set(result) == {"Kael", "Lumina"}
+    for agent, indices in acted.items():
+        series = np.zeros(len(history))
+        series[indices] = 1
+        assert result[agent] == pytest.approx(np.corrcoef(series, history)[0, 1])
+    assert result["Lumina"] > 0.5
+
+
+@pytest.mark.unit
+def test_report_computes_every_metric_from_one_array(history, tmp_path):
+    """The shared-array report matches the individual analyzers."""
+    report = AnalyticsReport(ConsciousnessTimeSeries(tmp_path / "history.jsonl")).generate(values=history)
+    values = list(history)
+    assert report["data_points"] == len(values)
+    assert report["trend"]["direction"] == TrendAnalyzer.detect_trend(values)
+    assert report["trend"]["volatility"] == round(TrendAnalyzer.calculate_volatility(values), 3)
+    assert report["anomalies"]["zscore_count"] == len(AnomalyDetector.detect_zscore_anomalies(values))
+    assert report["anomalies"]["sudden_drops"] == len(AnomalyDetector.detect_sudden_drops(values))
+    assert report["forecast"]["next_4_periods"] == [
+        round(v, 2) for v in ConsciousnessForecast.predict_next_state(values)
+    ]
+    assert report["forecast"]["confidence"] == round(ConsciousnessForecast.calculate_forecast_confidence(values), 1)
+    assert report["statistics"]["median"] == round(float(np.median(history)), 2)
+    assert report["current_consciousness"] == history[-1]
@@ -0,0 +1,111 @@
+"""
+Tests for compiled feature flag evaluation and the HyperLogLog sketch.
+"""
+import pytest
+
+from backend.saas.feature_flags import (FeatureFlag, FeatureFlagService,
+                                        TargetingRule)
+from backend.saas.sketches import HyperLogLog
+
+
+@pytest.fixture
+async def flags():
+    service = FeatureFlagService()
+    await service.create_flag(FeatureFlag(
+        key="new_dashboard", name="New dashboard", enabled=True, percentage=30,
+        targeting_rules=[
+            TargetingRule(type="plan", operator="in", values=["enterprise"]),
+            TargetingRule(type="email", operator="contains", values=["@helix.dev"]),
+            TargetingRule(type="custom", operator="equals", values=["region", "eu"]),
+        ],
+    ))
+    await service.create_flag(FeatureFlag(
+        key="pricing_test", name="Pricing test", enabled=True, is_experiment=True,
+        variants=["control", "treatment"], variant_weights={"control": 50, "treatment": 50},
+    ))
+    await service.create_flag(FeatureFlag(key="dark_mode", name="Dark mode", enabled=False))
+    return service
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_targeting_rollout_and_kill_switch(flags):
+    """Rules match through frozensets; rollout buckets are stable and near the percentage."""
+    assert await flags.is_enabled("new_dashboard", user_id="u1", plan="enterprise")
+    assert await flags.is_enabled("new_dashboard", user_id="u1", user_email="ops@helix.dev")
+    assert await flags.is_enabled("new_dashboard", user_id="u1", context={"region": "eu"})
+    assert not await flags.is_enabled("dark_mode", user_id="u1", plan="enterprise")
+    assert not await flags.is_enabled("missing", user_id="u1")
+
+    rolled_out = [await flags.is_enabled("new_dashboard", user_id=f"user_{i}") for i in range(5000)]
+    assert 0.27 < sum(rolled_out) / 5000 < 0.33
+    assert rolled_out[:50] == [await flags.is_enabled("new_dashboard", user_id=f"user_{i}") for i in range(50)]
+
+    before = flags.snapshot
+    await flags.kill_switch_activate("new_dashboard")
+    assert flags.snapshot is not before and flags.snapshot.version == before.version + 1
+    assert not await flags.is_enabled("new_dashboard", user_id="u1", plan="enterprise")
+    assert before.flags["new_dashboard"].active  # old snapshot is untouched
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_bulk_evaluate_matches_single_evaluation(flags):
+    """bulk_evaluate returns every flag with the same answers as is_enabled/get_variant."""
+    for i in range(200):
+        ctx = {"user_id": f"user_{i}", "plan": "pro" if i % 2 else "enterprise"}
+        bulk = await flags.bulk_evaluate(ctx)
+        assert set(bulk) == {"new_dashboard", "pricing_test", "dark_mode"}
+        assert bulk["new_dashboard"]["enabled"] == await flags.is_enabled(
+            "new_dashboard", user_id=ctx["user_id"], plan=ctx["plan"]
+        )
+        assert bulk["pricing_test"]["variant"] == await flags.get_variant("pricing_test", user_id=ctx["user_id"])
+        assert bulk["dark_mode"] == {"enabled": False, "variant": None}
+
+    assert await flags.bulk_evaluate({"user_id": "u1"}, ["dark_mode", "nope"]) == {
+        "dark_mode": {"enabled": False, "variant": None},
+        "nope": {"enabled": False, "variant": None},
+    }
+    variants = [(await flags.bulk_evaluate({"user_id": f"v{i}"}, ["pricing_test"]))["pricing_test"]["variant"]
+                for i in range(2000)]
+    assert 0.45 < variants.count("treatment") / 2000 < 0.55
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_unique_users_are_counted_approximately(flags):
+    """Flag stats use a fixed-size sketch instead of a set of user ids."""
+    for repeat in range(3):
+        for i in range(20_000):
+            await flags.is_enabled("dark_mode", user_id=f"user_{i}")
+
+    flag = await flags.get_flag("dark_mode")
+    assert flag.evaluation_count == 60_000
+    assert abs(flag.unique_users - 20_000) / 20_000 < 0.05
+
+    updated = await flags.update_flag("dark_mode", {
+        "enabled": True, "targeting_rules": [{"type": "user_id", "operator": "in", "values": ["user_1"]}],
+    })
+    assert isinstance(updated.targeting_rules[0], TargetingRule)
+    assert await flags.is_enabled("dark_mode", user_id="user_1")
+    assert (await flags.get_flag("dark_mode")).evaluation_count == 60_001
+
+
+@pytest.mark.unit
+def test_hyperloglog_union_and_serialization():
+    """Sketches merge as set unions and round-trip through bytes."""
+    small = HyperLogLog()
+    for i in range(10):
+        small.add(f"id_{i}")
+    assert small.count() == 10
+
+    a, b = HyperLogLog(), HyperLogLog()
+    for i in range(30_000):
+        a.add(f"id_{i}")
+    for i in range(20_000, 50_000):
+        b.add(f"id_{i}")
+    union = HyperLogLog.union([a, b])
+    assert abs(union.count() - 50_000) / 50_000 < 0.05
+    assert HyperLogLog.from_bytes(union.to_bytes()).count() == union.count()
+    with pytest.raises(ValueError):
+        union.merge(HyperLogLog(precision=10))
@@ -0,0 +1,840 @@
+"""
+Tests for the Helix Spirals execution engine (helix-spirals/backend).
+"""
+import asyncio
+import importlib
+import sys
+import types
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+SPIRALS_BACKEND = Path(__file__).parent.parent / "helix-spirals" / "backend"
+
+
+def _spirals_module(name):
+    """Import a helix-spirals backend module (the directory is not a package on disk)."""
+    if "helix_spirals" not in sys.modules:
+        package = types.ModuleType("helix_spirals")
+        package.__path__ = [str(SPIRALS_BACKEND)]
+        sys.modules["helix_spirals"] = package
+    return importlib.import_module(f"helix_spirals.{name}")
+
+
+@pytest.fixture
+def models():
+    return _spirals_module("models")
+
+
+@pytest.fixture
+def compiler():
+    return _spirals_module("compiler")
+
+
+@pytest.fixture
+def make_context(models):
+    def _make(**variables):
+        return models.ExecutionContext(
+            spiral_id="spiral-1",
+            trigger={"type": "webhook", "data": variables.get("trigger", {})},
+            variables=variables,
+        )
+    return _make
+
+
+@pytest.mark.unit
+def test_compiled_condition_walks_context_fields(models, compiler, make_context):
+    """Dotted field paths resolve against the live context without copying it."""
+    condition = models.Condition(field="variables.trigger.amount", operator="greater_than", value=10)
+    compiled = compiler.CompiledCondition(condition)
+
+    assert compiled.evaluate(make_context(trigger={"amount": 25})) is True
+    assert compiled.evaluate(make_context(trigger={"amount": 5})) is False
+    assert compiled.evaluate(make_context(trigger={})) is False
+
+
+@pytest.mark.unit
+def test_compiled_condition_resolves_variable_values(models, compiler, make_context):
+    """`{{var}}` condition values are looked up in execution variables."""
+    condition = models.Condition(field="status", operator="equals", value="{{expected}}")
+    compiled = compiler.CompiledCondition(condition)
+
+    assert compiled.evaluate(make_context(expected="pending")) is True
+    assert compiled.evaluate(make_context(expected="completed")) is False
+
+
+@pytest.mark.unit
+def test_regex_condition_is_precompiled(models, compiler, make_context):
+    """Static regex patterns are compiled once and invalid ones never match."""
+    condition = models.Condition(field="spiral_id", operator="regex_match", value=r"spiral-\d+")
+    assert compiler.CompiledCondition(condition).evaluate(make_context()) is True
+
+    broken = models.Condition(field="spiral_id", operator="regex_match", value="(")
+    assert compiler.CompiledCondition(broken).evaluate(make_context()) is False
+
+
+@pytest.mark.unit
+def test_condition_group_logical_operators(models, compiler, make_context):
+    """AND/OR short-circuiting matches the engine's original semantics."""
+    conditions = [
+        {"field": "variables.a", "operator": "equals", "value": 1, "logical_operator": "OR"},
+        {"field": "variables.b", "operator": "equals", "value": 2, "logical_operator": "AND"},
+    ]
+    group = compiler.CompiledConditionGroup(conditions)
+
+    assert group.evaluate(make_context(a=1, b=0)) is True
+    assert group.evaluate(make_context(a=0, b=2)) is True
+    assert group.evaluate(make_context(a=0, b=0)) is False
+
+
+@pytest.mark.unit
+def test_compiled_template_segments(compiler):
+    """Templates are split into literal and variable segments once."""
+    template = compiler.CompiledTemplate("Hello {{ user.name }}, level {{level}}!")
+
+    assert [s if isinstance(s, str) else s.path for s in template.segments] == [
+        "Hello ", ("user", "name"), ", level ", ("level",), "!",
+    ]
+    assert template.single_ref is None
+    assert compiler.CompiledTemplate("{{level}}").single_ref.name == "level"
+
+
+def _make_spiral(models, name="Cache Test", spiral_id="00000000-0000-0000-0000-000000000001"):
+    return models.Spiral(
+        id=spiral_id,
+        name=name,
+        trigger={"type": "manual", "name": "Manual", "config": {"type": "manual"}},
+        actions=[{
+            "type": "log_event",
+            "name": "Log",
+            "config": {"type": "log_event", "level": "info", "message": "hello"},
+        }],
+    )
+
+
+class _FakePool:
+    """Minimal asyncpg pool stand-in for storage calls that only write."""
+
+    def acquire(self):
+        class _Acquire:
+            async def __aenter__(self):
+                conn = MagicMock()
+                conn.execute = AsyncMock(return_value="INSERT 1")
+                return conn
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return _Acquire()
+
+
+async def _wait_for(predicate, timeout=2.0):
+    deadline = asyncio.get_event_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_event_loop().time() > deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+@pytest.mark.asyncio
+async def test_spiral_cache_coherent_across_workers(models):
+    """A save on one worker invalidates the parsed spiral cached by another."""
+    fakeredis = pytest.importorskip("fakeredis")
+    storage_module = _spirals_module("storage")
+    engine_module = _spirals_module("engine")
+
+    server = fakeredis.FakeServer()
+    workers = []
+    for _ in range(2):
+        client = fakeredis.aioredis.FakeRedis(server=server)
+        storage = storage_module.SpiralStorage(_FakePool(), client)
+        await storage.start_cache_invalidation()
+        workers.append((storage, engine_module.SpiralEngine(storage)))
+    (storage_a, engine_a), (storage_b, engine_b) = workers
+
+    try:
+        spiral = _make_spiral(models)
+        await storage_a.save_spiral(spiral)
+
+        first = await storage_b.get_spiral(spiral.id)
+        second = await storage_b.get_spiral(spiral.id)
+        assert first is second
+        assert first.name == "Cache Test"
+        assert storage_b.spiral_cache.get_stats()["hits"] == 1
+        assert engine_b.compile_spiral(first) is engine_b.compile_spiral(second)
+
+        await storage_a.save_spiral(_make_spiral(models, name="Renamed"))
+        assert await _wait_for(lambda: storage_b.spiral_cache.invalidations == 1)
+
+        refreshed = await storage_b.get_spiral(spiral.id)
+        assert refreshed.name == "Renamed"
+        assert engine_b.compile_spiral(refreshed).spiral is refreshed
+    finally:
+        for storage, _ in workers:
+            await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_compiled_plans_follow_spiral_saves_and_deletes(models):
+    """Saving or deleting a spiral on any worker drops every worker's compiled plan."""
+    fakeredis = pytest.importorskip("fakeredis")
+    storage_module = _spirals_module("storage")
+    engine_module = _spirals_module("engine")
+
+    server = fakeredis.FakeServer()
+    workers = []
+    for _ in range(2):
+        client = fakeredis.aioredis.FakeRedis(server=server)
+        storage = storage_module.SpiralStorage(_FakePool(), client)
+        await storage.start_cache_invalidation()
+        workers.append((storage, engine_module.SpiralEngine(storage)))
+    (storage_a, engine_a), (storage_b, engine_b) = workers
+
+    try:
+        spiral = _make_spiral(models)
+        engine_a.compile_spiral(spiral)
+        engine_b.compile_spiral(spiral)
+
+        await storage_a.save_spiral(_make_spiral(models, name="Renamed"))
+        assert spiral.id not in engine_a.compiled_spirals
+        assert await _wait_for(lambda: spiral.id not in engine_b.compiled_spirals)
+
+        engine_b.compile_spiral(spiral)
+        await storage_a.delete_spiral(spiral.id)
+        assert await _wait_for(lambda: spiral.id not in engine_b.compiled_spirals)
+    finally:
+        for storage, _ in workers:
+            await storage.close()
+
+
+@pytest.mark.unit
+def test_compiled_plan_cache_is_bounded(models):
+    """The least recently used plans are evicted once the cache is full."""
+    engine_module = _spirals_module("engine")
+    engine = engine_module.SpiralEngine(MagicMock())
+    engine.max_compiled_spirals = 2
+
+    spirals = [_make_spiral(models, spiral_id=f"00000000-0000-0000-0000-00000000010{i}") for i in range(3)]
+    engine.compile_spiral(spirals[0])
+    engine.compile_spiral(spirals[1])
+    engine.compile_spiral(spirals[0])
+    engine.compile_spiral(spirals[2])
+
+    assert list(engine.compiled_spirals) == [spirals[0].id, spirals[2].id]
+
+
+@pytest.mark.unit
+def test_spiral_cache_rejects_stale_versions(models):
+    """A definition loaded before an invalidation is never cached after it."""
+    storage_module = _spirals_module("storage")
+    cache = storage_module.SpiralDefinitionCache(max_entries=2)
+    spiral = _make_spiral(models)
+
+    cache.invalidate(spiral.id, 3)
+    cache.put(spiral.id, 2, spiral)
+    assert cache.get(spiral.id) is None
+
+    cache.put(spiral.id, 3, spiral)
+    assert cache.get(spiral.id) is spiral
+
+    for index in range(2):
+        cache.put(f"other-{index}", 1, spiral)
+    assert cache.get(spiral.id) is None
+    assert cache.get_stats()["evictions"] == 1
+
+
+@pytest.mark.unit
+def test_spiral_cache_invalidations_stay_bounded(models):
+    """Invalidations for spirals this worker never loads don't grow the cache."""
+    storage_module = _spirals_module("storage")
+    cache = storage_module.SpiralDefinitionCache(max_entries=2)
+    spiral = _make_spiral(models)
+
+    for index in range(100):
+        cache.invalidate(f"elsewhere-{index}", 1)
+    assert len(cache._invalidated_versions) == 2
+
+    cache.invalidate("elsewhere-99", 2)
+    cache.put("elsewhere-99", 1, spiral)
+    assert cache.get("elsewhere-99") is None
+    cache.put("elsewhere-99", 2, spiral)
+    assert cache.get("elsewhere-99") is spiral
+    assert "elsewhere-99" not in cache._invalidated_versions
+
+    # A cached entry is its own version record: older loads never replace it
+    cache.put("elsewhere-99", 1, _make_spiral(models, name="Stale"))
+    assert cache.get("elsewhere-99") is spiral
+
+
+@pytest.mark.asyncio
+async def test_history_sink_batches_and_drains(models):
+    """Finished executions are flushed in batches and drained on shutdown."""
+    sink_module = _spirals_module("history_sink")
+    storage = MagicMock()
+    storage.save_execution_batch = AsyncMock()
+
+    sink = sink_module.ExecutionHistorySink(storage, flush_interval_ms=10_000, max_batch=3, max_queue=10)
+    await sink.start()
+
+    contexts = [
+        models.ExecutionContext(spiral_id="spiral-1", trigger={}, status="completed")
+        for _ in range(4)
+    ]
+    for context in contexts:
+        await sink.submit(context, record_statistics=context is not contexts[-1])
+
+    assert await _wait_for(lambda: storage.save_execution_batch.await_count == 1)
+    assert sink.get_pending(contexts[-1].execution_id) is contexts[-1]
+
+    await sink.stop()
+
+    assert storage.save_execution_batch.await_count == 2
+    first, second = storage.save_execution_batch.await_args_list
+    assert first.args[0] == contexts[:3]
+    assert second.args == ([contexts[3]], [])
+    assert sink.get_stats()["flushed"] == 4
+    assert sink.get_pending(contexts[-1].execution_id) is None
+
+
+@pytest.mark.asyncio
+async def test_work_queue_recovers_unacked_executions(models):
+    """Executions fetched by a worker that died are reclaimed after restart."""
+    fakeredis = pytest.importorskip("fakeredis")
+    queue_module = _spirals_module("work_queue")
+    client = fakeredis.aioredis.FakeRedis()
+
+    crashed = queue_module.SpiralWorkQueue(client, consumer="worker-a")
+    await crashed.initialize()
+    context = models.ExecutionContext(spiral_id="spiral-1", trigger={})
+    await crashed.enqueue(context, priority=7)
+
+    fetched = await crashed.fetch(count=10, block_ms=10)
+    assert [job.execution_id for job in fetched] == [context.execution_id]
+    assert fetched[0].priority == 7
+
+    restarted = queue_module.SpiralWorkQueue(client, consumer="worker-b", visibility_timeout_ms=0)
+    await restarted.initialize()
+    recovered = await restarted.recover()
+    assert [job.execution_id for job in recovered] == [context.execution_id]
+
+    await restarted.ack(recovered[0])
+    assert await restarted.depth() == 0
+
+
+@pytest.mark.asyncio
+async def test_killed_worker_job_is_redelivered(models):
+    """A job held by a worker killed mid-run is redelivered without waiting for another restart."""
+    fakeredis = pytest.importorskip("fakeredis")
+    queue_module = _spirals_module("work_queue")
+    client = fakeredis.aioredis.FakeRedis()
+    started, finished = [], []
+
+    class _Engine:
+        storage = MagicMock()
+        storage.get_spiral = AsyncMock(return_value=None)
+
+        def __init__(self, hang):
+            self.hang = hang
+
+        async def run_queued(self, context):
+            started.append(context.execution_id)
+            if self.hang:
+                await asyncio.Event().wait()
+            finished.append(context.execution_id)
+
+    def make_pool(consumer, hang):
+        work_queue = queue_module.SpiralWorkQueue(client, consumer=consumer, visibility_timeout_ms=200)
+        return queue_module.ExecutionWorkerPool(_Engine(hang), work_queue, workers=1, recover_interval=0.05)
+
+    crashed = make_pool("worker-a", hang=True)
+    await crashed.start()
+    context = models.ExecutionContext(spiral_id="spiral-1", trigger={})
+    await crashed.work_queue.enqueue(context, priority=5)
+    assert await _wait_for(lambda: started == [context.execution_id])
+    crashed._stopping = True  # killed mid-job: tasks die without acking
+    for task in crashed._tasks:
+        task.cancel()
+    await asyncio.gather(*crashed._tasks, return_exceptions=True)
+
+    # A survivor starts while the job is still under the visibility timeout...
+    survivor = make_pool("worker-b", hang=False)
+    await survivor.start()
+    try:
+        assert survivor.get_stats()["recovered"] == 0
+        # ...and its periodic reclaim picks the job up once it goes idle
+        assert await _wait_for(lambda: finished == [context.execution_id], timeout=3.0)
+        assert survivor.get_stats()["recovered"] == 1
+        assert await survivor.work_queue.depth() == 0
+    finally:
+        await survivor.stop(timeout=1.0)
+
+    # A restarted worker with a stable id replays its own pending list immediately
+    await crashed.work_queue.enqueue(context, priority=5)
+    assert len(await crashed.work_queue.fetch(count=1, block_ms=10)) == 1
+    restarted = make_pool("worker-a", hang=False)
+    await restarted.start()
+    try:
+        assert restarted.get_stats()["recovered"] == 1
+        assert await _wait_for(lambda: len(finished) == 2)
+    finally:
+        await restarted.stop(timeout=1.0)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_worker_cancels_its_execution(models):
+    """Cancelling run_queued (pool shutdown) also stops the spiral it started."""
+    engine_module = _spirals_module("engine")
+    spiral = _make_spiral(models)
+    storage = MagicMock()
+    storage.redis_client = None
+    storage.get_spiral = AsyncMock(return_value=spiral)
+    engine = engine_module.SpiralEngine(storage)
+
+    started, cancelled = asyncio.Event(), []
+
+    async def hang(plan, context):
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append(context.execution_id)
+            raise
+
+    engine._execute_spiral = hang
+    context = models.ExecutionContext(spiral_id=spiral.id, trigger={})
+    worker = asyncio.create_task(engine.run_queued(context))
+    await started.wait()
+    worker.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await worker
+    assert cancelled == [context.execution_id]
+    await engine.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_priority_and_per_spiral_cap(models):
+    """Higher consciousness levels run first and spirals respect their cap."""
+    fakeredis = pytest.importorskip("fakeredis")
+    queue_module = _spirals_module("work_queue")
+    work_queue = queue_module.SpiralWorkQueue(fakeredis.aioredis.FakeRedis())
+    await work_queue.initialize()
+
+    order, running, peak = [], {}, {}
+    release = asyncio.Event()
+
+    class _Engine:
+        storage = MagicMock()
+        storage.get_spiral = AsyncMock(return_value=None)
+
+        async def run_queued(self, context):
+            order.append(context.trigger["label"])
+            running[context.spiral_id] = running.get(context.spiral_id, 0) + 1
+            peak[context.spiral_id] = max(peak.get(context.spiral_id, 0), running[context.spiral_id])
+            await release.wait()
+            running[context.spiral_id] -= 1
+
+    for label, spiral_id, level in [("low", "b", 1), ("busy-1", "a", 5), ("busy-2", "a", 5), ("high", "c", 9)]:
+        context = models.ExecutionContext(spiral_id=spiral_id, trigger={"label": label})
+        await work_queue.enqueue(context, priority=level)
+
+    pool = queue_module.ExecutionWorkerPool(_Engine(), work_queue, workers=4, per_spiral_limit=1)
+    await pool.start()
+    try:
+        assert await _wait_for(lambda: len(order) == 3)
+        assert order[0] == "high"
+        assert peak["a"] == 1
+        assert pool.get_stats()["parked_now"] == 1
+
+        release.set()
+        assert await _wait_for(lambda: pool.get_stats()["processed"] == 4)
+        assert await work_queue.depth() == 0
+    finally:
+        await pool.stop(timeout=1.0)
+
+
+@pytest.mark.asyncio
+async def test_fetch_never_exceeds_count_across_streams(models):
+    """XREADGROUP counts per stream; fetch still hands out at most `count`, best first."""
+    fakeredis = pytest.importorskip("fakeredis")
+    queue_module = _spirals_module("work_queue")
+    work_queue = queue_module.SpiralWorkQueue(fakeredis.aioredis.FakeRedis(), consumer="worker-a")
+    await work_queue.initialize()
+    for level in (2, 9, 5):
+        await work_queue.enqueue(models.ExecutionContext(spiral_id="s", trigger={}), priority=level)
+
+    assert [job.priority for job in await work_queue.fetch(count=2, block_ms=10)] == [9, 5]
+    assert len(await work_queue.pending()) == 2
+    assert [job.priority for job in await work_queue.fetch(count=2, block_ms=10)] == [2]
+    assert await work_queue.fetch(count=2, block_ms=10) == []
+
+
+@pytest.mark.asyncio
+async def test_parked_jobs_do_not_starve_other_spirals(models):
+    """A saturated spiral's parked backlog doesn't use up the prefetch budget."""
+    fakeredis = pytest.importorskip("fakeredis")
+    queue_module = _spirals_module("work_queue")
+    work_queue = queue_module.SpiralWorkQueue(fakeredis.aioredis.FakeRedis())
+    await work_queue.initialize()
+    ran, release = [], asyncio.Event()
+
+    class _Engine:
+        storage = MagicMock()
+        storage.get_spiral = AsyncMock(return_value=None)
+
+        async def run_queued(self, context):
+            ran.append(context.spiral_id)
+            if context.spiral_id == "hot":
+                await release.wait()
+
+    for _ in range(5):
+        await work_queue.enqueue(models.ExecutionContext(spiral_id="hot", trigger={}), priority=9)
+    await work_queue.enqueue(models.ExecutionContext(spiral_id="cold", trigger={}), priority=1)
+
+    pool = queue_module.ExecutionWorkerPool(_Engine(), work_queue, workers=2, per_spiral_limit=1, prefetch=2)
+    await pool.start()
+    try:
+        assert await _wait_for(lambda: "cold" in ran)
+        assert pool.get_stats()["parked_now"] == 4
+
+        release.set()
+        assert await _wait_for(lambda: pool.get_stats()["processed"] == 6)
+        assert pool.get_stats()["in_flight"] == 0
+    finally:
+        await pool.stop(timeout=1.0)
+
+
+@pytest.fixture
+def rate_limiter(monkeypatch):
+    """The rate limiter module with a controllable clock (milliseconds)."""
+    module = _spirals_module("rate_limiter")
+    clock = {"now": 1_000_000.0}
+    monkeypatch.setattr(module, "_now_ms", lambda: clock["now"])
+    module.clock = clock
+    return module
+
+
+@pytest.mark.unit
+def test_rate_limiter_fixed_window(rate_limiter):
+    """Fixed windows reset at the window boundary."""
+    limiter = rate_limiter.RateLimiter(2, 1000, "fixed")
+
+    assert [limiter.allow() for _ in range(3)] == [True, True, False]
+    rate_limiter.clock["now"] += 1000
+    assert limiter.allow() is True
+
+
+@pytest.mark.unit
+def test_rate_limiter_sliding_window_weights_previous_window(rate_limiter):
+    """The previous window's count decays as it slides out of the trailing window."""
+    limiter = rate_limiter.RateLimiter(4, 1000, "sliding")
+    assert all(limiter.allow() for _ in range(4))
+    assert limiter.allow() is False
+
+    # A quarter into the next window, 3/4 of the previous 4 still count
+    rate_limiter.clock["now"] += 1250
+    assert limiter.allow() is True
+    assert limiter.allow() is False
+
+    rate_limiter.clock["now"] += 500
+    assert limiter.allow() is True
+
+
+@pytest.mark.unit
+def test_rate_limiter_token_bucket_refills_evenly(rate_limiter):
+    """Tokens refill at max_executions per window and cap at the bucket size."""
+    limiter = rate_limiter.RateLimiter(10, 1000, "token_bucket")
+    assert all(limiter.allow() for _ in range(10))
+    assert limiter.allow() is False
+
+    rate_limiter.clock["now"] += 200
+    assert [limiter.allow() for _ in range(3)] == [True, True, False]
+
+    rate_limiter.clock["now"] += 60_000
+    assert sum(limiter.allow() for _ in range(20)) == 10
+
+
+@pytest.mark.unit
+def test_rate_limiter_registry_evicts_idle_and_rebuilds_on_config_change(models, rate_limiter):
+    """Idle limiters are swept and a changed config gets a fresh limiter."""
+    registry = rate_limiter.RateLimiterRegistry(sweep_interval_ms=1000)
+    config = models.RateLimitConfig(max_executions=1, window_ms=100, strategy="fixed")
+
+    limiter = registry.get("spiral-1", config)
+    assert registry.get("spiral-1", config) is limiter
+    assert limiter.allow() is True
+
+    changed = models.RateLimitConfig(max_executions=5, window_ms=100, strategy="bogus")
+    rebuilt = registry.get("spiral-1", changed)
+    assert rebuilt is not limiter
+    assert rebuilt.strategy == "sliding"
+
+    rate_limiter.clock["now"] += 1000
+    registry.get("spiral-2", config)
+    assert "spiral-1" not in registry
+    assert registry.get_stats() == {"mode": "local", "limiters": 1, "evictions": 1}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", ["fixed", "sliding", "token_bucket"])
+async def test_distributed_rate_limit_shared_across_workers(models, strategy):
+    """Limits held in Redis are enforced across every worker's registry."""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    module = _spirals_module("rate_limiter")
+    server = fakeredis.FakeServer()
+    config = models.RateLimitConfig(max_executions=3, window_ms=60_000, strategy=strategy)
+
+    limiters = [
+        module.RateLimiterRegistry(fakeredis.aioredis.FakeRedis(server=server), distributed=True)
+        .get("spiral-1", config)
+        for _ in range(2)
+    ]
+    results = [await limiters[i % 2].acquire() for i in range(5)]
+    assert results == [True, True, True, False, False]
+
+
+@pytest.mark.asyncio
+async def test_distributed_rate_limit_falls_back_to_local(models):
+    """An unreachable Redis degrades to the per-process limit."""
+    module = _spirals_module("rate_limiter")
+    client = MagicMock()
+    client.register_script.return_value = AsyncMock(side_effect=ConnectionError("down"))
+
+    limiter = module.DistributedRateLimiter(client, "spirals:ratelimit:spiral-1", 1, 60_000, "fixed")
+    assert await limiter.acquire() is True
+    assert await limiter.acquire() is False
+
+
+@pytest.mark.asyncio
+async def test_pooled_http_client_limits_each_host():
+    """Concurrency is capped per destination host and latencies are bucketed."""
+    httpx = pytest.importorskip("httpx")
+    transport_module = _spirals_module("transport")
+    active, peak = {}, {}
+
+    async def handler(request):
+        host = request.url.host
+        active[host] = active.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), active[host])
+        await asyncio.sleep(0.01)
+        active[host] -= 1
+        return httpx.Response(503 if host == "down.example" else 200, json={"ok": True})
+
+    client = transport_module.PooledHTTPClient(
+        max_connections_per_host=2, transport=httpx.MockTransport(handler)
+    )
+    try:
+        await asyncio.gather(
+            *[client.post("https://hooks.example/a", json={}) for _ in range(6)],
+            client.get("https://down.example/health"),
+        )
+    finally:
+        await client.aclose()
+
+    assert peak["hooks.example"] == 2
+    destinations = client.get_stats()["destinations"]
+    assert destinations["hooks.example"]["count"] == 6
+    assert destinations["hooks.example"]["errors"] == 0
+    assert destinations["down.example"]["errors"] == 1
+    assert destinations["hooks.example"]["p50_ms"] >= 10
+
+
+@pytest.mark.unit
+def test_latency_histogram_percentiles():
+    """Percentiles report the upper bound of the bucket that holds them."""
+    transport_module = _spirals_module("transport")
+    histogram = transport_module.LatencyHistogram()
+    for elapsed in [1, 2, 3, 4, 40, 40, 40, 40, 40, 60_000]:
+        histogram.observe(elapsed)
+
+    assert histogram.percentile(0.4) == 5
+    assert histogram.percentile(0.9) == 50
+    assert histogram.percentile(1.0) == 60_000
+    assert histogram.snapshot()["buckets"]["+Inf"] == 1
+
+
+@pytest.mark.asyncio
+async def test_smtp_pool_reuses_and_reconnects(monkeypatch):
+    """Sends share one authenticated connection and recover from disconnects."""
+    import smtplib
+    from email.mime.text import MIMEText
+
+    transport_module = _spirals_module("transport")
+    opened = []
+
+    class _FakeSMTP:
+        def __init__(self, host, port, timeout=None):
+            self.sent = 0
+            self.drop_next = False
+            opened.append(self)
+
+        def starttls(self):
+            pass
+
+        def login(self, user, password):
+            pass
+
+        def send_message(self, msg, to_addrs=None):
+            if self.drop_next:
+                raise smtplib.SMTPServerDisconnected("gone")
+            self.sent += 1
+
+        def quit(self):
+            pass
+
+    monkeypatch.setattr(transport_module.smtplib, "SMTP", _FakeSMTP)
+    pool = transport_module.SMTPConnectionPool("smtp.example", 587, "user", "pass", size=2)
+
+    for _ in range(3):
+        await pool.send_message(MIMEText("hi"), ["a@example.com"])
+    assert len(opened) == 1 and opened[0].sent == 3
+
+    opened[0].drop_next = True
+    await pool.send_message(MIMEText("hi"), ["a@example.com"])
+    await pool.aclose()
+
+    assert len(opened) == 2 and opened[1].sent == 1
+    stats = pool.get_stats()
+    assert stats["sent"] == 4
+    assert stats["reconnects"] == 1
+    assert stats["destinations"]["smtp://smtp.example:587"]["count"] == 4
+
+
+@pytest.fixture
+def expressions():
+    pytest.importorskip("numpy")
+    return _spirals_module("expressions")
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("source", [
+    "().__class__.__bases__[0].__subclasses__()",
+    "__import__('os').system('true')",
+    "(lambda: 1)()",
+    "value := 1",
+    '"{0.__class__.__mro__[1].__subclasses__}".format(item)',
+    '"{x.__class__}".format_map({"x": item})',
+    "template.format(item)",
+    "sorted(items, key=str.format)",
+    # Frame walk out of a generator to the real builtins
+    '[z for l in [[]] if l.append((l[0].gi_frame.f_back.f_back.f_back.f_globals for _ in [1])) or True '
+    'for z in l[0]][0]["__builtins__"]["__import__"]("os").getcwd()',
+    "[g.gi_frame.f_back.f_globals for g in [(x for x in [1])]]",
+    "[g.gi_code for g in [(x for x in [1])]]",
+    "item.cr_frame.f_back.f_builtins",
+    "item.ag_frame.f_locals",
+    "item.tb_frame.f_globals",
+    "item.tb_next.tb_frame",
+    'data["__builtins__"]',
+    "items.append(1)",
+])
+def test_expression_whitelist_rejects_unsafe_syntax(expressions, source):
+    """Dunder access, lambdas and assignments never reach eval."""
+    with pytest.raises(expressions.ExpressionError):
+        expressions.compile_expression(source)
+
+
+@pytest.mark.unit
+def test_expression_allows_read_only_methods(expressions):
+    """Allow-listed str/dict methods keep working in expressions."""
+    expression = expressions.compile_expression('value.strip().lower() + str(data.get("n", 0))')
+    assert expression.evaluate({"value": "  HeLix ", "data": {"n": 3}}) == "helix3"
+
+
+@pytest.mark.unit
+def test_expression_compiled_once_and_evaluated(expressions):
+    """Repeated expression text reuses one compiled code object."""
+    first = expressions.compile_expression("round(value * 2, 1) if value else 0")
+    assert expressions.compile_expression("round(value * 2, 1) if value else 0") is first
+    assert first.evaluate({"value": 1.25}) == 2.5
+    assert first.evaluate({"value": 0}) == 0
+
+
+@pytest.mark.unit
+def test_vectorised_filter_matches_per_item_filter(expressions, monkeypatch):
+    """The columnar filter keeps exactly the items the per-item path keeps."""
+    monkeypatch.setattr(expressions, "VECTORISE_MIN_ITEMS", 1)
+    condition = expressions.compile_expression(
+        'item["amount"] - 10 > consciousness_level and not item["status"] == "fail" or item["amount"] == 0'
+    )
+    assert condition.columns is not None
+
+    items = [{"amount": i % 40, "status": "fail" if i % 3 == 0 else "ok"} for i in range(200)]
+    expected = [item for item in items if eval(condition.source, {}, {"item": item, "consciousness_level": 5})]
+    assert condition.filter(items, {"consciousness_level": 5}) == expected
+
+    # Mixed column types fall back to the per-item path instead of coercing
+    mixed = items + [{"amount": "12", "status": "ok"}]
+    assert condition.columns.mask(mixed, {"consciousness_level": 5}) is None
+    with pytest.raises(TypeError):
+        condition.filter(mixed, {"consciousness_level": 5})
+
+
+@pytest.mark.unit
+def test_field_template_leaves_unknown_fields(expressions):
+    """`{name}` fields render in one pass and unknown fields stay untouched."""
+    template = expressions.compile_field_template("{greeting}, {name}! {missing}")
+    assert template.render({"greeting": "Hi", "name": 7}) == "Hi, 7! {missing}"
+
+
+@pytest.mark.unit
+def test_template_render_resolves_dotted_paths(compiler):
+    """Dotted placeholders walk nested data; unresolved ones are left as written."""
+    variables = {"trigger": {"user": {"name": "Ada", "tags": ["x", "y"]}}, "a.b": "flat", "n": None}
+    template = compiler.CompiledTemplate(
+        "{{trigger.user.name}} {{ trigger.user.tags.1 }} {{a.b}} {{n}} {{trigger.nope}} {{missing}}"
+    )
+    assert template.render(variables) == "Ada y flat None {{trigger.nope}} {{missing}}"
+
+
+@pytest.mark.unit
+def test_compiled_config_renders_fresh_containers(compiler):
+    """Constant subtrees are copied per render so executors can mutate them."""
+    config = compiler.CompiledConfig({
+        "url": "https://example.com/{{trigger.id}}",
+        "headers": {"Accept": "application/json"},
+        "body": ["{{payload}}", 1],
+    })
+    first = config.render({"trigger": {"id": 7}, "payload": {"k": [1]}})
+    first["headers"]["X-Extra"] = "1"
+
+    second = config.render({"trigger": {"id": 8}, "payload": {}})
+    assert second == {"url": "https://example.com/8", "headers": {"Accept": "application/json"}, "body": ["{}", 1]}
+    assert first["body"][0] == "{'k': [1]}"
+    assert not compiler.CompiledConfig({"level": "info", "message": "static"}).has_variables
+
+
+@pytest.mark.unit
+def test_action_config_render_cached_per_variables_version(models, monkeypatch):
+    """Renders are reused until a variable changes, and never shared by reference."""
+    actions_module = _spirals_module("actions")
+    compiler_module = _spirals_module("compiler")
+    executor = actions_module.ActionExecutor(MagicMock())
+    action = models.Action(
+        type="log_event",
+        name="Log",
+        config={"type": "log_event", "level": "info", "message": "user {{trigger.user}}"},
+    )
+    context = models.ExecutionContext(spiral_id="spiral-1", trigger={}, variables={"trigger": {"user": "ada"}})
+
+    renders = []
+    original_render = compiler_module.CompiledTemplate.render
+    monkeypatch.setattr(
+        compiler_module.CompiledTemplate, "render",
+        lambda self, variables: renders.append(1) or original_render(self, variables),
+    )
+
+    first = executor._resolve_config_variables(action, context)
+    second = executor._resolve_config_variables(action, context)
+    assert first == second and first is not second
+    assert first["message"] == "user ada"
+    assert len(renders) == 1
+
+    context.set_variable("trigger", {"user": "grace"})
+    assert executor._resolve_config_variables(action, context)["message"] == "user grace"
+    assert len(renders) == 2
+    assert "_rendered_configs" not in context.json()
@@ -0,0 +1,123 @@
+"""
+Tests for the vectorised Mandelbrot escape-time kernel, batch UCF API and PIL renderer.
+"""
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+
+from backend import mandelbrot_ucf, samsara_bridge
+from backend.mandelbrot_ucf import (MandelbrotUCFGenerator, escape_time,
+                                    escape_time_grid)
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(3)
+    return rng.uniform(-2.2, 1.0, 500) + 1j * rng.uniform(-1.5, 1.5, 500)
+
+
+def legacy_pil_pixel(c, max_iter, drishti):
+    """The per-pixel loop generate_pil_mandelbrot used to run."""
+    z, iteration = 0, 0
+    while abs(z) < 2 and iteration < max_iter:
+        z = z * z + c
+        iteration += 1
+    if iteration == max_iter:
+        return (0, 0, 0)
+    ratio, drishti_factor = iteration / max_iter, drishti * 2
+    r = int(255 * ratio * drishti_factor)
+    g = int(191 + 24 * ratio)
+    b = int(165 - 165 * ratio * (1 - drishti_factor * 0.5))
+    return tuple(max(0, min(255, v)) for v in (r, g, b))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("context", ["generic", "ritual", "meditation", "crisis"])
+def test_batch_ucf_matches_scalar(points, context):
+    """complex_to_ucf_many gives the same states as one complex_to_ucf call per point."""
+    generator = MandelbrotUCFGenerator(max_iterations=128)
+    batch = generator.complex_to_ucf_many(points, context)
+    assert len(batch) == len(points)
+    for c, state in zip(points, batch):
+        assert state == pytest.approx(generator.complex_to_ucf(c, context), abs=1e-9)
+
+    iterations, smooth = generator.calculate_mandelbrot_many(points)
+    expected_iterations, expected_smooth = zip(*(generator.calculate_mandelbrot(c) for c in points))
+    assert iterations.tolist() == list(expected_iterations)
+    assert smooth == pytest.approx(expected_smooth)
+
+
+@pytest.mark.unit
+def test_region_and_spiral_use_batch_states():
+    """Sample names, coordinates and states are unchanged by the batch path."""
+    generator = MandelbrotUCFGenerator()
+    eye = generator.sacred_points["eye_of_consciousness"]
+
+    region = generator.explore_region(eye, radius=0.1, samples=8)
+    assert list(region)[:3] == ["center", "sample_0_0", "sample_1_45"]
+    assert region["sample_2_90"] == pytest.approx(generator.complex_to_ucf(eye + 0.1j))
+
+    journey = generator.phi_spiral_journey(eye, steps=20)
+    assert [ucf["step"] for ucf in journey] == list(range(20))
+    point = complex(journey[7]["coordinate"]["real"], journey[7]["coordinate"]["imag"])
+    expected = generator.complex_to_ucf(point, "ritual")
+    assert {k: journey[7][k] for k in expected} == pytest.approx(expected)
+
+
+@pytest.mark.unit
+def test_escape_time_bailout_and_tiles():
+    """The kernel honours both bailout conventions and tiled grids equal the whole grid."""
+    iterations, modulus = escape_time(np.array([-2.0 + 0j, 0j, 3 + 0j]), 50)
+    assert iterations.tolist() == [50, 50, 1] and modulus[2] == 3.0
+    assert escape_time(np.array([-2.0 + 0j]), 50, bailout_inclusive=True)[0].tolist() == [1]
+
+    xs, ys = np.linspace(-2, 1, 90), np.linspace(-1.2, 1.2, 70)
+    whole = escape_time_grid(xs, ys, 60)
+    assert whole.shape == (70, 90)
+    try:
+        assert np.array_equal(escape_time_grid(xs, ys, 60, workers=2), whole)
+        pool = mandelbrot_ucf._get_tile_pool()
+        assert np.array_equal(escape_time_grid(xs, ys, 60, workers=3), whole)
+        assert mandelbrot_ucf._get_tile_pool() is pool
+    finally:
+        mandelbrot_ucf.shutdown_tile_pool()
+
+
+@pytest.mark.unit
+def test_tile_pool_restarts_after_a_worker_dies():
+    """A pool broken by a dead worker is replaced on the next submit."""
+    xs, ys = np.linspace(-2, 1, 40), np.linspace(-1.2, 1.2, 30)
+    try:
+        pool = mandelbrot_ucf._get_tile_pool()
+        with pytest.raises(BrokenProcessPool):
+            pool.submit(os._exit, 1).result()
+        assert np.array_equal(escape_time_grid(xs, ys, 40, workers=2), escape_time_grid(xs, ys, 40))
+        assert mandelbrot_ucf._get_tile_pool() is not pool
+    finally:
+        mandelbrot_ucf.shutdown_tile_pool()
+
+
+@pytest.mark.unit
+def test_pil_mandelbrot_matches_pixel_loop_and_caches_png():
+    """The grid render is pixel-identical to the old loop; PNG bytes are cached per quantised state."""
+    state = {"harmony": 0.61, "zoom": 2.5, "prana": 0.58, "drishti": 1.3}
+    width, height, max_iter = 48, 36, 80
+    image = np.asarray(samsara_bridge.generate_pil_mandelbrot(width, height, state, max_iter))
+
+    zoom_factor = 1.5 / (2.5 * 1.5)
+    x_center, y_center = -0.5 + (0.61 - 0.428) * 0.5, (0.58 - 0.5) * 0.3
+    for y in range(height):
+        for x in range(width):
+            c = complex(zoom_factor * (x - width / 2) / (0.5 * width) + x_center,
+                        zoom_factor * (y - height / 2) / (0.5 * height) + y_center)
+            assert tuple(image[y, x]) == legacy_pil_pixel(c, max_iter, 1.3)
+
+    samsara_bridge._render_mandelbrot_png.cache_clear()
+    first = asyncio.run(samsara_bridge.generate_pil_fractal_bytes("mandelbrot", 64, {"harmony": 0.5001}))
+    second = asyncio.run(samsara_bridge.generate_pil_fractal_bytes("mandelbrot", 64, {"harmony": 0.50012}))
+    assert first.startswith(b"\x89PNG") and first == second
+    info = samsara_bridge._render_mandelbrot_png.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
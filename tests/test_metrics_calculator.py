@@ -0,0 +1,167 @@
+"""
+Tests for incremental daily metrics materialization.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import (Base, DailyMetrics, DailyUsageRollup, ErrorLog,
+                              MetricsCursor, Team, UsageLog, User)
+from backend.saas.metrics_calculator import MetricsCalculator
+
+DAY_1 = datetime(2025, 3, 10)
+DAY_2 = datetime(2025, 3, 11)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: session.statements.append(statement))
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def add_usage(db, day, users, status_code=200, calls_per_user=1):
+    db.add_all(
+        UsageLog(user_id=f"user_{u}", timestamp=day + timedelta(hours=u % 24), endpoint="/api/x",
+                 method="GET", status_code=status_code, response_time_ms=1.0)
+        for u in users for _ in range(calls_per_user)
+    )
+    db.commit()
+
+
+@pytest.mark.unit
+def test_refresh_folds_only_new_rows(db):
+    """Each refresh reads rows past the cursor; DAU/MAU come from daily sketches."""
+    add_usage(db, DAY_1, range(0, 300), calls_per_user=2)
+    add_usage(db, DAY_2, range(200, 500))
+    add_usage(db, DAY_2, range(0, 30), status_code=500)
+    db.add(ErrorLog(error_type="ValueError", error_message="boom", occurred_at=DAY_2))
+    db.commit()
+
+    calculator = MetricsCalculator(db)
+    assert calculator.refresh_rollups(settle_seconds=0) == {DAY_1, DAY_2}
+    day_1, day_2 = calculator.materialize_days([DAY_1, DAY_2])
+    assert day_1.api_calls_total == 600 and day_2.api_calls_total == 330
+    assert abs(day_1.daily_active_users - 300) <= 6
+    assert abs(day_2.daily_active_users - 330) <= 7
+    assert abs(day_2.monthly_active_users - 500) <= 10
+    assert day_2.error_count == 31 and day_2.error_rate == round(30 / 330 * 100, 2)
+
+    # Nothing new: no rollup is rewritten
+    assert calculator.refresh_rollups(settle_seconds=0) == set()
+
+    add_usage(db, DAY_2, range(500, 510))
+    db.statements.clear()
+    assert calculator.refresh_rollups(settle_seconds=0) == {DAY_2}
+    assert not any("count(distinct" in s.lower() for s in db.statements)
+    assert db.query(DailyUsageRollup).filter_by(date=DAY_2).one().api_calls == 340
+
+
+@pytest.mark.unit
+def test_mrr_is_a_single_sum_case_per_table(db):
+    """MRR sums tier prices in SQL for users and teams active on the date."""
+    now = datetime.utcnow()
+    db.add_all([
+        User(id="u1", email="a@x.io", name="A", subscription_tier="pro", subscription_status="active"),
+        User(id="u2", email="b@x.io", name="B", subscription_tier="enterprise", subscription_status="active"),
+        User(id="u3", email="c@x.io", name="C", subscription_tier="pro", subscription_status="canceled"),
+        User(id="u4", email="d@x.io", name="D", subscription_tier="workflow", subscription_status="active",
+             subscription_end_date=now - timedelta(days=1)),
+        User(id="u5", email="e@x.io", name="E", subscription_tier="legacy", subscription_status="active"),
+        Team(id="t1", name="T", slug="t", owner_id="u1", subscription_tier="workflow", subscription_status="active"),
+    ])
+    db.commit()
+
+    db.statements.clear()
+    assert MetricsCalculator(db).calculate_mrr(datetime.utcnow()) == 29 + 299 + 149
+    assert len(db.statements) == 2
+    assert all("CASE" in s for s in db.statements)
+
+
+@pytest.mark.unit
+def test_backfill_matches_incremental_and_is_repeatable(db):
+    """Rebuilding a range from the raw logs gives the same rows, however often it runs."""
+    add_usage(db, DAY_1, range(0, 100))
+    add_usage(db, DAY_2, range(50, 150))
+    calculator = MetricsCalculator(db)
+    calculator.refresh_rollups(settle_seconds=0)
+    incremental = [(m.daily_active_users, m.monthly_active_users, m.api_calls_total)
+                   for m in calculator.materialize_days([DAY_1, DAY_2])]
+
+    for _ in range(2):
+        rows = calculator.backfill(DAY_1 - timedelta(days=1), DAY_2)
+        assert [m.date for m in rows] == [DAY_1 - timedelta(days=1), DAY_1, DAY_2]
+        assert [(m.daily_active_users, m.monthly_active_users, m.api_calls_total) for m in rows[1:]] == incremental
+    assert db.query(DailyMetrics).count() == 3
+    assert db.query(DailyUsageRollup).count() == 2
+
+
+def age_settled_marks(db, seconds=60):
+    """Pretend the ids recorded by the last refresh were allocated `seconds` ago."""
+    db.query(MetricsCursor).filter(MetricsCursor.name.like("%:settled")).update(
+        {MetricsCursor.updated_at: datetime.utcnow() - timedelta(seconds=seconds)}, synchronize_session=False
+    )
+    db.commit()
+
+
+@pytest.mark.unit
+def test_cursor_waits_for_ids_committed_out_of_order(db):
+    """Only ids allocated a settle window ago are folded, whatever their request timestamps."""
+    add_usage(db, DAY_1, range(3))
+    calculator = MetricsCalculator(db)
+    assert calculator.refresh_rollups() == set()  # ids 1-3 are only marked
+
+    # Id 5 is visible while id 4 (allocated first) is still uncommitted
+    db.add(UsageLog(id=5, user_id="user_5", timestamp=DAY_2, status_code=200))
+    db.commit()
+    age_settled_marks(db)
+    assert calculator.refresh_rollups() == {DAY_1}
+    assert calculator._cursor("usage_logs") == 3
+
+    # Id 4 lands late with an old request-time stamp (batched middleware writes)
+    db.add(UsageLog(id=4, user_id="user_4", timestamp=DAY_1, status_code=200))
+    db.commit()
+    assert calculator.refresh_rollups() == set()
+    age_settled_marks(db)
+    assert calculator.refresh_rollups() == {DAY_1, DAY_2}
+    assert calculator._cursor("usage_logs") == 5
+    assert db.query(DailyUsageRollup).filter_by(date=DAY_1).one().api_calls == 4
+
+
+@pytest.mark.unit
+def test_backfill_holds_the_cursors_while_rebuilding(db, tmp_path):
+    """A refresh can't commit into the range between backfill reading the cursors and rewriting rollups."""
+    add_usage(db, DAY_1, range(10))
+    calculator = MetricsCalculator(db)
+    calculator.refresh_rollups(settle_seconds=0)
+    add_usage(db, DAY_1, range(10, 15))  # past the cursor, left to the next refresh
+
+    other_engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}", connect_args={"timeout": 0.1})
+    other = sessionmaker(bind=other_engine)()
+    fold_usage, raced = calculator._fold_usage, []
+
+    def fold_then_race(rows, deltas):
+        try:
+            raced.append(MetricsCalculator(other).refresh_rollups(settle_seconds=0))
+        except OperationalError:
+            other.rollback()
+            raced.append("blocked")
+        fold_usage(rows, deltas)
+
+    calculator._fold_usage = fold_then_race
+    calculator.backfill(DAY_1, DAY_1)
+    other.close()
+    other_engine.dispose()
+
+    assert raced == ["blocked"]
+    calculator.refresh_rollups(settle_seconds=0)
+    assert db.query(DailyUsageRollup).filter_by(date=DAY_1).one().api_calls == 15
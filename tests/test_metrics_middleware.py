@@ -0,0 +1,94 @@
+"""
+Tests for the buffered metrics middleware and its background writer.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import ErrorLog, UsageLog
+from backend.saas.metrics_middleware import MetricsBuffer, MetricsMiddleware
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}")
+    UsageLog.__table__.create(engine)
+    ErrorLog.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+    factory.commits = []
+    event.listen(engine, "commit", lambda conn: factory.commits.append(conn))
+    yield factory
+    engine.dispose()
+
+
+def usage_row(i, timestamp=None):
+    return {
+        "user_id": f"user_{i}", "timestamp": timestamp or datetime.utcnow(), "endpoint": "/api/x",
+        "method": "GET", "status_code": 200, "response_time_ms": 1.5, "request_metadata": {},
+    }
+
+
+@pytest.mark.unit
+def test_rows_are_written_in_batches(session_factory):
+    """Buffered rows land in a few bulk inserts with their request-time timestamps."""
+    buffer = MetricsBuffer(session_factory, batch_size=100, flush_interval=60)
+    buffer.start = lambda: None  # flush manually
+    earlier = datetime.utcnow() - timedelta(hours=1)
+    for i in range(250):
+        assert buffer.add_usage(usage_row(i, earlier))
+    assert session_factory.commits == []
+
+    assert buffer.flush() == 250
+    assert len(session_factory.commits) == 3
+
+    db = session_factory()
+    assert db.query(UsageLog).count() == 250
+    assert {row.timestamp for row in db.query(UsageLog)} == {earlier}
+    db.close()
+    assert buffer.get_stats()["batches"] == 3 and buffer.get_stats()["pending"] == 0
+
+
+@pytest.mark.unit
+def test_overload_samples_then_drops_with_counters(session_factory):
+    """Past the watermark usage is sampled; at capacity everything new is dropped and counted."""
+    buffer = MetricsBuffer(session_factory, capacity=100, sample_above=0.5, overload_sample_every=10)
+    buffer.start = lambda: None
+    kept = sum(buffer.add_usage(usage_row(i)) for i in range(1000))
+    stats = buffer.get_stats()
+    assert kept == stats["usage_buffered"] == stats["pending"] == 100
+    assert stats["sampled_out"] > 0 and stats["dropped_full"] > 0
+    assert stats["sampled_out"] + stats["dropped_full"] == 900
+    assert not buffer.add_error({"error_type": "ValueError", "error_message": "boom"})
+
+
+@pytest.mark.unit
+def test_middleware_queues_usage_and_errors(session_factory):
+    """Requests never touch the database; the flusher thread writes both tables."""
+    buffer = MetricsBuffer(session_factory, flush_interval=0.05)
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, buffer=buffer)
+
+    @app.get("/ok")
+    def ok():
+        return {"ok": True}
+
+    @app.get("/boom")
+    def boom():
+        raise ValueError("boom")
+
+    client = TestClient(app, raise_server_exceptions=False)
+    for _ in range(5):
+        assert client.get("/ok").status_code == 200
+    assert client.get("/boom").status_code == 500
+
+    buffer.stop()
+    db = session_factory()
+    assert db.query(UsageLog).filter_by(endpoint="/ok").count() == 5
+    error = db.query(ErrorLog).one()
+    assert error.error_type == "ValueError" and "boom" in error.stack_trace
+    db.close()
+    assert buffer.get_stats()["flusher_running"] is False
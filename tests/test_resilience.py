@@ -0,0 +1,104 @@
+"""
+Tests for circuit breaker probe limiting, failure-rate windows and slow calls.
+"""
+import asyncio
+
+import pytest
+
+from backend.core.resilience import (CircuitBreaker, CircuitBreakerConfig,
+                                     CircuitOpenError, CircuitState,
+                                     SlidingWindow)
+
+
+async def _fail():
+    raise ConnectionError("down")
+
+
+async def _ok():
+    return "ok"
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_half_open_admits_only_configured_probes():
+    """After the timeout only half_open_max_calls requests reach the service."""
+    breaker = CircuitBreaker("test-probes", CircuitBreakerConfig(
+        failure_threshold=1, success_threshold=2, timeout=0.01, half_open_max_calls=2,
+    ))
+    with pytest.raises(ConnectionError):
+        await breaker.call(_fail)
+    assert breaker._state.state == CircuitState.OPEN
+    await asyncio.sleep(0.02)
+
+    reached = 0
+    release = asyncio.Event()
+
+    async def probe():
+        nonlocal reached
+        reached += 1
+        await release.wait()
+        return "ok"
+
+    calls = [asyncio.create_task(breaker.call(probe)) for _ in range(50)]
+    await asyncio.sleep(0.01)
+    release.set()
+    results = await asyncio.gather(*calls, return_exceptions=True)
+
+    assert reached == 2
+    assert sum(isinstance(r, CircuitOpenError) for r in results) == 48
+    assert breaker._state.state == CircuitState.CLOSED
+    transitions = [(t["from"], t["to"]) for t in CircuitBreaker.get_all_states()["test-probes"]["transitions"]]
+    assert transitions == [("closed", "open"), ("open", "half_open"), ("half_open", "closed")]
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_trips_on_failure_rate_not_just_consecutive_failures():
+    """Alternating failures never hit the consecutive threshold but exceed the rate."""
+    breaker = CircuitBreaker("test-rate", CircuitBreakerConfig(
+        failure_threshold=100, failure_rate_threshold=0.5, window_size=10, minimum_calls=10,
+    ))
+    for i in range(9):
+        try:
+            await breaker.call(_fail if i % 2 else _ok)
+        except ConnectionError:
+            pass
+    assert breaker._state.state == CircuitState.CLOSED
+
+    # 10th call: 5 of the last 10 failed
+    with pytest.raises(ConnectionError):
+        await breaker.call(_fail)
+    assert breaker._state.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(_ok)
+    assert breaker.get_state()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_slow_calls_count_as_failures_and_latency_is_reported():
+    breaker = CircuitBreaker("test-slow", CircuitBreakerConfig(failure_threshold=2, slow_call_threshold=0.01))
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "late"
+
+    assert await breaker.call(slow) == "late"
+    assert await breaker.call(slow) == "late"
+    state = breaker.get_state()
+    assert state["state"] == "open"
+    assert state["slow_calls"] == 2
+    assert state["latency_ms"]["p50"] >= 10
+
+
+@pytest.mark.unit
+def test_time_window_expires_old_buckets():
+    window = SlidingWindow("time", size=10)
+    for _ in range(4):
+        window.record(True, now=100.0)
+    window.record(False, now=105.0)
+    assert window.failure_rate(now=105.0) == 0.8
+    assert window.failure_rate(now=111.0) == 0.0
+    assert window.calls == 1
+    window.failure_rate(now=116.0)
+    assert window.calls == 0
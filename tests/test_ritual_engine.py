@@ -132,3 +132,33 @@ def test_ritual_default_steps():
 
     # Verify it's within valid range
     assert 1 <= default_steps <= 1000
+
+
+@pytest.mark.unit
+def test_ritual_saves_through_state_manager(monkeypatch, tmp_path):
+    """The ritual's adjustments land as deltas, keeping changes committed while it ran."""
+    try:
+        from backend.core import state_manager
+        from backend.z88_ritual_engine import Z88RitualEngine, execute_ritual
+    except ImportError:
+        pytest.skip("Ritual engine not available")
+
+    state_file = tmp_path / "ucf_state.json"
+    state_file.write_text(json.dumps({"harmony": 0.5, "klesha": 0.3, "phase": "dawn"}))
+    manager = state_manager.UCFStateManager(str(state_file))
+    monkeypatch.setattr(state_manager, "_global_state_manager", manager)
+
+    def ritual_with_concurrent_write(self, steps):
+        manager.update({"harmony": 0.7})  # another writer commits mid-ritual
+        return {"steps": steps, "events": [], "ucf_final": {"harmony": 0.8, "klesha": 0.1},
+                "ucf_deltas": {"harmony": 0.3, "klesha": -0.5}}
+
+    monkeypatch.setattr(Z88RitualEngine, "run_ritual_cycle", ritual_with_concurrent_write)
+    result = execute_ritual(steps=10)
+
+    saved = json.loads(state_file.read_text())
+    assert manager.version == 2
+    assert saved["harmony"] == pytest.approx(1.0)
+    assert saved["klesha"] == 0.0  # clamped at the field's minimum
+    assert saved["phase"] == "dawn"
+    assert result["ucf_final"] == {"harmony": saved["harmony"], "klesha": 0.0}
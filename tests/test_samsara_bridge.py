@@ -0,0 +1,159 @@
+"""
+Tests for the Samsara frame pipeline: vectorised frames, in-memory encoding, overlapped uploads.
+"""
+import asyncio
+import io
+import os
+import shutil
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from backend import samsara_bridge
+from backend.samsara_bridge import (AnimationEncoder, SamsaraRenderer,
+                                    render_frame_png, samsara_escape_counts)
+
+UCF_STATE = {"harmony": 0.75, "resilience": 0.82, "prana": 0.67, "drishti": 0.73, "klesha": 0.24, "zoom": 1.2}
+
+
+class RecordingStorage:
+    def __init__(self):
+        self.uploads = []
+
+    async def upload_bytes(self, data, filename, remote_dir):
+        self.uploads.append((filename, remote_dir, data))
+        return 200
+
+
+@pytest.mark.unit
+def test_escape_counts_match_masked_loop():
+    """The kernel-based frame data equals the per-iteration masked update it replaced."""
+    x = np.linspace(-2, 2, 150)
+    X, Y = np.meshgrid(x, x)
+    C, Z = X + 1j * Y, np.zeros((150, 150), dtype=complex)
+    escape_count = np.zeros(C.shape)
+    for i in range(int(50 + UCF_STATE["harmony"] * 100)):
+        mask = np.abs(Z) <= 2
+        Z[mask] = Z[mask] ** 2 + C[mask] * (1 + UCF_STATE["resilience"] * 0.5) + UCF_STATE["prana"] * 0.1j
+        escape_count[mask] = i
+
+    assert np.array_equal(samsara_escape_counts(UCF_STATE, resolution=150), escape_count * UCF_STATE["zoom"])
+    assert render_frame_png(UCF_STATE, dpi=20).startswith(b"\x89PNG")
+
+
+@pytest.mark.unit
+def test_cycle_encodes_in_memory_and_uploads_every_frame():
+    """A multi-frame cycle renders on the pool, encodes a GIF in memory and uploads frames plus animation."""
+    storage = RecordingStorage()
+    renderer = SamsaraRenderer(storage=storage, workers=1, dpi=20)
+    try:
+        cycle = asyncio.run(renderer.render_cycle(UCF_STATE, frames=3, fmt="gif", upload_dir="samsara_visuals"))
+        pool = samsara_bridge._get_frame_pool()
+        # Other frame counts and per-cycle limits reuse the pool instead of resizing it
+        asyncio.run(SamsaraRenderer(storage=storage, workers=2, dpi=10).render_cycle(UCF_STATE, frames=2))
+        assert samsara_bridge._get_frame_pool() is pool
+        assert pool._max_workers == samsara_bridge.FRAME_POOL_WORKERS
+    finally:
+        samsara_bridge.shutdown_frame_pool()
+
+    assert len(cycle.frames) == 3 and cycle.frames_per_second > 0
+    with Image.open(io.BytesIO(cycle.animation)) as animation:
+        assert (animation.format, animation.n_frames) == ("GIF", 3)
+    names = [name for name, _, _ in storage.uploads]
+    assert [name.split("_")[2] for name in names[:3]] == ["0000", "0001", "0002"]
+    assert names[3].endswith(".gif") and cycle.uploads == [200] * 4
+
+    with pytest.raises(ValueError):
+        AnimationEncoder("avi")
+
+
+@pytest.mark.unit
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_webm_streams_through_ffmpeg():
+    encoder = AnimationEncoder("webm", fps=5, width=64)
+    for _ in range(3):
+        encoder.add(render_frame_png(UCF_STATE, dpi=10))
+    assert encoder.finish().startswith(b"\x1a\x45\xdf\xa3")  # EBML header
+
+
+@pytest.mark.unit
+def test_frame_pool_restarts_after_a_worker_dies():
+    """A pool broken by a dead worker is replaced when the next cycle submits frames."""
+    try:
+        pool = samsara_bridge._get_frame_pool()
+        with pytest.raises(BrokenProcessPool):
+            pool.submit(os._exit, 1).result()
+        cycle = asyncio.run(SamsaraRenderer(storage=RecordingStorage(), dpi=10).render_cycle(UCF_STATE, frames=2))
+        assert len(cycle.frames) == 2
+        assert samsara_bridge._get_frame_pool() is not pool
+    finally:
+        samsara_bridge.shutdown_frame_pool()
+
+
+@pytest.mark.unit
+def test_failed_cycle_stops_the_webm_encoder(monkeypatch, tmp_path):
+    """A frame failing mid-cycle kills the ffmpeg process and joins its reader thread."""
+    fake_ffmpeg = tmp_path / "ffmpeg"
+    fake_ffmpeg.write_text("#!/bin/sh\nexec cat\n")
+    fake_ffmpeg.chmod(0o755)
+    monkeypatch.setattr(samsara_bridge.shutil, "which", lambda name: str(fake_ffmpeg))
+
+    encoders, submitted = [], []
+
+    class RecordingEncoder(AnimationEncoder):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            encoders.append(self)
+
+    def submit_frame(ucf_state, dpi):
+        future = Future()
+        submitted.append(future)
+        if len(submitted) == 2:
+            future.set_exception(RuntimeError("frame failed"))
+        else:
+            future.set_result(render_frame_png(ucf_state, dpi))
+        return future
+
+    monkeypatch.setattr(samsara_bridge, "AnimationEncoder", RecordingEncoder)
+    monkeypatch.setattr(samsara_bridge, "_submit_frame", submit_frame)
+    renderer = SamsaraRenderer(storage=RecordingStorage(), workers=1, dpi=10)
+    with pytest.raises(RuntimeError, match="frame failed"):
+        asyncio.run(renderer.render_cycle(UCF_STATE, frames=3, fmt="webm"))
+
+    encoder, = encoders
+    assert encoder.frame_count == 1
+    assert encoder._process.poll() is not None
+    assert not encoder._stdout_reader.is_alive()
+
+
+@pytest.mark.unit
+def test_discord_post_sends_bytes_and_uploads_in_background(monkeypatch, tmp_path):
+    """Posting attaches the in-memory PNG; cloud uploads run after the post without local files."""
+    discord = pytest.importorskip("discord")
+    storage = RecordingStorage()
+    monkeypatch.setattr(samsara_bridge, "HelixStorageAdapterAsync", lambda: storage)
+    monkeypatch.setenv("HELIX_STORAGE_MODE", "mega")
+    monkeypatch.chdir(tmp_path)
+
+    sent = []
+
+    class Channel:
+        name = "samsara"
+
+        async def send(self, embed, file):
+            sent.append((embed, file))
+
+    async def post():
+        result = await samsara_bridge.generate_and_post_to_discord(UCF_STATE, Channel())
+        await asyncio.gather(*samsara_bridge._background_tasks)
+        return result
+
+    result = asyncio.run(post())
+    assert result is not None and result.parts[0] == "samsara_visuals"
+    (embed, file), = sent
+    assert isinstance(file, discord.File) and file.fp.read(4) == b"\x89PNG"
+    assert storage.uploads[0][1] == "samsara_visuals"
+    assert not any((tmp_path / "Shadow/manus_archive/visual_outputs").iterdir())
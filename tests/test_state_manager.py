@@ -1,6 +1,7 @@
 """
 Tests for state management system (Redis + PostgreSQL + JSON fallback).
 """
+import asyncio
 import json
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -99,3 +100,108 @@ async def test_concurrent_state_access(mock_redis):
 
     # Should all complete without exceptions
     assert all(not isinstance(r, Exception) for r in results)
+
+
+@pytest.fixture
+async def ucf_service(tmp_path):
+    """Initialized UCF state service backed by a temp file (polling mode)."""
+    from backend.core.state_manager import UCFStateManager
+
+    state_file = tmp_path / "ucf_state.json"
+    state_file.write_text(json.dumps({"harmony": 0.5, "klesha": 0.1}))
+    manager = UCFStateManager(str(state_file), flush_delay=0.05, poll_interval=0.05)
+    manager._use_file_watching = False
+    await manager.initialize()
+    yield manager
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_ucf_service_versions_and_coalesced_flush(ucf_service):
+    """Many updates bump the version each time but are persisted in one write."""
+    start = ucf_service.version
+
+    for i in range(50):
+        await ucf_service.update_state({"harmony": i / 100})
+
+    assert ucf_service.version == start + 50
+    assert ucf_service.snapshot()["harmony"] == 0.49
+
+    await asyncio.sleep(0.2)
+    assert ucf_service.stats["flushes"] == 1
+    assert json.loads(ucf_service.state_file_path.read_text())["harmony"] == 0.49
+    assert not list(ucf_service.state_file_path.parent.glob("*.tmp"))
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_ucf_service_subscribers_get_latest_state(ucf_service):
+    """Subscribers start with the current state and skip intermediate versions."""
+    stream = ucf_service.subscribe()
+    version, state = await stream.__anext__()
+    assert version == ucf_service.version
+    assert state["harmony"] == 0.5
+
+    for value in (0.6, 0.7, 0.8):
+        await ucf_service.update_state({"harmony": value})
+
+    version, state = await asyncio.wait_for(stream.__anext__(), 1)
+    assert version == ucf_service.version
+    assert state["harmony"] == 0.8
+    await stream.aclose()
+
+    since = ucf_service.version
+    waiter = asyncio.create_task(ucf_service.wait_for_change(since, timeout=1))
+    await asyncio.sleep(0)
+    ucf_service.update({"klesha": 0.2})
+    version, state = await waiter
+    assert version == since + 1 and state["klesha"] == 0.2
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_ucf_service_thread_updates_and_external_reload(ucf_service):
+    """Updates from worker threads are not lost; external edits are picked up, own writes are not."""
+    start = ucf_service.version
+
+    def bump(key):
+        for _ in range(100):
+            ucf_service.update({key: ucf_service.version})
+
+    await asyncio.gather(*(asyncio.to_thread(bump, f"k{i}") for i in range(4)))
+    assert ucf_service.version == start + 400
+    await asyncio.sleep(0.2)
+    assert ucf_service.stats["external_reloads"] == 0
+
+    await asyncio.sleep(0.01)
+    ucf_service.state_file_path.write_text(json.dumps({"harmony": 0.99}))
+    before = ucf_service.version
+    changed_version, state = await ucf_service.wait_for_change(before, timeout=1)
+    assert changed_version == before + 1
+    assert state == {"harmony": 0.99}
+    assert ucf_service.stats["external_reloads"] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_ucf_service_external_reload_keeps_unflushed_writes(tmp_path):
+    """An external edit is merged under local writes that haven't been persisted yet."""
+    from backend.core.state_manager import UCFStateManager
+
+    state_file = tmp_path / "ucf_state.json"
+    state_file.write_text(json.dumps({"harmony": 0.5, "klesha": 0.1, "prana": 0.5}))
+    manager = UCFStateManager(str(state_file), flush_delay=60, poll_interval=60)
+    manager._use_file_watching = False
+    await manager.initialize()
+    try:
+        manager.update({"klesha": 0.3})
+        state_file.write_text(json.dumps({"harmony": 0.9, "klesha": 0.1, "prana": 0.4}))
+        await manager._reload_if_changed_externally()
+
+        assert manager.snapshot() == {"harmony": 0.9, "klesha": 0.3, "prana": 0.4}
+        assert manager.stats["external_reloads"] == 1
+        assert await manager.flush()
+        assert json.loads(state_file.read_text()) == {"harmony": 0.9, "klesha": 0.3, "prana": 0.4}
+    finally:
+        await manager.shutdown()
@@ -78,3 +78,88 @@ async def test_ucf_state_persistence(temp_state_dir):
 
     assert loaded_state["metrics"]["harmony"] == 0.75
     assert loaded_state["metrics"]["resilience"] == 0.80
+
+
+@pytest.fixture
+def ucf_store(temp_state_dir):
+    """Isolated UCF state service over a temp state file."""
+    from backend.core.state_manager import UCFStateManager
+
+    state_file = temp_state_dir["state"] / "ucf_calculator_state.json"
+    return UCFStateManager(str(state_file), flush_delay=0.02, poll_interval=0.05)
+
+
+@pytest.mark.unit
+def test_ucf_ritual_batch_and_cas(ucf_store):
+    """Ritual deltas land as one version, clamped to specs; stale versions are rejected."""
+    from backend.core.state_manager import UCFVersionConflict
+    from backend.services.ucf_calculator import DEFAULT_STATE, UCFCalculator
+
+    calculator = UCFCalculator(store=ucf_store)
+    assert json.loads(ucf_store.state_file_path.read_text()) == DEFAULT_STATE
+
+    version = calculator.version
+    result = calculator.apply_ritual_adjustment("neti_neti", expected_version=version)
+    assert result["version"] == version + 1
+    assert result["after"]["klesha"] == 0.0  # clamped at the spec minimum
+    assert result["after"]["harmony"] == pytest.approx(DEFAULT_STATE["harmony"] + 0.4)
+    assert json.loads(ucf_store.state_file_path.read_text()) == result["after"]
+
+    with pytest.raises(UCFVersionConflict):
+        calculator.apply_deltas({"harmony": 0.1}, expected_version=version)
+
+    calculator.update_harmony(0.5)
+    assert calculator.state["harmony"] == 1.0
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_ucf_concurrent_updaters_lose_no_deltas(ucf_store):
+    """Threads and tasks hammering the service (plain and CAS) never lose a delta."""
+    import asyncio
+
+    from backend.core.state_manager import UCFVersionConflict
+    from backend.services.ucf_calculator import UCFCalculator
+
+    ucf_store._use_file_watching = False
+    await ucf_store.initialize()
+    calculator = UCFCalculator(store=ucf_store)
+    calculator.reset_to_default()
+    start = calculator.state
+
+    threads, per_thread = 8, 250
+    tasks, per_task = 20, 25
+    conflicts = 0
+
+    def thread_updater():
+        for _ in range(per_thread):
+            calculator.apply_deltas({"resilience": 0.001, "zoom": 0.002})
+
+    async def cas_updater():
+        nonlocal conflicts
+        for _ in range(per_task):
+            while True:
+                version = ucf_store.version
+                await asyncio.sleep(0)
+                try:
+                    ucf_store.apply_deltas({"resilience": 0.01}, expected_version=version)
+                    break
+                except UCFVersionConflict:
+                    conflicts += 1
+
+    await asyncio.gather(
+        *(asyncio.to_thread(thread_updater) for _ in range(threads)),
+        *(cas_updater() for _ in range(tasks)),
+    )
+    await ucf_store.shutdown()
+
+    expected_resilience = start["resilience"] + threads * per_thread * 0.001 + tasks * per_task * 0.01
+    final = calculator.state
+    assert final["resilience"] == pytest.approx(expected_resilience)
+    assert final["zoom"] == pytest.approx(start["zoom"] + threads * per_thread * 0.002)
+    assert conflicts > 0
+
+    on_disk = json.loads(ucf_store.state_file_path.read_text())
+    assert on_disk == final
+    # Thousands of versions, but only a handful of coalesced writes
+    assert ucf_store.stats["flushes"] < ucf_store.stats["updates"] / 10
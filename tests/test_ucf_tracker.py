@@ -0,0 +1,98 @@
+"""
+Tests for the UCF tracker's persistent connection, bulk writes and SQL aggregates.
+"""
+import math
+import statistics
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backend.ucf_tracker import UCFTracker
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    with UCFTracker(str(tmp_path / "ucf_history.db")) as tracker:
+        yield tracker
+
+
+def snapshots(count, hours=40, start_harmony=0.6, step=-0.002):
+    now = datetime.utcnow()
+    return [
+        {
+            "timestamp": now - timedelta(hours=hours) + timedelta(hours=hours * i / count),
+            "harmony": start_harmony + step * i + 0.01 * math.sin(i),
+            "resilience": 1.0, "prana": 0.5, "drishti": 0.5, "klesha": 0.01, "zoom": 1.0,
+            "phase": "COHERENT", "agent": "Omega Zero",
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.unit
+def test_bulk_backfill_and_array_reads(tracker):
+    """record_metrics_many writes historical rows; arrays come back in time order."""
+    assert tracker.record_metrics_many(snapshots(500)) == 500
+    assert tracker._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    now = datetime.utcnow()
+    arrays = tracker.get_metrics_arrays(now - timedelta(hours=48), now, fields=("harmony", "klesha"))
+    assert set(arrays) == {"timestamp", "harmony", "klesha"}
+    assert arrays["harmony"].shape == (500,) and arrays["harmony"].dtype == np.float64
+    assert np.all(np.diff(arrays["timestamp"]) > np.timedelta64(0, "us"))
+    assert arrays["harmony"][0] == pytest.approx(0.6)
+
+    assert tracker.get_metrics_arrays(now + timedelta(hours=1), now + timedelta(hours=2))["harmony"].size == 0
+    with pytest.raises(ValueError):
+        tracker.get_metrics_arrays(now, now, fields=("harmony; DROP TABLE ucf_metrics",))
+
+
+@pytest.mark.unit
+def test_sql_aggregates_match_python_statistics(tracker):
+    """Trend and prediction pushed into SQL give the same numbers as the row-by-row versions."""
+    tracker.record_metrics_many(snapshots(300))
+    now = datetime.utcnow()
+    values = [m["harmony"] for m in tracker.get_metrics_in_range(now - timedelta(hours=24), now)]
+
+    trend = tracker.get_harmony_trend(hours=24)
+    assert trend["data_points"] == len(values)
+    assert trend["average"] == pytest.approx(statistics.mean(values))
+    assert (trend["min"], trend["max"]) == (min(values), max(values))
+    assert trend["change"] == pytest.approx(values[-1] - values[0])
+    assert trend["direction"] == "FALLING"
+
+    values = [m["harmony"] for m in tracker.get_metrics_in_range(now - timedelta(hours=48), now)]
+    slope, intercept = np.polyfit(np.arange(len(values)), values, 1)
+    prediction = tracker.predict_harmony(hours_ahead=12)
+    assert prediction["slope"] == pytest.approx(slope)
+    assert prediction["current"] == values[-1]
+    expected = slope * (len(values) + 12 / (48 / len(values))) + intercept
+    assert prediction["predicted_harmony"] == pytest.approx(max(0.0, min(1.0, expected)))
+
+    for success, delta in [(True, 0.1), (True, 0.06), (False, -0.02)]:
+        tracker.record_ritual("Z-88", "Kael", 0.4, 0.4 + delta, success)
+    effectiveness = tracker.get_ritual_effectiveness("Z-88")
+    assert effectiveness["executions"] == 3
+    assert effectiveness["success_rate"] == pytest.approx(2 / 3)
+    assert effectiveness["average_delta"] == pytest.approx(0.14 / 3)
+    assert tracker.get_ritual_effectiveness("missing")["effectiveness"] == "UNKNOWN"
+
+
+@pytest.mark.unit
+def test_threads_reuse_their_own_connection(tracker):
+    """Each thread opens one connection and keeps it across calls."""
+    def worker():
+        for _ in range(50):
+            tracker.record_metrics(0.5, 1.0, 0.5, 0.5, 0.01, 1.0, "COHERENT")
+        assert tracker._conn is tracker._conn
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(tracker.get_recent_metrics(limit=1000)) == 200
+    assert len(tracker._connections) == 5
@@ -0,0 +1,142 @@
+"""
+Tests for buffered usage logging and incremental per-day rollups.
+"""
+import errno
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.saas import usage_metering
+from backend.saas.usage_metering import (BillingAccumulator, UsageMeter,
+                                         UsageRollupStore)
+
+
+def write_legacy_log(path, entries):
+    with open(path, "w") as f:
+        for user_id, days_ago, metric, quantity in entries:
+            timestamp = (datetime.utcnow() - timedelta(days=days_ago)).isoformat() + "Z"
+            f.write(json.dumps({
+                "timestamp": timestamp, "user_id": user_id, "metric_type": metric,
+                "quantity": quantity, "metadata": {},
+            }) + "\n")
+
+
+@pytest.mark.unit
+def test_migration_builds_rollups_from_existing_log(tmp_path):
+    """An existing JSONL log is read once into rollups and checkpointed."""
+    log = tmp_path / "saas_usage.jsonl"
+    write_legacy_log(log, [
+        ("alice", 0, "api_calls", 5),
+        ("alice", 3, "api_calls", 2),
+        ("alice", 3, "exports", 1),
+        ("alice", 45, "api_calls", 100),  # outside a 30-day window
+        ("bob", 1, "api_calls", 7),
+    ])
+
+    meter = UsageMeter(usage_file=log)
+    assert meter.get_usage_summary("alice") == {"api_calls": 7, "systems": 0, "alerts": 0, "exports": 1}
+    assert meter.get_usage_summary("alice", days=60)["api_calls"] == 107
+    assert meter.get_usage_summary("nobody") == {"api_calls": 0, "systems": 0, "alerts": 0, "exports": 0}
+
+    meter.store.checkpoint()
+    checkpoint = json.loads(meter.store.checkpoint_path.read_text())
+    assert checkpoint["log_offset"] == log.stat().st_size
+    assert set(checkpoint["rollups"]) == {"alice", "bob"}
+
+
+@pytest.mark.unit
+def test_window_covers_exactly_the_requested_days(tmp_path):
+    """A 30-day summary spans 30 calendar days: today back to 29 days ago, not 30."""
+    log = tmp_path / "saas_usage.jsonl"
+    write_legacy_log(log, [
+        ("alice", 0, "api_calls", 1),
+        ("alice", 29, "api_calls", 10),
+        ("alice", 30, "api_calls", 100),
+    ])
+
+    store = UsageRollupStore(log)
+    assert store.totals("alice", 30) == {"api_calls": 11}
+    assert store.totals("alice", 31) == {"api_calls": 111}
+    assert store.totals("alice", 1) == {"api_calls": 1}
+
+
+@pytest.mark.unit
+def test_writes_are_buffered_and_reads_see_them(tmp_path):
+    """record_usage doesn't touch the file until a batch is full; reads flush first."""
+    log = tmp_path / "saas_usage.jsonl"
+    store = UsageRollupStore(log, flush_every=50, flush_interval=60)
+    for _ in range(49):
+        store.record({"timestamp": datetime.utcnow().isoformat() + "Z", "user_id": "alice",
+                      "metric_type": "api_calls", "quantity": 1, "metadata": {}})
+    assert not log.exists()
+
+    assert store.totals("alice", 30) == {"api_calls": 49}
+    assert len(log.read_text().splitlines()) == 49
+
+
+@pytest.mark.unit
+def test_failed_flush_keeps_unwritten_entries(tmp_path, monkeypatch):
+    """A write error leaves the unwritten bytes buffered; the retry completes the log exactly."""
+    log = tmp_path / "saas_usage.jsonl"
+    store = UsageRollupStore(log, flush_every=3, flush_interval=60)
+    real_write, calls = os.write, []
+
+    def failing_write(fd, data):
+        calls.append(len(data))
+        if len(calls) == 1:
+            return real_write(fd, data[:10])  # short write, then the disk fills up
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(usage_metering.os, "write", failing_write)
+    for _ in range(3):
+        store.record({"timestamp": datetime.utcnow().isoformat() + "Z", "user_id": "alice",
+                      "metric_type": "api_calls", "quantity": 1, "metadata": {}})
+    with pytest.raises(OSError):
+        store.flush()
+
+    monkeypatch.setattr(usage_metering.os, "write", real_write)
+    assert store.totals("alice", 1) == {"api_calls": 3}
+    assert [json.loads(line)["quantity"] for line in log.read_text().splitlines()] == [1, 1, 1]
+
+
+@pytest.mark.unit
+def test_restart_replays_only_the_log_tail(tmp_path, monkeypatch):
+    """A new process loads the checkpoint and reads just the lines appended after it."""
+    log = tmp_path / "saas_usage.jsonl"
+    write_legacy_log(log, [("alice", 0, "api_calls", 1)] * 100)
+    first = UsageRollupStore(log)
+    first.checkpoint()
+
+    # Another process appends more usage (plus a half-written line)
+    write_legacy_log(tmp_path / "tail.jsonl", [("alice", 0, "api_calls", 2)] * 10)
+    with open(log, "a") as f:
+        f.write((tmp_path / "tail.jsonl").read_text())
+        f.write('{"timestamp": "2025-')
+
+    applied = []
+    original = UsageRollupStore._apply
+    monkeypatch.setattr(UsageRollupStore, "_apply", lambda self, *args: applied.append(args) or original(self, *args))
+    second = UsageRollupStore(log)
+    assert len(applied) == 10
+    assert second.totals("alice", 1) == {"api_calls": 120}
+
+    # The same meter also picks up the other process's writes incrementally
+    with open(log, "a") as f:
+        f.write('01T00:00:00Z", "user_id": "carol", "metric_type": "alerts", "quantity": 3}\n')
+    assert first.totals("alice", 1) == {"api_calls": 120}
+    assert second.rebuild() == 111
+
+
+@pytest.mark.unit
+def test_monthly_projection_uses_rollups(tmp_path, monkeypatch):
+    """Billing projection reads the 30-day window from the shared store."""
+    monkeypatch.chdir(tmp_path)
+    meter = UsageMeter()
+    for _ in range(3):
+        meter.record_usage("alice", "api_calls", quantity=50_000)
+
+    projection = BillingAccumulator().get_current_monthly_projection("alice", "pro")
+    assert projection["current_usage"]["api_calls"] == 150_000
+    assert projection["projected_charge"]["overage_charge_cents"] == 2500
@@ -0,0 +1,129 @@
+"""
+Tests for the webhook delivery engine.
+"""
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+import pytest
+
+from backend.saas.webhooks import (DeliveryStatus, WebhookEvent, WebhookService,
+                                   WebhookSubscription)
+
+
+def subscribe(url: str, events=(WebhookEvent.USER_CREATED,), **fields) -> WebhookSubscription:
+    return WebhookSubscription(user_id="user_1", name=url, url=url, events=list(events), **fields)
+
+
+async def wait_until(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+async def service():
+    webhooks = WebhookService(workers=6, max_concurrency_per_endpoint=2, max_retained_deliveries=100)
+    yield webhooks
+    await webhooks.stop()
+
+
+def use_transport(service: WebhookService, handler):
+    service._clients[True] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_workers_deliver_concurrently_within_endpoint_limits(service):
+    """Deliveries run in parallel, but never more than the limit against one endpoint."""
+    active, peak = Counter(), Counter()
+
+    async def handler(request):
+        host = request.url.host
+        active[host] += 1
+        peak[host] = max(peak[host], active[host])
+        await asyncio.sleep(0.1)
+        active[host] -= 1
+        return httpx.Response(200, text="ok")
+
+    use_transport(service, handler)
+    slow = await service.create_subscription(subscribe("https://slow.example.com/hook"))
+    await service.create_subscription(subscribe("https://other.example.com/hook"))
+    await service.create_subscription(subscribe("https://third.example.com/hook"))
+
+    started = time.monotonic()
+    for i in range(6):
+        await service.dispatch_event(WebhookEvent.USER_CREATED, {"n": i})
+    await wait_until(lambda: len(service._completed) == 18)
+    elapsed = time.monotonic() - started
+
+    assert all(count == 2 for count in peak.values())
+    assert elapsed < 18 * 0.1 / 2  # far quicker than serial delivery
+    stats = service.get_endpoint_stats(str(slow.url))
+    assert stats["attempts"] == 6 and stats["success_rate"] == 1.0
+    assert stats["latency_ms"]["p50"] >= 100
+    assert service.get_stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_backed_off_retry_does_not_block_other_deliveries(service):
+    """A delivery waiting for its retry sits on the delay heap, not the head of the queue."""
+    calls = []
+
+    async def handler(request):
+        calls.append((request.url.host, time.monotonic()))
+        if request.url.host == "flaky.example.com" and len([c for c in calls if c[0] == "flaky.example.com"]) == 1:
+            return httpx.Response(503, text="unavailable")
+        return httpx.Response(200, text="ok")
+
+    use_transport(service, handler)
+    flaky = await service.create_subscription(subscribe(
+        "https://flaky.example.com/hook", events=[WebhookEvent.PAYMENT_FAILED], retry_backoff_seconds=1,
+    ))
+    await service.create_subscription(subscribe("https://healthy.example.com/hook"))
+
+    await service.dispatch_event(WebhookEvent.PAYMENT_FAILED, {"invoice": "inv_1"})
+    await wait_until(lambda: service.get_stats()["scheduled_retries"] == 1)
+    scheduled_at = time.monotonic()
+    await service.dispatch_event(WebhookEvent.USER_CREATED, {"user": "u1"})
+    await wait_until(lambda: any(host == "healthy.example.com" for host, _ in calls))
+    assert time.monotonic() - scheduled_at < 0.5
+
+    [delivery] = await service.get_deliveries(webhook_id=flaky.id)
+    await wait_until(lambda: delivery.status == DeliveryStatus.SUCCESS)
+    flaky_calls = [at for host, at in calls if host == "flaky.example.com"]
+    assert len(flaky_calls) == 2 and flaky_calls[1] - flaky_calls[0] >= 0.95
+    assert delivery.attempt_count == 2
+    assert service.get_endpoint_stats(str(flaky.url))["failures"] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_event_index_and_bounded_retention():
+    """Only subscribers of the event are matched; finished deliveries are capped."""
+    service = WebhookService(workers=2, max_retained_deliveries=5)
+    use_transport(service, lambda request: httpx.Response(200))
+    users = await service.create_subscription(subscribe("https://users.example.com/hook"))
+    payments = await service.create_subscription(subscribe(
+        "https://payments.example.com/hook", events=[WebhookEvent.PAYMENT_SUCCEEDED],
+    ))
+
+    for i in range(12):
+        await service.dispatch_event(WebhookEvent.USER_CREATED, {"n": i})
+    await wait_until(lambda: service.get_stats()["ready"] == 0 and service.get_stats()["in_flight"] == 0)
+
+    assert len(service.deliveries) == 5
+    newest = await service.get_deliveries(limit=2)
+    assert [d.payload["n"] for d in newest] == [11, 10]
+    assert all(d.webhook_id == users.id for d in service.deliveries.values())
+    assert service.get_endpoint_stats(str(payments.url))["attempts"] == 0
+
+    await service.update_subscription(users.id, {"events": [WebhookEvent.PAYMENT_SUCCEEDED]})
+    await service.dispatch_event(WebhookEvent.USER_CREATED, {"n": 99})
+    assert all(d.payload["n"] != 99 for d in service.deliveries.values())
+    await service.delete_subscription(payments.id)
+    assert list(service._event_index) == [WebhookEvent.PAYMENT_SUCCEEDED]
+    await service.stop()